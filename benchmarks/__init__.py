@@ -0,0 +1,7 @@
+"""
+benchmarks
+~~~~~~~~~~
+Standalone performance benchmarks. Each module is runnable with
+``python -m benchmarks.<module> --help`` and works against a throwaway test
+database created from the project's migrations, never the configured one.
+"""
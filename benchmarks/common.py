@@ -0,0 +1,163 @@
+"""
+common.py
+~~~~~~~~~
+Shared helpers for benchmarks: Django setup, an isolated database, synthetic
+data and latency statistics.
+"""
+
+import contextlib
+import os
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda",
+    "William", "Elizabeth", "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+    "Thomas", "Sarah", "Charles", "Karen", "Jonathan", "Nancy", "Daniel", "Lisa",
+    "Matthew", "Margaret", "Anthony", "Sandra", "Mark", "Ashley", "Priya", "Arjun",
+    "Wei", "Mei", "Fatima", "Omar", "Sofia", "Mateo", "Aiko", "Kenji",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+    "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson",
+    "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson",
+    "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson", "Patel",
+    "Sharma", "Gauri", "Nakamura", "Kim", "Nguyen", "Okafor", "Haddad", "Rossi", "Novak",
+]
+
+
+def setup_django():
+    """Configure Django for a benchmark run outside ``manage.py``."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+
+    django.setup()
+
+
+@contextlib.contextmanager
+def isolated_database(keepdb=False):
+    """
+    Create the test database(s) from migrations for the duration of the block.
+
+    Args:
+        keepdb (bool): Reuse an existing test database instead of recreating it.
+    """
+    from django.test.utils import setup_databases, teardown_databases
+
+    config = setup_databases(verbosity=0, interactive=False, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        teardown_databases(config, verbosity=0, keepdb=keepdb)
+
+
+def synthetic_name(index, rng):
+    """Return a (first, last) name pair, with a numeric suffix for variety at scale."""
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    if index >= len(FIRST_NAMES) * len(LAST_NAMES):
+        last = f"{last}{index % 997}"
+    return first, last
+
+
+def seed_patients(count, users=10, batch_size=5000, seed=42):
+    """
+    Bulk-insert ``count`` synthetic patients spread over ``users`` owners.
+
+    Returns:
+        list[int]: Owner user ids.
+    """
+    from patients.models import Patient
+    from users.models import User
+
+    rng = random.Random(seed)
+    owners = [
+        User.objects.create_user(username=f"bench{i}", email=f"bench{i}@example.com", password=None)
+        for i in range(users)
+    ]
+    start = date(1940, 1, 1)
+    batch = []
+    for index in range(count):
+        first, last = synthetic_name(index, rng)
+        batch.append(Patient(
+            user=owners[index % users],
+            first_name=first,
+            last_name=last,
+            date_of_birth=start + timedelta(days=index // users),
+            gender=rng.choice(["Male", "Female", "Other"]),
+            email=f"{first.lower()}.{last.lower()}{index}@example.com",
+            contact_number=f"{5550000000 + index}",
+        ))
+        if len(batch) >= batch_size:
+            Patient.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Patient.objects.bulk_create(batch)
+    return [owner.id for owner in owners]
+
+
+def seed_heart_rates(owner_ids, per_patient, batch_size=5000, seed=42):
+    """Bulk-insert ``per_patient`` readings for every patient."""
+    from django.utils import timezone
+    from patients.models import Patient
+    from vitals.models import HeartRate
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    batch = []
+    for patient_id, owner_id in Patient.objects.values_list("id", "user_id").iterator():
+        for i in range(per_patient):
+            batch.append(HeartRate(
+                patient_id=patient_id,
+                recorded_by_id=owner_id,
+                bpm=rng.randint(50, 140),
+                recorded_at=now - timedelta(minutes=i * 15),
+            ))
+        if len(batch) >= batch_size:
+            HeartRate.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        HeartRate.objects.bulk_create(batch)
+
+
+def timed(func, *args, **kwargs):
+    """Run ``func`` and return ``(result, seconds)``."""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def summarize(samples):
+    """
+    Latency summary in milliseconds.
+
+    Returns:
+        dict: ``n``, ``mean``, ``p50``, ``p95``, ``p99`` and ``max``.
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return {"n": 0}
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    return {
+        "n": len(ordered),
+        "mean": statistics.fmean(ordered) * 1000,
+        "p50": pct(50),
+        "p95": pct(95),
+        "p99": pct(99),
+        "max": ordered[-1] * 1000,
+    }
+
+
+def format_summary(label, summary):
+    """One-line, fixed-width rendering of ``summarize`` output."""
+    if not summary.get("n"):
+        return f"{label:<40} (no samples)"
+    return (
+        f"{label:<40} n={summary['n']:<6} mean={summary['mean']:8.2f}ms "
+        f"p50={summary['p50']:8.2f}ms p95={summary['p95']:8.2f}ms p99={summary['p99']:8.2f}ms"
+    )
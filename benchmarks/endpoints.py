@@ -0,0 +1,461 @@
+"""
+endpoints.py
+~~~~~~~~~~~~
+Latency and throughput of every users / patients / vitals route at a
+chosen data scale, with baseline comparison.
+
+Usage
+-----
+    python -m benchmarks.endpoints                                  # 10k readings, test client
+    python -m benchmarks.endpoints --scale 1m --keepdb              # 1M readings; reuse the seeded DB
+    python -m benchmarks.endpoints --scale 10m --keepdb --only heart-rate
+    python -m benchmarks.endpoints --http --concurrency 8           # local HTTP server, reads only
+    python -m benchmarks.endpoints --save-baseline benchmarks/baselines/10k.json
+    python -m benchmarks.endpoints --baseline benchmarks/baselines/10k.json   # exit 1 on regression
+
+Seeds an isolated test database with ``--scale`` heart-rate readings (10k,
+1m or 10m; 20 readings per patient over 10 owners) plus locations, devices
+and merge suggestions. With ``--keepdb`` an already seeded database is
+reused, which matters at 10m. Every ``(route, method)`` of ``users/urls.py``,
+``patients/urls.py`` and ``vitals/urls.py`` must have a case in ``CASES``;
+the run stops if one is missing.
+
+Requests carry real JWTs. In-process (the default) they go through the
+Django test client; writes run inside a rolled-back transaction so every
+iteration sees the same data. ``--http`` serves the app from a local
+threaded WSGI server and sends reads over keep-alive HTTP connections from
+``--concurrency`` threads (writes are skipped: they could not be rolled
+back). The response cache is disabled unless ``--response-cache``.
+
+For each case the report shows latency percentiles, throughput (requests
+per second) and the status codes seen. ``--save-baseline`` stores the
+results as JSON; ``--baseline`` compares p50 and p95 against a stored run
+and flags cases slower by more than ``--threshold`` (and ``--min-delta-ms``).
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date
+
+from benchmarks.common import (
+    format_summary, isolated_database, seed_heart_rates, seed_patients, setup_django, summarize, timed,
+)
+
+SCALES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+READINGS_PER_PATIENT = 20
+OWNERS = 10
+ADMIN_USERNAME = "bench-admin"
+ADMIN_PASSWORD = "Bench-Admin-Pass-1"
+URLCONFS = {"users": "users.urls", "patients": "patients.urls", "vitals": "vitals.urls"}
+
+
+@dataclass
+class Case:
+    """
+    One request shape to measure.
+
+    Attributes:
+        name (str): URL name.
+        method (str): HTTP method.
+        who (str): ``"owner"``, ``"admin"``, ``"anon"`` or ``"fresh"`` (a new
+            owner token per request, for endpoints that revoke it).
+        kwargs (callable): ``ctx -> URL kwargs``.
+        params (callable): ``ctx -> query parameters``.
+        body (callable): ``ctx -> JSON body``.
+    """
+
+    name: str
+    method: str
+    who: str = "owner"
+    kwargs: object = None
+    params: object = None
+    body: object = None
+    key: str = field(init=False)
+
+    def __post_init__(self):
+        self.key = f"{self.method} {self.name}"
+
+    @property
+    def write(self):
+        return self.method != "GET"
+
+
+def pick(ids):
+    return lambda ctx: {"pk": ctx.rng.choice(ctx.ids[ids])}
+
+
+def sample_ids(ctx, ids, count=100):
+    return ctx.rng.sample(ctx.ids[ids], min(count, len(ctx.ids[ids])))
+
+
+def joined(ids):
+    return lambda ctx: {"ids": ",".join(map(str, sample_ids(ctx, ids)))}
+
+
+def patient_body(ctx):
+    return {"first_name": f"Bench{next(ctx.counter)}", "last_name": "Run", "date_of_birth": "1990-01-01", "gender": "Other"}
+
+
+def import_rows(ctx):
+    run = next(ctx.counter)
+    return [
+        {"first_name": f"Import{run}x{i}", "last_name": "Run", "date_of_birth": "1985-05-05", "gender": "Female"}
+        for i in range(100)
+    ]
+
+
+def register_body(ctx):
+    n = next(ctx.counter)
+    return {
+        "username": f"benchreg{n}", "email": f"benchreg{n}@example.com", "first_name": "Bench", "last_name": "Run",
+        "password": ADMIN_PASSWORD, "password2": ADMIN_PASSWORD,
+    }
+
+
+CASES = [
+    # users/urls.py
+    Case("user-register", "POST", who="anon", body=register_body),
+    Case("user-login", "POST", who="anon", body=lambda ctx: {"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD}),
+    Case("user-logout", "POST", who="fresh"),
+    Case("user-hash-pool-stats", "GET", who="admin"),
+    Case("user-list-users", "GET", who="admin", params=lambda ctx: {"page_size": 100}),
+    Case("user-detail", "GET", kwargs=pick("users")),
+    Case("user-detail", "PUT", kwargs=pick("users"), body=lambda ctx: {"first_name": "Bench"}),
+    Case("user-detail", "PATCH", kwargs=pick("users"), body=lambda ctx: {"first_name": "Bench"}),
+    Case("user-detail", "DELETE", kwargs=pick("users")),
+    Case("location-list", "GET"),
+    Case("location-list", "POST", body=lambda ctx: {"name": f"Bench Location {next(ctx.counter)}"}),
+    Case("location-detail", "GET", kwargs=pick("locations")),
+    Case("location-detail", "PUT", kwargs=pick("locations"),
+         body=lambda ctx: {"name": f"Bench Location {next(ctx.counter)}", "city": "Springfield"}),
+    Case("location-detail", "PATCH", kwargs=pick("locations"), body=lambda ctx: {"city": "Shelbyville"}),
+    Case("location-detail", "DELETE", kwargs=pick("locations")),
+    Case("device-list", "GET"),
+    Case("device-list", "POST", body=lambda ctx: {"name": f"bench-device-{next(ctx.counter)}"}),
+    Case("device-detail", "GET", kwargs=pick("devices")),
+    Case("device-detail", "PATCH", kwargs=pick("devices"), body=lambda ctx: {"name": "renamed"}),
+    Case("device-detail", "DELETE", kwargs=pick("devices")),
+    Case("device-rotate", "POST", kwargs=pick("devices")),
+    # patients/urls.py
+    Case("patient-list", "GET"),
+    Case("patient-list", "POST", body=patient_body),
+    Case("patient-detail", "GET", kwargs=pick("patients")),
+    Case("patient-detail", "PUT", kwargs=pick("patients"), body=patient_body),
+    Case("patient-detail", "PATCH", kwargs=pick("patients"), body=lambda ctx: {"last_name": "Patched"}),
+    Case("patient-detail", "DELETE", kwargs=pick("patients")),
+    Case("patient-timeline", "GET", kwargs=pick("patients")),
+    Case("patient-autocomplete", "GET", params=lambda ctx: {"q": ctx.rng.choice(["Ma", "Jo", "Pri", "Wil"])}),
+    Case("patient-batch", "GET", params=joined("patients")),
+    Case("patient-batch", "POST", body=lambda ctx: {"ids": sample_ids(ctx, "patients")}),
+    Case("patient-import", "POST", body=import_rows),
+    Case("merge-suggestion-list", "GET", who="admin"),
+    Case("merge-suggestion-detail", "GET", who="admin", kwargs=pick("suggestions")),
+    Case("merge-suggestion-merge", "POST", who="admin", kwargs=pick("suggestions")),
+    Case("merge-suggestion-dismiss", "POST", who="admin", kwargs=pick("suggestions")),
+    # vitals/urls.py
+    Case("heart-rate-list", "GET"),
+    Case("heart-rate-list", "POST", body=lambda ctx: {"patient": ctx.rng.choice(ctx.ids["patients"]), "bpm": 72}),
+    Case("heart-rate-batch", "GET", params=joined("heart_rates")),
+    Case("heart-rate-batch", "POST", body=lambda ctx: {"ids": sample_ids(ctx, "heart_rates")}),
+    Case("heart-rate-detail", "GET", kwargs=pick("heart_rates")),
+    Case("heart-rate-detail", "PUT", kwargs=pick("heart_rates"),
+         body=lambda ctx: {"patient": ctx.rng.choice(ctx.ids["patients"]), "bpm": 80}),
+    Case("heart-rate-detail", "PATCH", kwargs=pick("heart_rates"), body=lambda ctx: {"bpm": 81}),
+    Case("heart-rate-detail", "DELETE", kwargs=pick("heart_rates")),
+]
+
+
+def route_methods():
+    """Every ``(url name, METHOD)`` served by the benchmarked URLconfs."""
+    from importlib import import_module
+
+    routes = set()
+    for module in URLCONFS.values():
+        for pattern in import_module(module).urlpatterns:
+            for method in getattr(pattern.callback, "actions", {}):
+                routes.add((pattern.name, method.upper()))
+    return routes
+
+
+def check_coverage():
+    """Stop when a route has no case (or a case names no route)."""
+    routes = route_methods()
+    cases = {(case.name, case.method) for case in CASES}
+    missing, stale = sorted(routes - cases), sorted(cases - routes)
+    if missing or stale:
+        sys.exit(f"Benchmark cases out of date. Missing: {missing}. Unknown: {stale}.")
+
+
+# -----------------------------
+# Data
+# -----------------------------
+def seed(rows):
+    """Seed ``rows`` readings plus reference data, unless already present."""
+    from django.contrib.auth.hashers import make_password
+    from patients.models import MergeSuggestion, Patient
+    from users.models import Device, Location, User
+    from vitals.models import HeartRate
+
+    if HeartRate.objects.count() >= rows:
+        print(f"Reusing seeded database ({HeartRate.objects.count():,} readings).")
+        return
+    patients = max(rows // READINGS_PER_PATIENT, OWNERS)
+    print(f"Seeding {patients:,} patients with {READINGS_PER_PATIENT} readings each...")
+    owner_ids, seconds = timed(seed_patients, patients, users=OWNERS)
+    _, more = timed(seed_heart_rates, owner_ids, READINGS_PER_PATIENT, 10_000)
+    print(f"Seeded in {seconds + more:.1f}s")
+
+    User.objects.create(
+        username=ADMIN_USERNAME, email="bench-admin@example.com", password=make_password(ADMIN_PASSWORD),
+        is_staff=True, is_superuser=True,
+    )
+    Location.objects.bulk_create([Location(name=f"Clinic {i}", city="Springfield") for i in range(50)])
+    owner = User.objects.get(pk=owner_ids[0])
+    Device.objects.bulk_create([Device(name=f"monitor-{i}", owner=owner) for i in range(10)])
+    pairs = list(Patient.objects.filter(user=owner).values_list("id", flat=True)[:200])
+    MergeSuggestion.objects.bulk_create([
+        MergeSuggestion(primary_id=a, duplicate_id=b, score=0.9, reasons=["name"])
+        for a, b in zip(pairs[0::2], pairs[1::2])
+    ])
+
+
+class Context:
+    """Ids, users and tokens the cases draw from."""
+
+    def __init__(self, seed_value=7):
+        from patients.models import MergeSuggestion, Patient
+        from users.authentication import issue_tokens
+        from users.models import Device, Location, User
+        from vitals.models import HeartRate
+
+        self.rng = random.Random(seed_value)
+        self.counter = itertools.count(int(time.time()))
+        self.owner = User.objects.filter(username__startswith="bench").exclude(username=ADMIN_USERNAME).order_by("id")[0]
+        self.admin = User.objects.get(username=ADMIN_USERNAME)
+        self.issue_tokens = issue_tokens
+        self.tokens = {
+            "owner": str(issue_tokens(self.owner).access_token),
+            "admin": str(issue_tokens(self.admin).access_token),
+        }
+        self.ids = {
+            "users": [self.owner.id],
+            "patients": list(Patient.objects.filter(user=self.owner).values_list("id", flat=True)[:2000]),
+            "heart_rates": list(HeartRate.objects.filter(patient__user=self.owner).values_list("id", flat=True)[:2000]),
+            "locations": list(Location.objects.values_list("id", flat=True)),
+            "devices": list(Device.objects.filter(owner=self.owner).values_list("id", flat=True)),
+            "suggestions": list(MergeSuggestion.objects.values_list("id", flat=True)),
+        }
+
+    def headers(self, who):
+        if who == "anon":
+            return {}
+        token = str(self.issue_tokens(self.owner).access_token) if who == "fresh" else self.tokens[who]
+        return {"Authorization": f"Bearer {token}"}
+
+
+def build_request(case, ctx):
+    """``(path, query, body, headers)`` for one iteration of ``case``."""
+    from urllib.parse import urlencode
+    from django.urls import reverse
+
+    path = reverse(case.name, kwargs=case.kwargs(ctx) if case.kwargs else None)
+    query = urlencode(case.params(ctx)) if case.params else ""
+    body = json.dumps(case.body(ctx)).encode() if case.body else b""
+    return path, query, body, ctx.headers(case.who)
+
+
+# -----------------------------
+# Drivers
+# -----------------------------
+def run_in_process(case, ctx, requests, warmup):
+    """Drive ``case`` through the test client; writes are rolled back."""
+    from django.db import transaction
+    from django.test import Client
+
+    client = Client(raise_request_exception=False)
+    samples, statuses = [], {}
+    for i in range(warmup + requests):
+        path, query, body, headers = build_request(case, ctx)
+        url = f"{path}?{query}" if query else path
+        with transaction.atomic():
+            started = time.perf_counter()
+            response = client.generic(case.method, url, body, content_type="application/json", headers=headers)
+            if hasattr(response, "streaming_content"):
+                b"".join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        if i >= warmup:
+            samples.append(elapsed)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return samples, statuses, sum(samples)
+
+
+def run_http(case, ctx, requests, warmup, server, concurrency):
+    """Drive ``case`` over HTTP from ``concurrency`` keep-alive connections."""
+    prepared = [build_request(case, ctx) for _ in range(warmup + requests)]
+    samples, statuses, lock = [], {}, threading.Lock()
+    work = iter(enumerate(prepared))
+
+    def worker():
+        conn = http.client.HTTPConnection(server.host, server.port)
+        try:
+            while True:
+                with lock:
+                    item = next(work, None)
+                if item is None:
+                    return
+                i, (path, query, body, headers) = item
+                url = f"{path}?{query}" if query else path
+                started = time.perf_counter()
+                conn.request(case.method, url, body=body or None, headers={**headers, "Content-Type": "application/json"})
+                response = conn.getresponse()
+                response.read()
+                elapsed = time.perf_counter() - started
+                if i >= warmup:
+                    with lock:
+                        samples.append(elapsed)
+                        statuses[response.status] = statuses.get(response.status, 0) + 1
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, statuses, time.perf_counter() - started
+
+
+def start_server():
+    """Serve the app from a local threaded WSGI server sharing the test database."""
+    from django.db import connections
+    from django.test.testcases import LiveServerThread
+
+    override = {}
+    for conn in connections.all():
+        if conn.vendor == "sqlite" and conn.is_in_memory_db():
+            conn.inc_thread_sharing()
+            override[conn.alias] = conn
+    server = LiveServerThread("127.0.0.1", lambda handler: handler, connections_override=override)
+    server.daemon = True
+    server.start()
+    server.is_ready.wait()
+    if server.error:
+        raise server.error
+    print(f"Serving on http://{server.host}:{server.port}")
+    return server
+
+
+# -----------------------------
+# Reporting
+# -----------------------------
+def compare(results, baseline, threshold, min_delta_ms):
+    """
+    Cases slower than ``baseline``.
+
+    Returns:
+        list[str]: One line per regressed metric.
+    """
+    regressions = []
+    for key, result in results.items():
+        before = baseline.get("cases", {}).get(key)
+        if not before or not result.get("n") or not before.get("n"):
+            continue
+        for metric in ("p50", "p95"):
+            old, new = before[metric], result[metric]
+            if new > old * (1 + threshold) and new - old > min_delta_ms:
+                regressions.append(f"{key}: {metric} {old:.2f}ms -> {new:.2f}ms (+{new / old - 1:.0%})")
+    return regressions
+
+
+def run(args):
+    from django.conf import settings
+
+    logging.disable(logging.ERROR)
+    settings.RESPONSE_CACHE_ENABLED = args.response_cache
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver", "127.0.0.1", "localhost"]
+
+    seed(SCALES[args.scale])
+    ctx = Context()
+    server = start_server() if args.http else None
+
+    cases = [case for case in CASES if not args.only or any(part in case.name for part in args.only)]
+    if args.http:
+        cases = [case for case in cases if not case.write]
+    results = {}
+    try:
+        for case in cases:
+            if server:
+                samples, statuses, wall = run_http(case, ctx, args.requests, args.warmup, server, args.concurrency)
+            else:
+                samples, statuses, wall = run_in_process(case, ctx, args.requests, args.warmup)
+            summary = summarize(samples)
+            summary["rps"] = len(samples) / wall if wall else 0.0
+            summary["statuses"] = {str(code): count for code, count in sorted(statuses.items())}
+            results[case.key] = summary
+            errors = "  ERRORS" if any(code >= 500 for code in statuses) else ""
+            print(format_summary(case.key, summary))
+            print(f"{'':<40} {summary['rps']:8.1f} req/s  status={summary['statuses']}{errors}")
+    finally:
+        if server:
+            server.terminate()
+
+    report = {
+        "scale": args.scale,
+        "mode": f"http x{args.concurrency}" if args.http else "in-process",
+        "requests": args.requests,
+        "date": date.today().isoformat(),
+        "cases": results,
+    }
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        if (baseline.get("scale"), baseline.get("mode")) != (report["scale"], report["mode"]):
+            print(f"Warning: baseline is {baseline.get('scale')} / {baseline.get('mode')}, "
+                  f"this run is {report['scale']} / {report['mode']}")
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        print(f"{len(regressions)} regression(s) against {args.baseline}")
+        return 1 if regressions else 0
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="10k", help="Heart-rate readings to seed.")
+    parser.add_argument("--requests", type=int, default=50, help="Measured requests per case.")
+    parser.add_argument("--warmup", type=int, default=3, help="Unmeasured requests per case.")
+    parser.add_argument("--only", nargs="*", help="Only cases whose URL name contains one of these.")
+    parser.add_argument("--http", action="store_true", help="Serve over local HTTP instead of the test client.")
+    parser.add_argument("--concurrency", type=int, default=1, help="HTTP client threads (with --http).")
+    parser.add_argument("--response-cache", action="store_true", help="Keep the response cache enabled.")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write results as a baseline JSON file.")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare against a baseline; exit 1 on regression.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown flagged (0.2 = 20%%).")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this.")
+    parser.add_argument("--keepdb", action="store_true", help="Keep (and reuse) the seeded test database.")
+    args = parser.parse_args()
+
+    setup_django()
+    check_coverage()
+    with isolated_database(keepdb=args.keepdb):
+        code = run(args)
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
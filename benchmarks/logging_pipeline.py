@@ -0,0 +1,127 @@
+"""
+logging_pipeline.py
+~~~~~~~~~~~~~~~~~~~
+Benchmark log handling cost on the heart-rate ingest path.
+
+Usage
+-----
+    python -m benchmarks.logging_pipeline
+    python -m benchmarks.logging_pipeline --requests 2000 --sink-latency-ms 0
+
+Compares three setups, each writing to a log file in a temporary directory
+through a sink that waits ``--sink-latency-ms`` per write (modelling a
+congested stderr pipe or a remote collector; 0 for a local buffered file):
+
+- ``sync``: handlers run on the request thread, no sampling (the previous
+  behaviour);
+- ``queue``: handlers behind ``install_queue_logging``;
+- ``queue + sampling``: additionally ``SampledLogFilter`` on the ingest logger
+  (the default configuration).
+
+For each it reports the cost of one ingest-path ``logger.info`` call and
+the mean time of ``POST /vitals/heart-rates`` requests.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from benchmarks.common import format_summary, isolated_database, seed_patients, setup_django, summarize, timed
+
+URL = "/api/v1/vitals/heart-rates"
+INGEST_LOGGER = "vitals.views.heartrate"
+
+
+class SlowStream:
+    """File wrapper sleeping ``latency`` seconds per write."""
+
+    def __init__(self, stream, latency):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def configure(variant, log_file):
+    """Point the root logger at ``log_file`` and apply ``variant``."""
+    from django.conf import settings
+    from core.async_logging import SampledLogFilter, install_queue_logging, uninstall_queue_logging
+
+    uninstall_queue_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(log_file)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+    ingest = logging.getLogger(INGEST_LOGGER)
+    ingest.filters.clear()
+    if variant != "sync":
+        install_queue_logging(settings.LOG_QUEUE_SIZE)
+    if variant == "queue + sampling":
+        ingest.addFilter(SampledLogFilter(burst=settings.LOG_SAMPLE_BURST, sample_every=settings.LOG_SAMPLE_EVERY))
+
+
+def per_call(calls):
+    """Mean seconds of one ingest-path info call."""
+    logger = logging.getLogger(INGEST_LOGGER)
+    started = time.perf_counter()
+    for i in range(calls):
+        logger.info("Heart rate record created successfully: %s", i)
+    return (time.perf_counter() - started) / calls
+
+
+def run(args):
+    from django.conf import settings
+    from rest_framework.test import APIClient
+    from core.async_logging import uninstall_queue_logging
+    from patients.models import Patient
+    from users.models import User
+
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+    owner_ids, _ = timed(seed_patients, 10)
+    user = User.objects.get(pk=owner_ids[0])
+    patient = Patient.objects.filter(user=user).first()
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for variant in ("sync", "queue", "queue + sampling"):
+            with open(os.path.join(directory, "app.log"), "w") as log_file:
+                configure(variant, SlowStream(log_file, args.sink_latency_ms / 1000))
+                call = per_call(args.calls)
+                samples = []
+                for i in range(args.requests):
+                    response, seconds = timed(client.post, URL, {"patient": patient.id, "bpm": 60 + i % 60}, format="json")
+                    assert response.status_code == 201, response.status_code
+                    samples.append(seconds)
+                uninstall_queue_logging()
+                print(format_summary(f"{variant} / POST heart-rates", summarize(samples)))
+                print(f"{'':<40} logger.info={call * 1e6:6.2f}us per call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="Ingest requests per variant.")
+    parser.add_argument("--calls", type=int, default=20_000, help="Direct logger calls per variant.")
+    parser.add_argument("--sink-latency-ms", type=float, default=0.2, help="Delay per log write.")
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    with isolated_database(keepdb=args.keepdb):
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
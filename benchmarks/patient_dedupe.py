@@ -0,0 +1,92 @@
+"""
+patient_dedupe.py
+~~~~~~~~~~~~~~~~~
+Benchmark the patient deduplication job.
+
+Usage
+-----
+    python -m benchmarks.patient_dedupe                      # 1M patients
+    python -m benchmarks.patient_dedupe --patients 100000 --duplicate-rate 0.02
+
+Seeds an isolated test database with synthetic patients plus a fraction of
+perturbed copies (misspelled names, shifted birthdays, reformatted phone
+numbers), runs ``find_duplicates`` and reports the wall time per stage and
+the share of injected duplicates that were suggested.
+"""
+
+import argparse
+import random
+from datetime import timedelta
+
+from benchmarks.common import isolated_database, seed_patients, setup_django, timed
+
+
+def perturb(patient, owners, rng):
+    """Return field values for a plausible duplicate entry of ``patient`` by another owner."""
+    first, last = patient.first_name, patient.last_name
+    choice = rng.randrange(4)
+    if choice == 0 and len(first) > 3:
+        i = rng.randrange(1, len(first) - 1)
+        first = first[:i] + first[i + 1:]
+    elif choice == 1:
+        first, last = last, first
+    elif choice == 2:
+        last = last.upper()
+    dob = patient.date_of_birth + timedelta(days=rng.choice([0, 0, 1]))
+    phone = patient.contact_number
+    phone = f"+1 ({phone[:3]}) {phone[3:6]}-{phone[6:]}" if phone and rng.random() < 0.5 else phone
+    return {
+        "user_id": rng.choice([owner for owner in owners if owner != patient.user_id] or owners), "first_name": first, "last_name": last, "date_of_birth": dob,
+        "gender": patient.gender, "contact_number": phone, "email": None,
+    }
+
+
+def seed_duplicates(owners, rate, seed=11):
+    from patients.models import Patient
+
+    rng = random.Random(seed)
+    total = Patient.objects.count()
+    sample = sorted(rng.sample(range(total), int(total * rate)))
+    ids = list(Patient.objects.order_by("id").values_list("id", flat=True))
+    originals = Patient.objects.in_bulk([ids[i] for i in sample])
+    copies = [Patient(**perturb(patient, owners, rng)) for patient in originals.values()]
+    created = Patient.objects.bulk_create(copies, batch_size=5000)
+    return {(original_id, copy.pk) for original_id, copy in zip(originals, created)}
+
+
+def run(args):
+    from django.db import connection
+    from patients.dedupe import candidate_pairs, find_duplicates
+
+    print(f"Seeding {args.patients} patients on {connection.vendor}...")
+    owners, seconds = timed(seed_patients, args.patients)
+    injected, dup_seconds = timed(seed_duplicates, owners, args.duplicate_rate)
+    print(f"Seeded in {seconds:.1f}s, {len(injected)} duplicates in {dup_seconds:.1f}s")
+
+    (pairs, skipped), seconds = timed(candidate_pairs)
+    print(f"Blocking: {len(pairs)} candidate pairs, {skipped} oversized blocks, {seconds:.1f}s")
+
+    result, seconds = timed(find_duplicates, dry_run=args.dry_run)
+    found = {(low, high) for low, high, _, _ in result.matches}
+    recall = len(injected & found) / len(injected) if injected else 1.0
+    print(
+        f"find_duplicates: {seconds:.1f}s total, {len(result.matches)} matches, "
+        f"{result.written} written, recall of injected duplicates {recall:.1%}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--duplicate-rate", type=float, default=0.01)
+    parser.add_argument("--dry-run", action="store_true", help="Do not write suggestions.")
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    with isolated_database(keepdb=args.keepdb):
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
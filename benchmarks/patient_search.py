@@ -0,0 +1,110 @@
+"""
+patient_search.py
+~~~~~~~~~~~~~~~~~
+Benchmark patient search backends against a synthetic registry.
+
+Usage
+-----
+    python -m benchmarks.patient_search                      # 1M patients
+    python -m benchmarks.patient_search --patients 100000 --backends fts5 ngram
+
+Seeds an isolated test database, then times ``search_patients`` for each
+backend with exact, prefix, multi-term and misspelled queries, alongside the
+previous ``icontains`` scan for comparison.
+"""
+
+import argparse
+import operator
+import random
+from functools import reduce
+
+from benchmarks.common import (
+    FIRST_NAMES,
+    LAST_NAMES,
+    format_summary,
+    isolated_database,
+    seed_patients,
+    setup_django,
+    summarize,
+    timed,
+)
+
+
+def misspell(word, rng):
+    """Swap two adjacent inner letters of ``word``."""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 2)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def build_queries(count, seed=7):
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        queries.append(("exact", [last]))
+        queries.append(("prefix", [first[:4]]))
+        queries.append(("two terms", [first, last]))
+        queries.append(("misspelled", [misspell(last, rng)]))
+    return queries
+
+
+def icontains_scan(terms, queryset):
+    from django.db.models import Q
+
+    for term in terms:
+        queryset = queryset.filter(reduce(operator.or_, (
+            Q(**{f"{field}__icontains": term}) for field in ("first_name", "last_name", "email")
+        )))
+    return queryset
+
+
+def run(args):
+    from django.conf import settings
+    from django.db import connection
+    from patients.models import Patient
+    from patients.search import BACKENDS
+
+    print(f"Seeding {args.patients} patients on {connection.vendor}...")
+    _, seconds = timed(seed_patients, args.patients)
+    print(f"Seeded in {seconds:.1f}s")
+
+    queries = build_queries(args.queries)
+    page = settings.REST_FRAMEWORK["PAGE_SIZE"]
+    candidates = [("icontains (baseline)", None)] + [(name, BACKENDS[name]) for name in args.backends]
+    for label, backend_class in candidates:
+        if backend_class is not None and not backend_class.is_available(connection):
+            print(f"{label:<40} unavailable on {connection.vendor}")
+            continue
+        backend = backend_class() if backend_class else None
+        if backend is not None and hasattr(backend, "index"):
+            _, seconds = timed(backend.index.strict, ["warmup"])
+            print(f"{label:<40} index build {seconds:.1f}s")
+        samples = {}
+        for kind, terms in queries:
+            def query():
+                queryset = Patient.objects.all()
+                results = icontains_scan(terms, queryset) if backend is None else backend.search(terms, queryset)
+                return list(results[:page])
+            _, seconds = timed(query)
+            samples.setdefault(kind, []).append(seconds)
+        for kind, values in samples.items():
+            print(format_summary(f"{label} / {kind}", summarize(values)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=50, help="Queries per kind.")
+    parser.add_argument("--backends", nargs="+", default=["trigram", "fts5", "ngram"])
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    with isolated_database(keepdb=args.keepdb):
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+request_timing.py
+~~~~~~~~~~~~~~~~~
+Benchmark the overhead of ``ServerTimingMiddleware`` on the heart-rate list.
+
+Usage
+-----
+    python -m benchmarks.request_timing                      # 2k patients
+    python -m benchmarks.request_timing --patients 500 --page-size 500
+
+Requests the same page with request timing disabled (the default), enabled
+for every request and enabled with slow query logging (threshold above any
+query here, so only the check runs), and prints the timing breakdown of the
+last measured response.
+"""
+
+import argparse
+
+from benchmarks.common import (
+    format_summary, isolated_database, seed_heart_rates, seed_patients, setup_django, summarize, timed,
+)
+from benchmarks.sparse_fields import measure
+
+URL = "/api/v1/vitals/heart-rates"
+VARIANTS = [
+    ("disabled", {"REQUEST_TIMING_ENABLED": False}),
+    ("enabled", {"REQUEST_TIMING_ENABLED": True, "REQUEST_TIMING_SLOW_QUERY_MS": 0}),
+    ("enabled + slow queries", {"REQUEST_TIMING_ENABLED": True, "REQUEST_TIMING_SLOW_QUERY_MS": 10_000}),
+]
+
+
+def run(args):
+    import logging
+    from django.conf import settings
+    from rest_framework.test import APIClient
+    from users.models import User
+
+    logging.getLogger("core.instrumentation").setLevel(logging.WARNING)
+    settings.RESPONSE_CACHE_ENABLED = False
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+    settings.REST_FRAMEWORK["PAGE_SIZE"] = args.page_size
+
+    print(f"Seeding {args.patients} patients with {args.readings} readings each...")
+    owner_ids, seconds = timed(seed_patients, args.patients)
+    _, more = timed(seed_heart_rates, owner_ids, args.readings)
+    print(f"Seeded in {seconds + more:.1f}s")
+    user = User.objects.get(pk=owner_ids[0])
+
+    baseline = None
+    for label, overrides in VARIANTS:
+        for name, value in overrides.items():
+            setattr(settings, name, value)
+        # Middleware is loaded on a client's first request.
+        client = APIClient()
+        client.force_authenticate(user=user)
+        measure(client, URL, {}, 1)
+        samples, cpu, _ = measure(client, URL, {}, args.requests)
+        print(format_summary(label, summarize(samples)))
+        if baseline is None:
+            baseline = cpu
+        print(f"{'':<40} cpu={cpu * 1000:8.2f}ms ({cpu / baseline - 1:+.1%} vs disabled)")
+        response = client.get(URL)
+        if "Server-Timing" in response:
+            print(f"{'':<40} Server-Timing: {response['Server-Timing']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=2_000)
+    parser.add_argument("--readings", type=int, default=10, help="Heart-rate readings per patient.")
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per variant.")
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    with isolated_database(keepdb=args.keepdb):
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+sparse_fields.py
+~~~~~~~~~~~~~~~~
+Benchmark ``?fields=`` sparse fieldsets on the heart-rate and patient lists.
+
+Usage
+-----
+    python -m benchmarks.sparse_fields                       # 10k patients
+    python -m benchmarks.sparse_fields --patients 2000 --readings 20 --page-size 500
+
+Seeds an isolated test database with patients and heart-rate readings, then
+requests the same list pages with the full representation and with a sparse
+fieldset, reporting wall time, process CPU time and payload bytes per page.
+The response cache is disabled so every request is served from the database.
+"""
+
+import argparse
+import time
+
+from benchmarks.common import (
+    format_summary, isolated_database, seed_heart_rates, seed_patients, setup_django, summarize, timed,
+)
+
+BASE_URL = "/api/v1"
+CASES = [
+    ("heart rates", "/vitals/heart-rates", "id,bpm,recorded_at"),
+    ("patients", "/patients", "id,first_name,last_name"),
+]
+
+
+def measure(client, url, params, requests):
+    """Request ``url`` repeatedly; return wall-time samples, CPU seconds and bytes per response."""
+    samples, cpu, size = [], 0.0, 0
+    for _ in range(requests):
+        started = time.process_time()
+        response, seconds = timed(client.get, url, params)
+        cpu += time.process_time() - started
+        assert response.status_code == 200, response.status_code
+        samples.append(seconds)
+        size = len(response.content)
+    return samples, cpu / requests, size
+
+
+def run(args):
+    from django.conf import settings
+    from rest_framework.test import APIClient
+    from users.models import User
+
+    settings.RESPONSE_CACHE_ENABLED = False
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+    settings.REST_FRAMEWORK["PAGE_SIZE"] = args.page_size
+
+    print(f"Seeding {args.patients} patients with {args.readings} readings each...")
+    owner_ids, seconds = timed(seed_patients, args.patients)
+    _, more = timed(seed_heart_rates, owner_ids, args.readings)
+    print(f"Seeded in {seconds + more:.1f}s")
+
+    client = APIClient()
+    client.force_authenticate(user=User.objects.get(pk=owner_ids[0]))
+    for label, path, fields in CASES:
+        url = f"{BASE_URL}{path}"
+        measure(client, url, {}, 1)
+        full = measure(client, url, {}, args.requests)
+        sparse = measure(client, url, {"fields": fields}, args.requests)
+        for variant, (samples, cpu, size) in (("full", full), (f"fields={fields}", sparse)):
+            print(format_summary(f"{label} / {variant}", summarize(samples)))
+            print(f"{'':<40} cpu={cpu * 1000:8.2f}ms payload={size:,} bytes")
+        print(
+            f"{label}: payload -{1 - sparse[2] / full[2]:.0%}, "
+            f"cpu -{1 - sparse[1] / full[1]:.0%} per page of {args.page_size}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=10_000)
+    parser.add_argument("--readings", type=int, default=10, help="Heart-rate readings per patient.")
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=50, help="Requests per variant.")
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    with isolated_database(keepdb=args.keepdb):
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
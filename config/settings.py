@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import environ
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -54,9 +55,13 @@ INSTALLED_APPS = [
     'users',
     'patients',
     'vitals',
+    'sync',
+    'core',
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
+    'core.instrumentation.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -150,7 +155,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -158,8 +163,173 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.ApproximateCountPagination',
     'PAGE_SIZE': 10,
 }
 
-AUTH_USER_MODEL = 'users.User'
\ No newline at end of file
+AUTH_USER_MODEL = 'users.User'
+
+# JWT authentication (users/authentication.py)
+# Verified token -> user resolutions kept per process (LRU, until token expiry).
+JWT_USER_CACHE_SIZE = env.int("JWT_USER_CACHE_SIZE", default=10000)
+# Cache holding revoked token ids and per-user cutoffs; point
+# TOKEN_DENYLIST_CACHE_URL at a cache shared by all processes in production.
+JWT_DENYLIST_CACHE_ALIAS = "tokens"
+# Refuse to start when the denylist or response cache (which also versions
+# device keys) is process-local; on by default outside DEBUG.
+REQUIRE_SHARED_CACHES = env.bool("REQUIRE_SHARED_CACHES", default=not DEBUG)
+# Device request signing: accepted clock skew (seconds) for X-Device-Timestamp.
+# Signatures are remembered for twice this long to reject replays.
+DEVICE_SIGNATURE_MAX_SKEW = env.int("DEVICE_SIGNATURE_MAX_SKEW", default=300)
+
+# Password hashing pool (users/password_hashing.py)
+# Concurrent password hashes per process, hashes allowed to wait beyond that
+# (further login / register requests get 503), and seconds to wait for one
+# (a hash still unfinished after that also gets 503).
+PASSWORD_HASH_WORKERS = env.int("PASSWORD_HASH_WORKERS", default=2)
+PASSWORD_HASH_QUEUE = env.int("PASSWORD_HASH_QUEUE", default=32)
+PASSWORD_HASH_TIMEOUT = env.int("PASSWORD_HASH_TIMEOUT", default=10)
+
+# HeartRate partitioning (PostgreSQL only)
+# Monthly partitions created ahead of time on every migrate / partition run.
+HEARTRATE_PARTITION_MONTHS_AHEAD = env.int("HEARTRATE_PARTITION_MONTHS_AHEAD", default=3)
+# Months of readings kept (including the current month) before partitions expire.
+HEARTRATE_RETENTION_MONTHS = env.int("HEARTRATE_RETENTION_MONTHS", default=24)
+
+# Sync change feed
+# Changes younger than this are held back so that rows from transactions still
+# in flight (lower ids committed later) are not skipped by a client cursor.
+SYNC_SETTLE_SECONDS = env.float("SYNC_SETTLE_SECONDS", default=2.0)
+SYNC_PAGE_SIZE = env.int("SYNC_PAGE_SIZE", default=500)
+SYNC_MAX_PAGE_SIZE = env.int("SYNC_MAX_PAGE_SIZE", default=2000)
+
+# Paginated list counts
+# Counts at or above the threshold may come from the planner estimate
+# (PostgreSQL) or a short-lived cache instead of an exact COUNT(*).
+PAGINATION_COUNT_THRESHOLD = env.int("PAGINATION_COUNT_THRESHOLD", default=10000)
+PAGINATION_COUNT_CACHE_TIMEOUT = env.int("PAGINATION_COUNT_CACHE_TIMEOUT", default=30)
+PAGINATION_COUNT_CACHE_ALIAS = "default"
+
+# Response cache (core/response_cache.py)
+# In-process LRU by default; point RESPONSE_CACHE_URL at Redis / Memcached
+# (e.g. redis://localhost:6379/1) to share entries between workers.
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "responses": env.cache_url("RESPONSE_CACHE_URL", default="locmemcache://responses?max_entries=5000"),
+    # Token denylist; sized so that revocations are not culled.
+    "tokens": env.cache_url("TOKEN_DENYLIST_CACHE_URL", default="locmemcache://tokens?max_entries=100000"),
+}
+RESPONSE_CACHE_ALIAS = "responses"
+RESPONSE_CACHE_ENABLED = env.bool("RESPONSE_CACHE_ENABLED", default=True)
+# Seconds an entry lives even without invalidation.
+RESPONSE_CACHE_TIMEOUT = env.int("RESPONSE_CACHE_TIMEOUT", default=300)
+
+# Patient search
+# Backend: "auto", "trigram" (PostgreSQL), "fts5" (SQLite) or "ngram" (in-process).
+PATIENT_SEARCH_BACKEND = env("PATIENT_SEARCH_BACKEND", default="auto")
+# Retry with typo-tolerant similarity matching when nothing matches exactly.
+PATIENT_SEARCH_FUZZY = env.bool("PATIENT_SEARCH_FUZZY", default=True)
+PATIENT_SEARCH_FUZZY_MIN_SIMILARITY = env.float("PATIENT_SEARCH_FUZZY_MIN_SIMILARITY", default=0.3)
+# Matches the fts5 / ngram backends rank individually; further matches are still returned, ranked 0.
+PATIENT_SEARCH_RANKED_RESULTS = env.int("PATIENT_SEARCH_RANKED_RESULTS", default=1000)
+# Seconds before the in-process n-gram index is rebuilt (None: never).
+PATIENT_SEARCH_INDEX_TTL = 300
+# Largest matching-patient id list inlined into IN (...); larger matches use a subquery.
+PATIENT_SEARCH_ID_LIMIT = env.int("PATIENT_SEARCH_ID_LIMIT", default=1000)
+
+# Patient autocomplete (in-process, per-owner prefix index)
+# Seconds before an owner's index is rebuilt (None: never).
+PATIENT_AUTOCOMPLETE_TTL = 300
+# Memory bounds: owners held, and patients held across all owners.
+PATIENT_AUTOCOMPLETE_MAX_USERS = env.int("PATIENT_AUTOCOMPLETE_MAX_USERS", default=500)
+PATIENT_AUTOCOMPLETE_MAX_ENTRIES = env.int("PATIENT_AUTOCOMPLETE_MAX_ENTRIES", default=500000)
+PATIENT_AUTOCOMPLETE_LIMIT = 10
+PATIENT_AUTOCOMPLETE_MAX_LIMIT = 50
+
+# Bulk patient import
+# Rows per existence check / location lookup / bulk INSERT.
+PATIENT_IMPORT_BATCH_SIZE = env.int("PATIENT_IMPORT_BATCH_SIZE", default=1000)
+# Largest import accepted by the API (the management command has no limit).
+PATIENT_IMPORT_MAX_ROWS = env.int("PATIENT_IMPORT_MAX_ROWS", default=50000)
+
+# Batch retrieval (/patients/batch, /vitals/heart-rates/batch)
+# Most ids accepted per request.
+BATCH_GET_MAX_IDS = env.int("BATCH_GET_MAX_IDS", default=5000)
+
+# Patient timeline (/patients/<pk>/timeline)
+PATIENT_TIMELINE_READINGS = 20
+PATIENT_TIMELINE_MAX_READINGS = 200
+PATIENT_TIMELINE_WINDOW_HOURS = 24
+PATIENT_TIMELINE_MAX_WINDOW_HOURS = 24 * 90
+
+# Patient deduplication
+# Lowest pair score written as a merge suggestion (0-1).
+DEDUPE_MIN_SCORE = env.float("DEDUPE_MIN_SCORE", default=0.75)
+# Blocks with more patients than this are not expanded into pairs.
+DEDUPE_MAX_BLOCK_SIZE = env.int("DEDUPE_MAX_BLOCK_SIZE", default=50)
+
+# Request timing (core/instrumentation.py)
+# Server-Timing headers and timing log lines with query count / SQL, serializer
+# and render time. Off by default; the middleware then unloads itself.
+REQUEST_TIMING_ENABLED = env.bool("REQUEST_TIMING_ENABLED", default=False)
+# Fraction of requests measured (0-1).
+REQUEST_TIMING_SAMPLE_RATE = env.float("REQUEST_TIMING_SAMPLE_RATE", default=1.0)
+# Log queries at least this slow (ms) with their EXPLAIN plan; 0 disables.
+REQUEST_TIMING_SLOW_QUERY_MS = env.int("REQUEST_TIMING_SLOW_QUERY_MS", default=0)
+
+# Metrics (core/metrics.py, /api/v1/metrics)
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=True)
+# Clients allowed to scrape /api/v1/metrics. Behind a reverse proxy on the same
+# host every request comes from 127.0.0.1, so also set METRICS_TOKEN: scrapers
+# must then send "Authorization: Bearer <token>".
+METRICS_ALLOWED_IPS = env.list("METRICS_ALLOWED_IPS", default=["127.0.0.1", "::1"])
+METRICS_TOKEN = env("METRICS_TOKEN", default=None)
+# Shared directory for multi-worker deployments (gunicorn): each worker writes
+# its samples there and a scrape sums them. Unset: this process only.
+METRICS_MULTIPROC_DIR = env("METRICS_MULTIPROC_DIR", default=None)
+# Minimum seconds between a worker's writes to METRICS_MULTIPROC_DIR.
+METRICS_FLUSH_SECONDS = env.float("METRICS_FLUSH_SECONDS", default=5.0)
+
+# Logging (core/async_logging.py)
+# Handlers run on a background listener thread when LOG_ASYNC is on; request
+# threads only enqueue records (dropped, and counted, when the queue is full).
+LOG_LEVEL = env("LOG_LEVEL", default="INFO")
+LOG_ASYNC = env.bool("LOG_ASYNC", default=True)
+LOG_QUEUE_SIZE = env.int("LOG_QUEUE_SIZE", default=10000)
+# Info logs on ingest paths: LOG_SAMPLE_BURST records per message per second,
+# then one in LOG_SAMPLE_EVERY.
+LOG_SAMPLE_BURST = env.int("LOG_SAMPLE_BURST", default=10)
+LOG_SAMPLE_EVERY = env.int("LOG_SAMPLE_EVERY", default=100)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "default": {"format": "%(asctime)s %(levelname)s %(name)s: %(message)s"},
+    },
+    "filters": {
+        "ingest_sampling": {
+            "()": "core.async_logging.SampledLogFilter",
+            "burst": LOG_SAMPLE_BURST,
+            "sample_every": LOG_SAMPLE_EVERY,
+        },
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "default"},
+    },
+    "root": {"handlers": ["console"], "level": LOG_LEVEL},
+    "loggers": {
+        "vitals.views.heartrate": {"filters": ["ingest_sampling"]},
+    },
+}
+
+# On-demand request profiling (core/profiling.py)
+# Staff requests with "X-Profile: cprofile|sampling|memory" (or ?_profile=)
+# are profiled; profiles are stored here and served at /api/v1/profiles/<name>.
+PROFILER_ENABLED = env.bool("PROFILER_ENABLED", default=True)
+PROFILER_DIR = env("PROFILER_DIR", default=os.path.join(tempfile.gettempdir(), "api-profiles"))
+PROFILER_SAMPLE_INTERVAL_MS = env.float("PROFILER_SAMPLE_INTERVAL_MS", default=1.0)
+# Stack depth recorded per allocation in memory profiles.
+PROFILER_TRACEMALLOC_FRAMES = env.int("PROFILER_TRACEMALLOC_FRAMES", default=10)
+# Stored profiles kept: the newest PROFILER_MAX_PROFILES, none older than PROFILER_MAX_AGE_HOURS.
+PROFILER_MAX_PROFILES = env.int("PROFILER_MAX_PROFILES", default=100)
+PROFILER_MAX_AGE_HOURS = env.float("PROFILER_MAX_AGE_HOURS", default=24)
@@ -30,4 +30,10 @@ urlpatterns = [
     # Heart Rates / Vitals app
     path(f"api/{settings.API_VERSION}/vitals/", include('vitals.urls')),
 
+    # Incremental sync / change feed
+    path(f"api/{settings.API_VERSION}/sync/", include('sync.urls')),
+
+    # Shared infrastructure (cache and Prometheus metrics, request profiles)
+    path(f"api/{settings.API_VERSION}/", include('core.urls')),
+
 ]
@@ -0,0 +1,14 @@
+"""
+conftest.py
+~~~~~~~~~~~
+Fixtures shared by every app's tests.
+"""
+
+import pytest
+from core.response_cache import response_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Start every test with an empty response cache (rolled-back rows reuse ids)."""
+    response_cache.clear()
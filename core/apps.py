@@ -0,0 +1,21 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from core import signals  # noqa: F401  (connects response cache invalidation)
+        from core.metrics import collect_database_pools, collect_response_cache, count_connection, registry
+
+        connection_created.connect(count_connection, dispatch_uid="core.metrics.count_connection")
+        registry.add_collector(collect_response_cache)
+        registry.add_collector(collect_database_pools)
+
+        if settings.LOG_ASYNC:
+            from core.async_logging import install_queue_logging
+
+            install_queue_logging(settings.LOG_QUEUE_SIZE)
@@ -0,0 +1,176 @@
+"""
+async_logging.py
+~~~~~~~~~~~~~~~~
+Non-blocking log delivery and sampling of repetitive info logs.
+
+``install_queue_logging`` (called from ``CoreConfig.ready`` when
+``LOG_ASYNC`` is on) moves the root logger's handlers, as configured by
+``LOGGING``, behind a ``QueueListener``. Request threads only append the
+record to a bounded queue; formatting and I/O happen on the listener
+thread. When the queue is full the record is dropped and counted in
+``log_records_dropped_total`` rather than blocking the request. Forked
+children (pre-forking servers that load the app first, such as gunicorn
+``--preload``) do not inherit the listener thread, so each child starts its
+own listener on a fresh queue.
+
+``SampledLogFilter`` is attached (in ``LOGGING``) to loggers on ingest
+paths. Per logger, level and message template it lets ``burst`` records
+through every ``interval`` seconds, then one in ``sample_every``; warnings
+and errors always pass. Records carry ``sample_rate`` when sampled and the
+first record of a window reports ``suppressed`` from the previous one.
+Templates are the unformatted messages, so log with ``%s`` arguments
+(``logger.info("Saved %s", pk)``) rather than f-strings for the grouping
+(and the deferred formatting) to work.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from core.metrics import registry
+
+LOG_RECORDS_DROPPED = registry.counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full."
+)
+
+
+class SampledLogFilter(logging.Filter):
+    """
+    Rate-limit repetitive records of one logger.
+
+    Args:
+        burst (int): Records per key passed unconditionally each interval.
+        interval (float): Window length in seconds.
+        sample_every (int): Beyond the burst, pass one record in this many.
+        max_level (str | int): Highest level sampled (default ``INFO``).
+    """
+
+    def __init__(self, burst=10, interval=1.0, sample_every=100, max_level="INFO"):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.sample_every = sample_every
+        self.max_level = logging._checkLevel(max_level)
+        self._lock = threading.Lock()
+        self._windows = {}
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                if window is not None and window[2]:
+                    record.suppressed = window[2]
+                window = self._windows[key] = [now, 0, 0]
+            window[1] += 1
+            seen = window[1]
+            passed = seen <= self.burst or (seen - self.burst) % self.sample_every == 0
+            if not passed:
+                window[2] += 1
+        if passed and seen > self.burst:
+            record.sample_rate = self.sample_every
+        return passed
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    ``QueueHandler`` that never waits for queue space.
+
+    Uses a ``SimpleQueue`` (no condition variables, unlike ``queue.Queue``)
+    bounded by ``maxsize``. Only the message is merged on the logging
+    thread (``msg % args``, so arguments are not read after the call
+    returns); formatting and tracebacks are left to the listener's handlers.
+
+    Args:
+        log_queue (queue.SimpleQueue): Queue read by the listener.
+        maxsize (int): Records queued before new ones are dropped.
+    """
+
+    def __init__(self, log_queue, maxsize=10000):
+        super().__init__(log_queue)
+        self.maxsize = maxsize
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self.queue.qsize() >= self.maxsize:
+            LOG_RECORDS_DROPPED.inc()
+            return
+        self.queue.put_nowait(record)
+
+
+_listener = None
+_fork_hook_registered = False
+
+
+def install_queue_logging(maxsize=10000):
+    """
+    Put the root logger's handlers behind a background listener.
+
+    Args:
+        maxsize (int): Queue capacity; further records are dropped.
+
+    Returns:
+        QueueListener | None: The running listener, or None when the root
+        logger has no handlers or the listener is already installed.
+    """
+    global _listener, _fork_hook_registered
+    root = logging.getLogger()
+    if _listener is not None or not root.handlers:
+        return None
+    handlers = list(root.handlers)
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(NonBlockingQueueHandler(log_queue, maxsize))
+    _listener.start()
+    atexit.register(uninstall_queue_logging)
+    if not _fork_hook_registered and hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=restart_queue_logging)
+        _fork_hook_registered = True
+    return _listener
+
+
+def restart_queue_logging():
+    """
+    Start a new listener in a forked child.
+
+    Only the forking thread survives ``fork()``, so the inherited listener
+    is not running. The child gets a new queue (the inherited one holds the
+    parent's pending records and possibly a held lock) and its own thread.
+    """
+    global _listener
+    if _listener is None:
+        return
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *_listener.handlers, respect_handler_level=True)
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, NonBlockingQueueHandler):
+            handler.queue = log_queue
+    _listener.start()
+
+
+def uninstall_queue_logging():
+    """Flush the queue and give the root logger its handlers back."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, NonBlockingQueueHandler):
+            root.removeHandler(handler)
+    for handler in listener.handlers:
+        root.addHandler(handler)
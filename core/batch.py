@@ -0,0 +1,124 @@
+"""
+batch.py
+~~~~~~~~
+Batch retrieval by primary key (``GET ?ids=1,2,3`` or ``POST {"ids": [...]}``).
+
+``BatchRetrieveMixin`` adds a ``batch`` action that loads every requested
+row of the view's (owner-scoped) queryset with ``in_bulk`` - a single
+``WHERE id IN (...)`` query, split only where the backend caps query
+parameters (SQLite) - and returns them in request order together with the
+ids that were not found. Rows the user may not see are reported as missing.
+"""
+
+import logging
+from django.conf import settings
+from django.db import DatabaseError
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from core.metrics import BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+IDS_PARAM = "ids"
+
+
+def parse_ids(raw):
+    """
+    Normalise requested ids.
+
+    Args:
+        raw (str | list | None): ``"1,2,3"`` or a list of ints / numeric strings.
+
+    Returns:
+        list[int]: Distinct ids in first-seen order.
+
+    Raises:
+        ValueError: If ``raw`` is missing, empty or holds a non-integer id.
+    """
+    if isinstance(raw, str):
+        raw = [value for value in raw.split(",") if value.strip()]
+    if not isinstance(raw, (list, tuple)) or not raw:
+        raise ValueError("Provide ids as ?ids=1,2,3 or a JSON body {\"ids\": [1, 2, 3]}.")
+    ids = []
+    for value in raw:
+        if isinstance(value, bool):
+            raise ValueError(f"Invalid id: {value!r}.")
+        try:
+            ids.append(int(str(value).strip()))
+        except ValueError:
+            raise ValueError(f"Invalid id: {value!r}.") from None
+    return list(dict.fromkeys(ids))
+
+
+class BatchRetrieveMixin:
+    """
+    ViewSet mixin adding ``GET|POST <prefix>/batch``.
+
+    Attributes:
+        batch_max_ids (int | None): Largest batch accepted; defaults to
+            ``settings.BATCH_GET_MAX_IDS``.
+    """
+
+    batch_max_ids = None
+
+    def get_batch_max_ids(self):
+        return self.batch_max_ids or settings.BATCH_GET_MAX_IDS
+
+    @action(detail=False, methods=["get", "post"])
+    def batch(self, request):
+        """
+        Retrieve many records by id in one query.
+
+        Steps
+        -----
+        1. Read ids from ``?ids=`` (GET) or the ``ids`` body field / a bare
+           JSON list (POST).
+        2. Load them from the scoped queryset with ``in_bulk``.
+        3. Serialize the found rows in request order.
+
+        Returns
+        -------
+        Response
+            ``{"results": [...], "missing": [ids]}``; 400 for malformed or
+            too many ids.
+        """
+        try:
+            if request.method == "GET":
+                raw = request.query_params.get(IDS_PARAM)
+            else:
+                raw = request.data.get(IDS_PARAM) if hasattr(request.data, "get") else request.data
+            try:
+                ids = parse_ids(raw)
+            except ValueError as exc:
+                return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+            max_ids = self.get_batch_max_ids()
+            if len(ids) > max_ids:
+                return Response(
+                    {"detail": f"At most {max_ids} ids per batch."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            queryset = self.get_queryset()
+            BATCH_SIZE.observe("get", queryset.model._meta.model_name, value=len(ids))
+            found = queryset.in_bulk(ids)
+            rows = [found[pk] for pk in ids if pk in found]
+            serializer = self.get_serializer(rows, many=True)
+            logger.info("Batch fetched %s of %s %s record(s).", len(rows), len(ids), queryset.model.__name__)
+            return Response(
+                {"results": serializer.data, "missing": [pk for pk in ids if pk not in found]},
+                status=status.HTTP_200_OK,
+            )
+        except DatabaseError as db_err:
+            logger.error("Database error in %s.batch: %s", type(self).__name__, db_err)
+            return Response(
+                {"detail": "Database error while fetching records."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        except Exception as ex:
+            logger.error("Unexpected error in %s.batch: %s", type(self).__name__, ex)
+            return Response(
+                {"detail": "An unexpected error occurred."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
@@ -0,0 +1,185 @@
+"""
+conditional.py
+~~~~~~~~~~~~~~
+Conditional GET helpers (ETag / Last-Modified) for API views.
+
+Views compute cheap validators first, return ``not_modified`` when the
+request's ``If-None-Match`` / ``If-Modified-Since`` still match, and only
+then run the full query and serialization. Responses are marked
+``Cache-Control: private, no-cache`` and vary on ``Authorization`` because
+their content depends on the requesting user.
+
+``ConditionalReadMixin`` applies this to ViewSet ``list`` / ``retrieve``.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Count, Max
+from django.http import HttpResponseNotModified
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+VALIDATOR_CACHE_PREFIX = "conditional:"
+
+
+def make_etag(*parts):
+    """
+    Build a strong ETag from validator parts.
+
+    Args:
+        *parts: Values that change whenever the representation changes
+            (ids, timestamps, counts, query parameters).
+
+    Returns:
+        str: Quoted ETag.
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def _timestamp(last_modified):
+    return int(last_modified.timestamp()) if last_modified is not None else None
+
+
+def set_validators(response, etag=None, last_modified=None):
+    """
+    Attach validators and revalidation headers to a response.
+
+    Returns:
+        Response: The same response, for chaining.
+    """
+    if etag is not None:
+        response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(_timestamp(last_modified))
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ["Authorization"])
+    return response
+
+
+def not_modified(request, etag=None, last_modified=None):
+    """
+    Return a 304 response if the request's conditional headers match.
+
+    Args:
+        request (Request | HttpRequest): Incoming GET/HEAD request.
+        etag (str | None): Current ETag (see ``make_etag``).
+        last_modified (datetime | None): Current modification time.
+
+    Returns:
+        HttpResponseNotModified | None: 304 with the validators, or None when
+        the full response must be built.
+    """
+    http_request = getattr(request, "_request", request)
+    if http_request.method not in ("GET", "HEAD") or (etag is None and last_modified is None):
+        return None
+    response = get_conditional_response(http_request, etag=etag, last_modified=_timestamp(last_modified))
+    if response is None or response.status_code != status.HTTP_304_NOT_MODIFIED:
+        return None
+    return set_validators(HttpResponseNotModified(), etag, last_modified)
+
+
+def list_validators(queryset, field="updated_at"):
+    """
+    Row count and latest modification time of a filtered queryset.
+
+    One aggregate over the rows the list would page through, without
+    fetching or serializing them. Results at or above
+    ``PAGINATION_COUNT_THRESHOLD`` rows are cached for
+    ``PAGINATION_COUNT_CACHE_TIMEOUT`` seconds, matching the staleness the
+    paginator already accepts for large counts.
+
+    Args:
+        queryset (QuerySet): Filtered (owner-scoped, searched) queryset.
+        field (str): Timestamp bumped on every save.
+
+    Returns:
+        tuple: ``(count, last_modified, cached)``.
+    """
+    # Deferred: this module loads with the app registry (via the response
+    # cache signals), and DRF's pagination settings are read on import.
+    from core.pagination import _count_cache, count_cache_key
+
+    cache = _count_cache()
+    try:
+        key = VALIDATOR_CACHE_PREFIX + count_cache_key(queryset)
+    except EmptyResultSet:
+        return 0, None, False
+
+    cached = cache.get(key)
+    if cached is not None:
+        return cached[0], cached[1], True
+
+    stats = queryset.order_by().aggregate(count=Count("pk"), last_modified=Max(field))
+    if stats["count"] >= settings.PAGINATION_COUNT_THRESHOLD:
+        cache.set(key, (stats["count"], stats["last_modified"]), settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+    return stats["count"], stats["last_modified"], False
+
+
+class ConditionalReadMixin:
+    """
+    ViewSet mixin answering ``list`` / ``retrieve`` with 304 when unchanged.
+
+    List ETags hash the user, the full request path (filters, search,
+    ordering, page) and ``list_validators``: a new, edited or deleted row
+    changes the count or the latest ``updated_at``. The count is handed to
+    ``ApproximateCountPagination`` as ``known_count`` so a 200 still runs a
+    single count. Lists send no ``Last-Modified``, which cannot reflect
+    deletions. Detail responses carry both validators from the object.
+
+    Attributes:
+        modified_field (str): Timestamp bumped on every save.
+        known_count (int | None): Set by ``get_list_etag`` for the paginator.
+    """
+
+    modified_field = "updated_at"
+    known_count = None
+    known_count_is_approximate = False
+
+    def conditional_reads_enabled(self):
+        """Whether representations can be validated (override for time-dependent extras)."""
+        return True
+
+    def get_list_validator_parts(self, queryset):
+        """Extra ETag parts for data the list embeds from other models."""
+        return ()
+
+    def get_list_etag(self, queryset):
+        """
+        ETag for a filtered list, or None when conditional reads are disabled.
+        """
+        if not self.conditional_reads_enabled():
+            return None
+        count, last_modified, cached = list_validators(queryset, self.modified_field)
+        self.known_count = count
+        self.known_count_is_approximate = cached
+        return make_etag(
+            "list", self.request.user.pk, self.request.get_full_path(), count, last_modified,
+            *self.get_list_validator_parts(queryset),
+        )
+
+    def get_object_last_modified(self, instance):
+        """Modification time of a detail representation."""
+        return getattr(instance, self.modified_field)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Return one object, or 304 when the client's copy is current.
+
+        The object is fetched (also enforcing scoping and permissions), but
+        serialization is skipped when the validators match.
+        """
+        instance = self.get_object()
+        if not self.conditional_reads_enabled():
+            return Response(self.get_serializer(instance).data)
+
+        last_modified = self.get_object_last_modified(instance)
+        etag = make_etag("detail", request.user.pk, request.get_full_path(), instance.pk, last_modified)
+        cached = not_modified(request, etag, last_modified)
+        if cached is not None:
+            return cached
+        return set_validators(Response(self.get_serializer(instance).data), etag, last_modified)
@@ -0,0 +1,211 @@
+"""
+instrumentation.py
+~~~~~~~~~~~~~~~~~~
+Per-request SQL, serialization and rendering timings.
+
+``ServerTimingMiddleware`` measures each sampled request and reports:
+
+- ``db``: number of queries and total SQL time, from a database
+  ``execute_wrapper`` on every connection;
+- ``serialize``: time spent in ``to_representation`` of serializers using
+  ``TimedSerializerMixin`` (including any lazy queries it triggers);
+- ``render``: time spent rendering the response (JSON encoding);
+- ``total``: wall time inside the middleware.
+
+They are sent as a ``Server-Timing`` header (shown in the browser dev tools'
+timing tab) and logged on the ``core.instrumentation`` logger with the same
+values as structured ``extra`` fields.
+
+With ``REQUEST_TIMING_SLOW_QUERY_MS`` set, queries at or above that duration
+are logged after the response together with their ``EXPLAIN`` plan.
+
+Disabled (``REQUEST_TIMING_ENABLED = False``, the default) the middleware
+removes itself from the chain at startup and the serializer mixin costs one
+context variable lookup per object, so there is no measurable overhead.
+``REQUEST_TIMING_SAMPLE_RATE`` limits measurement to a fraction of requests.
+"""
+
+import logging
+import random
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("request_timing", default=None)
+
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+    "mysql": "EXPLAIN ",
+}
+
+
+class RequestTimings:
+    """
+    Timings collected for one request.
+
+    Attributes:
+        queries (int): Statements executed.
+        db (float): Seconds spent executing them.
+        serialize (float): Seconds in timed serializers.
+        render (float): Seconds rendering the response.
+        slow_queries (list): ``(alias, sql, params, seconds)`` above the threshold.
+    """
+
+    def __init__(self, slow_query_seconds=None):
+        self.slow_query_seconds = slow_query_seconds
+        self.queries = 0
+        self.db = self.serialize = self.render = 0.0
+        self.slow_queries = []
+        self.serializing = False
+
+    def execute_wrapper(self, alias):
+        """Database ``execute_wrapper`` counting and timing ``alias`` queries."""
+
+        def wrapper(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                elapsed = time.perf_counter() - started
+                self.queries += 1
+                self.db += elapsed
+                if self.slow_query_seconds is not None and elapsed >= self.slow_query_seconds and not many:
+                    self.slow_queries.append((alias, sql, params, elapsed))
+
+        return wrapper
+
+    def as_dict(self, total):
+        return {
+            "queries": self.queries,
+            "db_ms": round(self.db * 1000, 2),
+            "serialize_ms": round(self.serialize * 1000, 2),
+            "render_ms": round(self.render * 1000, 2),
+            "total_ms": round(total * 1000, 2),
+        }
+
+    def server_timing(self, total):
+        """``Server-Timing`` header value."""
+        return ", ".join((
+            f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries"',
+            f"serialize;dur={self.serialize * 1000:.2f}",
+            f"render;dur={self.render * 1000:.2f}",
+            f"total;dur={total * 1000:.2f}",
+        ))
+
+
+def current_timings():
+    """``RequestTimings`` of the request being measured, or None."""
+    return _current.get()
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin adding ``to_representation`` time to the request's
+    ``serialize`` timing. Nested timed serializers are counted once.
+    """
+
+    def to_representation(self, instance):
+        timings = _current.get()
+        if timings is None or timings.serializing:
+            return super().to_representation(instance)
+        timings.serializing = True
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            timings.serialize += time.perf_counter() - started
+            timings.serializing = False
+
+
+def explain(alias, sql, params):
+    """
+    Query plan of ``sql`` on connection ``alias``.
+
+    Returns:
+        str | None: One plan row per line, or None if the backend has no
+        supported ``EXPLAIN`` or the statement cannot be explained.
+    """
+    connection = connections[alias]
+    prefix = EXPLAIN_PREFIXES.get(connection.vendor)
+    if prefix is None or not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+    except Exception as e:
+        logger.warning("Could not explain slow query: %s", e)
+        return None
+
+
+class ServerTimingMiddleware:
+    """
+    Measure sampled requests and report them in ``Server-Timing`` and logs.
+
+    Settings:
+        REQUEST_TIMING_ENABLED (bool): Install the middleware at all.
+        REQUEST_TIMING_SAMPLE_RATE (float): Fraction of requests measured (0-1).
+        REQUEST_TIMING_SLOW_QUERY_MS (int): Log queries at least this slow with
+            their plan (0 disables).
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_TIMING_SAMPLE_RATE
+        slow_ms = settings.REQUEST_TIMING_SLOW_QUERY_MS
+        self.slow_query_seconds = slow_ms / 1000 if slow_ms else None
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        timings = RequestTimings(self.slow_query_seconds)
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(timings.execute_wrapper(alias)))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        response["Server-Timing"] = timings.server_timing(total)
+        fields = timings.as_dict(total)
+        logger.info(
+            "%s %s %s: %s queries in %sms, serialize %sms, render %sms, total %sms",
+            request.method, request.path, response.status_code, fields["queries"],
+            fields["db_ms"], fields["serialize_ms"], fields["render_ms"], fields["total_ms"],
+            extra={"method": request.method, "path": request.path, "status": response.status_code, **fields},
+        )
+        for alias, sql, params, elapsed in timings.slow_queries:
+            if not logger.isEnabledFor(logging.WARNING):
+                break  # Skip the EXPLAIN queries too.
+            logger.warning(
+                "Slow query (%.2fms) on %s %s: %s\nPlan:\n%s",
+                elapsed * 1000, request.method, request.path, sql, explain(alias, sql, params),
+                extra={"path": request.path, "sql": sql, "duration_ms": round(elapsed * 1000, 2)},
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        # Runs just before the handler renders the response.
+        timings = _current.get()
+        if timings is not None:
+            render_started = time.perf_counter()
+
+            def rendered(response):
+                timings.render += time.perf_counter() - render_started
+
+            response.add_post_render_callback(rendered)
+        return response
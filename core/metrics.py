@@ -0,0 +1,462 @@
+"""
+metrics.py
+~~~~~~~~~~
+Process metrics registry with Prometheus text exposition.
+
+``registry`` holds counters, gauges and histograms declared at import time
+(see the bottom of this module) and scrape-time collectors for state owned
+elsewhere (response cache counters, password hashing pool, database pool).
+``MetricsMiddleware`` records request count and latency per route pattern,
+so ``/patients/42`` and ``/patients/43`` share ``api/v1/patients/<int:pk>``.
+
+Counters and histograms are sharded per thread: each thread only updates
+its own dict, so recording takes no lock (a lock is taken once, when a
+thread first touches a metric). Shards are summed when the registry is
+collected. When a thread exits, its shards are folded into a per-metric
+retired total, so servers that start a thread per request or recycle
+threads do not accumulate shards.
+
+Multiple processes (gunicorn workers) are aggregated through a directory:
+with ``METRICS_MULTIPROC_DIR`` set, every process writes its samples to
+``<dir>/<pid>.json`` at most every ``METRICS_FLUSH_SECONDS`` (on request
+completion) and whenever it serves a scrape, and the scrape sums all files.
+Counters and histograms of exited workers are kept so totals never go
+backwards; their gauges are dropped.
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _ShardOwner:
+    """Per-thread object whose collection (at thread exit) retires a shard."""
+
+    __slots__ = ("__weakref__",)
+
+
+class Metric:
+    """
+    Base class of registry metrics.
+
+    Attributes:
+        name (str): Metric name.
+        documentation (str): ``# HELP`` text.
+        labelnames (tuple): Label names; values are passed positionally.
+    """
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shards = {}
+        self._retired = {}
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            owner = self._local.owner = _ShardOwner()
+            with self._lock:
+                self._shards[id(shard)] = shard
+            weakref.finalize(owner, self._retire, shard)
+            return shard
+
+    def _retire(self, shard):
+        """Fold the shard of an exited thread into ``_retired``."""
+        with self._lock:
+            self._shards.pop(id(shard), None)
+            for key, value in shard.items():
+                self._retired[key] = self._merge(self._retired.get(key), value)
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return tuple(str(value) for value in labels)
+
+    def samples(self):
+        """Merged ``{label values: value}`` of all threads, live and exited."""
+        with self._lock:
+            merged = {key: self._merge(None, value) for key, value in self._retired.items()}
+            for shard in self._shards.values():
+                for key, value in shard.copy().items():
+                    merged[key] = self._merge(merged.get(key), value)
+        return merged
+
+    def clear(self):
+        with self._lock:
+            self._retired.clear()
+            for shard in self._shards.values():
+                shard.clear()
+
+
+class Counter(Metric):
+    """Monotonic counter."""
+
+    type = "counter"
+
+    def inc(self, *labels, amount=1):
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    @staticmethod
+    def _merge(total, value):
+        return value if total is None else total + value
+
+
+class Gauge(Metric):
+    """Current value, shared by all threads of the process."""
+
+    type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self):
+        with self._lock:
+            return dict(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(Metric):
+    """
+    Bucketed observations.
+
+    Each sample is ``[count per bucket..., count above the last bucket, sum]``;
+    exposition makes the buckets cumulative.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value):
+        shard = self._shard()
+        key = self._key(labels)
+        sample = shard.get(key)
+        if sample is None:
+            sample = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        sample[bisect.bisect_left(self.buckets, value)] += 1
+        sample[-1] += value
+
+    @staticmethod
+    def _merge(total, value):
+        if total is None:
+            return list(value)
+        return [a + b for a, b in zip(total, value)]
+
+
+class MetricsRegistry:
+    """
+    Named metrics and scrape-time collectors of this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collectors = []
+        self._last_flush = 0.0
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector):
+        """
+        Register ``collector()``, called on every collection.
+
+        It returns an iterable of ``(name, type, documentation, labelnames,
+        {label values: value})`` for counters and gauges it reads from
+        elsewhere.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def snapshot(self):
+        """
+        Samples of this process.
+
+        Returns:
+            dict: ``{name: {"type", "help", "labels", ["buckets"], "samples"}}``
+            with samples as ``[[label values], value]`` pairs (JSON-ready).
+        """
+        families = {}
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for metric in metrics:
+            family = {"type": metric.type, "help": metric.documentation, "labels": list(metric.labelnames)}
+            if isinstance(metric, Histogram):
+                family["buckets"] = list(metric.buckets)
+            family["samples"] = [[list(key), value] for key, value in metric.samples().items()]
+            families[metric.name] = family
+        for collector in collectors:
+            try:
+                for name, kind, documentation, labelnames, samples in collector():
+                    families[name] = {
+                        "type": kind,
+                        "help": documentation,
+                        "labels": list(labelnames),
+                        "samples": [[list(map(str, key)), value] for key, value in samples.items()],
+                    }
+            except Exception as e:
+                logger.warning("Metrics collector %s failed: %s", collector.__name__, e)
+        return families
+
+    def clear(self):
+        """Reset every metric of this process (collectors are untouched)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+    # -----------------------------
+    # Multiprocess mode
+    # -----------------------------
+    def flush(self, force=False):
+        """
+        Write this process's snapshot to ``METRICS_MULTIPROC_DIR``.
+
+        Args:
+            force (bool): Ignore ``METRICS_FLUSH_SECONDS``.
+        """
+        directory = settings.METRICS_MULTIPROC_DIR
+        if not directory:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < settings.METRICS_FLUSH_SECONDS:
+            return
+        self._last_flush = now
+        pid = os.getpid()
+        path = os.path.join(directory, f"{pid}.json")
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w") as fh:
+                json.dump({"pid": pid, "metrics": self.snapshot()}, fh)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("Could not write metrics to %s: %s", path, e)
+
+    def collect(self):
+        """
+        Families to expose: this process's snapshot, or the sum of every
+        process file in multiprocess mode.
+        """
+        directory = settings.METRICS_MULTIPROC_DIR
+        if not directory:
+            return self.snapshot()
+        self.flush(force=True)
+        merged = {}
+        for entry in sorted(os.listdir(directory)):
+            if not entry.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(directory, entry)) as fh:
+                    data = json.load(fh)
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping unreadable metrics file %s: %s", entry, e)
+                continue
+            alive = _pid_alive(data["pid"])
+            for name, family in data["metrics"].items():
+                if family["type"] == "gauge" and not alive:
+                    continue
+                _merge_family(merged, name, family)
+        return merged
+
+    def render(self):
+        """Prometheus text exposition of ``collect()``."""
+        lines = []
+        for name, family in sorted(self.collect().items()):
+            lines.append(f"# HELP {name} {_escape_help(family['help'])}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            labelnames = family["labels"]
+            for values, value in sorted(family["samples"], key=lambda sample: sample[0]):
+                labels = list(zip(labelnames, values))
+                if family["type"] != "histogram":
+                    lines.append(f"{name}{_labels(labels)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip([*family["buckets"], "+Inf"], value[:-1]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels([*labels, ('le', bound)])} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {value[-1]}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _pid_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge_family(merged, name, family):
+    target = merged.get(name)
+    if target is None:
+        merged[name] = {**family, "samples": [[list(k), v] for k, v in family["samples"]]}
+        return
+    index = {tuple(k): i for i, (k, _) in enumerate(target["samples"])}
+    for key, value in family["samples"]:
+        i = index.get(tuple(key))
+        if i is None:
+            target["samples"].append([list(key), value])
+        elif family["type"] == "histogram":
+            target["samples"][i][1] = [a + b for a, b in zip(target["samples"][i][1], value)]
+        else:
+            target["samples"][i][1] += value
+
+
+def _escape_help(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+registry = MetricsRegistry()
+
+REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route pattern, method and status.", ("route", "method", "status")
+)
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route pattern and method.", ("route", "method")
+)
+REQUESTS_IN_PROGRESS = registry.gauge("http_requests_in_progress", "HTTP requests being handled.")
+INGESTED_ROWS = registry.counter("ingested_rows_total", "Rows written by ingest endpoints.", ("kind",))
+BATCH_SIZE = registry.histogram(
+    "batch_size", "Items per batch request.", ("operation", "model"),
+    buckets=(1, 10, 50, 100, 500, 1000, 5000, 10000, 50000),
+)
+DB_CONNECTIONS_OPENED = registry.counter(
+    "db_connections_opened_total", "Database connections opened (steady growth means no reuse).", ("alias",)
+)
+
+
+class MetricsMiddleware:
+    """
+    Count requests and observe their latency per route pattern.
+
+    Settings:
+        METRICS_ENABLED (bool): Install the middleware at all.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+        elapsed = time.perf_counter() - started
+        match = getattr(request, "resolver_match", None)
+        route = match.route if match is not None else "<unmatched>"
+        REQUESTS.inc(route, request.method, response.status_code)
+        REQUEST_LATENCY.observe(route, request.method, value=elapsed)
+        registry.flush()
+        return response
+
+
+# -----------------------------
+# Collectors
+# -----------------------------
+def count_connection(sender, connection, **kwargs):
+    """``connection_created`` receiver."""
+    DB_CONNECTIONS_OPENED.inc(connection.alias)
+
+
+def collect_database_pools():
+    """Pool usage of PostgreSQL aliases configured with a psycopg connection pool."""
+    from django.db import connections
+
+    samples = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None) if connections[alias].vendor == "postgresql" else None
+        if pool is None:
+            continue
+        stats = pool.get_stats()
+        samples[(alias, "size")] = stats.get("pool_size", 0)
+        samples[(alias, "available")] = stats.get("pool_available", 0)
+        samples[(alias, "waiting")] = stats.get("requests_waiting", 0)
+    if samples:
+        yield "db_pool_connections", "gauge", "Database pool connections by state.", ("alias", "state"), samples
+
+
+def collect_response_cache():
+    """Response cache lookups from ``response_cache.metrics``."""
+    from core.response_cache import response_cache
+
+    endpoints = response_cache.metrics.snapshot()["endpoints"]
+    samples = {}
+    for endpoint, stats in endpoints.items():
+        samples[(endpoint, "hit")] = stats["hits"]
+        samples[(endpoint, "miss")] = stats["misses"]
+    yield (
+        "response_cache_lookups_total", "counter", "Response cache lookups by endpoint and result.",
+        ("endpoint", "result"), samples,
+    )
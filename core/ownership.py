@@ -0,0 +1,88 @@
+"""
+ownership.py
+~~~~~~~~~~~~
+Owner scoping for querysets.
+
+Non-admin users only see records they own, so list queries and counts run
+against an owner-leading index and grow with that user's data rather than
+the whole table. Admin (staff) users see every record.
+"""
+
+
+def sees_all_records(user):
+    """
+    Whether ``user`` bypasses owner scoping.
+
+    Args:
+        user (User): Requesting user.
+
+    Returns:
+        bool: True for active staff users and superusers.
+    """
+    return bool(user and user.is_authenticated and (user.is_staff or user.is_superuser))
+
+
+def scope_to_owner(queryset, user, owner_field="user"):
+    """
+    Restrict ``queryset`` to rows owned by ``user`` unless they are an admin.
+
+    Args:
+        queryset (QuerySet): Records to scope.
+        user (User): Requesting user.
+        owner_field (str): Lookup from the model to its owning user.
+
+    Returns:
+        QuerySet: ``queryset`` unchanged for admins, otherwise filtered.
+    """
+    if sees_all_records(user):
+        return queryset
+    return queryset.filter(**{owner_field: user})
+
+
+def related_owner_id(instance, fk_field, owner_field="user"):
+    """
+    Owner id of the row ``instance.<fk_field>`` points to.
+
+    Read from the cached related object when it is loaded, otherwise with a
+    single ``values_list`` query.
+
+    Args:
+        instance (Model): Row holding the foreign key, e.g. a heart rate.
+        fk_field (str): Foreign key to the owned model, e.g. ``"patient"``.
+        owner_field (str): Owner foreign key on the related model.
+
+    Returns:
+        int | None: Owner id, or None if the related row does not exist.
+    """
+    field = instance._meta.get_field(fk_field)
+    if field.is_cached(instance):
+        return getattr(field.get_cached_value(instance), f"{owner_field}_id")
+    return (
+        field.related_model.objects.filter(pk=getattr(instance, field.attname))
+        .values_list(f"{owner_field}_id", flat=True)
+        .first()
+    )
+
+
+class OwnerScopedMixin:
+    """
+    ViewSet mixin that scopes ``get_queryset`` to the requesting user.
+
+    Attributes:
+        owner_field (str): Lookup to the owning user, e.g. ``"user"``.
+        owner_subquery (tuple | None): ``(fk_field, Model, owner_field)`` to
+            scope through a related model with ``fk_field IN (SELECT id ...)``
+            instead of a JOIN, e.g. ``("patient", Patient, "user")``.
+    """
+
+    owner_field = "user"
+    owner_subquery = None
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if self.owner_subquery is not None and not sees_all_records(user):
+            fk_field, model, owner_field = self.owner_subquery
+            owned = model.objects.filter(**{owner_field: user}).values("id")
+            return queryset.filter(**{f"{fk_field}_id__in": owned})
+        return scope_to_owner(queryset, user, self.owner_field)
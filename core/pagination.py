@@ -0,0 +1,229 @@
+"""
+pagination.py
+~~~~~~~~~~~~~
+Page-number pagination whose total count does not grow with table size.
+
+``PageNumberPagination`` runs an exact ``SELECT COUNT(*)`` for every page.
+``ApproximateCountPagination`` instead:
+
+1. Reuses a recently cached count for the same query (keyed by the SQL and
+   its parameters, so filters, search terms and owner scoping all produce
+   distinct keys) for ``PAGINATION_COUNT_CACHE_TIMEOUT`` seconds.
+2. On PostgreSQL, asks the planner for its row estimate and uses it when the
+   estimate is at or above ``PAGINATION_COUNT_THRESHOLD``.
+3. Otherwise counts exactly, caching the result only when it is large.
+
+Small result sets therefore stay exact and fresh, while large ones are served
+from an estimate or a short-lived cache. Responses carry
+``count_is_approximate`` so clients can render "about N" instead of "N".
+
+``OrderingCursorPagination`` is the count-free alternative for exports and
+very large lists: keyset pagination over a unique, indexed ordering, so
+every page costs one bounded ``WHERE key < cursor ... LIMIT n`` query.
+"""
+
+import hashlib
+import json
+import logging
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "pagination:count:"
+
+
+def _count_cache():
+    return caches[settings.PAGINATION_COUNT_CACHE_ALIAS]
+
+
+def count_cache_key(queryset):
+    """
+    Build a cache key identifying the rows a queryset would count.
+
+    Args:
+        queryset (QuerySet): Filtered queryset about to be paginated.
+
+    Returns:
+        str: Key derived from the model and the SQL with its parameters.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.sha1(f"{sql}|{params!r}".encode()).hexdigest()
+    return f"{CACHE_PREFIX}{queryset.model._meta.label_lower}:{digest}"
+
+
+def planner_estimate(queryset):
+    """
+    Return the PostgreSQL planner's row estimate for a queryset.
+
+    Returns:
+        int | None: Estimated row count, or None on other databases or if the
+        plan cannot be read.
+    """
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    try:
+        plan = json.loads(queryset.order_by().explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (DatabaseError, ValueError, KeyError, IndexError, TypeError) as exc:
+        logger.warning("Could not read planner estimate: %s", exc)
+        return None
+
+
+class ApproximatePage(Page):
+    """
+    Page whose next-page check does not rely on an exact total.
+
+    When the count is approximate the paginator fetches one extra row, so
+    ``has_next`` is exact even if the estimated total is off.
+    """
+
+    def __init__(self, object_list, number, paginator, has_more=None):
+        super().__init__(object_list, number, paginator)
+        self._has_more = has_more
+
+    def has_next(self):
+        if self._has_more is None:
+            return super().has_next()
+        return self._has_more
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Django paginator with a cached / estimated ``count``.
+
+    Attributes:
+        count_is_approximate (bool): True when ``count`` did not come from an
+            exact COUNT(*) in this request.
+    """
+
+    count_is_approximate = False
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True,
+                 known_count=None, known_count_is_approximate=False):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.known_count = known_count
+        self.known_count_is_approximate = known_count_is_approximate
+
+    @cached_property
+    def count(self):
+        if self.known_count is not None:
+            # Already counted by the view (e.g. alongside conditional-GET validators).
+            self.count_is_approximate = self.known_count_is_approximate
+            return self.known_count
+
+        queryset = self.object_list
+        if not hasattr(queryset, "query"):
+            return super().count
+
+        threshold = settings.PAGINATION_COUNT_THRESHOLD
+        cache = _count_cache()
+        try:
+            key = count_cache_key(queryset)
+        except EmptyResultSet:
+            return 0
+
+        cached = cache.get(key)
+        if cached is not None:
+            self.count_is_approximate = True
+            return cached
+
+        estimate = planner_estimate(queryset)
+        if estimate is not None and estimate >= threshold:
+            self.count_is_approximate = True
+            cache.set(key, estimate, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+            return estimate
+
+        exact = queryset.count()
+        if exact >= threshold:
+            cache.set(key, exact, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        return exact
+
+    def validate_number(self, number):
+        """Allow pages past an approximate end; they are simply empty."""
+        if not self.count_is_approximate:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number):
+        """Return a page, slicing by page size rather than the approximate total."""
+        self.count  # decide exact vs approximate before validating
+        if not self.count_is_approximate:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return ApproximatePage(rows[:self.per_page], number, self, has_more=len(rows) > self.per_page)
+
+
+class ApproximateCountPagination(PageNumberPagination):
+    """
+    Page-number pagination using ``ApproximateCountPaginator``.
+
+    Adds ``count_is_approximate`` to the paginated response. A view that has
+    already counted the queryset can set ``known_count`` (and
+    ``known_count_is_approximate``) to skip the paginator's own count.
+    """
+
+    django_paginator_class = ApproximateCountPaginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        known_count = getattr(view, "known_count", None)
+        if known_count is not None:
+            self.django_paginator_class = partial(
+                ApproximateCountPaginator,
+                known_count=known_count,
+                known_count_is_approximate=getattr(view, "known_count_is_approximate", False),
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_is_approximate': self.page.paginator.count_is_approximate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_approximate'] = {
+            'type': 'boolean',
+            'example': False,
+        }
+        return response_schema
+
+
+class OrderingCursorPagination(CursorPagination):
+    """
+    Cursor pagination with a client-selected ordering.
+
+    ``?ordering=`` picks one of the view's ``cursor_ordering_choices`` (the
+    first is the default); each choice must be unique and indexed so a page
+    is a single index range scan. ``?page_size=`` is capped at
+    ``max_page_size``.
+    """
+
+    ordering_param = "ordering"
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def get_ordering(self, request, queryset, view):
+        choices = getattr(view, "cursor_ordering_choices", None) or (self.ordering,)
+        requested = request.query_params.get(self.ordering_param)
+        return (requested if requested in choices else choices[0],)
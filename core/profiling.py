@@ -0,0 +1,279 @@
+"""
+profiling.py
+~~~~~~~~~~~~
+On-demand profiling of single requests for staff users.
+
+A staff request carrying ``X-Profile: <mode>`` (or ``?_profile=<mode>``) to
+a view using ``ProfilingMixin`` runs its handler under a profiler:
+
+- ``cprofile``: deterministic ``cProfile`` of the request thread, stored as
+  ``.pstats`` (open with ``snakeviz`` / ``pstats``);
+- ``sampling``: stacks of the request thread sampled every
+  ``PROFILER_SAMPLE_INTERVAL_MS`` by a helper thread, stored as speedscope
+  JSON (https://www.speedscope.app);
+- ``memory``: ``tracemalloc`` snapshot at the end of the handler, stored as
+  the top allocation sites by line (tracemalloc is process-wide, so
+  concurrent requests contribute too).
+
+The profile is written to ``PROFILER_DIR`` and the response carries its
+name in ``X-Profile`` and its download URL (staff only) in
+``X-Profile-Url``. One request per process is profiled at a time; others
+asking meanwhile get ``X-Profile: busy`` and run normally. After each new
+profile, profiles older than ``PROFILER_MAX_AGE_HOURS`` and all but the
+newest ``PROFILER_MAX_PROFILES`` are deleted (other files in the directory
+are left alone).
+
+Requests without the header or parameter only pay for those two lookups,
+and the check runs after authentication so it costs nothing for anonymous
+or non-staff users beyond ``is_staff``.
+"""
+
+import cProfile
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+
+from django.conf import settings
+from django.urls import reverse
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_PARAM = "_profile"
+PROFILE_NAME_RE = re.compile(r"[0-9a-f]{32}\.(pstats|speedscope\.json|txt)")
+
+_busy = threading.Lock()
+
+
+def requested_profile(request):
+    """Profiling mode asked for by ``request``, or None."""
+    mode = request.META.get(PROFILE_HEADER) or request.query_params.get(PROFILE_PARAM)
+    return mode.lower() if mode else None
+
+
+def profile_path(name):
+    """
+    Absolute path of stored profile ``name``.
+
+    Raises:
+        ValueError: If ``name`` is not a profile file name.
+    """
+    if not PROFILE_NAME_RE.fullmatch(name):
+        raise ValueError(f"Not a profile name: {name!r}")
+    return os.path.join(settings.PROFILER_DIR, name)
+
+
+def prune_profiles(now=None):
+    """
+    Delete expired profiles and all but the newest ``PROFILER_MAX_PROFILES``.
+
+    Returns:
+        list[str]: Names of the deleted profiles.
+    """
+    now = time.time() if now is None else now
+    max_age = settings.PROFILER_MAX_AGE_HOURS * 3600
+    profiles = []
+    with os.scandir(settings.PROFILER_DIR) as entries:
+        for entry in entries:
+            if PROFILE_NAME_RE.fullmatch(entry.name) and entry.is_file():
+                profiles.append((entry.stat().st_mtime, entry.name))
+    profiles.sort(reverse=True)
+    deleted = []
+    for index, (mtime, name) in enumerate(profiles):
+        if index >= settings.PROFILER_MAX_PROFILES or now - mtime > max_age:
+            try:
+                os.remove(profile_path(name))
+            except FileNotFoundError:
+                continue
+            deleted.append(name)
+    return deleted
+
+
+class CProfileProfiler:
+    """Deterministic profile of the calling thread."""
+
+    extension = "pstats"
+
+    def start(self):
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self, path):
+        self.profile.disable()
+        self.profile.dump_stats(path)
+
+
+class SamplingProfiler:
+    """
+    Periodic stack samples of one thread, exported as speedscope JSON.
+
+    Args:
+        interval (float): Seconds between samples.
+    """
+
+    extension = "speedscope.json"
+
+    def __init__(self, interval):
+        self.interval = interval
+
+    def start(self):
+        self.thread_id = threading.get_ident()
+        self.frames, self.frame_index = [], {}
+        self.samples, self.weights = [], []
+        self._stop = threading.Event()
+        self.started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._sampler.start()
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is not None:
+                self.samples.append(self._stack(frame))
+                self.weights.append(now - last)
+            last = now
+
+    def _stack(self, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_name, code.co_filename, code.co_firstlineno)
+            index = self.frame_index.get(key)
+            if index is None:
+                index = self.frame_index[key] = len(self.frames)
+                self.frames.append({"name": key[0], "file": key[1], "line": key[2]})
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def stop(self, path):
+        self._stop.set()
+        self._sampler.join()
+        elapsed = time.perf_counter() - self.started
+        document = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "core.profiling",
+            "name": os.path.basename(path),
+            "activeProfileIndex": 0,
+            "shared": {"frames": self.frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": "request thread",
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": elapsed,
+                "samples": self.samples,
+                "weights": self.weights,
+            }],
+        }
+        with open(path, "w") as fh:
+            json.dump(document, fh)
+
+
+class MemoryProfiler:
+    """``tracemalloc`` allocation sites, written as text."""
+
+    extension = "txt"
+    top = 50
+
+    def start(self):
+        self.was_tracing = tracemalloc.is_tracing()
+        if not self.was_tracing:
+            tracemalloc.start(settings.PROFILER_TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        self.baseline = tracemalloc.take_snapshot()
+
+    def stop(self, path):
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if not self.was_tracing:
+            tracemalloc.stop()
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        diff = snapshot.filter_traces(ignore).compare_to(self.baseline.filter_traces(ignore), "lineno")
+        with open(path, "w") as fh:
+            fh.write(f"traced memory: current={current} bytes, peak={peak} bytes\n")
+            fh.write(f"top {self.top} allocation sites by growth during the request:\n")
+            for stat in diff[:self.top]:
+                fh.write(f"{stat}\n")
+
+
+def make_profiler(mode):
+    """Profiler for ``mode``, or None if unknown."""
+    if mode == "cprofile":
+        return CProfileProfiler()
+    if mode == "sampling":
+        return SamplingProfiler(settings.PROFILER_SAMPLE_INTERVAL_MS / 1000)
+    if mode == "memory":
+        return MemoryProfiler()
+    return None
+
+
+class ProfilingMixin:
+    """
+    APIView mixin profiling staff requests that ask for it (see module docs).
+
+    The profiler starts once authentication and permission checks pass
+    (``initial``) and stops when ``dispatch`` returns or raises, so it covers
+    the handler, its queries and serialization, but not rendering.
+    """
+
+    _profiler = None
+    _profile_status = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        mode = requested_profile(request)
+        if mode is None or not settings.PROFILER_ENABLED or not request.user.is_staff:
+            return
+        profiler = make_profiler(mode)
+        if profiler is None:
+            self._profile_status = "unknown mode"
+            return
+        if not _busy.acquire(blocking=False):
+            self._profile_status = "busy"
+            return
+        try:
+            profiler.start()
+        except Exception:
+            _busy.release()
+            raise
+        self._profiler = profiler
+
+    def dispatch(self, request, *args, **kwargs):
+        response = None
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+            return response
+        finally:
+            if self._profiler is not None:
+                self._store_profile(request, response)
+            elif self._profile_status and response is not None:
+                response["X-Profile"] = self._profile_status
+
+    def _store_profile(self, request, response):
+        profiler, self._profiler = self._profiler, None
+        name = f"{uuid.uuid4().hex}.{profiler.extension}"
+        try:
+            os.makedirs(settings.PROFILER_DIR, exist_ok=True)
+            profiler.stop(profile_path(name))
+            prune_profiles()
+        except Exception as e:
+            logger.error("Could not store request profile: %s", e)
+            name = None
+        finally:
+            _busy.release()
+        if name is not None:
+            logger.info("Stored %s profile of %s %s as %s", type(profiler).__name__, request.method, request.path, name)
+        if response is not None:
+            response["X-Profile"] = name or "failed"
+            if name is not None:
+                response["X-Profile-Url"] = reverse("profile-detail", args=[name])
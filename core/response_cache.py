@@ -0,0 +1,301 @@
+"""
+response_cache.py
+~~~~~~~~~~~~~~~~~
+Tag-invalidated cache for read responses and query results.
+
+Entries live in the ``RESPONSE_CACHE_ALIAS`` cache: an in-process
+``LocMemCache`` (LRU with ``MAX_ENTRIES``) by default, or Redis / Memcached
+through ``RESPONSE_CACHE_URL``. Every entry expires after
+``RESPONSE_CACHE_TIMEOUT`` seconds and records the version of each tag it
+depends on, e.g. ``patient:42`` or ``heart_rates:user:7``. Model signals
+(``core/signals.py``) bump only the tags a saved or deleted row affects; an
+entry whose recorded versions no longer match is a miss. Nothing is scanned
+or deleted by pattern, so invalidation behaves the same on every backend.
+
+Keys are derived from the user, the endpoint and its query parameters.
+Hits, misses and their latency are counted per endpoint in ``metrics``.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.utils.http import parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.conditional import not_modified, set_validators
+from core.ownership import sees_all_records
+
+logger = logging.getLogger(__name__)
+
+ENTRY_PREFIX = "rc:entry:"
+TAG_PREFIX = "rc:tag:"
+
+
+def owner_tag(prefix, user):
+    """
+    Tag for the rows of ``prefix`` visible to ``user``.
+
+    Args:
+        prefix (str): Record type, e.g. ``"patients"``.
+        user (User): Requesting user.
+
+    Returns:
+        str: ``"<prefix>:all"`` for admins, otherwise ``"<prefix>:user:<id>"``.
+    """
+    if sees_all_records(user):
+        return f"{prefix}:all"
+    return f"{prefix}:user:{user.pk}"
+
+
+class CacheMetrics:
+    """
+    Thread-safe, per-process hit / miss counters and latency per endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, hit, seconds):
+        """Count one lookup for ``endpoint`` and its total handling time."""
+        with self._lock:
+            stats = self._endpoints.setdefault(
+                endpoint, {"hits": 0, "misses": 0, "hit_seconds": 0.0, "miss_seconds": 0.0}
+            )
+            if hit:
+                stats["hits"] += 1
+                stats["hit_seconds"] += seconds
+            else:
+                stats["misses"] += 1
+                stats["miss_seconds"] += seconds
+
+    def snapshot(self):
+        """
+        Current counters.
+
+        Returns:
+            dict: Per endpoint ``hits``, ``misses``, ``hit_ratio`` and average
+            ``hit_ms`` / ``miss_ms``, plus the same totals under ``"total"``.
+        """
+        with self._lock:
+            endpoints = {name: dict(stats) for name, stats in self._endpoints.items()}
+
+        total = {"hits": 0, "misses": 0, "hit_seconds": 0.0, "miss_seconds": 0.0}
+        for stats in endpoints.values():
+            for field in total:
+                total[field] += stats[field]
+
+        def summarize(stats):
+            lookups = stats["hits"] + stats["misses"]
+            return {
+                "hits": stats["hits"],
+                "misses": stats["misses"],
+                "hit_ratio": round(stats["hits"] / lookups, 4) if lookups else None,
+                "hit_ms": round(1000 * stats["hit_seconds"] / stats["hits"], 3) if stats["hits"] else None,
+                "miss_ms": round(1000 * stats["miss_seconds"] / stats["misses"], 3) if stats["misses"] else None,
+            }
+
+        return {
+            "endpoints": {name: summarize(stats) for name, stats in sorted(endpoints.items())},
+            "total": summarize(total),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+class ResponseCache:
+    """
+    Versioned-tag cache over a Django cache backend.
+
+    Attributes:
+        metrics (CacheMetrics): Lookup counters for this process.
+    """
+
+    def __init__(self):
+        self.metrics = CacheMetrics()
+
+    @property
+    def cache(self):
+        return caches[settings.RESPONSE_CACHE_ALIAS]
+
+    @staticmethod
+    def make_key(*parts):
+        """Entry key for the given identifying parts."""
+        digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+        return f"{ENTRY_PREFIX}{digest}"
+
+    def tag_versions(self, tags):
+        """
+        Current version of each tag, creating versions for new tags.
+
+        Read before computing a value, so a write during the computation
+        leaves the stored entry already stale.
+        """
+        keys = {tag: f"{TAG_PREFIX}{tag}" for tag in tags}
+        found = self.cache.get_many(list(keys.values()))
+        versions = {}
+        for tag, key in keys.items():
+            version = found.get(key)
+            if version is None:
+                version = uuid.uuid4().hex
+                if not self.cache.add(key, version, None):
+                    version = self.cache.get(key, version)
+            versions[tag] = version
+        return versions
+
+    def get(self, key):
+        """
+        Cached value for ``key``, or None if absent or any tag has moved on.
+        """
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        versions, value = entry
+        current = self.cache.get_many([f"{TAG_PREFIX}{tag}" for tag in versions])
+        if any(current.get(f"{TAG_PREFIX}{tag}") != version for tag, version in versions.items()):
+            return None
+        return value
+
+    def set(self, key, value, versions, timeout=None):
+        """Store ``value`` together with the tag versions it was computed at."""
+        timeout = settings.RESPONSE_CACHE_TIMEOUT if timeout is None else timeout
+        self.cache.set(key, (versions, value), timeout)
+
+    def get_or_set(self, parts, tags, compute, timeout=None):
+        """
+        Query cache: return the cached result of ``compute()`` for ``parts``.
+
+        Args:
+            parts (Iterable): Values identifying the result.
+            tags (Iterable[str]): Tags whose invalidation discards it.
+            compute (Callable[[], Any]): Produces a picklable value.
+            timeout (int | None): Seconds to keep it (default
+                ``RESPONSE_CACHE_TIMEOUT``).
+        """
+        key = self.make_key(*parts)
+        value = self.get(key)
+        if value is None:
+            versions = self.tag_versions(tags)
+            value = compute()
+            self.set(key, value, versions, timeout)
+        return value
+
+    def invalidate(self, *tags):
+        """
+        Give each tag a new version, orphaning every entry that used it.
+
+        Inside a transaction the tags are bumped again on commit, so an entry
+        cached from pre-commit data by a concurrent request does not survive.
+        """
+        if not tags:
+            return
+
+        def bump():
+            self.cache.set_many({f"{TAG_PREFIX}{tag}": uuid.uuid4().hex for tag in tags}, None)
+
+        bump()
+        if connection.in_atomic_block:
+            transaction.on_commit(bump)
+        logger.debug("Invalidated response cache tags: %s", ", ".join(tags))
+
+    def clear(self):
+        self.cache.clear()
+
+
+response_cache = ResponseCache()
+
+
+def invalidate_patients(rows):
+    """
+    Invalidate cached reads for patients.
+
+    Args:
+        rows (Iterable[tuple[int, int | None]]): ``(patient_id, owner_id)`` pairs.
+    """
+    tags = {"patients:all"}
+    for patient_id, owner_id in rows:
+        tags.update({f"patient:{patient_id}", f"patients:user:{owner_id}"})
+    response_cache.invalidate(*sorted(tags))
+
+
+def invalidate_heart_rates(rows):
+    """
+    Invalidate cached reads for heart rates.
+
+    Args:
+        rows (Iterable[tuple[int, int, int | None]]): ``(heart_rate_id,
+            patient_id, owner_id)`` triples.
+    """
+    tags = {"heart_rates:all"}
+    for heart_rate_id, patient_id, owner_id in rows:
+        tags.update({
+            f"heart_rate:{heart_rate_id}",
+            f"heart_rates:patient:{patient_id}",
+            f"heart_rates:user:{owner_id}",
+        })
+    response_cache.invalidate(*sorted(tags))
+
+
+def _last_modified(response):
+    timestamp = parse_http_date_safe(response.get("Last-Modified", ""))
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc) if timestamp is not None else None
+
+
+def cache_response(handler):
+    """
+    Cache a ViewSet read handler's 200 responses.
+
+    The view's ``get_cache_tags()`` returns the tags the response depends on,
+    or None to bypass the cache for this request. Cached ETag / Last-Modified
+    validators are kept, so a hit can still answer 304.
+    """
+
+    @wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        tags = self.get_cache_tags() if settings.RESPONSE_CACHE_ENABLED else None
+        if tags is None or request.method != "GET":
+            return handler(self, request, *args, **kwargs)
+
+        started = time.perf_counter()
+        match = request.resolver_match
+        endpoint = match.url_name if match and match.url_name else f"{type(self).__name__}.{self.action}"
+        user = request.user
+        key = response_cache.make_key(
+            endpoint, user.pk, sees_all_records(user), request.get_host(), request.path,
+            sorted((name, sorted(values)) for name, values in request.query_params.lists()),
+        )
+
+        entry = response_cache.get(key)
+        if entry is not None:
+            data, etag, last_modified = entry
+            response = None
+            if etag is not None or last_modified is not None:
+                response = not_modified(request, etag, last_modified)
+                if response is None:
+                    response = set_validators(Response(data, status=status.HTTP_200_OK), etag, last_modified)
+            else:
+                response = Response(data, status=status.HTTP_200_OK)
+            response["X-Cache"] = "HIT"
+            response_cache.metrics.record(endpoint, True, time.perf_counter() - started)
+            return response
+
+        versions = response_cache.tag_versions(tags)
+        response = handler(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response_cache.set(key, (response.data, response.get("ETag"), _last_modified(response)), versions)
+        response["X-Cache"] = "MISS"
+        response_cache.metrics.record(endpoint, False, time.perf_counter() - started)
+        return response
+
+    return wrapper
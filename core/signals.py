@@ -0,0 +1,65 @@
+"""
+signals.py
+~~~~~~~~~~
+Model signal receivers that invalidate the response cache.
+
+Each receiver bumps only the tags the changed row can appear under (see
+``core/response_cache.py``):
+
+- Location: ``location:<id>``, ``locations``.
+- Patient: ``patient:<id>``, ``patients:user:<owner>``, ``patients:all``.
+- HeartRate: ``heart_rate:<id>``, ``heart_rates:patient:<id>`` (old and new
+  patient), ``heart_rates:user:<owner>``, ``heart_rates:all``.
+
+Code paths that bypass model signals (``bulk_create``, ``QuerySet.update``)
+call ``invalidate_patients`` / ``invalidate_heart_rates`` from
+``core.response_cache`` themselves.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from core.ownership import related_owner_id
+from core.response_cache import invalidate_heart_rates, invalidate_patients, response_cache
+from patients.models import Patient
+from users.models import Location
+from vitals.models import HeartRate
+
+
+@receiver(post_save, sender=Location, dispatch_uid="cache_location_saved")
+@receiver(post_delete, sender=Location, dispatch_uid="cache_location_deleted")
+def location_changed(sender, instance, **kwargs):
+    response_cache.invalidate(f"location:{instance.pk}", "locations")
+
+
+@receiver(pre_delete, sender=Location, dispatch_uid="cache_location_deleting")
+def location_deleting(sender, instance, **kwargs):
+    # Patients lose their place through SET_NULL, an UPDATE without signals.
+    invalidate_patients(Patient.objects.filter(place=instance).values_list("id", "user_id"))
+
+
+@receiver(post_save, sender=Patient, dispatch_uid="cache_patient_saved")
+@receiver(post_delete, sender=Patient, dispatch_uid="cache_patient_deleted")
+def patient_changed(sender, instance, **kwargs):
+    invalidate_patients([(instance.pk, instance.user_id)])
+
+
+@receiver(pre_save, sender=HeartRate, dispatch_uid="cache_heart_rate_saving")
+def heart_rate_saving(sender, instance, raw=False, **kwargs):
+    # Remember the previous patient so moving a reading refreshes both lists.
+    if not raw and not instance._state.adding:
+        instance._cache_previous_patient_id = (
+            HeartRate.objects.filter(pk=instance.pk).values_list("patient_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=HeartRate, dispatch_uid="cache_heart_rate_saved")
+@receiver(post_delete, sender=HeartRate, dispatch_uid="cache_heart_rate_deleted")
+def heart_rate_changed(sender, instance, **kwargs):
+    owner_id = related_owner_id(instance, "patient")
+    rows = [(instance.pk, instance.patient_id, owner_id)]
+    previous = getattr(instance, "_cache_previous_patient_id", None)
+    if previous is not None and previous != instance.patient_id:
+        previous_owner_id = Patient.objects.filter(pk=previous).values_list("user_id", flat=True).first()
+        rows.append((instance.pk, previous, previous_owner_id))
+    invalidate_heart_rates(rows)
@@ -0,0 +1,131 @@
+"""
+sparse_fields.py
+~~~~~~~~~~~~~~~~
+Sparse fieldsets (``?fields=id,bpm,recorded_at``) for list endpoints.
+
+``SparseFieldsMixin`` parses the parameter on list reads, passes the names
+to the serializer through its context and narrows the queryset with
+``.only()``, so unrequested columns are neither selected nor rendered.
+Fields whose source reaches through a relation (``patient.__str__``) keep
+the foreign key column and are only resolved when requested, so a
+projection without them never touches the related table.
+
+Unknown names are ignored; if none of the names is known the full
+representation is returned.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+
+FIELDS_PARAM = "fields"
+
+
+def parse_fields(request):
+    """
+    Read ``?fields=`` from a GET request.
+
+    Returns:
+        tuple | None: Requested names in order, or None when absent.
+    """
+    if request is None or request.method != "GET":
+        return None
+    raw = request.query_params.get(FIELDS_PARAM, "")
+    names = tuple(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+    return names or None
+
+
+def project_rows(rows, fields):
+    """
+    Apply a sparse fieldset to already-serialized rows.
+
+    Args:
+        rows (list[dict]): Serialized representations.
+        fields (Iterable[str] | None): Requested names.
+
+    Returns:
+        list[dict]: ``rows`` unchanged without a usable projection.
+    """
+    if not fields or not rows:
+        return rows
+    known = [name for name in fields if name in rows[0]]
+    if not known:
+        return rows
+    return [{name: row[name] for name in known} for row in rows]
+
+
+def projected_columns(serializer_class, fields):
+    """
+    Model fields to load with ``.only()`` for a sparse fieldset.
+
+    Args:
+        serializer_class (type[ModelSerializer]): Serializer rendering the rows.
+        fields (Iterable[str]): Requested serializer field names.
+
+    Returns:
+        list[str] | None: Field names (always including the primary key), or
+        None when a requested field cannot be mapped to model fields (e.g.
+        a source that is a model property) and every column must be loaded.
+    """
+    model = serializer_class.Meta.model
+    serializer_fields = serializer_class().fields
+    columns = {model._meta.pk.name}
+    for name in fields:
+        field = serializer_fields.get(name)
+        if field is None or field.write_only:
+            continue
+        if field.source == "*":
+            # Method fields may read any attribute of the instance.
+            return None
+        root = field.source.split(".")[0]
+        try:
+            model_field = model._meta.get_field(root)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete:
+            return None
+        columns.add(model_field.name)
+    return sorted(columns)
+
+
+class SparseFieldsSerializerMixin:
+    """
+    ModelSerializer mixin rendering only ``context["fields"]`` when given.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get("fields")
+        if not requested:
+            return fields
+        sparse = {name: fields[name] for name in requested if name in fields}
+        return sparse or fields
+
+
+class SparseFieldsMixin:
+    """
+    ViewSet mixin adding ``?fields=`` projection to ``list``.
+
+    Attributes:
+        sparse_actions (tuple): Actions that honour ``?fields=``.
+    """
+
+    sparse_actions = ("list",)
+
+    def get_requested_fields(self):
+        """Requested field names for this request, or None."""
+        if getattr(self, "action", None) not in self.sparse_actions:
+            return None
+        return parse_fields(self.request)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.get_requested_fields()
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_requested_fields()
+        if fields:
+            columns = projected_columns(self.get_serializer_class(), fields)
+            if columns is not None:
+                queryset = queryset.only(*columns)
+        return queryset
@@ -0,0 +1,45 @@
+"""
+conftest.py
+~~~~~~~~~~~
+Fixtures for shared infrastructure tests (pagination, caching, middleware).
+"""
+
+import pytest
+from django.core.cache import caches
+from rest_framework.test import APIClient
+from users.models import User
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with empty caches (default and response cache)."""
+    for cache in caches.all():
+        cache.clear()
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture
+def api_client():
+    """Unauthenticated API client."""
+    return APIClient()
+
+
+@pytest.fixture
+def test_user(db):
+    """Create a test user."""
+    return User.objects.create_user(username="testuser", password="testpass123")
+
+
+@pytest.fixture
+def auth_client(api_client, test_user):
+    """Authenticated API client."""
+    api_client.force_authenticate(user=test_user)
+    return api_client
+
+
+@pytest.fixture
+def location_list_url():
+    """Full URL of the location list endpoint."""
+    return "http://localhost:8000/api/v1/users/locations"
@@ -0,0 +1,130 @@
+"""
+test_async_logging.py
+~~~~~~~~~~~~~~~~~~~~~
+Tests for queued log delivery and sampling of repetitive info logs.
+"""
+
+import logging
+import os
+import queue
+import time
+import pytest
+from core import async_logging
+from core.async_logging import (
+    LOG_RECORDS_DROPPED, NonBlockingQueueHandler, SampledLogFilter, install_queue_logging, uninstall_queue_logging,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def sampled_logger():
+    logger = logging.getLogger("tests.sampled")
+    handler = ListHandler()
+    logger.addHandler(handler)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    yield logger, handler
+    logger.removeHandler(handler)
+    logger.filters.clear()
+
+
+class TestSampledLogFilter:
+
+    def test_burst_then_one_in_n(self, sampled_logger):
+        logger, handler = sampled_logger
+        logger.addFilter(SampledLogFilter(burst=3, sample_every=5))
+
+        for i in range(20):
+            logger.info("Saved %s", i)
+
+        assert [record.args[0] for record in handler.records] == [0, 1, 2, 7, 12, 17]
+        assert handler.records[-1].sample_rate == 5
+
+    def test_templates_and_warnings_not_grouped(self, sampled_logger):
+        logger, handler = sampled_logger
+        logger.addFilter(SampledLogFilter(burst=1, sample_every=1000))
+
+        for i in range(3):
+            logger.info("Saved %s", i)
+            logger.info("Read %s", i)
+            logger.warning("Rejected %s", i)
+
+        assert sorted(record.getMessage() for record in handler.records) == [
+            "Read 0", "Rejected 0", "Rejected 1", "Rejected 2", "Saved 0",
+        ]
+
+    def test_next_window_reports_suppressed(self, sampled_logger):
+        logger, handler = sampled_logger
+        logger.addFilter(SampledLogFilter(burst=1, interval=0.05, sample_every=1000))
+
+        for i in range(4):
+            logger.info("Saved %s", i)
+        time.sleep(0.06)
+        logger.info("Saved %s", 4)
+
+        assert [record.args[0] for record in handler.records] == [0, 4]
+        assert handler.records[-1].suppressed == 3
+
+
+class TestQueueLogging:
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = NonBlockingQueueHandler(queue.SimpleQueue(), maxsize=1)
+        logger = logging.getLogger("tests.queue")
+        logger.addHandler(handler)
+        logger.propagate = False
+        before = LOG_RECORDS_DROPPED.samples().get((), 0)
+        try:
+            for i in range(3):
+                logger.warning("Reading %s", {"bpm": i})
+        finally:
+            logger.removeHandler(handler)
+
+        assert handler.queue.get_nowait().msg == "Reading {'bpm': 0}"
+        assert LOG_RECORDS_DROPPED.samples()[()] - before == 2
+
+    def test_root_handlers_run_on_listener(self, monkeypatch):
+        root = logging.getLogger()
+        target = ListHandler()
+        monkeypatch.setattr(async_logging, "_listener", None)
+        monkeypatch.setattr(root, "handlers", [target])
+
+        assert install_queue_logging() is not None
+        assert install_queue_logging() is None
+        assert [type(handler) for handler in root.handlers] == [NonBlockingQueueHandler]
+        logging.getLogger("tests.root").warning("Queued %s", 1)
+        uninstall_queue_logging()
+
+        assert [record.getMessage() for record in target.records] == ["Queued 1"]
+        assert root.handlers == [target]
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+    def test_forked_child_runs_its_own_listener(self, monkeypatch, tmp_path):
+        root = logging.getLogger()
+        path = tmp_path / "child.log"
+        target = logging.FileHandler(path)
+        monkeypatch.setattr(async_logging, "_listener", None)
+        monkeypatch.setattr(root, "handlers", [target])
+        install_queue_logging()
+        try:
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    logging.getLogger("tests.fork").warning("From child %s", os.getpid())
+                    uninstall_queue_logging()
+                finally:
+                    os._exit(0)
+            os.waitpid(pid, 0)
+        finally:
+            uninstall_queue_logging()
+            target.close()
+
+        assert path.read_text().strip() == f"From child {pid}"
@@ -0,0 +1,87 @@
+"""
+test_batch.py
+~~~~~~~~~~~~~
+Tests for batch retrieval of patients and heart rates by id.
+"""
+
+import pytest
+from datetime import date
+from rest_framework import status
+from patients.models import Patient
+from users.models import User
+from vitals.models import HeartRate
+
+BASE_URL = "http://localhost:8000/api/v1"
+PATIENTS_BATCH_URL = f"{BASE_URL}/patients/batch"
+HEART_RATES_BATCH_URL = f"{BASE_URL}/vitals/heart-rates/batch"
+
+
+def make_patient(user, first_name):
+    return Patient.objects.create(
+        user=user, first_name=first_name, last_name="Batch", date_of_birth=date(1990, 7, 8), gender="Male",
+    )
+
+
+# ----------------------------
+# Patients
+# ----------------------------
+@pytest.mark.django_db
+class TestPatientBatch:
+
+    def test_get_preserves_order_and_reports_missing(self, auth_client, test_user, django_assert_num_queries):
+        ada, grace = make_patient(test_user, "Ada"), make_patient(test_user, "Grace")
+        missing = grace.id + 100
+
+        with django_assert_num_queries(1):
+            response = auth_client.get(PATIENTS_BATCH_URL, {"ids": f"{grace.id},{missing},{ada.id},{grace.id}"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [row["first_name"] for row in response.data["results"]] == ["Grace", "Ada"]
+        assert response.data["missing"] == [missing]
+
+    def test_post_body_and_other_owners_rows(self, auth_client, test_user):
+        other = User.objects.create_user(username="other", email="other@example.com", password="x")
+        mine, theirs = make_patient(test_user, "Ada"), make_patient(other, "Eve")
+
+        response = auth_client.post(PATIENTS_BATCH_URL, {"ids": [theirs.id, mine.id]}, format="json")
+
+        assert [row["id"] for row in response.data["results"]] == [mine.id]
+        assert response.data["missing"] == [theirs.id]
+
+    def test_thousands_of_ids(self, auth_client, test_user):
+        patients = Patient.objects.bulk_create([
+            Patient(user=test_user, first_name=f"P{i}", last_name="Batch", date_of_birth=date(1990, 1, 1), gender="Other")
+            for i in range(1500)
+        ])
+        ids = [patient.id for patient in reversed(patients)]
+        response = auth_client.post(PATIENTS_BATCH_URL, {"ids": ids}, format="json")
+        assert [row["id"] for row in response.data["results"]] == ids
+
+    @pytest.mark.parametrize("ids", ["", "1,x", "1.5"])
+    def test_malformed_ids(self, auth_client, ids):
+        response = auth_client.get(PATIENTS_BATCH_URL, {"ids": ids})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_too_many_ids(self, auth_client, settings):
+        settings.BATCH_GET_MAX_IDS = 2
+        response = auth_client.get(PATIENTS_BATCH_URL, {"ids": "1,2,3"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+# ----------------------------
+# Heart rates
+# ----------------------------
+@pytest.mark.django_db
+class TestHeartRateBatch:
+
+    def test_single_query_with_related_names(self, auth_client, test_user, django_assert_num_queries):
+        patient = make_patient(test_user, "Ada")
+        first = HeartRate.objects.create(patient=patient, bpm=70, recorded_by=test_user)
+        second = HeartRate.objects.create(patient=patient, bpm=80, recorded_by=test_user)
+
+        with django_assert_num_queries(1):
+            response = auth_client.get(HEART_RATES_BATCH_URL, {"ids": f"{second.id},{first.id}"})
+
+        assert [row["bpm"] for row in response.data["results"]] == [80, 70]
+        assert response.data["results"][0]["patient_name"] == "Ada Batch"
+        assert response.data["missing"] == []
@@ -0,0 +1,127 @@
+"""
+test_conditional.py
+~~~~~~~~~~~~~~~~~~~
+Tests for ETag / Last-Modified conditional reads on patients and heart rates.
+"""
+
+import pytest
+from datetime import date
+from rest_framework import status
+from patients.models import Patient
+from vitals.models import HeartRate
+
+BASE_URL = "http://localhost:8000/api/v1"
+PATIENTS_URL = f"{BASE_URL}/patients"
+HEART_RATES_URL = f"{BASE_URL}/vitals/heart-rates"
+
+
+@pytest.fixture(autouse=True)
+def no_response_cache(settings):
+    """Exercise the validators themselves rather than cached responses."""
+    settings.RESPONSE_CACHE_ENABLED = False
+
+
+def make_patient(user, first_name):
+    return Patient.objects.create(
+        user=user, first_name=first_name, last_name="Cached", date_of_birth=date(1975, 6, 1), gender="Male",
+    )
+
+
+# ----------------------------
+# Lists
+# ----------------------------
+@pytest.mark.django_db
+class TestConditionalLists:
+
+    def test_unchanged_list_is_not_modified(self, auth_client, test_user, django_assert_num_queries):
+        make_patient(test_user, "Ada")
+        etag = auth_client.get(PATIENTS_URL)["ETag"]
+
+        # Only the validator aggregate runs: no page query, no serialization.
+        with django_assert_num_queries(1):
+            response = auth_client.get(PATIENTS_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+
+    def test_full_response_counts_once(self, auth_client, test_user, django_assert_num_queries):
+        make_patient(test_user, "Ada")
+        with django_assert_num_queries(2):
+            response = auth_client.get(PATIENTS_URL)
+        assert response.data["count"] == 1
+        assert "private" in response["Cache-Control"]
+
+    def test_create_update_and_delete_change_the_etag(self, auth_client, test_user):
+        patient = make_patient(test_user, "Ada")
+        etags = [auth_client.get(PATIENTS_URL)["ETag"]]
+
+        other = make_patient(test_user, "Grace")
+        etags.append(auth_client.get(PATIENTS_URL)["ETag"])
+        patient.first_name = "Augusta"
+        patient.save()
+        etags.append(auth_client.get(PATIENTS_URL)["ETag"])
+        other.delete()
+        response = auth_client.get(PATIENTS_URL, HTTP_IF_NONE_MATCH=etags[-1])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(set(etags + [response["ETag"]])) == 4
+
+    def test_query_parameters_are_part_of_the_etag(self, auth_client, test_user):
+        make_patient(test_user, "Ada")
+        etag = auth_client.get(PATIENTS_URL)["ETag"]
+        response = auth_client.get(PATIENTS_URL, {"ordering": "first_name"}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_vitals_summary_is_not_validated(self, auth_client, test_user):
+        make_patient(test_user, "Ada")
+        response = auth_client.get(PATIENTS_URL, {"include": "vitals_summary"})
+        assert response.status_code == status.HTTP_200_OK
+        assert "ETag" not in response
+
+    def test_heart_rates_revalidate_on_patient_rename(self, auth_client, test_user):
+        patient = make_patient(test_user, "Ada")
+        HeartRate.objects.create(patient=patient, bpm=72)
+        etag = auth_client.get(HEART_RATES_URL)["ETag"]
+        assert auth_client.get(HEART_RATES_URL, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        patient.last_name = "Renamed"
+        patient.save()
+        response = auth_client.get(HEART_RATES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"][0]["patient_name"].endswith("Renamed")
+
+
+# ----------------------------
+# Details
+# ----------------------------
+@pytest.mark.django_db
+class TestConditionalDetails:
+
+    def test_patient_detail_validators(self, auth_client, test_user):
+        patient = make_patient(test_user, "Ada")
+        url = f"{PATIENTS_URL}/{patient.id}"
+        first = auth_client.get(url)
+        assert first["Last-Modified"]
+
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code == status.HTTP_304_NOT_MODIFIED
+        response = auth_client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        patient.first_name = "Augusta"
+        patient.save()
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["first_name"] == "Augusta"
+
+    def test_heart_rate_detail_single_query(self, auth_client, test_user, django_assert_num_queries):
+        heart_rate = HeartRate.objects.create(patient=make_patient(test_user, "Ada"), bpm=72)
+        url = f"{HEART_RATES_URL}/{heart_rate.id}"
+        etag = auth_client.get(url)["ETag"]
+
+        with django_assert_num_queries(1):
+            response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_if_match_mismatch_is_not_a_304(self, auth_client, test_user):
+        patient = make_patient(test_user, "Ada")
+        response = auth_client.get(f"{PATIENTS_URL}/{patient.id}", HTTP_IF_MATCH='"stale"')
+        assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,73 @@
+"""
+test_instrumentation.py
+~~~~~~~~~~~~~~~~~~~~~~~
+Tests for Server-Timing headers, timing logs and slow query plans.
+"""
+
+import logging
+import pytest
+from datetime import date
+from rest_framework import status
+from patients.models import Patient
+from vitals.models import HeartRate
+
+HEART_RATES_URL = "http://localhost:8000/api/v1/vitals/heart-rates"
+
+
+@pytest.fixture
+def timing(settings):
+    """Measure every request (and bypass the response cache)."""
+    settings.REQUEST_TIMING_ENABLED = True
+    settings.REQUEST_TIMING_SAMPLE_RATE = 1.0
+    settings.REQUEST_TIMING_SLOW_QUERY_MS = 0
+    settings.RESPONSE_CACHE_ENABLED = False
+    return settings
+
+
+@pytest.fixture
+def readings(test_user):
+    patient = Patient.objects.create(
+        user=test_user, first_name="Ada", last_name="Timing", date_of_birth=date(1980, 1, 2), gender="Female",
+    )
+    HeartRate.objects.bulk_create([HeartRate(patient=patient, bpm=60 + i, recorded_by=test_user) for i in range(5)])
+
+
+def timing_entries(response):
+    return {entry.split(";")[0]: entry for entry in response["Server-Timing"].split(", ")}
+
+
+@pytest.mark.django_db
+class TestServerTiming:
+
+    def test_header_and_log_fields(self, timing, auth_client, readings, caplog):
+        with caplog.at_level(logging.INFO, logger="core.instrumentation"):
+            response = auth_client.get(HEART_RATES_URL)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert set(timing_entries(response)) == {"db", "serialize", "render", "total"}
+        record = next(r for r in caplog.records if r.name == "core.instrumentation")
+        assert record.path == "/api/v1/vitals/heart-rates"
+        assert record.status == 200
+        assert record.queries >= 1
+        assert record.serialize_ms > 0
+        assert record.render_ms > 0
+        assert f'desc="{record.queries} queries"' in timing_entries(response)["db"]
+
+    def test_disabled_by_default(self, settings, auth_client, readings):
+        settings.REQUEST_TIMING_ENABLED = False
+        response = auth_client.get(HEART_RATES_URL)
+        assert "Server-Timing" not in response
+
+    def test_sampling(self, timing, auth_client, readings):
+        timing.REQUEST_TIMING_SAMPLE_RATE = 0
+        response = auth_client.get(HEART_RATES_URL)
+        assert "Server-Timing" not in response
+
+    def test_slow_queries_logged_with_plan(self, timing, auth_client, readings, caplog):
+        timing.REQUEST_TIMING_SLOW_QUERY_MS = 0.0001
+        with caplog.at_level(logging.WARNING, logger="core.instrumentation"):
+            auth_client.get(HEART_RATES_URL)
+
+        slow = [r for r in caplog.records if r.getMessage().startswith("Slow query")]
+        assert slow
+        assert any("vitals_heartrate" in r.sql and "Plan:\nNone" not in r.getMessage() for r in slow)
@@ -0,0 +1,142 @@
+"""
+test_metrics.py
+~~~~~~~~~~~~~~~
+Tests for the metrics registry, request metrics and the Prometheus endpoint.
+"""
+
+import json
+import subprocess
+import sys
+import threading
+import pytest
+from datetime import date
+from rest_framework import status
+from core.metrics import MetricsRegistry, registry
+from patients.models import Patient
+
+BASE_URL = "http://localhost:8000/api/v1"
+METRICS_URL = f"{BASE_URL}/metrics"
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics(settings):
+    settings.METRICS_MULTIPROC_DIR = None
+    registry.clear()
+    yield
+    registry.clear()
+
+
+def sample_lines(text, name):
+    return [line for line in text.splitlines() if line.startswith(name)]
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+
+    def test_request_count_and_latency_by_route(self, auth_client, api_client):
+        auth_client.get(f"{BASE_URL}/vitals/heart-rates")
+        auth_client.get(f"{BASE_URL}/patients/12345")
+        api_client.force_authenticate(user=None)
+
+        response = api_client.get(METRICS_URL)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        text = response.content.decode()
+        assert 'http_requests_total{route="api/v1/vitals/heart-rates",method="GET",status="200"} 1' in text
+        assert 'http_requests_total{route="api/v1/patients/<int:pk>",method="GET",status="404"} 1' in text
+        assert 'http_request_duration_seconds_count{route="api/v1/vitals/heart-rates",method="GET"} 1' in text
+        assert "# TYPE http_request_duration_seconds histogram" in text
+
+    def test_remote_clients_rejected(self, api_client):
+        response = api_client.get(METRICS_URL, REMOTE_ADDR="203.0.113.7")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_token_required_when_configured(self, api_client, settings):
+        settings.METRICS_TOKEN = "scrape-secret"
+        assert api_client.get(METRICS_URL).status_code == status.HTTP_403_FORBIDDEN
+        response = api_client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer wrong")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        response = api_client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer scrape-secret")
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_ingest_and_batch_metrics(self, auth_client, test_user):
+        patient = Patient.objects.create(
+            user=test_user, first_name="Ada", last_name="Metrics", date_of_birth=date(1980, 1, 2), gender="Female",
+        )
+        auth_client.post(f"{BASE_URL}/vitals/heart-rates", {"patient": patient.id, "bpm": 72}, format="json")
+        auth_client.get(f"{BASE_URL}/patients/batch", {"ids": f"{patient.id},999"})
+
+        text = auth_client.get(METRICS_URL).content.decode()
+
+        assert 'ingested_rows_total{kind="heart_rate"} 1' in text
+        assert 'batch_size_bucket{operation="get",model="patient",le="10"} 1' in text
+        assert 'batch_size_sum{operation="get",model="patient"} 2' in text
+        assert "password_hash_pool_rejected_total 0" in text
+
+
+class TestRegistry:
+
+    def test_thread_shards_are_summed(self):
+        metrics = MetricsRegistry()
+        counter = metrics.counter("events_total", "Events.", ("kind",))
+        histogram = metrics.histogram("sizes", "Sizes.", buckets=(1, 10))
+
+        def work():
+            for _ in range(1000):
+                counter.inc("a")
+                histogram.observe(value=5)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        text = metrics.render()
+        assert 'events_total{kind="a"} 8000' in text
+        assert sample_lines(text, "sizes_bucket") == [
+            'sizes_bucket{le="1"} 0', 'sizes_bucket{le="10"} 8000', 'sizes_bucket{le="+Inf"} 8000',
+        ]
+        assert "sizes_sum 40000.0" in text
+
+    def test_exited_threads_are_retired(self):
+        metrics = MetricsRegistry()
+        counter = metrics.counter("events_total", "Events.", ("kind",))
+        histogram = metrics.histogram("sizes", "Sizes.", buckets=(1, 10))
+
+        def work():
+            counter.inc("a")
+            histogram.observe(value=5)
+
+        for _ in range(20):
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+
+        assert len(counter._shards) == len(histogram._shards) == 0
+        assert counter.samples() == {("a",): 20}
+        assert histogram.samples() == {(): [0, 20, 0, 100.0]}
+
+    def test_label_values_escaped(self):
+        metrics = MetricsRegistry()
+        metrics.counter("events_total", "Events.", ("path",)).inc('a"b\\c\n')
+        assert 'events_total{path="a\\"b\\\\c\\n"} 1' in metrics.render()
+
+    def test_multiprocess_directory_merges_workers(self, settings, tmp_path):
+        settings.METRICS_MULTIPROC_DIR = str(tmp_path)
+        metrics = MetricsRegistry()
+        metrics.counter("events_total", "Events.").inc(amount=2)
+        metrics.gauge("busy", "Busy workers.").inc()
+
+        exited = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+        dead_pid = int(exited.stdout)
+        (tmp_path / f"{dead_pid}.json").write_text(json.dumps({"pid": dead_pid, "metrics": {
+            "events_total": {"type": "counter", "help": "Events.", "labels": [], "samples": [[[], 3]]},
+            "busy": {"type": "gauge", "help": "Busy workers.", "labels": [], "samples": [[[], 5]]},
+        }}))
+
+        text = metrics.render()
+
+        assert "events_total 5" in text
+        assert "busy 1" in text
@@ -0,0 +1,96 @@
+"""
+test_ownership.py
+~~~~~~~~~~~~~~~~~
+Tests for owner-scoped patient, heart-rate and sync queries.
+"""
+
+import pytest
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from patients.models import Patient
+from users.models import User
+from vitals.models import HeartRate
+
+BASE_URL = "http://localhost:8000/api/v1"
+
+
+@pytest.fixture
+def other_user(db):
+    return User.objects.create_user(username="otheruser", email="other@example.com", password="testpass123")
+
+
+@pytest.fixture
+def admin_client(db):
+    admin = User.objects.create_user(username="admin", email="admin@example.com", password="x", is_staff=True)
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+@pytest.fixture
+def records(test_user, other_user):
+    mine = Patient.objects.create(
+        user=test_user, first_name="Ann", last_name="Mine", date_of_birth=date(1990, 1, 1), gender="Female",
+    )
+    theirs = Patient.objects.create(
+        user=other_user, first_name="Ann", last_name="Theirs", date_of_birth=date(1990, 1, 1), gender="Female",
+    )
+    return {
+        "mine": mine,
+        "theirs": theirs,
+        "my_hr": HeartRate.objects.create(patient=mine, bpm=70),
+        "their_hr": HeartRate.objects.create(patient=theirs, bpm=80),
+    }
+
+
+def ids(response):
+    return {row["id"] for row in response.data["results"]}
+
+
+@pytest.mark.django_db
+class TestOwnerScoping:
+
+    def test_patient_list_and_detail_are_scoped(self, auth_client, records):
+        response = auth_client.get(f"{BASE_URL}/patients")
+        assert ids(response) == {records["mine"].id}
+        assert response.data["count"] == 1
+        response = auth_client.get(f"{BASE_URL}/patients/{records['theirs'].id}")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        response = auth_client.delete(f"{BASE_URL}/patients/{records['theirs'].id}")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_patient_search_is_scoped(self, auth_client, records):
+        response = auth_client.get(f"{BASE_URL}/patients", {"search": "ann"})
+        assert ids(response) == {records["mine"].id}
+
+    def test_heart_rates_scoped_through_patient_without_join(self, auth_client, records):
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(f"{BASE_URL}/vitals/heart-rates", {"search": "ann"})
+        assert ids(response) == {records["my_hr"].id}
+        heart_rate_queries = [q["sql"] for q in ctx.captured_queries if 'FROM "vitals_heartrate"' in q["sql"]]
+        assert not any("JOIN" in sql for sql in heart_rate_queries)
+
+    def test_cannot_record_heart_rate_for_other_users_patient(self, auth_client, records):
+        response = auth_client.post(
+            f"{BASE_URL}/vitals/heart-rates", {"patient": records["theirs"].id, "bpm": 75}, format="json"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "patient" in response.data
+
+    def test_sync_feed_is_scoped(self, auth_client, records, settings):
+        settings.SYNC_SETTLE_SECONDS = 0
+        response = auth_client.get(f"{BASE_URL}/sync/changes")
+        assert {p["id"] for p in response.data["patients"]} == {records["mine"].id}
+        assert {h["id"] for h in response.data["heart_rates"]} == {records["my_hr"].id}
+
+    def test_admin_sees_everything(self, admin_client, records, settings):
+        settings.SYNC_SETTLE_SECONDS = 0
+        assert ids(admin_client.get(f"{BASE_URL}/patients")) == {records["mine"].id, records["theirs"].id}
+        assert ids(admin_client.get(f"{BASE_URL}/vitals/heart-rates")) == {
+            records["my_hr"].id, records["their_hr"].id,
+        }
+        response = admin_client.get(f"{BASE_URL}/sync/changes")
+        assert len(response.data["patients"]) == 2
@@ -0,0 +1,85 @@
+"""
+test_pagination.py
+~~~~~~~~~~~~~~~~~~
+Tests for ApproximateCountPagination.
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from users.models import Location
+
+
+@pytest.fixture(autouse=True)
+def no_response_cache(settings):
+    """Exercise the paginator itself rather than cached responses."""
+    settings.RESPONSE_CACHE_ENABLED = False
+
+
+def paginate(queryset, page=1):
+    """Paginate ``queryset`` as a list endpoint would, returning the response body."""
+    # Imported late: DRF fixes the default page size when pagination is first imported.
+    from core.pagination import ApproximateCountPagination
+
+    request = Request(APIRequestFactory().get("/items", {"page": page}))
+    pagination = ApproximateCountPagination()
+    rows = pagination.paginate_queryset(queryset, request)
+    return pagination.get_paginated_response([row.name for row in rows]).data
+
+
+def count_queries(context):
+    return [q["sql"] for q in context.captured_queries if "COUNT(" in q["sql"].upper()]
+
+
+@pytest.mark.django_db
+class TestApproximateCountPagination:
+
+    def test_small_lists_are_counted_exactly_every_time(self, settings):
+        settings.PAGINATION_COUNT_THRESHOLD = 100
+        Location.objects.create(name="Ward A")
+
+        for _ in range(2):
+            data = paginate(Location.objects.order_by("id"))
+            assert data["count"] == 1
+            assert data["count_is_approximate"] is False
+
+    def test_large_counts_are_cached(self, settings):
+        settings.PAGINATION_COUNT_THRESHOLD = 2
+        for i in range(3):
+            Location.objects.create(name=f"Ward {i}")
+
+        first = paginate(Location.objects.order_by("id"))
+        assert first["count"] == 3
+        assert first["count_is_approximate"] is False
+
+        with CaptureQueriesContext(connection) as ctx:
+            second = paginate(Location.objects.order_by("id"))
+        assert second["count"] == 3
+        assert second["count_is_approximate"] is True
+        assert count_queries(ctx) == []
+
+    def test_cache_is_keyed_by_filters(self, auth_client, settings):
+        settings.PAGINATION_COUNT_THRESHOLD = 1
+        url = "http://localhost:8000/api/v1/patients"
+        auth_client.get(url)
+        response = auth_client.get(url, {"search": "nobody"})
+        assert response.data["count"] == 0
+        assert response.data["count_is_approximate"] is False
+
+    def test_stale_count_does_not_truncate_page(self, settings):
+        settings.PAGINATION_COUNT_THRESHOLD = 1
+        for i in range(3):
+            Location.objects.create(name=f"Ward {i}")
+        paginate(Location.objects.order_by("id"))
+
+        Location.objects.create(name="Ward 3")
+        names, page, data = [], 1, {"next": True}
+        while data["next"]:
+            data = paginate(Location.objects.order_by("id"), page)
+            assert data["count_is_approximate"] is True
+            assert data["count"] == 3
+            names.extend(data["results"])
+            page += 1
+        assert sorted(names) == ["Ward 0", "Ward 1", "Ward 2", "Ward 3"]
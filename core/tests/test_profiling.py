@@ -0,0 +1,108 @@
+"""
+test_profiling.py
+~~~~~~~~~~~~~~~~~
+Tests for on-demand request profiling by staff users.
+"""
+
+import json
+import os
+import pstats
+import time
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+from core import profiling
+from users.models import User
+
+BASE_URL = "http://localhost:8000/api/v1"
+
+
+@pytest.fixture(autouse=True)
+def profiler_dir(settings, tmp_path):
+    settings.PROFILER_DIR = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def staff_client(db):
+    client = APIClient()
+    client.force_authenticate(user=User.objects.create_user(username="staff", email="staff@example.com", password="x", is_staff=True))
+    return client
+
+
+@pytest.mark.django_db
+class TestRequestProfiling:
+
+    def test_cprofile_stored_and_downloadable(self, staff_client, profiler_dir):
+        response = staff_client.get(f"{BASE_URL}/patients", HTTP_X_PROFILE="cprofile")
+
+        assert response.status_code == status.HTTP_200_OK
+        name = response["X-Profile"]
+        assert name.endswith(".pstats")
+        stats = pstats.Stats(str(profiler_dir / name))
+        assert any(func[2] == "list" for func in stats.stats)
+
+        download = staff_client.get(f"http://localhost:8000{response['X-Profile-Url']}")
+        assert download.status_code == status.HTTP_200_OK
+        assert b"".join(download.streaming_content) == (profiler_dir / name).read_bytes()
+
+    def test_sampling_profile_is_speedscope(self, staff_client, profiler_dir):
+        response = staff_client.get(f"{BASE_URL}/vitals/heart-rates", {"_profile": "sampling"})
+
+        document = json.loads((profiler_dir / response["X-Profile"]).read_text())
+        profile = document["profiles"][0]
+        assert profile["type"] == "sampled"
+        assert len(profile["samples"]) == len(profile["weights"])
+        assert all(0 <= index < len(document["shared"]["frames"]) for stack in profile["samples"] for index in stack)
+
+    def test_memory_profile(self, staff_client, profiler_dir):
+        response = staff_client.get(f"{BASE_URL}/users/locations", HTTP_X_PROFILE="memory")
+        assert (profiler_dir / response["X-Profile"]).read_text().startswith("traced memory:")
+
+    def test_user_viewset_covered(self, staff_client):
+        response = staff_client.get(f"{BASE_URL}/users/auth/list-users", HTTP_X_PROFILE="cprofile")
+        assert response["X-Profile"].endswith(".pstats")
+
+    def test_ignored_for_non_staff(self, auth_client, profiler_dir):
+        response = auth_client.get(f"{BASE_URL}/patients", HTTP_X_PROFILE="cprofile")
+        assert response.status_code == status.HTTP_200_OK
+        assert "X-Profile" not in response
+        assert list(profiler_dir.iterdir()) == []
+
+    def test_unknown_mode_and_busy(self, staff_client):
+        response = staff_client.get(f"{BASE_URL}/patients", HTTP_X_PROFILE="perf")
+        assert response["X-Profile"] == "unknown mode"
+
+        with profiling._busy:
+            response = staff_client.get(f"{BASE_URL}/patients", HTTP_X_PROFILE="cprofile")
+        assert response.status_code == status.HTTP_200_OK
+        assert response["X-Profile"] == "busy"
+
+    def test_download_staff_only(self, staff_client, auth_client, profiler_dir):
+        name = "0" * 32 + ".txt"
+        (profiler_dir / name).write_text("profile")
+
+        assert auth_client.get(f"{BASE_URL}/profiles/{name}").status_code == status.HTTP_403_FORBIDDEN
+        assert staff_client.get(f"{BASE_URL}/profiles/{name}").status_code == status.HTTP_200_OK
+        assert staff_client.get(f"{BASE_URL}/profiles/..%2Fsecret.txt").status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestProfileStorage:
+
+    def test_name_must_match_entirely(self, profiler_dir):
+        assert profiling.profile_path("0" * 32 + ".txt") == str(profiler_dir / ("0" * 32 + ".txt"))
+        with pytest.raises(ValueError):
+            profiling.profile_path("0" * 32 + ".txt\n")
+
+    def test_prune_keeps_newest_and_recent_profiles(self, settings, profiler_dir):
+        settings.PROFILER_MAX_PROFILES = 2
+        settings.PROFILER_MAX_AGE_HOURS = 1
+        now = time.time()
+        names = [f"{i:032x}.txt" for i in range(4)]
+        for age, name in zip((0, 60, 120, 7200), names):
+            (profiler_dir / name).write_text("profile")
+            os.utime(profiler_dir / name, (now - age, now - age))
+        (profiler_dir / "notes.txt").write_text("keep")
+
+        assert sorted(profiling.prune_profiles(now)) == sorted(names[2:])
+        assert sorted(path.name for path in profiler_dir.iterdir()) == sorted([*names[:2], "notes.txt"])
@@ -0,0 +1,159 @@
+"""
+test_response_cache.py
+~~~~~~~~~~~~~~~~~~~~~~
+Tests for the tag-invalidated response cache and its metrics.
+"""
+
+import pytest
+from datetime import date
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.response_cache import response_cache
+from patients.importer import import_patients
+from patients.models import Patient
+from users.models import Location, User
+from vitals.models import HeartRate
+
+BASE_URL = "http://localhost:8000/api/v1"
+LOCATIONS_URL = f"{BASE_URL}/users/locations"
+PATIENTS_URL = f"{BASE_URL}/patients"
+HEART_RATES_URL = f"{BASE_URL}/vitals/heart-rates"
+STATS_URL = f"{BASE_URL}/cache/stats"
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    response_cache.metrics.reset()
+
+
+@pytest.fixture
+def other_client(db):
+    other = User.objects.create_user(username="otheruser", email="other@example.com", password="x")
+    client = APIClient()
+    client.force_authenticate(user=other)
+    return client
+
+
+def make_patient(user, first_name):
+    return Patient.objects.create(
+        user=user, first_name=first_name, last_name="Cached", date_of_birth=date(1970, 2, 3), gender="Female",
+    )
+
+
+# ----------------------------
+# Hits and invalidation
+# ----------------------------
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_repeat_read_is_served_without_queries(self, auth_client, django_assert_num_queries):
+        Location.objects.create(name="Ward A")
+        assert auth_client.get(LOCATIONS_URL)["X-Cache"] == "MISS"
+
+        with django_assert_num_queries(0):
+            response = auth_client.get(LOCATIONS_URL)
+        assert response["X-Cache"] == "HIT"
+        assert response.data["results"][0]["name"] == "Ward A"
+
+    def test_query_params_and_users_get_separate_entries(self, auth_client, other_client, test_user):
+        make_patient(test_user, "Ada")
+        auth_client.get(PATIENTS_URL)
+        assert auth_client.get(PATIENTS_URL, {"ordering": "first_name"})["X-Cache"] == "MISS"
+        response = other_client.get(PATIENTS_URL)
+        assert response["X-Cache"] == "MISS"
+        assert response.data["count"] == 0
+
+    def test_location_change_invalidates_only_its_keys(self, auth_client):
+        ward_a = Location.objects.create(name="Ward A")
+        ward_b = Location.objects.create(name="Ward B")
+        for url in (LOCATIONS_URL, f"{LOCATIONS_URL}/{ward_a.id}", f"{LOCATIONS_URL}/{ward_b.id}"):
+            auth_client.get(url)
+
+        ward_a.name = "Ward A1"
+        ward_a.save()
+
+        assert auth_client.get(f"{LOCATIONS_URL}/{ward_b.id}")["X-Cache"] == "HIT"
+        response = auth_client.get(f"{LOCATIONS_URL}/{ward_a.id}")
+        assert (response["X-Cache"], response.data["name"]) == ("MISS", "Ward A1")
+        assert auth_client.get(LOCATIONS_URL)["X-Cache"] == "MISS"
+
+    def test_patient_change_leaves_other_owners_cached(self, auth_client, other_client, test_user):
+        make_patient(test_user, "Ada")
+        auth_client.get(PATIENTS_URL)
+        other_client.get(PATIENTS_URL)
+
+        make_patient(test_user, "Grace")
+
+        assert other_client.get(PATIENTS_URL)["X-Cache"] == "HIT"
+        response = auth_client.get(PATIENTS_URL)
+        assert (response["X-Cache"], response.data["count"]) == ("MISS", 2)
+
+    def test_heart_rate_lists_are_invalidated_per_patient(self, auth_client, test_user):
+        ada, grace = make_patient(test_user, "Ada"), make_patient(test_user, "Grace")
+        reading = HeartRate.objects.create(patient=ada, bpm=70)
+        auth_client.get(HEART_RATES_URL, {"patient": ada.id})
+        auth_client.get(HEART_RATES_URL, {"patient": grace.id})
+
+        HeartRate.objects.create(patient=ada, bpm=75)
+        assert auth_client.get(HEART_RATES_URL, {"patient": grace.id})["X-Cache"] == "HIT"
+        assert auth_client.get(HEART_RATES_URL, {"patient": ada.id}).data["count"] == 2
+
+        reading.patient = grace
+        reading.save()
+        assert auth_client.get(HEART_RATES_URL, {"patient": ada.id}).data["count"] == 1
+        assert auth_client.get(HEART_RATES_URL, {"patient": grace.id}).data["count"] == 1
+
+    def test_bulk_import_invalidates_patient_lists(self, auth_client, test_user):
+        auth_client.get(PATIENTS_URL)
+        import_patients(
+            [{"first_name": "Bulk", "last_name": "Row", "date_of_birth": "1980-01-01", "gender": "Male"}], test_user
+        )
+        assert auth_client.get(PATIENTS_URL).data["count"] == 1
+
+    def test_hit_keeps_validators(self, auth_client, test_user):
+        patient = make_patient(test_user, "Ada")
+        etag = auth_client.get(f"{PATIENTS_URL}/{patient.id}")["ETag"]
+        response = auth_client.get(f"{PATIENTS_URL}/{patient.id}", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["X-Cache"] == "HIT"
+
+    def test_time_dependent_includes_are_not_cached(self, auth_client, test_user):
+        make_patient(test_user, "Ada")
+        response = auth_client.get(PATIENTS_URL, {"include": "vitals_summary"})
+        assert "X-Cache" not in response
+
+    def test_query_cache(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        assert response_cache.get_or_set(["answer"], ["locations"], compute) == 1
+        assert response_cache.get_or_set(["answer"], ["locations"], compute) == 1
+        response_cache.invalidate("locations")
+        assert response_cache.get_or_set(["answer"], ["locations"], compute) == 2
+
+
+# ----------------------------
+# Metrics
+# ----------------------------
+@pytest.mark.django_db
+class TestCacheStats:
+
+    def test_admin_only(self, auth_client):
+        assert auth_client.get(STATS_URL).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_hit_ratio_and_latency(self, api_client, auth_client):
+        for _ in range(4):
+            auth_client.get(LOCATIONS_URL)
+        admin = User.objects.create_user(username="admin", email="admin@example.com", password="x", is_staff=True)
+        api_client.force_authenticate(user=admin)
+
+        response = api_client.get(STATS_URL)
+
+        assert response.status_code == status.HTTP_200_OK
+        locations = response.data["endpoints"]["location-list"]
+        assert (locations["hits"], locations["misses"], locations["hit_ratio"]) == (3, 1, 0.75)
+        assert locations["hit_ms"] is not None and locations["miss_ms"] is not None
+        assert response.data["total"]["hits"] == 3
@@ -0,0 +1,108 @@
+"""
+test_sparse_fields.py
+~~~~~~~~~~~~~~~~~~~~~
+Tests for ``?fields=`` sparse fieldsets on list endpoints.
+"""
+
+import pytest
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from patients.models import Patient
+from users.models import Location, User
+from vitals.models import HeartRate
+
+BASE_URL = "http://localhost:8000/api/v1"
+PATIENTS_URL = f"{BASE_URL}/patients"
+HEART_RATES_URL = f"{BASE_URL}/vitals/heart-rates"
+LOCATIONS_URL = f"{BASE_URL}/users/locations"
+USERS_URL = f"{BASE_URL}/users/auth/list-users"
+
+
+@pytest.fixture(autouse=True)
+def no_response_cache(settings):
+    """Observe the queries of every request rather than cached responses."""
+    settings.RESPONSE_CACHE_ENABLED = False
+
+
+def make_patient(user, first_name):
+    return Patient.objects.create(
+        user=user, first_name=first_name, last_name="Sparse", date_of_birth=date(1981, 4, 5), gender="Female",
+    )
+
+
+def page_query(context, table):
+    """The SELECT reading the page rows of ``table``."""
+    return next(
+        q["sql"] for q in context.captured_queries
+        if q["sql"].startswith("SELECT") and f'FROM "{table}"' in q["sql"] and "COUNT(" not in q["sql"]
+    )
+
+
+# ----------------------------
+# Heart rates and patients
+# ----------------------------
+@pytest.mark.django_db
+class TestSparseModelLists:
+
+    def test_heart_rates_select_only_requested_columns(self, auth_client, test_user):
+        HeartRate.objects.create(patient=make_patient(test_user, "Ada"), bpm=72)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(HEART_RATES_URL, {"fields": "id,bpm,recorded_at"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.data["results"][0]) == ["id", "bpm", "recorded_at"]
+        sql = page_query(ctx, "vitals_heartrate")
+        assert '"bpm"' in sql and '"recorded_by_id"' not in sql and '"created_at"' not in sql
+        assert not any('FROM "users_user"' in q["sql"] for q in ctx.captured_queries)
+
+    def test_related_field_is_resolved_only_when_requested(self, auth_client, test_user):
+        HeartRate.objects.create(patient=make_patient(test_user, "Ada"), bpm=72)
+        response = auth_client.get(HEART_RATES_URL, {"fields": "bpm,patient_name"})
+        assert response.data["results"] == [{"bpm": 72, "patient_name": "Ada Sparse"}]
+
+    def test_patients_projection_and_unknown_names(self, auth_client, test_user):
+        make_patient(test_user, "Ada")
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(PATIENTS_URL, {"fields": "first_name,nope"})
+        assert response.data["results"] == [{"first_name": "Ada"}]
+        assert '"email"' not in page_query(ctx, "patients_patient")
+
+        response = auth_client.get(PATIENTS_URL, {"fields": "nope"})
+        assert "last_name" in response.data["results"][0]
+
+    def test_fields_are_part_of_the_etag(self, auth_client, test_user):
+        make_patient(test_user, "Ada")
+        etag = auth_client.get(PATIENTS_URL)["ETag"]
+        response = auth_client.get(PATIENTS_URL, {"fields": "id"}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_detail_reads_ignore_fields(self, auth_client, test_user):
+        patient = make_patient(test_user, "Ada")
+        response = auth_client.get(f"{PATIENTS_URL}/{patient.id}", {"fields": "id"})
+        assert "first_name" in response.data
+
+
+# ----------------------------
+# Locations and users
+# ----------------------------
+@pytest.mark.django_db
+class TestSparseReferenceLists:
+
+    def test_location_rows_are_trimmed(self, auth_client):
+        Location.objects.create(name="Ward A", city="Pune")
+        response = auth_client.get(LOCATIONS_URL, {"fields": "id,name"})
+        assert list(response.data["results"][0]) == ["id", "name"]
+
+    def test_user_list_projection(self, api_client):
+        admin = User.objects.create_user(username="admin", email="admin@example.com", password="x", is_staff=True)
+        api_client.force_authenticate(user=admin)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.get(USERS_URL, {"fields": "id,username"})
+
+        assert response.data["results"] == [{"id": admin.id, "username": "admin"}]
+        assert '"email"' not in page_query(ctx, "users_user")
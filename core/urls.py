@@ -0,0 +1,25 @@
+"""
+core/urls.py
+~~~~~~~~~~~~
+Defines URL patterns for shared infrastructure endpoints (cache and
+Prometheus metrics, request profiles).
+"""
+
+from django.urls import path
+from .views import CacheViewSet, MetricsViewSet, ProfileViewSet
+
+
+urlpatterns = [
+    path(
+        'cache/stats',
+        CacheViewSet.as_view({'get': 'stats'}),
+        name='cache-stats'),
+    path(
+        'metrics',
+        MetricsViewSet.as_view({'get': 'exposition'}),
+        name='metrics'),
+    path(
+        'profiles/<str:name>',
+        ProfileViewSet.as_view({'get': 'retrieve'}),
+        name='profile-detail'),
+]
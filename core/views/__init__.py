@@ -0,0 +1,3 @@
+from .cache import CacheViewSet
+from .metrics import MetricsViewSet
+from .profiles import ProfileViewSet
\ No newline at end of file
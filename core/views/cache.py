@@ -0,0 +1,62 @@
+"""
+cache.py
+~~~~~~~~
+Admin API exposing response cache metrics.
+"""
+
+import logging
+
+from django.conf import settings
+from rest_framework import viewsets, status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from core.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+
+class CacheViewSet(viewsets.ViewSet):
+    """
+    API endpoint reporting response cache effectiveness.
+
+    Public Methods
+    --------------
+    stats(request)
+        Hit ratio and hit / miss latency per endpoint for this process.
+
+    Attributes
+    ----------
+    permission_classes : list
+        Admin (staff) users only.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def stats(self, request):
+        """
+        Return response cache metrics.
+
+        Returns
+        -------
+        Response
+            ``backend``, ``enabled``, ``timeout`` and the counters from
+            ``CacheMetrics.snapshot`` (``endpoints`` and ``total``).
+        """
+        try:
+            backend = settings.CACHES[settings.RESPONSE_CACHE_ALIAS]["BACKEND"]
+            return Response(
+                {
+                    "backend": backend.rsplit(".", 1)[-1],
+                    "enabled": settings.RESPONSE_CACHE_ENABLED,
+                    "timeout": settings.RESPONSE_CACHE_TIMEOUT,
+                    **response_cache.metrics.snapshot(),
+                },
+                status=status.HTTP_200_OK,
+            )
+        except Exception as ex:
+            logger.error("Unexpected error in cache stats: %s", ex)
+            return Response(
+                {"detail": "An unexpected error occurred."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
@@ -0,0 +1,77 @@
+"""
+metrics.py
+~~~~~~~~~~
+Prometheus scrape endpoint for the process metrics registry.
+"""
+
+import hmac
+import logging
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import viewsets, status
+from rest_framework.permissions import BasePermission
+from rest_framework.response import Response
+
+from core.metrics import CONTENT_TYPE, registry
+
+logger = logging.getLogger(__name__)
+
+
+class IsMetricsClient(BasePermission):
+    """
+    Allow requests whose ``REMOTE_ADDR`` is in ``METRICS_ALLOWED_IPS`` and,
+    when ``METRICS_TOKEN`` is set, that send ``Authorization: Bearer <token>``.
+
+    Behind a reverse proxy on the same host every client's ``REMOTE_ADDR``
+    is the proxy's (``127.0.0.1``), so the address check alone lets anyone
+    through; set ``METRICS_TOKEN`` there.
+    """
+
+    def has_permission(self, request, view):
+        if request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+            return False
+        if not settings.METRICS_TOKEN:
+            return True
+        supplied = request.META.get("HTTP_AUTHORIZATION", "")
+        return hmac.compare_digest(supplied.encode(), f"Bearer {settings.METRICS_TOKEN}".encode())
+
+
+class MetricsViewSet(viewsets.ViewSet):
+    """
+    API endpoint exposing metrics in the Prometheus text format.
+
+    Public Methods
+    --------------
+    exposition(request)
+        All metrics of this process, or of every worker in multiprocess mode.
+
+    Attributes
+    ----------
+    authentication_classes : list
+        None; scrapers do not carry tokens.
+    permission_classes : list
+        Local scrapers only (``METRICS_ALLOWED_IPS``), with ``METRICS_TOKEN``
+        when set.
+    """
+
+    authentication_classes = []
+    permission_classes = [IsMetricsClient]
+
+    def exposition(self, request):
+        """
+        Render the metrics registry.
+
+        Returns
+        -------
+        HttpResponse
+            ``text/plain; version=0.0.4`` exposition.
+        """
+        try:
+            return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
+        except Exception as ex:
+            logger.error("Unexpected error rendering metrics: %s", ex)
+            return Response(
+                {"detail": "An unexpected error occurred."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
@@ -0,0 +1,59 @@
+"""
+profiles.py
+~~~~~~~~~~~
+Admin API for downloading stored request profiles.
+"""
+
+import logging
+import os
+
+from django.http import FileResponse
+from rest_framework import viewsets, status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from core.profiling import profile_path
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileViewSet(viewsets.ViewSet):
+    """
+    API endpoint serving profiles recorded by ``core.profiling``.
+
+    Public Methods
+    --------------
+    retrieve(request, name)
+        Download one profile (``.pstats``, ``.speedscope.json`` or ``.txt``).
+
+    Attributes
+    ----------
+    permission_classes : list
+        Admin (staff) users only.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def retrieve(self, request, name=None):
+        """
+        Return the stored profile ``name``.
+
+        Returns
+        -------
+        FileResponse | Response
+            The profile as an attachment, or 404.
+        """
+        try:
+            path = profile_path(name)
+        except ValueError:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not os.path.exists(path):
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            return FileResponse(open(path, "rb"), as_attachment=True, filename=name)
+        except OSError as ex:
+            logger.error("Could not read profile %s: %s", name, ex)
+            return Response(
+                {"detail": "An unexpected error occurred."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
@@ -0,0 +1,364 @@
+"""
+dedupe.py
+~~~~~~~~~
+Patient deduplication (record linkage) and merging.
+
+``find_duplicates`` runs in three stages and stays roughly linear in the
+number of patients:
+
+1. Blocking. One streaming pass per rule in ``BLOCKING_RULES`` groups
+   patients by a cheap normalized key (name + date of birth, phone, email,
+   ...). Only patients sharing a key are ever compared. Blocks larger than
+   ``DEDUPE_MAX_BLOCK_SIZE`` (a shared placeholder phone number, say) are
+   skipped rather than expanded into a quadratic number of pairs.
+2. Scoring. Features are loaded only for patients that appear in a candidate
+   pair. Each patient's name trigram sets are built once and reused for all
+   of its pairs, so scoring a pair is a handful of set intersections.
+3. Writing. Pairs scoring at least ``DEDUPE_MIN_SCORE`` are bulk inserted as
+   ``MergeSuggestion`` rows. Pairs already suggested (or dismissed) are left
+   untouched.
+
+``merge_patients`` folds duplicates into a surviving record, re-pointing
+their heart rates with one set-based UPDATE.
+"""
+
+import logging
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.response_cache import invalidate_heart_rates
+from patients.models import MergeSuggestion, Patient
+from patients.search.ngram import similarity, word_trigrams
+from sync.changelog import record_changes
+from sync.models import Change
+from vitals.models import HeartRate
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 10000
+# Ids per ``id IN (...)`` query, below SQLite's bound-parameter limit.
+ID_CHUNK_SIZE = 900
+WRITE_BATCH_SIZE = 1000
+
+NAME_WEIGHT = 0.55
+DOB_WEIGHT = 0.30
+CONTACT_WEIGHT = 0.15
+
+
+def normalize_name(value):
+    """Lower-case letters and digits of ``value`` with accents removed."""
+    value = unicodedata.normalize("NFKD", value or "")
+    return "".join(char for char in value.lower() if char.isalnum())
+
+
+def normalize_phone(value):
+    """Last ten digits of a phone number, or None if it has fewer than seven."""
+    digits = "".join(char for char in value or "" if char.isdigit())
+    return digits[-10:] if len(digits) >= 7 else None
+
+
+def normalize_email(value):
+    """Lower-cased, trimmed email address, or None if it is not one."""
+    value = (value or "").strip().lower()
+    return value if "@" in value else None
+
+
+def _full_name_key(first_name, last_name):
+    names = sorted(name for name in (normalize_name(first_name), normalize_name(last_name)) if name)
+    return tuple(names) if len(names) == 2 else None
+
+
+def _name_dob_key(first_name, last_name, date_of_birth):
+    last = normalize_name(last_name)
+    return (date_of_birth, last[:4], normalize_name(first_name)[:1]) if last else None
+
+
+def _dob_first_name_key(first_name, date_of_birth):
+    first = normalize_name(first_name)
+    return (date_of_birth, first) if first else None
+
+
+# Rule name -> (Patient fields read, key function). A key of None skips the patient.
+BLOCKING_RULES = {
+    "name_dob": (("first_name", "last_name", "date_of_birth"), _name_dob_key),
+    "dob_first_name": (("first_name", "date_of_birth"), _dob_first_name_key),
+    "name": (("first_name", "last_name"), _full_name_key),
+    "phone": (("contact_number",), normalize_phone),
+    "email": (("email",), normalize_email),
+}
+
+
+@dataclass
+class DedupeResult:
+    """
+    Outcome of a deduplication run.
+
+    Attributes:
+        candidate_pairs (int): Pairs produced by blocking.
+        skipped_blocks (int): Blocks over the size limit that were not expanded.
+        matches (list[tuple]): ``(primary_id, duplicate_id, score, reasons)``
+            for every pair at or above the score threshold.
+        written (int): Suggestions inserted (0 on a dry run). A pair a
+            concurrent run inserts during this run's own insert is counted too.
+    """
+
+    candidate_pairs: int = 0
+    skipped_blocks: int = 0
+    matches: list = field(default_factory=list)
+    written: int = 0
+
+
+@dataclass
+class _Features:
+    first: set
+    last: set
+    date_of_birth: object
+    phone: str
+    email: str
+
+
+def candidate_pairs(queryset=None, rules=None, max_block_size=None):
+    """
+    Group patients by each blocking rule and return the pairs sharing a block.
+
+    Args:
+        queryset (QuerySet | None): Patients to consider. Defaults to all.
+        rules (Iterable[str] | None): Names from ``BLOCKING_RULES``. Defaults to all.
+        max_block_size (int | None): Largest block expanded into pairs.
+            Defaults to ``settings.DEDUPE_MAX_BLOCK_SIZE``.
+
+    Returns:
+        tuple[dict, int]: ``{(low_id, high_id): rule_bitmask}`` and the number
+        of skipped oversized blocks.
+    """
+    queryset = (Patient.objects.all() if queryset is None else queryset).order_by()
+    rules = list(rules or BLOCKING_RULES)
+    max_block_size = max_block_size or settings.DEDUPE_MAX_BLOCK_SIZE
+    pairs = defaultdict(int)
+    skipped = 0
+    for bit, rule in enumerate(rules):
+        fields, key_func = BLOCKING_RULES[rule]
+        # Keys are hashed and singleton blocks hold a bare id to keep a
+        # million-row pass compact; a hash collision only adds a pair that
+        # scoring rejects.
+        blocks = {}
+        for patient_id, *values in queryset.values_list("id", *fields).iterator(chunk_size=CHUNK_SIZE):
+            key = key_func(*values)
+            if key is None:
+                continue
+            key = hash(key)
+            block = blocks.get(key)
+            if block is None:
+                blocks[key] = patient_id
+            elif isinstance(block, list):
+                block.append(patient_id)
+            else:
+                blocks[key] = [block, patient_id]
+        for block in blocks.values():
+            if not isinstance(block, list):
+                continue
+            if len(block) > max_block_size:
+                skipped += 1
+                continue
+            block.sort()
+            for index, low in enumerate(block):
+                for high in block[index + 1:]:
+                    pairs[(low, high)] |= 1 << bit
+        logger.info("Blocking rule %r: %s candidate pair(s) so far.", rule, len(pairs))
+    return pairs, skipped
+
+
+def _load_features(queryset, ids):
+    features = {}
+    ids = sorted(ids)
+    fields = ("id", "first_name", "last_name", "date_of_birth", "contact_number", "email")
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        rows = queryset.filter(id__in=ids[start:start + ID_CHUNK_SIZE]).order_by().values_list(*fields)
+        for patient_id, first_name, last_name, date_of_birth, phone, email in rows:
+            features[patient_id] = _Features(
+                word_trigrams(normalize_name(first_name)),
+                word_trigrams(normalize_name(last_name)),
+                date_of_birth,
+                normalize_phone(phone),
+                normalize_email(email),
+            )
+    return features
+
+
+def score_pair(left, right):
+    """
+    Similarity of two patients' features, between 0 and 1.
+
+    Names are compared as trigram sets (also with first and last name
+    swapped), dates of birth exactly or with day and month transposed or off
+    by days within the same month, and phone / email exactly. Missing
+    contact details count as neutral rather than as a mismatch.
+    """
+    straight = (similarity(left.first, right.first) + similarity(left.last, right.last)) / 2
+    swapped = (similarity(left.first, right.last) + similarity(left.last, right.first)) / 2
+    name = max(straight, swapped)
+
+    a, b = left.date_of_birth, right.date_of_birth
+    if a == b:
+        dob = 1.0
+    elif a and b and a.year == b.year and (a.month == b.month or (a.month, a.day) == (b.day, b.month)):
+        dob = 0.5
+    else:
+        dob = 0.0
+
+    if (left.phone and left.phone == right.phone) or (left.email and left.email == right.email):
+        contact = 1.0
+    elif (left.phone and right.phone) or (left.email and right.email):
+        contact = 0.0
+    else:
+        # Nothing to compare: neither evidence for nor against.
+        contact = 0.5
+    return round(NAME_WEIGHT * name + DOB_WEIGHT * dob + CONTACT_WEIGHT * contact, 4)
+
+
+def _suggested_pairs(primary_ids):
+    """``(primary, duplicate)`` pairs already suggested (or dismissed) for ``primary_ids``."""
+    pairs = set()
+    primary_ids = sorted(primary_ids)
+    for start in range(0, len(primary_ids), ID_CHUNK_SIZE):
+        pairs.update(
+            MergeSuggestion.objects.filter(primary_id__in=primary_ids[start:start + ID_CHUNK_SIZE])
+            .values_list("primary_id", "duplicate_id")
+        )
+    return pairs
+
+
+def _suggestion_count(primary_ids):
+    """Number of suggestions stored for ``primary_ids``."""
+    primary_ids = sorted(primary_ids)
+    return sum(
+        MergeSuggestion.objects.filter(primary_id__in=primary_ids[start:start + ID_CHUNK_SIZE]).count()
+        for start in range(0, len(primary_ids), ID_CHUNK_SIZE)
+    )
+
+
+def find_duplicates(queryset=None, rules=None, min_score=None, max_block_size=None, dry_run=False):
+    """
+    Find probable duplicate patients and write merge suggestions.
+
+    Args:
+        queryset (QuerySet | None): Patients to consider. Defaults to all.
+        rules (Iterable[str] | None): Blocking rules to apply. Defaults to all.
+        min_score (float | None): Lowest score suggested. Defaults to
+            ``settings.DEDUPE_MIN_SCORE``.
+        max_block_size (int | None): See ``candidate_pairs``.
+        dry_run (bool): Score without writing suggestions.
+
+    Returns:
+        DedupeResult: Pair counts, matches and the number written.
+    """
+    queryset = Patient.objects.all() if queryset is None else queryset
+    rules = list(rules or BLOCKING_RULES)
+    min_score = settings.DEDUPE_MIN_SCORE if min_score is None else min_score
+
+    pairs, skipped = candidate_pairs(queryset, rules, max_block_size)
+    result = DedupeResult(candidate_pairs=len(pairs), skipped_blocks=skipped)
+    features = _load_features(queryset, {patient_id for pair in pairs for patient_id in pair})
+
+    for (low, high), mask in pairs.items():
+        if low not in features or high not in features:
+            continue
+        score = score_pair(features[low], features[high])
+        if score >= min_score:
+            reasons = [rule for bit, rule in enumerate(rules) if mask & (1 << bit)]
+            result.matches.append((low, high, score, reasons))
+    result.matches.sort(key=lambda match: (-match[2], match[0], match[1]))
+
+    if not dry_run:
+        primary_ids = {low for low, _, _, _ in result.matches}
+        existing = _suggested_pairs(primary_ids)
+        before = _suggestion_count(primary_ids)
+        MergeSuggestion.objects.bulk_create(
+            [
+                MergeSuggestion(primary_id=low, duplicate_id=high, score=score, reasons=reasons)
+                for low, high, score, reasons in result.matches
+                if (low, high) not in existing
+            ],
+            batch_size=WRITE_BATCH_SIZE,
+            # A concurrent run may still insert the same pair.
+            ignore_conflicts=True,
+        )
+        # bulk_create returns skipped conflicts too; count the rows that appeared.
+        result.written = _suggestion_count(primary_ids) - before
+
+    logger.info(
+        "Dedupe: %s candidate pair(s), %s match(es), %s suggestion(s) written, %s oversized block(s) skipped.",
+        result.candidate_pairs, len(result.matches), result.written, skipped,
+    )
+    return result
+
+
+def merge_patients(primary, duplicates):
+    """
+    Merge duplicate patient records into ``primary``.
+
+    Steps
+    -----
+    1. Re-point every heart rate of the duplicates with one UPDATE.
+    2. Fill ``primary``'s empty email, contact number and place from the
+       duplicates.
+    3. Delete the duplicates (their pending suggestions go with them).
+    4. Record the moved heart rates in the sync change log: upserts for
+       ``primary``'s owner and, for duplicates owned by someone else,
+       deletes for that owner, whose clients no longer see the readings.
+
+    Args:
+        primary (Patient): Surviving record.
+        duplicates (Iterable[Patient]): Records folded into ``primary``.
+
+    Returns:
+        int: Number of heart-rate rows moved.
+    """
+    duplicates = [patient for patient in duplicates if patient.pk != primary.pk]
+    duplicate_ids = [patient.pk for patient in duplicates]
+    if not duplicate_ids:
+        return 0
+
+    with transaction.atomic():
+        moving = HeartRate.objects.filter(patient_id__in=duplicate_ids)
+        moved = list(moving.values_list("id", "patient_id"))
+        moved_ids = [heart_rate_id for heart_rate_id, _ in moved]
+        moving.update(patient_id=primary.pk, updated_at=timezone.now())
+
+        filled = []
+        for attname in ("email", "contact_number", "place_id"):
+            if getattr(primary, attname) in (None, ""):
+                value = next(
+                    (getattr(patient, attname) for patient in duplicates if getattr(patient, attname) not in (None, "")),
+                    None,
+                )
+                if value is not None:
+                    setattr(primary, attname, value)
+                    filled.append(attname)
+
+        Patient.objects.filter(id__in=duplicate_ids).delete()
+        if filled:
+            primary.save(update_fields=[attname.removesuffix("_id") for attname in filled] + ["updated_at"])
+        record_changes(Change.HEART_RATE, [(heart_rate_id, primary.user_id) for heart_rate_id in moved_ids])
+        owners = {patient.pk: patient.user_id for patient in duplicates}
+        record_changes(
+            Change.HEART_RATE,
+            [
+                (heart_rate_id, owners[patient_id])
+                for heart_rate_id, patient_id in moved
+                if owners[patient_id] != primary.user_id
+            ],
+            action=Change.DELETE,
+        )
+        invalidate_heart_rates(
+            [(heart_rate_id, primary.pk, primary.user_id) for heart_rate_id in moved_ids]
+            + [(heart_rate_id, patient_id, owners[patient_id]) for heart_rate_id, patient_id in moved]
+        )
+
+    logger.info("Merged patients %s into %s; moved %s heart rate(s).", duplicate_ids, primary.pk, len(moved_ids))
+    return len(moved_ids)
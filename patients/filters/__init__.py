@@ -0,0 +1 @@
+from .patient_search import PatientSearchFilter
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+patient_search.py
+~~~~~~~~~~~~~~~~~
+Search filter backend for PatientViewSet using the indexed patient search.
+
+Replaces ``SearchFilter``'s ``icontains`` scan with the configured
+``patients.search`` backend. Results are ordered by relevance unless the
+client asks for an explicit ``ordering``.
+"""
+
+from rest_framework import filters
+from rest_framework.filters import search_smart_split
+from rest_framework.settings import api_settings
+from patients.search import search_patients
+
+
+class PatientSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` filter for Patient querysets.
+
+    Every whitespace-separated term must match the first name, last name or
+    email; when nothing matches exactly, similar (misspelled) names are
+    returned instead. Matches are ranked by ``search_rank``.
+    """
+
+    ordering_param = api_settings.ORDERING_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        terms = list(search_smart_split(self.get_search_terms(request)))
+        if not terms:
+            return queryset
+        queryset = search_patients(terms, queryset)
+        if not request.query_params.get(self.ordering_param):
+            queryset = queryset.order_by("-search_rank", "id")
+        return queryset
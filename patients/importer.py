@@ -0,0 +1,223 @@
+"""
+importer.py
+~~~~~~~~~~~
+Bulk patient import from CSV or JSON.
+
+Rows are validated in memory with ``PatientImportSerializer``; then, per
+batch of ``PATIENT_IMPORT_BATCH_SIZE`` rows, one query finds patients that
+already exist for the owner and one ``bulk_create`` inserts the rest;
+``place`` ids are checked against the in-memory location snapshot. Every
+rejected row is reported with its 1-based row number and errors; valid rows
+are still imported.
+
+``bulk_create`` bypasses model signals, so the sync change log and the
+in-process search indexes are updated here explicitly.
+"""
+
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from core.response_cache import invalidate_patients
+from patients.models import Patient
+from patients.search import patient_autocomplete_index, patient_ngram_index
+from patients.serializers import PatientImportSerializer
+from sync.changelog import record_changes
+from sync.models import Change
+from users.location_snapshot import location_snapshot
+
+logger = logging.getLogger(__name__)
+
+OPTIONAL_FIELDS = ("place", "email", "contact_number")
+
+
+class ImportFormatError(ValueError):
+    """Raised when an import payload cannot be parsed into rows."""
+
+
+@dataclass
+class ImportResult:
+    """
+    Outcome of an import.
+
+    Attributes:
+        total (int): Rows read.
+        created (list[int]): Ids of inserted patients (empty on a dry run).
+        errors (list[dict]): ``{"row": n, "errors": {...}}`` per rejected row.
+        dry_run (bool): True when nothing was written.
+    """
+
+    total: int = 0
+    created: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+    dry_run: bool = False
+
+    def report(self):
+        """Serializable summary for API responses and the management command."""
+        return {
+            "total": self.total,
+            "created": len(self.created),
+            "failed": len(self.errors),
+            "dry_run": self.dry_run,
+            "errors": self.errors,
+        }
+
+
+def parse_rows(content, fmt):
+    """
+    Parse an import payload into a list of row dicts.
+
+    Args:
+        content (str | bytes | list): CSV text with a header row, JSON text
+            holding a list (or ``{"patients": [...]}``), or an already
+            decoded list of dicts.
+        fmt (str): ``"csv"`` or ``"json"``.
+
+    Returns:
+        list[dict]: Rows in file order.
+
+    Raises:
+        ImportFormatError: If the payload is not valid CSV / JSON rows.
+    """
+    if isinstance(content, bytes):
+        try:
+            content = content.decode("utf-8-sig")
+        except UnicodeDecodeError as exc:
+            raise ImportFormatError(f"File is not UTF-8: {exc}")
+    if fmt == "csv":
+        if not isinstance(content, str):
+            raise ImportFormatError("CSV import expects text.")
+        reader = csv.DictReader(io.StringIO(content))
+        if not reader.fieldnames:
+            raise ImportFormatError("CSV file has no header row.")
+        return [dict(row) for row in reader]
+    if fmt == "json":
+        if isinstance(content, str):
+            try:
+                content = json.loads(content)
+            except json.JSONDecodeError as exc:
+                raise ImportFormatError(f"Invalid JSON: {exc}")
+        if isinstance(content, dict):
+            content = content.get("patients")
+        if not isinstance(content, list) or not all(isinstance(row, dict) for row in content):
+            raise ImportFormatError('JSON import expects a list of objects or {"patients": [...]}.')
+        return content
+    raise ImportFormatError(f"Unsupported format {fmt!r}; use csv or json.")
+
+
+def _clean(row):
+    """Treat blank optional CSV cells as missing."""
+    return {
+        key.strip(): (None if key in OPTIONAL_FIELDS and value in ("", None) else value)
+        for key, value in row.items()
+        if key
+    }
+
+
+def _existing_keys(user, keys):
+    """Natural keys from ``keys`` that ``user`` already has, in one query."""
+    condition = Q()
+    for first_name, last_name, date_of_birth in keys:
+        condition |= Q(first_name=first_name, last_name=last_name, date_of_birth=date_of_birth)
+    return set(
+        Patient.objects.filter(condition, user=user)
+        .values_list("first_name", "last_name", "date_of_birth")
+    )
+
+
+def _import_batch(user, batch, result, dry_run):
+    keys = [(row["first_name"], row["last_name"], row["date_of_birth"]) for _, row in batch]
+    existing = _existing_keys(user, keys)
+    places = location_snapshot.current().by_id
+
+    patients = []
+    for (number, row), key in zip(batch, keys):
+        if key in existing:
+            result.errors.append({"row": number, "errors": {
+                "non_field_errors": ["A patient with this name and date of birth already exists."],
+            }})
+            continue
+        if row.get("place") is not None and row["place"] not in places:
+            result.errors.append({"row": number, "errors": {
+                "place": [f"Location {row['place']} does not exist."],
+            }})
+            continue
+        place_id = row.pop("place", None)
+        patients.append((number, Patient(user=user, place_id=place_id, **row)))
+
+    if dry_run or not patients:
+        return
+    try:
+        with transaction.atomic():
+            created = Patient.objects.bulk_create([patient for _, patient in patients])
+    except IntegrityError as exc:
+        # A concurrent writer inserted one of these rows after the check.
+        logger.warning("Patient import batch rejected: %s", exc)
+        result.errors.extend(
+            {"row": number, "errors": {"non_field_errors": ["Batch rejected by the database; retry."]}}
+            for number, _ in patients
+        )
+        return
+    result.created.extend(patient.pk for patient in created)
+    _after_insert(user, created)
+
+
+def _after_insert(user, patients):
+    """Do what the post_save receivers would have done for bulk-created rows."""
+    rows = [(patient.pk, user.pk) for patient in patients]
+    record_changes(Change.PATIENT, rows)
+    invalidate_patients(rows)
+    for patient in patients:
+        patient_ngram_index.update(patient)
+        patient_autocomplete_index.update(patient)
+
+
+def import_patients(rows, user, batch_size=None, dry_run=False):
+    """
+    Validate and insert patients for ``user``.
+
+    Args:
+        rows (list[dict]): Parsed rows (see ``parse_rows``).
+        user (User): Owner of the imported patients.
+        batch_size (int | None): Rows per existence query and INSERT.
+            Defaults to ``settings.PATIENT_IMPORT_BATCH_SIZE``.
+        dry_run (bool): Validate and check duplicates without inserting.
+
+    Returns:
+        ImportResult: Created ids and per-row errors.
+    """
+    batch_size = batch_size or settings.PATIENT_IMPORT_BATCH_SIZE
+    result = ImportResult(total=len(rows), dry_run=dry_run)
+
+    valid = []
+    seen = {}
+    for number, raw in enumerate(rows, start=1):
+        serializer = PatientImportSerializer(data=_clean(raw))
+        if not serializer.is_valid():
+            result.errors.append({"row": number, "errors": serializer.errors})
+            continue
+        row = dict(serializer.validated_data)
+        key = (row["first_name"], row["last_name"], row["date_of_birth"])
+        if key in seen:
+            result.errors.append({"row": number, "errors": {
+                "non_field_errors": [f"Duplicate of row {seen[key]} in this import."],
+            }})
+            continue
+        seen[key] = number
+        valid.append((number, row))
+
+    for start in range(0, len(valid), batch_size):
+        _import_batch(user, valid[start:start + batch_size], result, dry_run)
+
+    result.errors.sort(key=lambda error: error["row"])
+    logger.info(
+        "Patient import for user %s: %s created, %s rejected of %s (dry_run=%s).",
+        user.pk, len(result.created), len(result.errors), result.total, dry_run,
+    )
+    return result
@@ -0,0 +1,63 @@
+"""
+dedupe_patients.py
+~~~~~~~~~~~~~~~~~~
+Management command that finds probable duplicate patients and writes merge
+suggestions, optionally merging high-confidence pairs straight away.
+
+Usage
+-----
+    python manage.py dedupe_patients
+    python manage.py dedupe_patients --min-score 0.9 --dry-run
+    python manage.py dedupe_patients --merge-above 0.97
+
+Suggestions are reviewed at ``/api/v1/patients/merge-suggestions``.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from patients.dedupe import BLOCKING_RULES, find_duplicates, merge_patients
+from patients.models import MergeSuggestion, Patient
+
+
+class Command(BaseCommand):
+    help = "Find probable duplicate patients and write merge suggestions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rules", nargs="+", choices=list(BLOCKING_RULES), default=None)
+        parser.add_argument("--min-score", type=float, default=None)
+        parser.add_argument("--max-block-size", type=int, default=None)
+        parser.add_argument("--dry-run", action="store_true", help="Score pairs without writing suggestions.")
+        parser.add_argument(
+            "--merge-above", type=float, default=None,
+            help="Merge pending suggestions scoring at least this much.",
+        )
+
+    def handle(self, *args, **options):
+        if options["merge_above"] is not None and options["dry_run"]:
+            raise CommandError("--merge-above cannot be combined with --dry-run.")
+
+        result = find_duplicates(
+            rules=options["rules"],
+            min_score=options["min_score"],
+            max_block_size=options["max_block_size"],
+            dry_run=options["dry_run"],
+        )
+        self.stdout.write(
+            f"{result.candidate_pairs} candidate pair(s), {len(result.matches)} match(es), "
+            f"{result.written} new suggestion(s), {result.skipped_blocks} oversized block(s) skipped."
+        )
+
+        if options["merge_above"] is None:
+            return
+        merged = moved = 0
+        pending = MergeSuggestion.objects.filter(
+            status=MergeSuggestion.PENDING, score__gte=options["merge_above"],
+        ).order_by("-score", "id").values_list("id", "primary_id", "duplicate_id")
+        for _, primary_id, duplicate_id in list(pending):
+            # Earlier merges in this loop may already have removed either side.
+            patients = Patient.objects.in_bulk([primary_id, duplicate_id])
+            if len(patients) < 2:
+                continue
+            moved += merge_patients(patients[primary_id], [patients[duplicate_id]])
+            merged += 1
+        self.stdout.write(f"Merged {merged} pair(s), moving {moved} heart rate(s).")
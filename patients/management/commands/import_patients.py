@@ -0,0 +1,63 @@
+"""
+import_patients.py
+~~~~~~~~~~~~~~~~~~
+Management command for bulk-importing patients from CSV or JSON.
+
+Usage
+-----
+    python manage.py import_patients patients.csv --user dr_smith
+    python manage.py import_patients patients.json --user dr_smith --dry-run
+
+CSV files need a header row with ``first_name``, ``last_name``,
+``date_of_birth`` and ``gender`` columns, and optionally ``place`` (location
+id), ``email`` and ``contact_number``. The format is taken from the file
+extension unless ``--format`` is given.
+"""
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from patients.importer import ImportFormatError, import_patients, parse_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk-import patients from a CSV or JSON file with batched validation and inserts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON file to import.")
+        parser.add_argument("--user", required=True, help="Username that will own the patients.")
+        parser.add_argument("--format", choices=["csv", "json"], default=None)
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--dry-run", action="store_true", help="Validate without inserting.")
+        parser.add_argument("--report", default=None, help="Write the full JSON error report to this path.")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']!r} does not exist.")
+
+        path = options["path"]
+        fmt = options["format"] or ("json" if path.lower().endswith(".json") else "csv")
+        try:
+            with open(path, "rb") as handle:
+                rows = parse_rows(handle.read(), fmt)
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+        except ImportFormatError as exc:
+            raise CommandError(str(exc))
+
+        result = import_patients(rows, user, batch_size=options["batch_size"], dry_run=options["dry_run"])
+        report = result.report()
+        verb = "Validated" if result.dry_run else "Imported"
+        self.stdout.write(f"{verb} {result.total} row(s): {report['created']} created, {report['failed']} rejected.")
+        for error in result.errors[:20]:
+            self.stdout.write(f"  row {error['row']}: {json.dumps(error['errors'], default=str)}")
+        if len(result.errors) > 20:
+            self.stdout.write(f"  ... {len(result.errors) - 20} more")
+        if options["report"]:
+            with open(options["report"], "w") as handle:
+                json.dump(report, handle, indent=2, default=str)
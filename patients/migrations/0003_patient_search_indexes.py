@@ -0,0 +1,89 @@
+"""
+Search indexes for Patient first name, last name and email.
+
+PostgreSQL: ``pg_trgm`` GIN indexes on ``UPPER(field::text)``, the
+expression Django uses for ``icontains``.
+SQLite: an FTS5 trigram table with triggers keeping it in step with
+``patients_patient``. Skipped when the SQLite build lacks the trigram
+tokenizer; the in-process n-gram backend is used instead.
+"""
+
+import logging
+
+from django.db import migrations
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("first_name", "last_name", "email")
+FTS_TABLE = "patients_patient_fts"
+
+
+def _sqlite_has_trigram(cursor):
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE temp.fts_probe USING fts5(x, tokenize='trigram')")
+        cursor.execute("DROP TABLE temp.fts_probe")
+        return True
+    except Exception:
+        return False
+
+
+def create_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for field in FIELDS:
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS patients_patient_{field}_trgm "
+                    f"ON patients_patient USING gin ((UPPER({field}::text)) gin_trgm_ops)"
+                )
+        elif connection.vendor == "sqlite":
+            if not _sqlite_has_trigram(cursor):
+                logger.warning("SQLite FTS5 trigram tokenizer unavailable; skipping patient FTS index.")
+                return
+            columns = ", ".join(FIELDS)
+            new_values = ", ".join(f"new.{field}" for field in FIELDS)
+            old_values = ", ".join(f"old.{field}" for field in FIELDS)
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({columns}, "
+                f"content='patients_patient', content_rowid='id', tokenize='trigram')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON patients_patient BEGIN "
+                f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON patients_patient BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) "
+                f"VALUES ('delete', old.id, {old_values}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON patients_patient BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) "
+                f"VALUES ('delete', old.id, {old_values}); "
+                f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+            )
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            for field in FIELDS:
+                cursor.execute(f"DROP INDEX IF EXISTS patients_patient_{field}_trgm")
+        elif connection.vendor == "sqlite":
+            for suffix in ("ai", "ad", "au"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0003_patient_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MergeSuggestion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "score",
+                    models.FloatField(help_text="Similarity score between 0 and 1."),
+                ),
+                (
+                    "reasons",
+                    models.JSONField(
+                        default=list,
+                        help_text="Blocking rules that paired the two records.",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("pending", "Pending"), ("dismissed", "Dismissed")],
+                        default="pending",
+                        help_text="Review status of the suggestion.",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="Timestamp when the suggestion was written.",
+                    ),
+                ),
+                (
+                    "duplicate",
+                    models.ForeignKey(
+                        help_text="Patient record merged into the primary.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="patients.patient",
+                    ),
+                ),
+                (
+                    "primary",
+                    models.ForeignKey(
+                        help_text="Patient record that survives a merge.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="patients.patient",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Merge Suggestion",
+                "verbose_name_plural": "Merge Suggestions",
+                "ordering": ["-score", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "-score"], name="patients_merge_status_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("primary", "duplicate"),
+                        name="patients_merge_suggestion_pair_uniq",
+                    )
+                ],
+            },
+        ),
+    ]
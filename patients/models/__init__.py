@@ -1 +1,2 @@
-from .patient import Patient
\ No newline at end of file
+from .patient import Patient
+from .merge_suggestion import MergeSuggestion
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""
+merge_suggestion.py
+
+This module contains the MergeSuggestion model, a candidate pair of
+patient records that the deduplication job believes describe the same
+person, awaiting review.
+
+Created On: 19 Oct 2026
+"""
+
+from django.db import models
+from patients.models.patient import Patient
+
+
+class MergeSuggestion(models.Model):
+    """
+    A scored pair of probable duplicate patients.
+
+    Attributes:
+        primary (ForeignKey): Record that survives a merge (the older one).
+        duplicate (ForeignKey): Record merged into ``primary`` and then deleted.
+        score (FloatField): Similarity score between 0 and 1.
+        reasons (JSONField): Blocking rules that paired the records
+            (for example ``["phone", "name_dob"]``).
+        status (CharField): ``pending`` or ``dismissed``. Merged suggestions
+            are removed together with the duplicate record.
+        created_at (DateTimeField): Timestamp when the suggestion was written.
+    """
+
+    PENDING = "pending"
+    DISMISSED = "dismissed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (DISMISSED, "Dismissed")]
+
+    primary = models.ForeignKey(
+        Patient,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text="Patient record that survives a merge."
+    )
+    duplicate = models.ForeignKey(
+        Patient,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text="Patient record merged into the primary."
+    )
+    score = models.FloatField(
+        help_text="Similarity score between 0 and 1."
+    )
+    reasons = models.JSONField(
+        default=list,
+        help_text="Blocking rules that paired the two records."
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        help_text="Review status of the suggestion."
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="Timestamp when the suggestion was written."
+    )
+
+    class Meta:
+        """
+        Meta options for the MergeSuggestion model.
+
+        Attributes:
+            constraints: One suggestion per (primary, duplicate) pair, so
+                         re-running the job never duplicates suggestions and
+                         dismissed pairs stay dismissed.
+            indexes: Review queue ordered by score within a status.
+        """
+        ordering = ['-score', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['primary', 'duplicate'], name='patients_merge_suggestion_pair_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['status', '-score'], name='patients_merge_status_idx'),
+        ]
+        verbose_name = "Merge Suggestion"
+        verbose_name_plural = "Merge Suggestions"
+
+    def __str__(self):
+        """
+        Returns the string representation of the MergeSuggestion.
+
+        Returns:
+            str: The pair of patient ids and the score.
+        """
+        return f"{self.duplicate_id} -> {self.primary_id} ({self.score:.2f})"
@@ -88,8 +88,13 @@ class Patient(models.Model):
             unique_together (tuple): Ensures a patient with the same first name, 
                                      last name, and date of birth cannot be duplicated
                                      for the same user.
+            indexes (list): Owner-leading (user, -created_at) index serving the
+                            per-user patient list, its count and created_at ordering.
         """
         unique_together = ('user', 'first_name', 'last_name', 'date_of_birth')
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='patients_user_created_idx'),
+        ]
         verbose_name = "Patient"
         verbose_name_plural = "Patients"
 
@@ -0,0 +1,132 @@
+"""
+patients.search
+~~~~~~~~~~~~~~~
+Indexed, ranked and typo-tolerant patient search.
+
+Backends
+--------
+trigram
+    PostgreSQL ``pg_trgm`` GIN indexes (``patients/search/trigram.py``).
+fts5
+    SQLite FTS5 trigram table (``patients/search/fts.py``).
+ngram
+    Pure-Python in-process n-gram index (``patients/search/ngram.py``).
+
+``settings.PATIENT_SEARCH_BACKEND`` selects one by name, or ``"auto"`` picks
+the first available in the order above.
+
+``autocomplete`` holds the separate per-owner name prefix index used by the
+autocomplete endpoint.
+"""
+
+from django.conf import settings
+from django.db import connections, DEFAULT_DB_ALIAS
+
+from patients.models import Patient
+from .autocomplete import PatientAutocompleteIndex, patient_autocomplete_index
+from .base import PatientSearchBackend, rank_by_scores
+from .fts import FTS5SearchBackend
+from .ngram import NGramSearchBackend, patient_ngram_index
+from .trigram import TrigramSearchBackend
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (TrigramSearchBackend, FTS5SearchBackend, NGramSearchBackend)
+}
+
+_selected = {}
+
+
+def get_backend(using=DEFAULT_DB_ALIAS):
+    """
+    Return the patient search backend for a database alias.
+
+    Returns:
+        PatientSearchBackend: Configured backend, or the first available one
+        when ``PATIENT_SEARCH_BACKEND`` is ``"auto"``.
+    """
+    name = settings.PATIENT_SEARCH_BACKEND
+    if name != "auto":
+        return BACKENDS[name]()
+    if using not in _selected:
+        connection = connections[using]
+        _selected[using] = next(
+            backend for backend in BACKENDS.values() if backend.is_available(connection)
+        )
+    return _selected[using]()
+
+
+def search_patients(terms, queryset=None):
+    """
+    Filter patients by search terms and annotate ``search_rank``.
+
+    Args:
+        terms (list[str]): Search terms; every term must match.
+        queryset (QuerySet | None): Patients to search. Defaults to all patients.
+
+    Returns:
+        QuerySet: Matching patients annotated with ``search_rank``.
+    """
+    queryset = Patient.objects.all() if queryset is None else queryset
+    return get_backend(queryset.db).search(terms, queryset)
+
+
+def search_patient_ids(terms, queryset=None, limit=None):
+    """
+    Return ids of patients matching every search term.
+
+    For endpoints that filter other records by the full patient search
+    (names, email, fuzzy fallback), so they can filter by
+    ``patient_id IN (...)`` instead of joining Patient. Strict name-only
+    filters can pass their own queryset to ``limited_ids`` instead, as the
+    heart-rate ``?search=`` does.
+
+    Args:
+        terms (Iterable[str]): Search terms.
+        queryset (QuerySet | None): Patients to search. Defaults to all patients.
+        limit (int | None): Largest id list to materialize. Defaults to
+            ``settings.PATIENT_SEARCH_ID_LIMIT``.
+
+    Returns:
+        list[int] | QuerySet: The matching ids, or a ``values("id")`` subquery
+        when more than ``limit`` patients match.
+    """
+    return limited_ids(search_patients(list(terms), queryset), limit)
+
+
+def limited_ids(matches, limit=None):
+    """
+    Ids of ``matches`` as a list, or as a subquery when there are too many.
+
+    Args:
+        matches (QuerySet): Patients to return the ids of.
+        limit (int | None): Largest id list to materialize. Defaults to
+            ``settings.PATIENT_SEARCH_ID_LIMIT``.
+
+    Returns:
+        list[int] | QuerySet: The ids, or a ``values("id")`` subquery when
+        more than ``limit`` patients match.
+    """
+    limit = settings.PATIENT_SEARCH_ID_LIMIT if limit is None else limit
+    matches = matches.order_by()
+    ids = list(matches.values_list("id", flat=True)[:limit + 1])
+    if len(ids) > limit:
+        return matches.values("id")
+    return ids
+
+
+__all__ = [
+    "BACKENDS",
+    "FTS5SearchBackend",
+    "NGramSearchBackend",
+    "PatientAutocompleteIndex",
+    "PatientSearchBackend",
+    "TrigramSearchBackend",
+    "get_backend",
+    "limited_ids",
+    "patient_autocomplete_index",
+    "patient_ngram_index",
+    "rank_by_scores",
+    "search_patient_ids",
+    "search_patients",
+]
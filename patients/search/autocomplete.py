@@ -0,0 +1,192 @@
+"""
+autocomplete.py
+~~~~~~~~~~~~~~~
+In-process, per-owner prefix index for patient name autocomplete.
+
+Each owning user gets a sorted array of normalized name keys
+(``"first last"`` and ``"last first"``) built lazily from one query the
+first time that user autocompletes. Lookups are a ``bisect`` into the array
+followed by a short forward scan, so keystrokes never touch the database.
+
+The index is kept current from ``Patient`` save / delete signals in this
+process and a user's array is rebuilt after ``PATIENT_AUTOCOMPLETE_TTL``
+seconds to pick up writes from other processes. Memory is bounded: at most
+``PATIENT_AUTOCOMPLETE_MAX_USERS`` arrays and
+``PATIENT_AUTOCOMPLETE_MAX_ENTRIES`` patients are held, least recently used
+owners being evicted first.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from patients.models import Patient
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text):
+    """Lower-case ``text`` and collapse whitespace."""
+    return " ".join((text or "").lower().split())
+
+
+def name_keys(first_name, last_name):
+    """Sorted-array keys under which a patient is found."""
+    first, last = normalize(first_name), normalize(last_name)
+    return {key for key in (f"{first} {last}".strip(), f"{last} {first}".strip()) if key}
+
+
+class _OwnerIndex:
+    """Sorted ``(key, patient_id)`` array plus display names for one owner."""
+
+    __slots__ = ("keys", "names", "built_at")
+
+    def __init__(self):
+        self.keys = []
+        self.names = {}
+        self.built_at = time.monotonic()
+
+    def add(self, patient_id, first_name, last_name):
+        self.names[patient_id] = (first_name, last_name)
+        for key in name_keys(first_name, last_name):
+            bisect.insort(self.keys, (key, patient_id))
+
+    def remove(self, patient_id):
+        first_name, last_name = self.names.pop(patient_id, (None, None))
+        for key in name_keys(first_name, last_name):
+            position = bisect.bisect_left(self.keys, (key, patient_id))
+            if position < len(self.keys) and self.keys[position] == (key, patient_id):
+                del self.keys[position]
+
+
+class PatientAutocompleteIndex:
+    """
+    Thread-safe, memory-bounded map of owner id to ``_OwnerIndex``.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._owners = OrderedDict()
+        self._owner_of = {}
+        self._size = 0
+
+    def _build(self, user_id):
+        index = _OwnerIndex()
+        rows = (
+            Patient.objects.filter(user_id=user_id)
+            .order_by()
+            .values_list("id", "first_name", "last_name")
+        )
+        entries = []
+        for patient_id, first_name, last_name in rows.iterator(chunk_size=10000):
+            index.names[patient_id] = (first_name, last_name)
+            entries.extend((key, patient_id) for key in name_keys(first_name, last_name))
+        entries.sort()
+        index.keys = entries
+        return index
+
+    def _drop(self, user_id):
+        index = self._owners.pop(user_id, None)
+        if index is None:
+            return
+        self._size -= len(index.names)
+        for patient_id in index.names:
+            self._owner_of.pop(patient_id, None)
+
+    def _evict(self, keep):
+        while self._owners and (
+            len(self._owners) > settings.PATIENT_AUTOCOMPLETE_MAX_USERS
+            or self._size > settings.PATIENT_AUTOCOMPLETE_MAX_ENTRIES
+        ):
+            user_id = next(iter(self._owners))
+            if user_id == keep:
+                break
+            self._drop(user_id)
+
+    def _get(self, user_id):
+        ttl = settings.PATIENT_AUTOCOMPLETE_TTL
+        with self._lock:
+            index = self._owners.get(user_id)
+            if index is not None and (ttl is None or time.monotonic() - index.built_at < ttl):
+                self._owners.move_to_end(user_id)
+                return index
+        index = self._build(user_id)
+        with self._lock:
+            self._drop(user_id)
+            self._owners[user_id] = index
+            self._size += len(index.names)
+            for patient_id in index.names:
+                self._owner_of[patient_id] = user_id
+            self._evict(keep=user_id)
+        logger.debug("Built autocomplete index for user %s with %s patients.", user_id, len(index.names))
+        return index
+
+    def complete(self, user_id, prefix, limit=10):
+        """
+        Return up to ``limit`` of ``user_id``'s patients whose name starts with ``prefix``.
+
+        Args:
+            user_id (int): Owning user.
+            prefix (str): Typed text; matches the start of "first last" or
+                "last first", case-insensitively.
+            limit (int): Maximum suggestions.
+
+        Returns:
+            list[dict]: ``{"id", "first_name", "last_name"}`` in name order.
+        """
+        needle = normalize(prefix)
+        if not needle or limit < 1:
+            return []
+        index = self._get(user_id)
+        with self._lock:
+            keys, names = index.keys, index.names
+            position = bisect.bisect_left(keys, (needle,))
+            seen = []
+            while position < len(keys) and len(seen) < limit:
+                key, patient_id = keys[position]
+                if not key.startswith(needle):
+                    break
+                if patient_id not in seen:
+                    seen.append(patient_id)
+                position += 1
+            return [
+                {"id": pid, "first_name": names[pid][0], "last_name": names[pid][1]}
+                for pid in seen
+            ]
+
+    def update(self, patient):
+        """Re-index a saved patient in any loaded owner array."""
+        with self._lock:
+            previous = self._owner_of.pop(patient.pk, None)
+            if previous is not None and previous in self._owners:
+                self._owners[previous].remove(patient.pk)
+                self._size -= 1
+            index = self._owners.get(patient.user_id)
+            if index is not None:
+                index.add(patient.pk, patient.first_name, patient.last_name)
+                self._owner_of[patient.pk] = patient.user_id
+                self._size += 1
+                self._evict(keep=patient.user_id)
+
+    def remove(self, patient_id):
+        """Drop a deleted patient from its loaded owner array."""
+        with self._lock:
+            owner = self._owner_of.pop(patient_id, None)
+            if owner is not None and owner in self._owners:
+                self._owners[owner].remove(patient_id)
+                self._size -= 1
+
+    def clear(self):
+        """Discard every owner array; they are rebuilt on next use."""
+        with self._lock:
+            self._owners.clear()
+            self._owner_of.clear()
+            self._size = 0
+
+
+# Process-wide index shared by every request in this worker.
+patient_autocomplete_index = PatientAutocompleteIndex()
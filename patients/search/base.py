@@ -0,0 +1,126 @@
+"""
+base.py
+~~~~~~~
+Common interface for patient search backends.
+
+A backend filters a Patient queryset down to records matching every search
+term and annotates each with ``search_rank`` (higher is better). Matching is
+strict first (each term is a substring of the first name, last name or
+email); only when nothing matches strictly does the backend retry with its
+typo-tolerant similarity match. Every match is returned so pagination and
+counts stay exact; backends that rank outside the database score only the
+best ``PATIENT_SEARCH_RANKED_RESULTS`` and rank the rest ``0.0``.
+"""
+
+from django.conf import settings
+from django.db.models import Case, FloatField, Q, Value, When
+
+
+class PatientSearchBackend:
+    """
+    Base class for patient search backends.
+
+    Attributes:
+        name (str): Identifier used by ``settings.PATIENT_SEARCH_BACKEND``.
+        fields (tuple): Patient fields that are searched.
+    """
+
+    name = None
+    fields = ("first_name", "last_name", "email")
+
+    @classmethod
+    def is_available(cls, connection):
+        """Return True if the backend can serve queries on ``connection``."""
+        return True
+
+    def search(self, terms, queryset):
+        """
+        Filter and rank ``queryset`` by ``terms``.
+
+        Args:
+            terms (list[str]): Search terms; every term must match.
+            queryset (QuerySet): Patients to search (may already be scoped).
+
+        Returns:
+            QuerySet: Matching patients annotated with ``search_rank``.
+        """
+        results = self.strict(terms, queryset)
+        if settings.PATIENT_SEARCH_FUZZY and not results.exists():
+            results = self.fuzzy(terms, queryset)
+        return results
+
+    def strict(self, terms, queryset):
+        """Substring match of every term; ranked."""
+        raise NotImplementedError
+
+    def fuzzy(self, terms, queryset):
+        """Similarity (typo-tolerant) match of every term; ranked."""
+        raise NotImplementedError
+
+
+def rank_by_scores(queryset, scores, matches=None):
+    """
+    Restrict ``queryset`` to the matches and annotate their scores.
+
+    Args:
+        queryset (QuerySet): Patients to filter.
+        scores (dict[int, float]): Patient id to rank for the best matches;
+            other matches rank ``0.0``.
+        matches (Q | None): Condition selecting every match. Defaults to
+            the ids in ``scores``.
+
+    Returns:
+        QuerySet: Matching patients annotated with ``search_rank``.
+    """
+    if matches is None:
+        if not scores:
+            return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+        matches = Q(id__in=list(scores))
+    if not scores:
+        return queryset.filter(matches).annotate(search_rank=Value(0.0, output_field=FloatField()))
+    return queryset.filter(matches).annotate(
+        search_rank=Case(
+            *[When(id=patient_id, then=Value(score)) for patient_id, score in scores.items()],
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    )
+
+
+SCOPE_CHUNK_SIZE = 2000
+
+
+def top_scores(scores, queryset=None, limit=None):
+    """
+    Keep the ``limit`` highest scores (``settings.PATIENT_SEARCH_RANKED_RESULTS``).
+
+    With a filtered ``queryset`` only ids it contains count towards the
+    limit, so matches outside the scope (other owners' patients) cannot
+    crowd the ones inside it out of the ranking. Ids are checked best first, in chunks of
+    ``SCOPE_CHUNK_SIZE``, until ``limit`` are found.
+
+    Args:
+        scores (dict[int, float]): Patient id to rank, unlimited.
+        queryset (QuerySet | None): Patients the results must belong to.
+        limit (int | None): Largest number of scores kept.
+
+    Returns:
+        dict[int, float]: The best in-scope scores.
+    """
+    limit = settings.PATIENT_SEARCH_RANKED_RESULTS if limit is None else limit
+    scoped = queryset is not None and queryset.query.has_filters()
+    if len(scores) <= limit and not scoped:
+        return scores
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    if not scoped:
+        return dict(ranked[:limit])
+    kept = {}
+    for start in range(0, len(ranked), SCOPE_CHUNK_SIZE):
+        chunk = ranked[start:start + SCOPE_CHUNK_SIZE]
+        in_scope = set(queryset.filter(id__in=[pid for pid, _ in chunk]).values_list("id", flat=True))
+        for patient_id, score in chunk:
+            if patient_id in in_scope:
+                kept[patient_id] = score
+                if len(kept) >= limit:
+                    return kept
+    return kept
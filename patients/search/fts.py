@@ -0,0 +1,88 @@
+"""
+fts.py
+~~~~~~
+SQLite patient search on an FTS5 trigram index.
+
+The migration ``0003_patient_search_indexes`` creates the external-content
+table ``patients_patient_fts`` (tokenizer ``trigram``) over first name, last
+name and email, kept current by triggers on ``patients_patient``. Quoted
+terms of three or more characters match as substrings; ``bm25()`` ranks.
+Shorter terms cannot use the trigram index and fall back to ``icontains``.
+Every match is returned; only the best ``PATIENT_SEARCH_RANKED_RESULTS``
+get their ``bm25()`` rank. A filtered queryset (owner scope, short-term
+filters) is applied inside that ranking query, so other owners' matches
+cannot push its own out of the ranking.
+"""
+
+import operator
+from functools import reduce
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .base import PatientSearchBackend, rank_by_scores
+
+FTS_TABLE = "patients_patient_fts"
+MIN_TERM_LENGTH = 3
+
+
+def _quote(text):
+    """Quote text as an FTS5 string so punctuation is matched literally."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _trigrams(term):
+    term = term.lower()
+    return sorted({term[i:i + 3] for i in range(len(term) - 2)})
+
+
+class FTS5SearchBackend(PatientSearchBackend):
+    """
+    FTS5 trigram search backend for SQLite.
+    """
+
+    name = "fts5"
+
+    @classmethod
+    def is_available(cls, connection):
+        if connection.vendor != "sqlite":
+            return False
+        return FTS_TABLE in connection.introspection.table_names()
+
+    def _match(self, queryset, expression):
+        """Return ``{id: rank}`` for the best FTS matches of ``expression`` within ``queryset``."""
+        scope, params = "", []
+        if queryset.query.has_filters():
+            sql, params = queryset.order_by().values("id").query.sql_with_params()
+            scope = f"AND rowid IN ({sql}) "
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, -bm25({FTS_TABLE}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s {scope}ORDER BY bm25({FTS_TABLE}) LIMIT %s",
+                [expression, *params, settings.PATIENT_SEARCH_RANKED_RESULTS],
+            )
+            return {row[0]: float(row[1]) for row in cursor.fetchall()}
+
+    def _search(self, terms, queryset, build):
+        long_terms = [term for term in terms if len(term) >= MIN_TERM_LENGTH]
+        short_terms = [term for term in terms if len(term) < MIN_TERM_LENGTH]
+        for term in short_terms:
+            queryset = queryset.filter(
+                reduce(operator.or_, (Q(**{f"{field}__icontains": term}) for field in self.fields))
+            )
+        if not long_terms:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        expression = " AND ".join(build(term) for term in long_terms)
+        matches = Q(id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [expression]))
+        return rank_by_scores(queryset, self._match(queryset, expression), matches)
+
+    def strict(self, terms, queryset):
+        return self._search(terms, queryset, _quote)
+
+    def fuzzy(self, terms, queryset):
+        return self._search(
+            terms, queryset,
+            lambda term: "(" + " OR ".join(_quote(gram) for gram in _trigrams(term)) + ")",
+        )
@@ -0,0 +1,206 @@
+"""
+ngram.py
+~~~~~~~~
+Pure-Python, in-process n-gram index for patient search.
+
+Used when neither PostgreSQL ``pg_trgm`` nor SQLite FTS5 is available. The
+index maps padded word trigrams (``pg_trgm`` style: ``"  j", " jo", "joh"``)
+to patient ids. It is built lazily on first use, updated from ``Patient``
+save / delete signals in this process, and rebuilt after
+``PATIENT_SEARCH_INDEX_TTL`` seconds to pick up writes made by other
+processes.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Q
+
+from patients.models import Patient
+from .base import PatientSearchBackend, rank_by_scores, top_scores
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+
+def tokenize(text):
+    """Lower-case alphanumeric words of ``text``."""
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def word_trigrams(word):
+    """Padded trigrams of a single word, as ``pg_trgm`` builds them."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(left, right):
+    """Dice coefficient of two trigram sets."""
+    if not left or not right:
+        return 0.0
+    return 2.0 * len(left & right) / (len(left) + len(right))
+
+
+class NGramIndex:
+    """
+    Thread-safe inverted index from word trigrams to patient ids.
+
+    Attributes:
+        fields (tuple): Patient fields indexed.
+    """
+
+    fields = ("first_name", "last_name", "email")
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built_at = None
+        self._texts = {}
+        self._words = {}
+        self._postings = defaultdict(set)
+
+    def _ensure_built(self):
+        ttl = settings.PATIENT_SEARCH_INDEX_TTL
+        if self._built_at is not None and (ttl is None or time.monotonic() - self._built_at < ttl):
+            return
+        with self._lock:
+            if self._built_at is not None and (ttl is None or time.monotonic() - self._built_at < ttl):
+                return
+            self._texts, self._words, self._postings = {}, {}, defaultdict(set)
+            rows = Patient.objects.values_list("id", *self.fields).iterator(chunk_size=10000)
+            for patient_id, *values in rows:
+                self._add(patient_id, values)
+            self._built_at = time.monotonic()
+            logger.info("Built patient n-gram index with %s patients.", len(self._texts))
+
+    def _add(self, patient_id, values):
+        text = " ".join(value.lower() for value in values if value)
+        words = set(tokenize(text))
+        self._texts[patient_id] = text
+        self._words[patient_id] = words
+        for word in words:
+            for gram in word_trigrams(word):
+                self._postings[gram].add(patient_id)
+
+    def _remove(self, patient_id):
+        for word in self._words.pop(patient_id, ()):
+            for gram in word_trigrams(word):
+                ids = self._postings.get(gram)
+                if ids is not None:
+                    ids.discard(patient_id)
+                    if not ids:
+                        del self._postings[gram]
+        self._texts.pop(patient_id, None)
+
+    def update(self, patient):
+        """Re-index a saved patient (no-op until the index is built)."""
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._remove(patient.pk)
+            self._add(patient.pk, [getattr(patient, field) for field in self.fields])
+
+    def remove(self, patient_id):
+        """Drop a deleted patient (no-op until the index is built)."""
+        with self._lock:
+            if self._built_at is not None:
+                self._remove(patient_id)
+
+    def clear(self):
+        """Discard the index; it is rebuilt on next use."""
+        with self._lock:
+            self._built_at = None
+            self._texts, self._words, self._postings = {}, {}, defaultdict(set)
+
+    def _candidates(self, term, minimum_hits):
+        hits = defaultdict(int)
+        for word in tokenize(term):
+            for gram in word_trigrams(word):
+                for patient_id in self._postings.get(gram, ()):
+                    hits[patient_id] += 1
+        return [patient_id for patient_id, count in hits.items() if count >= minimum_hits]
+
+    def strict(self, terms):
+        """Return ``{id: score}`` for all patients containing every term (unlimited)."""
+        self._ensure_built()
+        with self._lock:
+            scores = None
+            for term in terms:
+                needle = term.lower()
+                words = tokenize(needle)
+                if words and len(needle) >= 3:
+                    # Every inner trigram of the term must appear in the patient's words.
+                    grams = [{w[i:i + 3] for i in range(len(w) - 2)} for w in words]
+                    pool = None
+                    for gram in set().union(*grams):
+                        ids = self._postings.get(gram, set())
+                        pool = set(ids) if pool is None else pool & ids
+                    pool = pool if pool is not None else self._texts.keys()
+                else:
+                    pool = self._texts.keys()
+                term_scores = {}
+                for patient_id in pool if scores is None else (set(pool) & scores.keys()):
+                    if needle in self._texts.get(patient_id, ""):
+                        exact = needle in self._words[patient_id]
+                        prefix = any(word.startswith(needle) for word in self._words[patient_id])
+                        term_scores[patient_id] = 1.0 if exact else 0.75 if prefix else 0.5
+                scores = term_scores if scores is None else {
+                    pid: scores[pid] + score for pid, score in term_scores.items()
+                }
+                if not scores:
+                    return {}
+            return scores or {}
+
+    def fuzzy(self, terms):
+        """Return ``{id: score}`` for all patients similar to every term (unlimited)."""
+        self._ensure_built()
+        threshold = settings.PATIENT_SEARCH_FUZZY_MIN_SIMILARITY
+        with self._lock:
+            scores = None
+            for term in terms:
+                words = tokenize(term)
+                if not words:
+                    continue
+                term_grams = set().union(*(word_trigrams(word) for word in words))
+                pool = self._candidates(term, minimum_hits=1)
+                if scores is not None:
+                    pool = [pid for pid in pool if pid in scores]
+                term_scores = {}
+                for patient_id in pool:
+                    best = max(similarity(term_grams, word_trigrams(w)) for w in self._words[patient_id])
+                    if best >= threshold:
+                        term_scores[patient_id] = best
+                scores = term_scores if scores is None else {
+                    pid: scores[pid] + score for pid, score in term_scores.items()
+                }
+                if not scores:
+                    return {}
+            return scores or {}
+
+
+# Process-wide index shared by every request in this worker.
+patient_ngram_index = NGramIndex()
+
+
+class NGramSearchBackend(PatientSearchBackend):
+    """
+    In-process n-gram search backend (any database).
+    """
+
+    name = "ngram"
+
+    def __init__(self, index=None):
+        self.index = index or patient_ngram_index
+
+    def _rank(self, scores, queryset):
+        return rank_by_scores(queryset, top_scores(scores, queryset), Q(id__in=list(scores)))
+
+    def strict(self, terms, queryset):
+        return self._rank(self.index.strict(terms), queryset)
+
+    def fuzzy(self, terms, queryset):
+        return self._rank(self.index.fuzzy(terms), queryset)
@@ -0,0 +1,67 @@
+"""
+trigram.py
+~~~~~~~~~~
+PostgreSQL patient search on ``pg_trgm`` GIN indexes.
+
+The migration ``0003_patient_search_indexes`` creates one GIN
+``gin_trgm_ops`` index per searched field on ``UPPER(field::text)``, the
+exact expression Django emits for ``icontains``. The same indexes serve the
+strict ``LIKE`` match and the typo-tolerant word-similarity operator, and
+``word_similarity()`` provides the rank.
+"""
+
+import operator
+from functools import reduce
+
+from django.db.models import F, FloatField, Q, TextField, Value
+from django.db.models.functions import Cast, Coalesce, Greatest, Upper
+
+from .base import PatientSearchBackend
+
+
+class TrigramSearchBackend(PatientSearchBackend):
+    """
+    Trigram search backend for PostgreSQL.
+    """
+
+    name = "trigram"
+
+    @classmethod
+    def is_available(cls, connection):
+        if connection.vendor != "postgresql":
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            return cursor.fetchone() is not None
+
+    def _rank(self, terms):
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        per_term = [
+            Greatest(*[
+                Coalesce(TrigramWordSimilarity(Value(term), field), Value(0.0), output_field=FloatField())
+                for field in self.fields
+            ])
+            for term in terms
+        ]
+        return reduce(operator.add, per_term)
+
+    def strict(self, terms, queryset):
+        for term in terms:
+            queryset = queryset.filter(
+                reduce(operator.or_, (Q(**{f"{field}__icontains": term}) for field in self.fields))
+            )
+        return queryset.annotate(search_rank=self._rank(terms))
+
+    def fuzzy(self, terms, queryset):
+        from django.contrib.postgres.lookups import TrigramWordSimilar
+
+        upper = {f"_{field}_upper": Upper(Cast(field, output_field=TextField())) for field in self.fields}
+        queryset = queryset.alias(**upper)
+        for term in terms:
+            queryset = queryset.filter(
+                reduce(operator.or_, (
+                    Q(TrigramWordSimilar(F(alias), Value(term.upper()))) for alias in upper
+                ))
+            )
+        return queryset.annotate(search_rank=self._rank(terms))
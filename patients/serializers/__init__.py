@@ -1 +1,4 @@
-from .patient_serializer import PatientSerializer
\ No newline at end of file
+from .patient_serializer import PatientSerializer
+from .patient_import_serializer import PatientImportSerializer
+from .patient_vitals_summary_serializer import PatientVitalsSummarySerializer
+from .merge_suggestion_serializer import MergeSuggestionSerializer
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""
+merge_suggestion_serializer.py
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Serializer for MergeSuggestion review listings.
+"""
+
+from rest_framework import serializers
+from patients.models import MergeSuggestion
+from patients.serializers.patient_serializer import PatientSerializer
+
+
+class MergeSuggestionSerializer(serializers.ModelSerializer):
+    """
+    Serializer for MergeSuggestion model.
+
+    Embeds both patient records so a reviewer can compare them side by side.
+    """
+
+    primary = PatientSerializer(read_only=True)
+    duplicate = PatientSerializer(read_only=True)
+
+    class Meta:
+        model = MergeSuggestion
+        fields = ["id", "primary", "duplicate", "score", "reasons", "status", "created_at"]
+        read_only_fields = fields
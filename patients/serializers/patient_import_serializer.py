@@ -0,0 +1,26 @@
+"""
+patient_import_serializer.py
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Row serializer for bulk patient imports.
+"""
+
+from rest_framework import serializers
+from patients.serializers.patient_serializer import PatientSerializer
+
+
+class PatientImportSerializer(PatientSerializer):
+    """
+    Validates one imported patient row without touching the database.
+
+    ``place`` is accepted as a raw location id; the importer checks it
+    against the in-memory location snapshot instead of querying per row.
+    """
+
+    place = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta(PatientSerializer.Meta):
+        fields = [
+            "first_name", "last_name", "date_of_birth", "gender",
+            "place", "email", "contact_number",
+        ]
+        read_only_fields = []
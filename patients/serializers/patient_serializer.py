@@ -7,18 +7,25 @@ Serializer for Patient model, handling validation and transformations.
 import logging
 from django.db import DatabaseError
 from rest_framework import serializers
+from core.instrumentation import TimedSerializerMixin
+from core.sparse_fields import SparseFieldsSerializerMixin
 from patients.models import Patient
+from users.serializers import LocationSnapshotField
 
 logger = logging.getLogger(__name__)
 
 
-class PatientSerializer(serializers.ModelSerializer):
+class PatientSerializer(TimedSerializerMixin, SparseFieldsSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Patient model.
 
-    Validates and serializes patient data.
+    Validates and serializes patient data. ``place`` is resolved from the
+    in-memory location snapshot rather than queried per request. Only
+    ``context["fields"]`` is rendered when a sparse fieldset is requested.
     """
 
+    place = LocationSnapshotField(required=False, allow_null=True)
+
     class Meta:
         model = Patient
         fields = [
@@ -52,11 +59,11 @@ class PatientSerializer(serializers.ModelSerializer):
         try:
             validated_data["user"] = self.context["request"].user
             patient = super().create(validated_data)
-            logger.info(f"Patient created successfully with ID {patient.id}")
+            logger.info("Patient created successfully with ID %s", patient.id)
             return patient
         except DatabaseError as db_err:
-            logger.error(f"Database error while creating patient: {db_err}")
+            logger.error("Database error while creating patient: %s", db_err)
             raise serializers.ValidationError("Failed to save patient due to a database error.")
         except Exception as ex:
-            logger.error(f"Unexpected error while creating patient: {ex}")
+            logger.error("Unexpected error while creating patient: %s", ex)
             raise serializers.ValidationError("An unexpected error occurred while saving patient.")
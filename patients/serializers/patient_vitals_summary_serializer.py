@@ -0,0 +1,36 @@
+"""
+patient_vitals_summary_serializer.py
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Patient serializer with an embedded heart-rate summary
+(``?include=vitals_summary``).
+"""
+
+from rest_framework import serializers
+from patients.serializers.patient_serializer import PatientSerializer
+
+
+class PatientVitalsSummarySerializer(PatientSerializer):
+    """
+    Serializer for Patient model plus ``vitals_summary``.
+
+    Reads the ``vitals_*`` annotations added by
+    ``vitals.annotations.with_vitals_summary``; it never queries heart rates
+    itself.
+    """
+
+    vitals_summary = serializers.SerializerMethodField()
+
+    class Meta(PatientSerializer.Meta):
+        fields = PatientSerializer.Meta.fields + ["vitals_summary"]
+
+    def get_vitals_summary(self, patient):
+        """Build the summary object from the row's annotations."""
+        last_recorded_at = getattr(patient, "vitals_last_recorded_at", None)
+        average = getattr(patient, "vitals_avg_bpm_24h", None)
+        return {
+            "last_bpm": getattr(patient, "vitals_last_bpm", None),
+            "last_recorded_at": serializers.DateTimeField().to_representation(last_recorded_at)
+            if last_recorded_at else None,
+            "readings_today": getattr(patient, "vitals_readings_today", 0),
+            "avg_bpm_24h": round(float(average), 1) if average is not None else None,
+        }
@@ -0,0 +1,24 @@
+"""
+signals.py
+~~~~~~~~~~
+Patient signal receivers that keep in-process search indexes current.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from patients.models import Patient
+from patients.search import patient_autocomplete_index, patient_ngram_index
+
+
+@receiver(post_save, sender=Patient, dispatch_uid="patients_search_index_saved")
+def patient_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        patient_ngram_index.update(instance)
+        patient_autocomplete_index.update(instance)
+
+
+@receiver(post_delete, sender=Patient, dispatch_uid="patients_search_index_deleted")
+def patient_deleted(sender, instance, **kwargs):
+    patient_ngram_index.remove(instance.pk)
+    patient_autocomplete_index.remove(instance.pk)
@@ -0,0 +1,124 @@
+"""
+test_patient_autocomplete.py
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Tests for the in-process patient autocomplete index and endpoint.
+"""
+
+import pytest
+from datetime import date
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from patients.models import Patient
+from patients.search import PatientAutocompleteIndex, patient_autocomplete_index
+
+User = get_user_model()
+
+AUTOCOMPLETE_URL = "http://localhost:8000/api/v1/patients/autocomplete"
+
+
+def make_patient(user, first_name, last_name):
+    return Patient.objects.create(
+        user=user, first_name=first_name, last_name=last_name,
+        date_of_birth=date(1990, 1, 1), gender="Other",
+    )
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    patient_autocomplete_index.clear()
+    yield
+    patient_autocomplete_index.clear()
+
+
+@pytest.fixture
+def other_user(db):
+    return User.objects.create_user(username="otheruser", email="other@example.com", password="testpass123")
+
+
+# ----------------------------
+# Index
+# ----------------------------
+@pytest.mark.django_db
+class TestPatientAutocompleteIndex:
+
+    def test_matches_first_or_last_name_prefix(self, test_user):
+        john = make_patient(test_user, "John", "Smith")
+        jane = make_patient(test_user, "Jane", "Johnson")
+        make_patient(test_user, "Mary", "Brown")
+        index = PatientAutocompleteIndex()
+        assert {r["id"] for r in index.complete(test_user.id, "jo")} == {john.id, jane.id}
+        assert [r["id"] for r in index.complete(test_user.id, "John  Sm")] == [john.id]
+        assert [r["id"] for r in index.complete(test_user.id, "smith j")] == [john.id]
+
+    def test_lookups_after_build_do_not_query(self, test_user, django_assert_num_queries):
+        make_patient(test_user, "John", "Smith")
+        index = PatientAutocompleteIndex()
+        index.complete(test_user.id, "j")
+        with django_assert_num_queries(0):
+            assert len(index.complete(test_user.id, "jo")) == 1
+
+    def test_scoped_to_owner(self, test_user, other_user):
+        make_patient(other_user, "John", "Smith")
+        assert PatientAutocompleteIndex().complete(test_user.id, "jo") == []
+
+    def test_kept_current_by_signals(self, test_user, other_user):
+        patient = make_patient(test_user, "John", "Smith")
+        assert patient_autocomplete_index.complete(test_user.id, "jo")
+
+        patient.first_name = "Alan"
+        patient.save()
+        assert patient_autocomplete_index.complete(test_user.id, "jo") == []
+        assert [r["first_name"] for r in patient_autocomplete_index.complete(test_user.id, "al")] == ["Alan"]
+
+        make_patient(test_user, "Joan", "Baker")
+        assert [r["first_name"] for r in patient_autocomplete_index.complete(test_user.id, "jo")] == ["Joan"]
+
+        patient_autocomplete_index.complete(other_user.id, "a")
+        patient.user = other_user
+        patient.save()
+        assert patient_autocomplete_index.complete(test_user.id, "al") == []
+        assert len(patient_autocomplete_index.complete(other_user.id, "al")) == 1
+
+        patient.delete()
+        assert patient_autocomplete_index.complete(other_user.id, "al") == []
+
+    def test_memory_bounded_by_evicting_least_recent_owner(self, test_user, other_user, settings):
+        settings.PATIENT_AUTOCOMPLETE_MAX_USERS = 1
+        make_patient(test_user, "John", "Smith")
+        make_patient(other_user, "Joan", "Baker")
+        index = PatientAutocompleteIndex()
+        index.complete(test_user.id, "j")
+        index.complete(other_user.id, "j")
+        assert list(index._owners) == [other_user.id]
+        assert index._size == 1
+        assert [r["first_name"] for r in index.complete(test_user.id, "j")] == ["John"]
+
+
+# ----------------------------
+# Endpoint
+# ----------------------------
+@pytest.mark.django_db
+class TestPatientAutocompleteEndpoint:
+
+    def test_requires_authentication(self, api_client):
+        response = api_client.get(AUTOCOMPLETE_URL, {"q": "jo"})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_returns_own_matches_with_limit(self, auth_client, test_user, other_user):
+        make_patient(test_user, "John", "Smith")
+        make_patient(test_user, "Joanna", "Reed")
+        make_patient(other_user, "Joe", "Other")
+        response = auth_client.get(AUTOCOMPLETE_URL, {"q": "jo", "limit": 1})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"] == [
+            {"id": Patient.objects.get(first_name="Joanna").id, "first_name": "Joanna", "last_name": "Reed"},
+        ]
+
+    def test_empty_query_returns_nothing(self, auth_client, test_user):
+        make_patient(test_user, "John", "Smith")
+        response = auth_client.get(AUTOCOMPLETE_URL)
+        assert response.data["results"] == []
+
+    def test_invalid_limit(self, auth_client):
+        response = auth_client.get(AUTOCOMPLETE_URL, {"q": "jo", "limit": "x"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
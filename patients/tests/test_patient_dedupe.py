@@ -0,0 +1,190 @@
+"""
+test_patient_dedupe.py
+~~~~~~~~~~~~~~~~~~~~~~
+Tests for patient deduplication, merging and the merge-suggestion API.
+"""
+
+import pytest
+from datetime import date
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework import status
+from patients import dedupe
+from patients.dedupe import candidate_pairs, find_duplicates, merge_patients, normalize_name, normalize_phone
+from patients.models import MergeSuggestion, Patient
+from sync.models import Change
+from vitals.models import HeartRate
+
+User = get_user_model()
+
+SUGGESTIONS_URL = "http://localhost:8000/api/v1/patients/merge-suggestions"
+
+
+def make_patient(user, first_name, last_name, dob=date(1980, 5, 17), **extra):
+    return Patient.objects.create(
+        user=user, first_name=first_name, last_name=last_name, date_of_birth=dob, gender="Female", **extra
+    )
+
+
+@pytest.fixture
+def other_user(db):
+    return User.objects.create_user(username="otheruser", email="other@example.com", password="testpass123")
+
+
+@pytest.fixture
+def admin_client(api_client, db):
+    admin = User.objects.create_user(username="admin", email="admin@example.com", password="x", is_staff=True)
+    api_client.force_authenticate(user=admin)
+    return api_client
+
+
+@pytest.fixture
+def duplicates(test_user, other_user):
+    """An exact cross-owner duplicate, a typo duplicate, a swapped-name duplicate and a bystander."""
+    return {
+        "original": make_patient(test_user, "Catherine", "Zeta-Jones", contact_number="+1 (555) 010-2030"),
+        "other_owner": make_patient(other_user, "catherine", "Zeta Jones"),
+        "typo": make_patient(test_user, "Cathrine", "Zeta-Jones", dob=date(1980, 5, 18), contact_number="5550102030"),
+        "swapped": make_patient(other_user, "Zetajones", "Catherine", email="cz@example.com"),
+        "bystander": make_patient(test_user, "Catherine", "Brown", dob=date(1991, 2, 3)),
+    }
+
+
+# ----------------------------
+# Engine
+# ----------------------------
+@pytest.mark.django_db
+class TestFindDuplicates:
+
+    def test_normalization(self):
+        assert normalize_name("  Zoë O'Brien ") == "zoeobrien"
+        assert normalize_phone("+1 (555) 010-2030") == "5550102030"
+        assert normalize_phone("12") is None
+
+    def test_suggests_probable_duplicates_only(self, duplicates):
+        result = find_duplicates()
+        original = duplicates["original"].id
+        pairs = {(low, high) for low, high, _, _ in result.matches}
+        assert (original, duplicates["other_owner"].id) in pairs
+        assert (original, duplicates["typo"].id) in pairs
+        assert (original, duplicates["swapped"].id) in pairs
+        assert all(duplicates["bystander"].id not in pair for pair in pairs)
+        assert result.written == MergeSuggestion.objects.count() == len(result.matches)
+        typo = MergeSuggestion.objects.get(primary_id=original, duplicate_id=duplicates["typo"].id)
+        assert "phone" in typo.reasons
+
+    def test_rerun_keeps_dismissed_pairs(self, duplicates):
+        find_duplicates()
+        MergeSuggestion.objects.update(status=MergeSuggestion.DISMISSED)
+        result = find_duplicates()
+        assert result.written == 0
+        assert not MergeSuggestion.objects.filter(status=MergeSuggestion.PENDING).exists()
+
+    def test_written_excludes_conflicting_rows(self, duplicates, monkeypatch):
+        original, typo = duplicates["original"].id, duplicates["typo"].id
+        # A concurrent run inserted this pair after the existing pairs were read.
+        MergeSuggestion.objects.create(primary_id=original, duplicate_id=typo, score=1.0, reasons=[])
+        real_suggested_pairs = dedupe._suggested_pairs
+        monkeypatch.setattr(
+            dedupe, "_suggested_pairs", lambda primary_ids: real_suggested_pairs(primary_ids) - {(original, typo)}
+        )
+        result = find_duplicates()
+        assert MergeSuggestion.objects.count() == len(result.matches)
+        assert result.written == len(result.matches) - 1
+
+    def test_dry_run_writes_nothing(self, duplicates):
+        assert find_duplicates(dry_run=True).matches
+        assert not MergeSuggestion.objects.exists()
+
+    def test_oversized_blocks_are_skipped(self, test_user):
+        for i in range(4):
+            make_patient(test_user, f"Person{i}", f"Unrelated{i}", dob=date(1970 + i, 1, 1), contact_number="0000000000")
+        pairs, skipped = candidate_pairs(rules=["phone"], max_block_size=3)
+        assert pairs == {}
+        assert skipped == 1
+
+
+@pytest.mark.django_db
+class TestMergePatients:
+
+    def test_repoints_heart_rates_and_fills_blanks(self, duplicates, test_location):
+        primary, duplicate = duplicates["original"], duplicates["swapped"]
+        duplicate.place = test_location
+        duplicate.save()
+        HeartRate.objects.create(patient=primary, bpm=70)
+        moved_ids = [HeartRate.objects.create(patient=duplicate, bpm=80 + i).id for i in range(3)]
+
+        assert merge_patients(primary, [duplicate]) == 3
+
+        primary.refresh_from_db()
+        assert primary.email == "cz@example.com"
+        assert primary.place == test_location
+        assert HeartRate.objects.filter(patient=primary).count() == 4
+        assert not Patient.objects.filter(id=duplicate.id).exists()
+        assert set(moved_ids) <= set(
+            Change.objects.filter(kind=Change.HEART_RATE).values_list("object_id", flat=True)
+        )
+
+    def test_cross_owner_merge_tombstones_moved_readings(self, duplicates, other_user):
+        primary, duplicate = duplicates["original"], duplicates["other_owner"]
+        moved_ids = {HeartRate.objects.create(patient=duplicate, bpm=80 + i).id for i in range(2)}
+
+        merge_patients(primary, [duplicate])
+
+        changes = Change.objects.filter(kind=Change.HEART_RATE, object_id__in=moved_ids)
+        assert set(changes.filter(action=Change.DELETE, user_id=other_user.id).values_list("object_id", flat=True)) == moved_ids
+        assert set(changes.filter(action=Change.UPSERT, user_id=primary.user_id).values_list("object_id", flat=True)) == moved_ids
+
+    def test_same_owner_merge_records_no_tombstones(self, duplicates):
+        primary, duplicate = duplicates["original"], duplicates["typo"]
+        HeartRate.objects.create(patient=duplicate, bpm=72)
+        merge_patients(primary, [duplicate])
+        assert not Change.objects.filter(kind=Change.HEART_RATE, action=Change.DELETE).exists()
+
+    def test_merge_command_merges_above_threshold(self, duplicates):
+        call_command("dedupe_patients", "--merge-above", "0.9")
+        assert not Patient.objects.filter(id=duplicates["other_owner"].id).exists()
+        assert Patient.objects.filter(id=duplicates["typo"].id).exists()
+
+
+# ----------------------------
+# API
+# ----------------------------
+@pytest.mark.django_db
+class TestMergeSuggestionEndpoints:
+
+    def test_admin_only(self, auth_client, duplicates):
+        response = auth_client.get(SUGGESTIONS_URL)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_list_merge_and_dismiss(self, admin_client, duplicates):
+        find_duplicates()
+        response = admin_client.get(SUGGESTIONS_URL, {"status": MergeSuggestion.PENDING})
+        assert response.status_code == status.HTTP_200_OK
+        first = response.data["results"][0]
+        assert first["score"] >= response.data["results"][-1]["score"]
+        assert {"primary", "duplicate", "reasons"} <= first.keys()
+
+        suggestion = MergeSuggestion.objects.get(primary=duplicates["original"], duplicate=duplicates["typo"])
+        HeartRate.objects.create(patient=duplicates["typo"], bpm=72)
+        response = admin_client.post(f"{SUGGESTIONS_URL}/{suggestion.id}/merge")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["heart_rates_moved"] == 1
+        assert response.data["patient"]["id"] == duplicates["original"].id
+
+        suggestion = MergeSuggestion.objects.get(primary=duplicates["original"], duplicate=duplicates["swapped"])
+        response = admin_client.post(f"{SUGGESTIONS_URL}/{suggestion.id}/dismiss")
+        assert response.data["status"] == MergeSuggestion.DISMISSED
+
+    def test_dismissed_suggestion_cannot_be_merged(self, admin_client, duplicates):
+        find_duplicates()
+        suggestion = MergeSuggestion.objects.get(primary=duplicates["original"], duplicate=duplicates["typo"])
+        suggestion.status = MergeSuggestion.DISMISSED
+        suggestion.save()
+        response = admin_client.post(f"{SUGGESTIONS_URL}/{suggestion.id}/merge")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Patient.objects.filter(id=duplicates["typo"].id).exists()
+
+    def test_merge_unknown_suggestion(self, admin_client):
+        response = admin_client.post(f"{SUGGESTIONS_URL}/999/merge")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
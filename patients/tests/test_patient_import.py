@@ -0,0 +1,132 @@
+"""
+test_patient_import.py
+~~~~~~~~~~~~~~~~~~~~~~
+Tests for bulk patient import (API endpoint and management command).
+"""
+
+import json
+import pytest
+from datetime import date
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework import status
+from patients.importer import import_patients
+from patients.models import Patient
+from sync.models import Change
+
+IMPORT_URL = "http://localhost:8000/api/v1/patients/import"
+
+CSV_HEADER = "first_name,last_name,date_of_birth,gender,place,email,contact_number\n"
+
+
+def row(first_name, last_name="Doe", dob="1990-01-01", **extra):
+    return {"first_name": first_name, "last_name": last_name, "date_of_birth": dob, "gender": "Male", **extra}
+
+
+# ----------------------------
+# Importer
+# ----------------------------
+@pytest.mark.django_db
+class TestImportPatients:
+
+    def test_valid_rows_inserted_in_constant_queries(self, test_user, test_location, django_assert_num_queries):
+        rows = [row(f"Name{i}", place=test_location.id) for i in range(50)]
+        # existence check, location lookup, savepoint + insert + release, change log
+        with django_assert_num_queries(6):
+            result = import_patients(rows, test_user)
+        assert len(result.created) == 50
+        assert result.errors == []
+        assert Patient.objects.filter(user=test_user, place=test_location).count() == 50
+
+    def test_per_row_error_report(self, test_user, patient_create):
+        rows = [
+            row("Alice"),
+            row("John", "Doe", "1990-01-01"),                # already exists (patient_create)
+            row("Bob", gender="Unknown"),                    # invalid choice
+            row("Alice"),                                    # duplicate within the file
+            row("Carol", place=999999),                      # unknown location
+            row("Dan", email="not-an-email"),
+        ]
+        result = import_patients(rows, test_user)
+        assert len(result.created) == 1
+        assert [error["row"] for error in result.errors] == [2, 3, 4, 5, 6]
+        errors = {error["row"]: error["errors"] for error in result.errors}
+        assert "gender" in errors[3]
+        assert "row 1" in errors[4]["non_field_errors"][0]
+        assert "place" in errors[5]
+        assert "email" in errors[6]
+
+    def test_batches(self, test_user):
+        rows = [row(f"Name{i}") for i in range(25)]
+        result = import_patients(rows, test_user, batch_size=10)
+        assert len(result.created) == 25
+
+    def test_dry_run_writes_nothing(self, test_user):
+        result = import_patients([row("Alice"), row("Bob", dob="bad")], test_user, dry_run=True)
+        assert result.created == []
+        assert [error["row"] for error in result.errors] == [2]
+        assert not Patient.objects.exists()
+
+    def test_records_sync_changes(self, test_user):
+        result = import_patients([row("Alice"), row("Bob")], test_user)
+        assert set(
+            Change.objects.filter(kind=Change.PATIENT).values_list("object_id", flat=True)
+        ) == set(result.created)
+
+
+# ----------------------------
+# Endpoint
+# ----------------------------
+@pytest.mark.django_db
+class TestPatientImportEndpoint:
+
+    def test_requires_authentication(self, api_client):
+        response = api_client.post(IMPORT_URL, [row("Alice")], format="json")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_json_body(self, auth_client, test_user):
+        response = auth_client.post(IMPORT_URL, {"patients": [row("Alice"), row("Bob", dob="x")]}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["created"] == 1
+        assert response.data["failed"] == 1
+        assert response.data["errors"][0]["row"] == 2
+        assert Patient.objects.get().user == test_user
+
+    def test_csv_upload(self, auth_client, test_location):
+        content = CSV_HEADER + f"Alice,Doe,1990-01-01,Female,{test_location.id},,\nBob,Doe,1990-01-02,Male,,bob@example.com,\n"
+        upload = SimpleUploadedFile("patients.csv", content.encode(), content_type="text/csv")
+        response = auth_client.post(IMPORT_URL, {"file": upload}, format="multipart")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["created"] == 2
+        assert Patient.objects.get(first_name="Alice").place == test_location
+
+    def test_dry_run(self, auth_client):
+        response = auth_client.post(f"{IMPORT_URL}?dry_run=true", [row("Alice")], format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["dry_run"] is True
+        assert not Patient.objects.exists()
+
+    def test_malformed_payload(self, auth_client):
+        response = auth_client.post(IMPORT_URL, {"rows": "nope"}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_row_limit(self, auth_client, settings):
+        settings.PATIENT_IMPORT_MAX_ROWS = 1
+        response = auth_client.post(IMPORT_URL, [row("Alice"), row("Bob")], format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+# ----------------------------
+# Management command
+# ----------------------------
+@pytest.mark.django_db
+class TestImportPatientsCommand:
+
+    def test_imports_json_file(self, tmp_path, test_user, capsys):
+        path = tmp_path / "patients.json"
+        path.write_text(json.dumps([row("Alice"), row("Bob", gender="?")]))
+        report = tmp_path / "report.json"
+        call_command("import_patients", str(path), "--user", test_user.username, "--report", str(report))
+        assert "1 created, 1 rejected" in capsys.readouterr().out
+        assert json.loads(report.read_text())["errors"][0]["row"] == 2
+        assert Patient.objects.get().date_of_birth == date(1990, 1, 1)
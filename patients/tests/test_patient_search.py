@@ -0,0 +1,147 @@
+"""
+test_patient_search.py
+~~~~~~~~~~~~~~~~~~~~~~
+Tests for the indexed patient search backends and PatientSearchFilter.
+"""
+
+import pytest
+from datetime import date
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from patients.models import Patient
+from patients.search import (
+    FTS5SearchBackend, NGramSearchBackend, get_backend, patient_ngram_index, search_patients,
+)
+from patients.search.ngram import NGramIndex
+
+User = get_user_model()
+
+
+def make_patient(user, first_name, last_name, email=None, day=1):
+    return Patient.objects.create(
+        user=user, first_name=first_name, last_name=last_name,
+        date_of_birth=date(1990, 1, day), gender="Other", email=email,
+    )
+
+
+@pytest.fixture
+def registry(test_user):
+    return {
+        "jonathan": make_patient(test_user, "Jonathan", "Smith", "jsmith@example.com", 1),
+        "jon": make_patient(test_user, "Jon", "Parker", None, 2),
+        "maria": make_patient(test_user, "Maria", "Jonas", "maria@example.com", 3),
+    }
+
+
+@pytest.fixture
+def crowd(db):
+    """Better-ranked matches for "Johnson" than any test_user patient, all owned by someone else."""
+    other = User.objects.create_user(username="other", password="otherpass123", email="other@example.com")
+    return [
+        make_patient(other, "Johnson", "Johnson", f"johnson{i}@example.com", day=i + 1)
+        for i in range(15)
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("backend_class", [FTS5SearchBackend, NGramSearchBackend])
+class TestSearchBackends:
+
+    def backend(self, backend_class):
+        return NGramSearchBackend(NGramIndex()) if backend_class is NGramSearchBackend else backend_class()
+
+    def test_strict_match_is_substring_of_any_field(self, backend_class, registry):
+        results = self.backend(backend_class).search(["jon"], Patient.objects.all())
+        assert set(results.values_list("id", flat=True)) == {p.id for p in registry.values()}
+
+    def test_every_term_must_match(self, backend_class, registry):
+        results = self.backend(backend_class).search(["jon", "parker"], Patient.objects.all())
+        assert list(results.values_list("id", flat=True)) == [registry["jon"].id]
+
+    def test_misspelling_falls_back_to_similar_names(self, backend_class, registry):
+        results = self.backend(backend_class).search(["Jonathon"], Patient.objects.all())
+        assert registry["jonathan"].id in set(results.values_list("id", flat=True))
+
+    def test_respects_scoped_queryset(self, backend_class, registry):
+        scoped = Patient.objects.exclude(id=registry["jon"].id)
+        results = self.backend(backend_class).search(["parker"], scoped)
+        assert not results.exists()
+
+    def test_result_limit_applies_within_scope(self, backend_class, test_user, crowd, settings):
+        settings.PATIENT_SEARCH_RANKED_RESULTS = 10
+        own = make_patient(test_user, "Ann", "Johnson", day=20)
+        for terms in (["johnson"], ["jonhson"]):
+            results = self.backend(backend_class).search(terms, Patient.objects.filter(user=test_user))
+            assert list(results.values_list("id", flat=True)) == [own.id]
+
+    def test_matches_beyond_ranked_results_are_kept(self, backend_class, test_user, crowd, settings):
+        settings.PATIENT_SEARCH_RANKED_RESULTS = 5
+        own = make_patient(test_user, "Ann", "Johnson", day=20)
+        for terms in (["johnson"], ["jonhson"]):
+            results = self.backend(backend_class).search(terms, Patient.objects.all()).order_by("-search_rank", "id")
+            ids = list(results.values_list("id", flat=True))
+            assert sorted(ids) == sorted([p.id for p in crowd] + [own.id])
+            assert len([rank for rank in results.values_list("search_rank", flat=True) if rank > 0]) == 5
+
+
+@pytest.mark.django_db
+class TestNGramIndexMaintenance:
+
+    def test_index_follows_saves_and_deletes(self, test_user):
+        index = NGramIndex()
+        patient = make_patient(test_user, "Alice", "Walker")
+        assert set(index.strict(["walker"])) == {patient.id}
+
+        patient.last_name = "Brown"
+        patient.save()
+        index.update(patient)
+        assert index.strict(["walker"]) == {}
+        assert set(index.strict(["brown"])) == {patient.id}
+
+        index.remove(patient.id)
+        assert index.strict(["brown"]) == {}
+
+
+@pytest.mark.django_db
+class TestPatientSearchFilter:
+
+    def test_sqlite_uses_fts5_backend(self):
+        assert isinstance(get_backend(), FTS5SearchBackend)
+
+    def test_results_ranked_by_relevance(self, auth_client, patient_endpoints, test_user, settings):
+        settings.PATIENT_SEARCH_BACKEND = "ngram"
+        patient_ngram_index.clear()
+        substring = make_patient(test_user, "Bjon", "Miller", day=4)
+        prefix = make_patient(test_user, "Jonas", "Miller", day=5)
+        exact = make_patient(test_user, "Ann", "Jon", day=6)
+        response = auth_client.get(patient_endpoints["list"], {"search": "jon"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 3
+        ids = [p["id"] for p in response.data["results"]]
+        assert ids == [exact.id, prefix.id, substring.id][:len(ids)]
+        patient_ngram_index.clear()
+
+    def test_explicit_ordering_wins_over_rank(self, auth_client, patient_endpoints, test_user):
+        make_patient(test_user, "Zed", "Jones", day=7)
+        make_patient(test_user, "Amy", "Jones", day=8)
+        response = auth_client.get(patient_endpoints["list"], {"search": "jones", "ordering": "first_name"})
+        assert [p["first_name"] for p in response.data["results"]] == ["Amy", "Zed"]
+
+    def test_list_search_is_not_crowded_out_by_other_owners(self, auth_client, patient_endpoints, test_user, crowd, settings):
+        settings.PATIENT_SEARCH_RANKED_RESULTS = 10
+        own = make_patient(test_user, "Ann", "Johnson", day=20)
+        response = auth_client.get(patient_endpoints["list"], {"search": "Johnson"})
+        assert response.data["count"] == 1
+        assert response.data["results"][0]["id"] == own.id
+
+    def test_list_search_counts_every_match(self, auth_client, patient_endpoints, test_user, settings):
+        settings.PATIENT_SEARCH_RANKED_RESULTS = 3
+        for day in range(1, 13):
+            make_patient(test_user, "Ann", "Johnson", day=day)
+        response = auth_client.get(patient_endpoints["list"], {"search": "Johnson"})
+        assert response.data["count"] == 12
+
+    def test_search_patients_annotates_rank(self, registry):
+        ranked = list(search_patients(["smith"]).values_list("id", "search_rank"))
+        assert ranked[0][0] == registry["jonathan"].id
+        assert ranked[0][1] > 0
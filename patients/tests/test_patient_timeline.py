@@ -0,0 +1,102 @@
+"""
+test_patient_timeline.py
+~~~~~~~~~~~~~~~~~~~~~~~~
+Tests for the composite patient timeline endpoint.
+"""
+
+import pytest
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from vitals.models import HeartRate
+
+User = get_user_model()
+
+
+def timeline_url(patient_id):
+    return f"http://localhost:8000/api/v1/patients/{patient_id}/timeline"
+
+
+def reading(patient, bpm, ago):
+    heart_rate = HeartRate.objects.create(patient=patient, bpm=bpm)
+    HeartRate.objects.filter(id=heart_rate.id).update(recorded_at=timezone.now() - ago)
+    return heart_rate
+
+
+@pytest.fixture
+def readings(patient_create):
+    return [
+        reading(patient_create, 60, timedelta(hours=48)),
+        reading(patient_create, 70, timedelta(hours=3)),
+        reading(patient_create, 80, timedelta(hours=2)),
+        reading(patient_create, 90, timedelta(hours=1)),
+    ]
+
+
+@pytest.mark.django_db
+class TestPatientTimeline:
+
+    def test_composite_response(self, auth_client, patient_create, readings):
+        response = auth_client.get(timeline_url(patient_create.id), {"limit": 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["patient"]["id"] == patient_create.id
+        assert response.data["location"]["id"] == patient_create.place_id
+        assert [r["bpm"] for r in response.data["readings"]] == [90, 80]
+        assert response.data["readings"][0]["patient_name"] == "John Doe"
+        stats = response.data["stats"]
+        assert (stats["count"], stats["min_bpm"], stats["max_bpm"], stats["avg_bpm"]) == (3, 70, 90, 80.0)
+        assert response["ETag"]
+
+    def test_fixed_query_count(self, auth_client, patient_create, readings, django_assert_num_queries):
+        with django_assert_num_queries(3):
+            auth_client.get(timeline_url(patient_create.id), {"limit": 50})
+
+    def test_conditional_get(self, auth_client, patient_create, readings, django_assert_num_queries):
+        etag = auth_client.get(timeline_url(patient_create.id))["ETag"]
+
+        with django_assert_num_queries(2):
+            response = auth_client.get(timeline_url(patient_create.id), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+
+        reading(patient_create, 100, timedelta(minutes=1))
+        response = auth_client.get(timeline_url(patient_create.id), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+
+    def test_etag_changes_when_readings_leave_window(self, auth_client, patient_create, readings):
+        etag = auth_client.get(timeline_url(patient_create.id), {"window": 4})["ETag"]
+        # Simulate the reading ageing out without touching updated_at.
+        HeartRate.objects.filter(id=readings[1].id).update(recorded_at=timezone.now() - timedelta(hours=5))
+        response = auth_client.get(timeline_url(patient_create.id), {"window": 4}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_etag_ignores_readings_outside_the_response(self, auth_client, patient_create, readings):
+        params = {"window": 4, "limit": 2}
+        etag = auth_client.get(timeline_url(patient_create.id), params)["ETag"]
+        HeartRate.objects.filter(id=readings[0].id).update(bpm=55, updated_at=timezone.now())
+        response = auth_client.get(timeline_url(patient_create.id), params, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_etag_changes_when_recent_reading_deleted(self, auth_client, patient_create, readings):
+        # The window is empty; the response shows the two latest readings only.
+        reading(patient_create, 50, timedelta(hours=96))
+        for heart_rate in readings[1:]:
+            HeartRate.objects.filter(id=heart_rate.id).update(recorded_at=timezone.now() - timedelta(hours=24))
+        params = {"window": 1, "limit": 2}
+        etag = auth_client.get(timeline_url(patient_create.id), params)["ETag"]
+        HeartRate.objects.filter(id=readings[3].id).delete()
+        response = auth_client.get(timeline_url(patient_create.id), params, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_other_users_patient_not_found(self, api_client, patient_create):
+        other = User.objects.create_user(username="other", email="other@example.com", password="x")
+        api_client.force_authenticate(user=other)
+        response = api_client.get(timeline_url(patient_create.id))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalid_params(self, auth_client, patient_create):
+        response = auth_client.get(timeline_url(patient_create.id), {"window": "day"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
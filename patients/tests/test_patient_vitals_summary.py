@@ -0,0 +1,75 @@
+"""
+test_patient_vitals_summary.py
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Tests for ``?include=vitals_summary`` on the patient endpoints.
+"""
+
+import pytest
+from datetime import date, timedelta
+from django.utils import timezone
+from rest_framework import status
+from patients.models import Patient
+from vitals.models import HeartRate
+
+
+def make_patient(user, first_name):
+    return Patient.objects.create(
+        user=user, first_name=first_name, last_name="Summary", date_of_birth=date(1985, 3, 4), gender="Male",
+    )
+
+
+def reading(patient, bpm, ago):
+    heart_rate = HeartRate.objects.create(patient=patient, bpm=bpm)
+    recorded_at = timezone.now() - ago
+    HeartRate.objects.filter(id=heart_rate.id).update(recorded_at=recorded_at)
+    return recorded_at
+
+
+@pytest.mark.django_db
+class TestPatientVitalsSummary:
+
+    def test_summary_values(self, auth_client, patient_endpoints, test_user):
+        patient = make_patient(test_user, "Alan")
+        times = [
+            reading(patient, 60, timedelta(hours=30)),
+            reading(patient, 80, timedelta(hours=2)),
+            reading(patient, 90, timedelta(minutes=5)),
+        ]
+        midnight = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        response = auth_client.get(patient_endpoints["detail"](patient.id), {"include": "vitals_summary"})
+
+        assert response.status_code == status.HTTP_200_OK
+        summary = response.data["vitals_summary"]
+        assert summary["last_bpm"] == 90
+        assert summary["last_recorded_at"] is not None
+        assert summary["readings_today"] == sum(1 for t in times if t >= midnight)
+        assert summary["avg_bpm_24h"] == 85.0
+
+    def test_patient_without_readings(self, auth_client, patient_endpoints, test_user):
+        patient = make_patient(test_user, "Empty")
+        response = auth_client.get(patient_endpoints["detail"](patient.id), {"include": "vitals_summary"})
+        assert response.data["vitals_summary"] == {
+            "last_bpm": None, "last_recorded_at": None, "readings_today": 0, "avg_bpm_24h": None,
+        }
+
+    def test_list_summary_uses_constant_queries(
+        self, auth_client, patient_endpoints, test_user, django_assert_num_queries
+    ):
+        for index in range(6):
+            patient = make_patient(test_user, f"Patient{index}")
+            for minutes in range(3):
+                reading(patient, 70 + index, timedelta(minutes=minutes + 1))
+
+        # One COUNT and one SELECT for the page, whatever the page size.
+        with django_assert_num_queries(2):
+            response = auth_client.get(patient_endpoints["list"], {"include": "vitals_summary"})
+
+        assert response.status_code == status.HTTP_200_OK
+        for row in response.data["results"]:
+            assert row["vitals_summary"]["last_bpm"] == 70 + int(row["first_name"].removeprefix("Patient"))
+
+    def test_summary_is_opt_in(self, auth_client, patient_endpoints, test_user):
+        make_patient(test_user, "Plain")
+        response = auth_client.get(patient_endpoints["list"], {"include": "unknown"})
+        assert "vitals_summary" not in response.data["results"][0]
@@ -7,10 +7,50 @@ Connects the PatientViewSet with DRF routers.
 """
 
 from django.urls import path
-from .views import PatientViewSet
+from .views import MergeSuggestionViewSet, PatientViewSet
 
 
 urlpatterns = [
+    path(
+        '/<int:pk>/timeline',
+        PatientViewSet.as_view({'get': 'timeline'}),
+        name='patient-timeline'),
+
+    path(
+        '/autocomplete',
+        PatientViewSet.as_view({'get': 'autocomplete'}),
+        name='patient-autocomplete'),
+
+    path(
+        '/batch',
+        PatientViewSet.as_view({'get': 'batch', 'post': 'batch'}),
+        name='patient-batch'),
+
+    path(
+        '/import',
+        PatientViewSet.as_view({'post': 'bulk_import'}),
+        name='patient-import'),
+
+    path(
+        '/merge-suggestions',
+        MergeSuggestionViewSet.as_view({'get': 'list'}),
+        name='merge-suggestion-list'),
+
+    path(
+        '/merge-suggestions/<int:pk>',
+        MergeSuggestionViewSet.as_view({'get': 'retrieve'}),
+        name='merge-suggestion-detail'),
+
+    path(
+        '/merge-suggestions/<int:pk>/merge',
+        MergeSuggestionViewSet.as_view({'post': 'merge'}),
+        name='merge-suggestion-merge'),
+
+    path(
+        '/merge-suggestions/<int:pk>/dismiss',
+        MergeSuggestionViewSet.as_view({'post': 'dismiss'}),
+        name='merge-suggestion-dismiss'),
+
     path(
         '/<int:pk>',
         PatientViewSet.as_view({
@@ -1 +1,2 @@
-from .patient import PatientViewSet
\ No newline at end of file
+from .patient import PatientViewSet
+from .merge_suggestion import MergeSuggestionViewSet
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+merge_suggestion.py
+~~~~~~~~~~~~~~~~~~~
+API endpoints for reviewing duplicate-patient merge suggestions written by
+``python manage.py dedupe_patients``.
+"""
+
+import logging
+from django.db import DatabaseError
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from core.pagination import ApproximateCountPagination
+from patients.dedupe import merge_patients
+from patients.models import MergeSuggestion
+from patients.serializers import MergeSuggestionSerializer, PatientSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class MergeSuggestionViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for admins to review, merge or dismiss duplicate patients.
+
+    Public Methods
+    --------------
+    list(request, *args, **kwargs)
+        Retrieve paginated suggestions, highest score first.
+
+    merge(request, pk)
+        Merge the suggestion's duplicate patient into its primary.
+
+    dismiss(request, pk)
+        Mark the suggestion as not a duplicate.
+
+    Attributes
+    ----------
+    queryset : QuerySet
+        Suggestions with both patients joined.
+    serializer_class : Serializer
+        Serializer embedding both patient records.
+    permission_classes : list
+        Permissions required (admin users only).
+    pagination_class : ApproximateCountPagination
+        Page-number pagination with cached / estimated counts for large lists.
+    filterset_fields : list
+        Fields that support filtering (``status``).
+
+    Raises
+    ------
+    DatabaseError
+        If database operations fail.
+    """
+
+    queryset = MergeSuggestion.objects.select_related("primary", "duplicate")
+    serializer_class = MergeSuggestionSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = ApproximateCountPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["status"]
+
+    @action(detail=True, methods=["post"])
+    def merge(self, request, pk=None):
+        """
+        Merge the duplicate patient into the primary.
+
+        Steps
+        -----
+        1. Load the suggestion; dismissed suggestions are rejected.
+        2. Re-point the duplicate's heart rates and delete it.
+        3. Return the surviving patient and the number of rows moved.
+        """
+        try:
+            suggestion = self.get_object()
+            if suggestion.status == MergeSuggestion.DISMISSED:
+                return Response(
+                    {"detail": "Suggestion was dismissed; the patients are not duplicates."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            moved = merge_patients(suggestion.primary, [suggestion.duplicate])
+            logger.info("Admin %s merged suggestion %s.", request.user.username, pk)
+            return Response(
+                {
+                    "patient": PatientSerializer(suggestion.primary).data,
+                    "heart_rates_moved": moved,
+                },
+                status=status.HTTP_200_OK,
+            )
+        except DatabaseError as db_err:
+            logger.error("Database error while merging patients: %s", db_err)
+            return Response(
+                {"detail": "Database error while merging patients."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=True, methods=["post"])
+    def dismiss(self, request, pk=None):
+        """
+        Mark the suggestion as not a duplicate.
+
+        Dismissed pairs are kept so later dedupe runs do not suggest them again.
+        """
+        try:
+            suggestion = self.get_object()
+            suggestion.status = MergeSuggestion.DISMISSED
+            suggestion.save(update_fields=["status"])
+            return Response(self.get_serializer(suggestion).data, status=status.HTTP_200_OK)
+        except DatabaseError as db_err:
+            logger.error("Database error while dismissing suggestion: %s", db_err)
+            return Response(
+                {"detail": "Database error while dismissing suggestion."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
@@ -6,26 +6,60 @@ Supports CRUD operations with pagination, filtering, and search.
 """
 
 import logging
+from datetime import timedelta
+from django.conf import settings
 from django.db import DatabaseError
+from django.utils import timezone
 from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from core.batch import BatchRetrieveMixin
+from core.conditional import ConditionalReadMixin, make_etag, not_modified, set_validators
+from core.metrics import BATCH_SIZE, INGESTED_ROWS
+from core.ownership import OwnerScopedMixin
+from core.pagination import ApproximateCountPagination
+from core.profiling import ProfilingMixin
+from core.response_cache import cache_response, owner_tag
+from core.sparse_fields import SparseFieldsMixin
+from patients.filters import PatientSearchFilter
+from patients.importer import ImportFormatError, import_patients, parse_rows
 from patients.models import Patient
-from patients.serializers import PatientSerializer
+from patients.search import patient_autocomplete_index
+from patients.serializers import PatientSerializer, PatientVitalsSummarySerializer
+from users.serializers import LocationSerializer
+from vitals.annotations import with_vitals_summary
+from vitals.models import HeartRate
+from vitals.serializers import HeartRateSerializer
+from vitals.stats import window_stats
 
 # Configure module-level logger
 logger = logging.getLogger(__name__)
 
 
-class PatientViewSet(viewsets.ModelViewSet):
+class PatientViewSet(
+    ProfilingMixin, BatchRetrieveMixin, SparseFieldsMixin, ConditionalReadMixin, OwnerScopedMixin, viewsets.ModelViewSet
+):
     """
     API endpoint to manage patients (create, retrieve, list, update, delete).
 
     Public Methods
     --------------
     list(request, *args, **kwargs)
-        Retrieve paginated patient records with search and ordering.
+        Retrieve paginated patient records with search and ordering;
+        ``?fields=`` selects and renders only the named fields
+        (``SparseFieldsMixin``).
+
+    retrieve(request, *args, **kwargs)
+        Retrieve one patient; 304 when ``If-None-Match`` / ``If-Modified-Since``
+        still match (``ConditionalReadMixin``).
+
+    batch(request)
+        Retrieve many patients by id (``?ids=`` or POST body) in one query,
+        in request order, with missing ids reported (``BatchRetrieveMixin``).
+
+    get_cache_tags()
+        Response-cache tags for list / retrieve reads.
 
     create(request, *args, **kwargs)
         Add a new patient record linked to the logged-in user.
@@ -33,22 +67,42 @@ class PatientViewSet(viewsets.ModelViewSet):
     perform_create(serializer)
         Assign the logged-in user as the owner of the patient record.
 
+    get_includes()
+        Optional extras requested with ``?include=`` on reads.
+
+    autocomplete(request)
+        Suggest the requesting user's patients by name prefix from memory.
+
+    bulk_import(request)
+        Import many patients from CSV / JSON with batched queries.
+
+    timeline(request, pk)
+        Patient, location, recent readings and window stats in one response.
+
     Attributes
     ----------
     queryset : QuerySet
-        All patient records.
+        All patient records; ``get_queryset`` scopes them to the requesting
+        user (admins see all) via ``OwnerScopedMixin``.
+    owner_field : str
+        Lookup to the owning user, served by the ``(user, -created_at)`` index.
     serializer_class : Serializer
         Serializer for patient validation and transformation.
     permission_classes : list
         Permissions required (authenticated users only).
-    pagination_class : PageNumberPagination
-        Built-in pagination strategy.
+    pagination_class : ApproximateCountPagination
+        Page-number pagination with cached / estimated counts for large lists.
     filter_backends : list
         Filters enabled for search and ordering.
     search_fields : list
-        Fields that support searching.
+        Fields that support searching. Matched by ``PatientSearchFilter``
+        through the indexed, ranked patient search backend.
     ordering_fields : list
         Fields that support ordering.
+    includes : set
+        Values accepted by ``?include=`` (comma separated). ``vitals_summary``
+        embeds last bpm, readings today and the 24h average per patient,
+        computed as subquery annotations in the same query as the page.
 
     Raises
     ------
@@ -59,13 +113,71 @@ class PatientViewSet(viewsets.ModelViewSet):
     """
 
     queryset = Patient.objects.all()
+    owner_field = "user"
     serializer_class = PatientSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = PageNumberPagination
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = ApproximateCountPagination
+    filter_backends = [PatientSearchFilter, filters.OrderingFilter]
     search_fields = ["first_name", "last_name", "email"]
     ordering_fields = ["created_at", "first_name"]
+    includes = {"vitals_summary"}
+
+    def get_includes(self):
+        """
+        Parse ``?include=`` for read requests.
 
+        Returns
+        -------
+        set
+            Requested values from ``includes``; unknown values are ignored.
+        """
+        if self.request.method != "GET":
+            return set()
+        raw = self.request.query_params.get("include", "")
+        return {value.strip() for value in raw.split(",")} & self.includes
+
+    def get_queryset(self):
+        """
+        Owner-scoped patients, annotated with ``vitals_*`` summaries when
+        ``include=vitals_summary`` is requested.
+        """
+        queryset = super().get_queryset()
+        if "vitals_summary" in self.get_includes():
+            queryset = with_vitals_summary(queryset)
+        return queryset
+
+    def get_serializer_class(self):
+        """Use the summary-embedding serializer for ``include=vitals_summary``."""
+        if "vitals_summary" in self.get_includes():
+            return PatientVitalsSummarySerializer
+        return super().get_serializer_class()
+
+    def conditional_reads_enabled(self):
+        """Vitals summaries depend on the clock and other tables, so skip validation."""
+        return not self.get_includes()
+
+    def get_cache_tags(self):
+        """
+        Tags invalidating cached reads (see ``core.response_cache``).
+
+        Returns
+        -------
+        list | None
+            ``patient:<pk>`` for a detail read, the requesting user's
+            ``patients`` tag for lists, or None (not cached) when extras are
+            included.
+        """
+        if self.get_includes():
+            return None
+        if self.action == "retrieve":
+            return [f"patient:{self.kwargs['pk']}"]
+        return [owner_tag("patients", self.request.user)]
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @cache_response
     def list(self, request, *args, **kwargs):
         """
         Retrieve paginated patient records.
@@ -74,30 +186,37 @@ class PatientViewSet(viewsets.ModelViewSet):
         -----
         1. Log request for fetching patients.
         2. Apply filters, search, and ordering.
-        3. Paginate the queryset.
-        4. Serialize results.
-        5. Return paginated response.
+        3. Return 304 if the list's ETag (row count, latest ``updated_at``,
+           request path) matches ``If-None-Match``.
+        4. Paginate the queryset.
+        5. Serialize results.
+        6. Return paginated response with the ETag.
         """
         try:
             logger.info("Fetching patient records...")
             queryset = self.filter_queryset(self.get_queryset())
+            etag = self.get_list_etag(queryset)
+            cached = not_modified(request, etag)
+            if cached is not None:
+                return cached
+
             page = self.paginate_queryset(queryset)
 
             if page is not None:
                 serializer = self.get_serializer(page, many=True)
                 logger.info("Patients retrieved successfully.")
-                return self.get_paginated_response(serializer.data)
+                return set_validators(self.get_paginated_response(serializer.data), etag)
 
             serializer = self.get_serializer(queryset, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return set_validators(Response(serializer.data, status=status.HTTP_200_OK), etag)
         except DatabaseError as db_err:
-            logger.error(f"Database error while fetching patients: {db_err}")
+            logger.error("Database error while fetching patients: %s", db_err)
             return Response(
                 {"detail": "Database error while fetching patient data."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
         except Exception as ex:
-            logger.error(f"Unexpected error in patient list: {ex}")
+            logger.error("Unexpected error in patient list: %s", ex)
             return Response(
                 {"detail": "An unexpected error occurred."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -119,19 +238,19 @@ class PatientViewSet(viewsets.ModelViewSet):
             serializer = self.get_serializer(data=request.data, context={"request": request})
             if serializer.is_valid():
                 patient = serializer.save(user=request.user)
-                logger.info(f"Patient created successfully with ID {patient.id}")
+                logger.info("Patient created successfully with ID %s", patient.id)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-            logger.warning(f"Validation failed for patient creation: {serializer.errors}")
+            logger.warning("Validation failed for patient creation: %s", serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except DatabaseError as db_err:
-            logger.error(f"Database error while creating patient: {db_err}")
+            logger.error("Database error while creating patient: %s", db_err)
             return Response(
                 {"detail": "Database error while saving patient."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
         except Exception as ex:
-            logger.error(f"Unexpected error in patient creation: {ex}")
+            logger.error("Unexpected error in patient creation: %s", ex)
             return Response(
                 {"detail": "An unexpected error occurred."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -148,11 +267,219 @@ class PatientViewSet(viewsets.ModelViewSet):
         """
         try:
             serializer.save(user=self.request.user)
-            logger.info(f"Patient created for user {self.request.user.username}")
+            logger.info("Patient created for user %s", self.request.user.username)
         except DatabaseError as db_err:
-            logger.error(f"Database error in perform_create: {db_err}")
+            logger.error("Database error in perform_create: %s", db_err)
             raise
         except Exception as ex:
-            logger.error(f"Unexpected error in perform_create: {ex}")
+            logger.error("Unexpected error in perform_create: %s", ex)
             raise
 
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        """
+        Suggest patients whose name starts with the typed text.
+
+        Served from the in-process ``patient_autocomplete_index``; only the
+        first keystroke after a (re)build reads the database.
+
+        Steps
+        -----
+        1. Read ``q`` and ``limit`` from the query string.
+        2. Look up the requesting user's prefix index.
+        3. Return the matching patients' ids and names.
+
+        Query Parameters
+        ----------------
+        q : str
+            Typed text, matched against "first last" and "last first".
+        limit : int
+            Maximum suggestions (default ``PATIENT_AUTOCOMPLETE_LIMIT``).
+
+        Returns
+        -------
+        Response
+            ``{"results": [{"id", "first_name", "last_name"}, ...]}``
+        """
+        try:
+            try:
+                limit = int(request.query_params.get("limit", settings.PATIENT_AUTOCOMPLETE_LIMIT))
+            except ValueError:
+                return Response({"detail": "Invalid limit."}, status=status.HTTP_400_BAD_REQUEST)
+            limit = max(1, min(limit, settings.PATIENT_AUTOCOMPLETE_MAX_LIMIT))
+            results = patient_autocomplete_index.complete(
+                request.user.id, request.query_params.get("q", ""), limit
+            )
+            return Response({"results": results}, status=status.HTTP_200_OK)
+        except DatabaseError as db_err:
+            logger.error("Database error while building autocomplete index: %s", db_err)
+            return Response(
+                {"detail": "Database error while fetching patient data."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        except Exception as ex:
+            logger.error("Unexpected error in patient autocomplete: %s", ex)
+            return Response(
+                {"detail": "An unexpected error occurred."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["post"], url_path="import")
+    def bulk_import(self, request):
+        """
+        Import patients for the logged-in user from CSV or JSON.
+
+        Steps
+        -----
+        1. Read rows from an uploaded ``file`` (``.csv`` / ``.json``) or from
+           a JSON body (a list, or ``{"patients": [...]}``).
+        2. Validate every row in memory.
+        3. Per batch, check existing patients and locations with one query
+           each and insert the rest with ``bulk_create``.
+        4. Return counts and a per-row error report.
+
+        Query Parameters
+        ----------------
+        dry_run : bool
+            Validate and check duplicates without inserting.
+
+        Returns
+        -------
+        Response
+            ``{"total", "created", "failed", "dry_run", "errors": [{"row", "errors"}]}``
+            with 201 when any patient was created, otherwise 200.
+        """
+        try:
+            upload = request.FILES.get("file")
+            try:
+                if upload is not None:
+                    is_json = upload.name.lower().endswith(".json") or upload.content_type == "application/json"
+                    rows = parse_rows(upload.read(), "json" if is_json else "csv")
+                else:
+                    rows = parse_rows(request.data, "json")
+            except ImportFormatError as exc:
+                return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+            if len(rows) > settings.PATIENT_IMPORT_MAX_ROWS:
+                return Response(
+                    {"detail": f"At most {settings.PATIENT_IMPORT_MAX_ROWS} rows per import."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            dry_run = request.query_params.get("dry_run", "").lower() in ("1", "true", "yes")
+            logger.info("Importing %s patient row(s) for user %s...", len(rows), request.user.username)
+            result = import_patients(rows, request.user, dry_run=dry_run)
+            BATCH_SIZE.observe("import", "patient", value=len(rows))
+            if not dry_run:
+                INGESTED_ROWS.inc("patient", amount=len(result.created))
+            return Response(
+                result.report(),
+                status=status.HTTP_201_CREATED if result.created else status.HTTP_200_OK,
+            )
+        except DatabaseError as db_err:
+            logger.error("Database error while importing patients: %s", db_err)
+            return Response(
+                {"detail": "Database error while importing patients."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        except Exception as ex:
+            logger.error("Unexpected error in patient import: %s", ex)
+            return Response(
+                {"detail": "An unexpected error occurred."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=True, methods=["get"])
+    def timeline(self, request, pk=None):
+        """
+        Return everything the patient detail screen needs in one response.
+
+        Built with three queries (patient + location, one aggregate, recent
+        readings); a matching ``If-None-Match`` is answered with 304 after the
+        first two.
+
+        Steps
+        -----
+        1. Load the patient and location with one joined query.
+        2. Aggregate window statistics plus the count, oldest ``recorded_at``
+           and latest ``updated_at`` of the readings the response can show
+           (window and latest ``limit``) in one query; derive the ETag.
+        3. Return 304 if the client's ETag still matches.
+        4. Otherwise load the last ``limit`` readings and respond.
+
+        Query Parameters
+        ----------------
+        limit : int
+            Recent readings to include (default ``PATIENT_TIMELINE_READINGS``).
+        window : int
+            Statistics window in hours (default ``PATIENT_TIMELINE_WINDOW_HOURS``).
+
+        Returns
+        -------
+        Response
+            ``{"patient", "location", "readings", "stats"}`` with an ``ETag``.
+        """
+        try:
+            try:
+                limit = int(request.query_params.get("limit", settings.PATIENT_TIMELINE_READINGS))
+                window_hours = int(request.query_params.get("window", settings.PATIENT_TIMELINE_WINDOW_HOURS))
+            except ValueError:
+                return Response({"detail": "Invalid limit or window."}, status=status.HTTP_400_BAD_REQUEST)
+            limit = max(1, min(limit, settings.PATIENT_TIMELINE_MAX_READINGS))
+            window_hours = max(1, min(window_hours, settings.PATIENT_TIMELINE_MAX_WINDOW_HOURS))
+
+            patient = self.get_queryset().select_related("place").filter(pk=pk).first()
+            if patient is None:
+                return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+            location = patient.place
+
+            window_start = timezone.now() - timedelta(hours=window_hours)
+            stats = window_stats(patient.pk, window_start, recent=limit)
+            # The window count changes as readings age out, so the ETag does
+            # too; a Last-Modified date could not express that.
+            etag = make_etag(
+                "timeline", patient.pk, patient.updated_at.isoformat(),
+                location.pk if location else None,
+                location.updated_at.isoformat() if location else None,
+                stats["total"], stats["first_recorded"], stats["last_modified"], stats["count"],
+                limit, window_hours,
+            )
+            cached = not_modified(request, etag=etag)
+            if cached is not None:
+                return cached
+
+            readings = list(
+                HeartRate.objects.filter(patient_id=patient.pk)
+                .select_related("recorded_by")
+                .order_by("-recorded_at")[:limit]
+            )
+            for reading in readings:
+                reading.patient = patient
+
+            context = self.get_serializer_context()
+            data = {
+                "patient": PatientSerializer(patient, context=context).data,
+                "location": LocationSerializer(location, context=context).data if location else None,
+                "readings": HeartRateSerializer(readings, many=True, context=context).data,
+                "stats": {
+                    "window_hours": window_hours,
+                    "window_start": window_start,
+                    "count": stats["count"],
+                    "min_bpm": stats["min_bpm"],
+                    "max_bpm": stats["max_bpm"],
+                    "avg_bpm": stats["avg_bpm"],
+                },
+            }
+            return set_validators(Response(data, status=status.HTTP_200_OK), etag=etag)
+        except DatabaseError as db_err:
+            logger.error("Database error while building patient timeline: %s", db_err)
+            return Response(
+                {"detail": "Database error while fetching patient data."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        except Exception as ex:
+            logger.error("Unexpected error in patient timeline: %s", ex)
+            return Response(
+                {"detail": "An unexpected error occurred."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
@@ -0,0 +1,93 @@
+"""
+changelog.py
+~~~~~~~~~~~~
+Helpers for appending to the sync change log.
+
+Signal receivers in ``sync/signals.py`` cover single-row saves and deletes.
+Code paths that bypass model signals (``bulk_create``, ``QuerySet.update``,
+``QuerySet.delete``) must call ``record_changes`` themselves so the feed
+stays complete.
+"""
+
+import base64
+import binascii
+import logging
+from sync.models import Change
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+CURSOR_VERSION = "c1"
+
+
+def record_change(kind, object_id, action=Change.UPSERT, user_id=None):
+    """
+    Append a single entry to the change log.
+
+    Args:
+        kind (str): One of ``Change.KIND_CHOICES``.
+        object_id (int): Primary key of the changed record.
+        action (str): ``Change.UPSERT`` or ``Change.DELETE``.
+        user_id (int | None): Owner of the record.
+    """
+    Change.objects.create(kind=kind, object_id=object_id, action=action, user_id=user_id)
+
+
+def record_changes(kind, rows, action=Change.UPSERT):
+    """
+    Append entries for many records in batched INSERTs.
+
+    Args:
+        kind (str): One of ``Change.KIND_CHOICES``.
+        rows (Iterable[tuple[int, int | None]]): ``(object_id, user_id)`` pairs.
+        action (str): ``Change.UPSERT`` or ``Change.DELETE``.
+
+    Returns:
+        int: Number of entries written.
+    """
+    entries = [
+        Change(kind=kind, object_id=object_id, action=action, user_id=user_id)
+        for object_id, user_id in rows
+    ]
+    Change.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+    logger.debug("Recorded %d %s %s change(s).", len(entries), action, kind)
+    return len(entries)
+
+
+def encode_cursor(change_id):
+    """
+    Encode a change-log position as an opaque cursor string.
+
+    Args:
+        change_id (int): Primary key of the last change the client has seen.
+
+    Returns:
+        str: URL-safe cursor.
+    """
+    return base64.urlsafe_b64encode(f"{CURSOR_VERSION}:{change_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode an opaque cursor back into a change-log position.
+
+    Args:
+        cursor (str | None): Cursor previously returned by the feed. Empty
+            means "from the beginning".
+
+    Returns:
+        int: Primary key of the last change the client has seen.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        version, change_id = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+        if version != CURSOR_VERSION:
+            raise ValueError(version)
+        return int(change_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error) as exc:
+        raise ValueError("Invalid sync cursor.") from exc
@@ -0,0 +1,49 @@
+"""
+Seed the change log with an upsert for every existing Patient, Location and
+HeartRate, so a client starting from an empty cursor receives the full
+dataset through the feed. Uses set-based INSERT ... SELECT statements.
+"""
+
+from django.db import migrations
+
+
+def backfill(apps, schema_editor):
+    Change = apps.get_model("sync", "Change")
+    Patient = apps.get_model("patients", "Patient")
+    Location = apps.get_model("users", "Location")
+    HeartRate = apps.get_model("vitals", "HeartRate")
+    qn = schema_editor.connection.ops.quote_name
+    change = qn(Change._meta.db_table)
+    columns = "(kind, object_id, action, user_id, changed_at)"
+    statements = [
+        f"INSERT INTO {change} {columns} "
+        f"SELECT 'location', id, 'upsert', NULL, updated_at "
+        f"FROM {qn(Location._meta.db_table)} ORDER BY id",
+        f"INSERT INTO {change} {columns} "
+        f"SELECT 'patient', id, 'upsert', user_id, updated_at "
+        f"FROM {qn(Patient._meta.db_table)} ORDER BY id",
+        f"INSERT INTO {change} {columns} "
+        f"SELECT 'heart_rate', hr.id, 'upsert', p.user_id, hr.updated_at "
+        f"FROM {qn(HeartRate._meta.db_table)} hr "
+        f"JOIN {qn(Patient._meta.db_table)} p ON p.id = hr.patient_id ORDER BY hr.id",
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def clear(apps, schema_editor):
+    apps.get_model("sync", "Change").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0001_initial"),
+        ("patients", "0002_initial"),
+        ("vitals", "0002_partition_heartrate"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, clear),
+    ]
@@ -0,0 +1 @@
+from .change import Change
\ No newline at end of file
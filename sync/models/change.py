@@ -0,0 +1,92 @@
+"""
+change.py
+
+This module contains the Change model, an append-only log of created, updated
+and deleted Patient, Location and HeartRate rows. Its auto-increment primary
+key is the position clients sync from.
+
+Created On: 19 Oct 2026
+"""
+
+from django.db import models
+from users.models import User
+
+
+class Change(models.Model):
+    """
+    Represents one change to a synced record.
+
+    Attributes:
+        kind: Type of record that changed (patient, location, heart_rate).
+        object_id: Primary key of the changed record.
+        action: Whether the record was created/updated (upsert) or deleted.
+        user: Owner of the record, used to scope the feed. Null for shared data.
+        changed_at: Timestamp when the change was logged.
+    """
+
+    PATIENT = "patient"
+    LOCATION = "location"
+    HEART_RATE = "heart_rate"
+    KIND_CHOICES = [
+        (PATIENT, "Patient"),
+        (LOCATION, "Location"),
+        (HEART_RATE, "Heart Rate"),
+    ]
+
+    UPSERT = "upsert"
+    DELETE = "delete"
+    ACTION_CHOICES = [
+        (UPSERT, "Upsert"),
+        (DELETE, "Delete"),
+    ]
+
+    kind: str = models.CharField(
+        max_length=20,
+        choices=KIND_CHOICES,
+        help_text="Type of record that changed."
+    )
+    object_id: int = models.BigIntegerField(
+        help_text="Primary key of the changed record."
+    )
+    action: str = models.CharField(
+        max_length=10,
+        choices=ACTION_CHOICES,
+        help_text="Upsert for create/update, delete for removal."
+    )
+    user: User = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="Owner of the changed record. Null for shared reference data."
+    )
+    changed_at: models.DateTimeField = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        help_text="Timestamp when the change was logged."
+    )
+
+    class Meta:
+        """
+        Meta options for the Change model.
+
+        Attributes:
+            ordering: Log order (ascending primary key).
+            indexes: (user, id) index for owner-scoped feeds.
+        """
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['user', 'id'], name='sync_change_user_id_idx'),
+        ]
+        verbose_name = "Change"
+        verbose_name_plural = "Changes"
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of the Change.
+
+        Returns:
+            str: Action, kind and object id.
+        """
+        return f"{self.action} {self.kind} {self.object_id}"
@@ -0,0 +1,51 @@
+"""
+signals.py
+~~~~~~~~~~
+Model signal receivers that feed the sync change log.
+
+Patients and heart rates are logged against their owning user; locations
+are shared reference data and logged without an owner.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.ownership import related_owner_id
+from patients.models import Patient
+from sync.changelog import record_change
+from sync.models import Change
+from users.models import Location
+from vitals.models import HeartRate
+
+
+@receiver(post_save, sender=Patient, dispatch_uid="sync_patient_saved")
+def patient_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_change(Change.PATIENT, instance.pk, Change.UPSERT, instance.user_id)
+
+
+@receiver(post_delete, sender=Patient, dispatch_uid="sync_patient_deleted")
+def patient_deleted(sender, instance, **kwargs):
+    record_change(Change.PATIENT, instance.pk, Change.DELETE, instance.user_id)
+
+
+@receiver(post_save, sender=Location, dispatch_uid="sync_location_saved")
+def location_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_change(Change.LOCATION, instance.pk, Change.UPSERT)
+
+
+@receiver(post_delete, sender=Location, dispatch_uid="sync_location_deleted")
+def location_deleted(sender, instance, **kwargs):
+    record_change(Change.LOCATION, instance.pk, Change.DELETE)
+
+
+@receiver(post_save, sender=HeartRate, dispatch_uid="sync_heart_rate_saved")
+def heart_rate_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_change(Change.HEART_RATE, instance.pk, Change.UPSERT, related_owner_id(instance, "patient"))
+
+
+@receiver(post_delete, sender=HeartRate, dispatch_uid="sync_heart_rate_deleted")
+def heart_rate_deleted(sender, instance, **kwargs):
+    record_change(Change.HEART_RATE, instance.pk, Change.DELETE, related_owner_id(instance, "patient"))
@@ -0,0 +1,62 @@
+"""
+conftest.py
+~~~~~~~~~~~
+Fixtures for sync (change feed) API tests.
+"""
+
+import pytest
+from datetime import date
+from rest_framework.test import APIClient
+from users.models import User, Location
+from patients.models import Patient
+
+
+@pytest.fixture(autouse=True)
+def no_settle_delay(settings):
+    """Serve changes immediately instead of waiting for them to settle."""
+    settings.SYNC_SETTLE_SECONDS = 0
+
+
+@pytest.fixture
+def api_client():
+    """Unauthenticated API client."""
+    return APIClient()
+
+
+@pytest.fixture
+def test_user(db):
+    """Create a test user."""
+    return User.objects.create_user(username="testuser", password="testpass123")
+
+
+@pytest.fixture
+def auth_client(api_client, test_user):
+    """Authenticated API client."""
+    api_client.force_authenticate(user=test_user)
+    return api_client
+
+
+@pytest.fixture
+def test_location(db):
+    """Create a location."""
+    return Location.objects.create(name="Ward A", city="City")
+
+
+@pytest.fixture
+def test_patient(db, test_user, test_location):
+    """Create a patient."""
+    return Patient.objects.create(
+        user=test_user,
+        first_name="John",
+        last_name="Doe",
+        date_of_birth=date(1990, 1, 1),
+        gender="Male",
+        place=test_location,
+    )
+
+
+@pytest.fixture
+def sync_endpoints():
+    """Return full URLs for sync endpoints."""
+    base_url = "http://localhost:8000/api/v1/sync"
+    return {"changes": f"{base_url}/changes"}
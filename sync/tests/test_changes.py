@@ -0,0 +1,60 @@
+"""
+test_changes.py
+~~~~~~~~~~~~~~~
+Tests for the incremental sync change feed.
+"""
+
+import pytest
+from rest_framework import status
+from vitals.models import HeartRate
+
+
+@pytest.mark.django_db
+class TestChangeFeed:
+
+    def test_full_sync_from_empty_cursor(self, auth_client, sync_endpoints, test_patient):
+        HeartRate.objects.create(patient=test_patient, bpm=72)
+        response = auth_client.get(sync_endpoints["changes"])
+        assert response.status_code == status.HTTP_200_OK
+        assert [p["id"] for p in response.data["patients"]] == [test_patient.id]
+        assert len(response.data["locations"]) == 1
+        assert len(response.data["heart_rates"]) == 1
+        assert response.data["has_more"] is False
+
+    def test_incremental_sync_returns_only_new_changes(self, auth_client, sync_endpoints, test_patient):
+        cursor = auth_client.get(sync_endpoints["changes"]).data["cursor"]
+
+        reading = HeartRate.objects.create(patient=test_patient, bpm=90)
+        response = auth_client.get(sync_endpoints["changes"], {"cursor": cursor})
+        assert response.data["patients"] == []
+        assert [hr["id"] for hr in response.data["heart_rates"]] == [reading.id]
+
+        again = auth_client.get(sync_endpoints["changes"], {"cursor": response.data["cursor"]})
+        assert again.data["heart_rates"] == []
+
+    def test_deletes_are_reported_as_tombstones(self, auth_client, sync_endpoints, test_patient):
+        reading = HeartRate.objects.create(patient=test_patient, bpm=90)
+        cursor = auth_client.get(sync_endpoints["changes"]).data["cursor"]
+
+        reading_id = reading.id
+        reading.delete()
+        response = auth_client.get(sync_endpoints["changes"], {"cursor": cursor})
+        assert response.data["heart_rates"] == []
+        assert response.data["deleted"]["heart_rates"] == [reading_id]
+
+    def test_pagination_with_limit(self, auth_client, sync_endpoints, test_patient):
+        for bpm in (60, 70, 80):
+            HeartRate.objects.create(patient=test_patient, bpm=bpm)
+        first = auth_client.get(sync_endpoints["changes"], {"limit": 2})
+        assert first.data["has_more"] is True
+        rest = auth_client.get(sync_endpoints["changes"], {"cursor": first.data["cursor"], "limit": 100})
+        assert rest.data["has_more"] is False
+        assert len(rest.data["heart_rates"]) == 3
+
+    def test_invalid_cursor(self, auth_client, sync_endpoints):
+        response = auth_client.get(sync_endpoints["changes"], {"cursor": "not-a-cursor"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_unauthenticated(self, api_client, sync_endpoints):
+        response = api_client.get(sync_endpoints["changes"])
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
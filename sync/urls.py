@@ -0,0 +1,16 @@
+"""
+sync/urls.py
+~~~~~~~~~~~~
+Defines URL patterns for the incremental sync (change feed) endpoint.
+"""
+
+from django.urls import path
+from .views import SyncViewSet
+
+
+urlpatterns = [
+    path(
+        'changes',
+        SyncViewSet.as_view({'get': 'changes'}),
+        name='sync-changes'),
+]
@@ -0,0 +1 @@
+from .changes import SyncViewSet
\ No newline at end of file
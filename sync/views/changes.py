@@ -0,0 +1,164 @@
+"""
+changes.py
+~~~~~~~~~~
+Incremental sync ("changes since") API for patients, locations and vitals.
+
+Clients keep the opaque ``cursor`` from each response and send it back to
+receive only what changed since. Each page is read from the indexed change
+log, deduplicated per record, and the surviving records are loaded with one
+query per record type.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from core.ownership import sees_all_records
+from patients.models import Patient
+from patients.serializers import PatientSerializer
+from sync.changelog import decode_cursor, encode_cursor
+from sync.models import Change
+from users.models import Location
+from users.serializers import LocationSerializer
+from vitals.models import HeartRate
+from vitals.serializers import HeartRateSerializer
+
+logger = logging.getLogger(__name__)
+
+# Response key, queryset and serializer for each change kind.
+FEEDS = {
+    Change.PATIENT: ("patients", lambda: Patient.objects.all(), PatientSerializer),
+    Change.LOCATION: ("locations", lambda: Location.objects.all(), LocationSerializer),
+    Change.HEART_RATE: (
+        "heart_rates",
+        lambda: HeartRate.objects.select_related("patient", "recorded_by"),
+        HeartRateSerializer,
+    ),
+}
+
+
+class SyncViewSet(viewsets.ViewSet):
+    """
+    API endpoint returning records changed since a cursor.
+
+    Public Methods
+    --------------
+    changes(request)
+        Return one page of upserted records and tombstones after ``cursor``.
+
+    Attributes
+    ----------
+    permission_classes : list
+        Permissions required (authenticated users only).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get_change_queryset(self):
+        """
+        Change-log entries visible to the requesting user.
+
+        Returns
+        -------
+        QuerySet
+            Entries for records the user owns plus unowned shared records
+            (locations); every entry for admins.
+        """
+        user = self.request.user
+        if sees_all_records(user):
+            return Change.objects.all()
+        return Change.objects.filter(Q(user=user) | Q(user__isnull=True))
+
+    @action(detail=False, methods=["get"])
+    def changes(self, request):
+        """
+        Return records created, updated or deleted after ``cursor``.
+
+        Steps
+        -----
+        1. Decode the cursor and page size from the query string.
+        2. Read the next page of change-log entries by primary key, stopping at
+           entries younger than ``SYNC_SETTLE_SECONDS``.
+        3. Keep the last action per record.
+        4. Load surviving records with one query per type and serialize them.
+        5. Return records, tombstones, the next cursor and ``has_more``.
+
+        Query Parameters
+        ----------------
+        cursor : str
+            Opaque cursor from a previous response. Omit for a full sync.
+        limit : int
+            Maximum number of change-log entries to consume.
+
+        Returns
+        -------
+        Response
+            ``{"cursor", "has_more", "patients", "locations", "heart_rates",
+            "deleted": {"patients", "locations", "heart_rates"}}``
+        """
+        try:
+            try:
+                after = decode_cursor(request.query_params.get("cursor"))
+                limit = int(request.query_params.get("limit", settings.SYNC_PAGE_SIZE))
+            except ValueError:
+                return Response(
+                    {"detail": "Invalid cursor or limit."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            limit = max(1, min(limit, settings.SYNC_MAX_PAGE_SIZE))
+
+            entries = list(
+                self.get_change_queryset()
+                .filter(id__gt=after)
+                .order_by("id")
+                .values_list("id", "kind", "object_id", "action", "changed_at")[:limit + 1]
+            )
+            has_more = len(entries) > limit
+            entries = entries[:limit]
+
+            settled_before = timezone.now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+            for index, entry in enumerate(entries):
+                if entry[4] > settled_before:
+                    # Newer entries are picked up on the next poll.
+                    entries = entries[:index]
+                    has_more = False
+                    break
+
+            latest = {}
+            for _, kind, object_id, change_action, _ in entries:
+                latest[(kind, object_id)] = change_action
+
+            payload = {
+                "cursor": encode_cursor(entries[-1][0] if entries else after),
+                "has_more": has_more,
+                "deleted": {},
+            }
+            for kind, (key, queryset, serializer_class) in FEEDS.items():
+                upserted = [oid for (k, oid), act in latest.items() if k == kind and act == Change.UPSERT]
+                deleted = [oid for (k, oid), act in latest.items() if k == kind and act == Change.DELETE]
+                records = queryset().filter(id__in=upserted).order_by("id") if upserted else []
+                payload[key] = serializer_class(records, many=True, context={"request": request}).data
+                payload["deleted"][key] = deleted
+
+            logger.info("Sync page served with %s change(s), has_more=%s", len(entries), has_more)
+            return Response(payload, status=status.HTTP_200_OK)
+        except DatabaseError as db_err:
+            logger.error("Database error while reading changes: %s", db_err)
+            return Response(
+                {"detail": "Database error while reading changes."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        except Exception as ex:
+            logger.error("Unexpected error in changes: %s", ex)
+            return Response(
+                {"detail": "An unexpected error occurred."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from core.metrics import registry
+        from users import signals  # noqa: F401  (connects token revocation)
+        from users.authentication import require_shared_caches
+        from users.password_hashing import collect_password_pool
+
+        registry.add_collector(collect_password_pool)
+        require_shared_caches()
@@ -0,0 +1,324 @@
+"""
+authentication.py
+~~~~~~~~~~~~~~~~~
+JWT authentication without a user query per request.
+
+``CachedJWTAuthentication`` (the default authentication class) verifies the
+token signature and expiry as usual, checks the denylist and then resolves
+the user from a bounded, per-process LRU keyed by the token id (``jti``),
+valid until the token expires. Only the first request of each token loads
+the ``User`` row.
+
+``JWTClaimsAuthentication`` goes further for ingest endpoints (see
+``IngestAuthenticationMixin``): it builds the user from the ``username`` /
+``is_staff`` / ``is_superuser`` claims that ``issue_tokens`` adds, so the
+request never touches the database for authentication. Ingest endpoints also
+accept ``DeviceSignatureAuthentication``: requests signed with a device
+secret (``sign_device_request``), verified against the in-memory
+``users.device_keys`` cache and attributed to the device and its owner.
+
+Revocation goes through ``token_denylist``: single tokens (logout) are kept
+until they would have expired anyway, and a per-user cutoff rejects every
+token issued before a deactivation, password or role change (see
+``users/signals.py``). The denylist lives in the shared cache, so it applies
+to all processes; each check is one ``get_many``. ``require_shared_caches``
+stops startup when that cache is process-local outside DEBUG.
+"""
+
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.device_keys import device_keys
+from users.models import User
+
+CLAIMS = ("username", "is_staff", "is_superuser")
+ISSUED_CLAIM = "iat_us"
+
+
+def issue_tokens(user):
+    """
+    Create a refresh token (and its access token) carrying the user claims.
+
+    ``ISSUED_CLAIM`` holds the issue time in microseconds, so a revocation
+    cutoff can tell tokens issued in the same second apart.
+
+    Returns:
+        RefreshToken: ``str(token)`` / ``str(token.access_token)`` to send.
+    """
+    refresh = RefreshToken.for_user(user)
+    for claim in CLAIMS:
+        refresh[claim] = getattr(user, claim)
+    refresh[ISSUED_CLAIM] = int(time.time() * 1_000_000)
+    return refresh
+
+
+class TokenDenylist:
+    """
+    Revoked token ids and per-user revocation cutoffs, in the shared cache.
+
+    Entries expire with the tokens they revoke, so the denylist only ever
+    holds tokens that would otherwise still be accepted.
+    """
+
+    prefix = "jwt:deny"
+
+    @property
+    def cache(self):
+        return caches[settings.JWT_DENYLIST_CACHE_ALIAS]
+
+    def revoke(self, token):
+        """Reject ``token`` (a validated simplejwt token) from now on."""
+        ttl = max(int(token["exp"] - time.time()), 1)
+        self.cache.set(f"{self.prefix}:{token[api_settings.JTI_CLAIM]}", 1, ttl)
+
+    def revoke_user(self, user_id):
+        """
+        Reject every token of ``user_id`` issued up to now.
+
+        The cutoff is in microseconds and compared with ``ISSUED_CLAIM``, so
+        a login right after a password change stays valid. Tokens without
+        the claim only have the whole-second ``iat`` and are rejected when
+        issued in the revoking second.
+        """
+        ttl = int((api_settings.REFRESH_TOKEN_LIFETIME + api_settings.ACCESS_TOKEN_LIFETIME).total_seconds())
+        self.cache.set(f"{self.prefix}:user:{user_id}", int(time.time() * 1_000_000), ttl)
+        user_cache.evict_user(user_id)
+
+    def is_revoked(self, token):
+        jti_key = f"{self.prefix}:{token.get(api_settings.JTI_CLAIM)}"
+        user_key = f"{self.prefix}:user:{token.get(api_settings.USER_ID_CLAIM)}"
+        found = self.cache.get_many([jti_key, user_key])
+        if jti_key in found:
+            return True
+        cutoff = found.get(user_key)
+        if cutoff is None:
+            return False
+        issued = token.get(ISSUED_CLAIM)
+        if issued is None:
+            issued = token.get("iat", 0) * 1_000_000
+        return issued <= cutoff
+
+
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def require_shared_caches():
+    """
+    Refuse process-local caches for revocation state when ``REQUIRE_SHARED_CACHES``.
+
+    The token denylist (``JWT_DENYLIST_CACHE_ALIAS``) and the ``devices`` tag
+    versions behind ``users.device_keys`` (``RESPONSE_CACHE_ALIAS``) must be
+    seen by every worker: with a per-process cache a logged-out token or a
+    deactivated device keeps working on the other workers.
+
+    Raises:
+        ImproperlyConfigured: If either alias uses a process-local backend.
+    """
+    if not settings.REQUIRE_SHARED_CACHES:
+        return
+    for setting in ("JWT_DENYLIST_CACHE_ALIAS", "RESPONSE_CACHE_ALIAS"):
+        alias = getattr(settings, setting)
+        backend = settings.CACHES[alias]["BACKEND"]
+        if backend in PROCESS_LOCAL_CACHES:
+            raise ImproperlyConfigured(
+                f"{setting} cache {alias!r} uses {backend}, which is not shared between processes. "
+                f"Point it at Redis / Memcached, or set REQUIRE_SHARED_CACHES=False for a single process."
+            )
+
+
+class UserCache:
+    """
+    Bounded LRU of authenticated users keyed by token id.
+
+    Attributes:
+        max_size (int | None): Entry limit; defaults to ``JWT_USER_CACHE_SIZE``.
+    """
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, jti):
+        with self._lock:
+            entry = self._entries.get(jti)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires <= time.time():
+                del self._entries[jti]
+                return None
+            self._entries.move_to_end(jti)
+            return user
+
+    def set(self, jti, user, expires):
+        max_size = self.max_size or settings.JWT_USER_CACHE_SIZE
+        with self._lock:
+            self._entries[jti] = (user, expires)
+            self._entries.move_to_end(jti)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def evict_user(self, user_id):
+        with self._lock:
+            stale = [jti for jti, (user, _) in self._entries.items() if user.pk == user_id]
+            for jti in stale:
+                del self._entries[jti]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+token_denylist = TokenDenylist()
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` with a denylist check and an LRU user lookup.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if token_denylist.is_revoked(token):
+            raise InvalidToken(_("Token has been revoked"))
+        return token
+
+    def get_user(self, validated_token):
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        user = user_cache.get(jti) if jti else None
+        if user is None:
+            user = super().get_user(validated_token)
+            if jti:
+                user_cache.set(jti, user, validated_token["exp"])
+        return user
+
+
+class JWTClaimsAuthentication(CachedJWTAuthentication):
+    """
+    Authenticate from token claims alone, without loading the user.
+
+    The user is a ``User`` holding only ``id`` and the ``CLAIMS``: enough for
+    owner scoping, admin checks and foreign keys, but it must never be
+    saved. Deactivated users are rejected by the denylist cutoff rather
+    than an ``is_active`` check. Tokens issued without the claims fall back
+    to the cached lookup.
+    """
+
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in CLAIMS):
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from exc
+        user = User(
+            **{api_settings.USER_ID_FIELD: int(user_id)},
+            **{claim: validated_token[claim] for claim in CLAIMS},
+        )
+        user._state.adding = False
+        return user
+
+
+DEVICE_ID_HEADER = "HTTP_X_DEVICE_ID"
+DEVICE_TIMESTAMP_HEADER = "HTTP_X_DEVICE_TIMESTAMP"
+DEVICE_SIGNATURE_HEADER = "HTTP_X_DEVICE_SIGNATURE"
+
+
+def sign_device_request(secret, method, path, timestamp, body=b""):
+    """
+    HMAC-SHA256 signature a device sends in ``X-Device-Signature``.
+
+    Args:
+        secret (str | bytes): Device secret.
+        method (str): HTTP method, e.g. ``"POST"``.
+        path (str): Request path including the query string.
+        timestamp (int | str): Unix time sent in ``X-Device-Timestamp``.
+        body (bytes): Raw request body.
+
+    Returns:
+        str: Hex digest of ``"<timestamp>\\n<METHOD>\\n<path>\\n<sha256(body)>"``.
+    """
+    if isinstance(secret, str):
+        secret = secret.encode()
+    message = f"{timestamp}\n{method.upper()}\n{path}\n{hashlib.sha256(body).hexdigest()}"
+    return hmac.new(secret, message.encode(), hashlib.sha256).hexdigest()
+
+
+class DeviceSignatureAuthentication(BaseAuthentication):
+    """
+    Authenticate HMAC-signed requests from registered devices.
+
+    Requests carry ``X-Device-Id``, ``X-Device-Timestamp`` (Unix seconds,
+    within ``DEVICE_SIGNATURE_MAX_SKEW``) and ``X-Device-Signature``. The key
+    comes from ``device_keys`` and each signature is accepted once, so a
+    captured request cannot be replayed. ``request.user`` is the device
+    owner and ``request.auth`` the ``Device``.
+    """
+
+    def authenticate(self, request):
+        device_id = request.META.get(DEVICE_ID_HEADER)
+        if device_id is None:
+            return None
+        timestamp = request.META.get(DEVICE_TIMESTAMP_HEADER, "")
+        signature = request.META.get(DEVICE_SIGNATURE_HEADER, "")
+        if not (device_id.isdigit() and timestamp.isdigit() and signature):
+            raise AuthenticationFailed(_("Malformed device signature headers."))
+        if abs(time.time() - int(timestamp)) > settings.DEVICE_SIGNATURE_MAX_SKEW:
+            raise AuthenticationFailed(_("Device request timestamp outside the allowed window."))
+
+        key = device_keys.get(int(device_id))
+        if key is None:
+            raise AuthenticationFailed(_("Unknown or inactive device."))
+        expected = sign_device_request(key.secret, request.method, request.get_full_path(), timestamp, request.body)
+        if not hmac.compare_digest(expected, signature):
+            raise AuthenticationFailed(_("Invalid device signature."))
+
+        ttl = 2 * settings.DEVICE_SIGNATURE_MAX_SKEW
+        if not token_denylist.cache.add(f"device:sig:{signature}", 1, ttl):
+            raise AuthenticationFailed(_("Device request already processed."))
+        return key.owner, key.device
+
+    def authenticate_header(self, request):
+        return "Device-HMAC"
+
+
+class IngestAuthenticationMixin:
+    """
+    ViewSet mixin authenticating ``ingest_actions`` with signed device
+    requests or token claims; other actions keep the default classes.
+
+    Attributes:
+        ingest_actions (tuple): Actions that skip the user lookup.
+        ingest_authentication_classes (list): Authenticators for those actions.
+    """
+
+    ingest_actions = ("create",)
+    ingest_authentication_classes = [DeviceSignatureAuthentication, JWTClaimsAuthentication]
+
+    def get_authenticators(self):
+        # Runs before ``self.action`` is set; resolve it from the action map.
+        action_map = getattr(self, "action_map", None) or {}
+        if action_map.get(self.request.method.lower()) in self.ingest_actions:
+            return [auth() for auth in self.ingest_authentication_classes]
+        return super().get_authenticators()
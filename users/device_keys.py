@@ -0,0 +1,83 @@
+"""
+device_keys.py
+~~~~~~~~~~~~~~
+In-process, versioned cache of device signing keys.
+
+Signed ingestion requests (see ``users.authentication.DeviceSignatureAuthentication``)
+are verified against this cache, so authenticating a device never queries
+the database. Like ``users.location_snapshot`` it stays valid while its
+version matches the response cache's ``devices`` tag, which the Device and
+User signals in ``users/signals.py`` bump on every change; the next request
+after a change reloads every active key with one query.
+"""
+
+import copy
+import logging
+import threading
+from dataclasses import dataclass
+
+from core.response_cache import response_cache
+from users.models import Device
+
+logger = logging.getLogger(__name__)
+
+TAG = "devices"
+
+
+@dataclass(frozen=True)
+class DeviceKey:
+    """
+    Signing key of one active device.
+
+    Attributes:
+        device (Device): The device, with ``owner`` loaded.
+        secret (bytes): HMAC secret.
+    """
+
+    device: Device
+    secret: bytes
+
+    @property
+    def owner(self):
+        """A copy of the owning user (safe to attach to new rows)."""
+        return copy.copy(self.device.owner)
+
+
+class DeviceKeyCache:
+    """
+    Lazily (re)loaded ``DeviceKey`` map of active devices with active owners.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._keys = {}
+
+    def get(self, device_id):
+        """
+        Look up the key of ``device_id``.
+
+        Returns:
+            DeviceKey | None: None for unknown or inactive devices.
+        """
+        version = response_cache.tag_versions([TAG])[TAG]
+        if self._version != version:
+            with self._lock:
+                if self._version != version:
+                    self._keys = self._load()
+                    self._version = version
+        return self._keys.get(device_id)
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._keys = {}
+
+    def _load(self):
+        devices = Device.objects.filter(is_active=True, owner__is_active=True).select_related("owner")
+        keys = {device.pk: DeviceKey(device=device, secret=device.secret.encode()) for device in devices}
+        logger.info("Loaded device keys: %s active device(s).", len(keys))
+        return keys
+
+
+device_keys = DeviceKeyCache()
@@ -0,0 +1 @@
+from .user_filter import UserFilter
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""
+user_filter.py
+~~~~~~~~~~~~~~
+FilterSet for the admin user list.
+"""
+
+import django_filters
+from users.models import User
+
+
+class UserFilter(django_filters.FilterSet):
+    """
+    Filters for ``list_users``.
+
+    Fields
+    ------
+    is_active : bool
+        Active (or deactivated) accounts only.
+    is_staff : bool
+        Admin (or non-admin) accounts only.
+    created_after : datetime
+        Inclusive lower bound on ``created_at``.
+    created_before : datetime
+        Exclusive upper bound on ``created_at``.
+    """
+
+    created_after = django_filters.IsoDateTimeFilter(field_name="created_at", lookup_expr="gte")
+    created_before = django_filters.IsoDateTimeFilter(field_name="created_at", lookup_expr="lt")
+
+    class Meta:
+        model = User
+        fields = ["is_active", "is_staff", "created_after", "created_before"]
@@ -0,0 +1,112 @@
+"""
+location_snapshot.py
+~~~~~~~~~~~~~~~~~~~~
+In-process, versioned snapshot of every location.
+
+Locations are reference data: written rarely, read by every location list,
+patient ``place`` validation and patient import. The snapshot holds all rows
+together with their serialized form and stays valid while its version
+matches the response cache's ``locations`` tag, which the Location signals
+in ``core/signals.py`` bump on every save and delete. The first read after a
+change reloads it with one query, in this and every other process sharing
+the cache backend.
+"""
+
+import copy
+import logging
+import threading
+from dataclasses import dataclass
+
+from core.conditional import make_etag
+from core.response_cache import response_cache
+from users.models import Location
+
+logger = logging.getLogger(__name__)
+
+TAG = "locations"
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    One immutable generation of the location snapshot.
+
+    Attributes:
+        version (str): ``locations`` tag version the rows were loaded at.
+        by_id (dict): Location instances by primary key.
+        data (list): Serialized locations in id order.
+        data_by_id (dict): Serialized location by primary key.
+    """
+
+    version: str
+    by_id: dict
+    data: list
+    data_by_id: dict
+
+    @property
+    def etag(self):
+        """Strong ETag of the whole snapshot."""
+        return make_etag(TAG, self.version)
+
+
+class LocationSnapshot:
+    """
+    Lazily (re)loaded snapshot of the ``Location`` table.
+
+    Readers get the current ``Snapshot``; a stale one is replaced under a
+    lock so concurrent readers trigger a single reload.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def current(self):
+        """
+        Return the snapshot for the current ``locations`` version.
+
+        Returns:
+            Snapshot: Loaded now if locations changed since the last load.
+        """
+        version = response_cache.tag_versions([TAG])[TAG]
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = self._load(version)
+                self._snapshot = snapshot
+        return snapshot
+
+    def get(self, pk):
+        """
+        Look up one location.
+
+        Returns:
+            Location | None: A copy of the cached instance (safe to attach to
+            other objects), or None if no such location exists.
+        """
+        location = self.current().by_id.get(pk)
+        return copy.copy(location) if location is not None else None
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+
+    def _load(self, version):
+        # Deferred: users.serializers imports this module for LocationSnapshotField.
+        from users.serializers import LocationSerializer
+
+        locations = list(Location.objects.order_by("id"))
+        data = list(LocationSerializer(locations, many=True).data)
+        logger.info("Loaded location snapshot: %s location(s).", len(locations))
+        return Snapshot(
+            version=version,
+            by_id={location.pk: location for location in locations},
+            data=data,
+            data_by_id={row["id"]: row for row in data},
+        )
+
+
+location_snapshot = LocationSnapshot()
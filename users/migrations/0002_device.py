@@ -0,0 +1,77 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:46
+
+import django.db.models.deletion
+import users.models.device
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Device",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(help_text="Label of the device.", max_length=100),
+                ),
+                (
+                    "secret",
+                    models.CharField(
+                        default=users.models.device.generate_secret,
+                        help_text="Shared HMAC-SHA256 signing secret.",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Designates whether signed requests from this device are accepted.",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="Timestamp when the device was registered.",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="Timestamp when the device was last updated.",
+                    ),
+                ),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        help_text="User the device records vitals for.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="devices",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Device",
+                "verbose_name_plural": "Devices",
+                "ordering": ["id"],
+            },
+        ),
+    ]
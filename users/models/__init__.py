@@ -1,2 +1,3 @@
 from .user import User
-from .location import Location
\ No newline at end of file
+from .location import Location
+from .device import Device
\ No newline at end of file
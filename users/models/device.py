@@ -0,0 +1,83 @@
+"""
+device.py
+
+This module contains the Device model: an ingestion credential for a gateway
+or bedside monitor, owned by a user and authenticated with HMAC-signed
+requests instead of a user login.
+"""
+
+import secrets
+
+from django.conf import settings
+from django.db import models
+
+
+def generate_secret():
+    """Return a new random signing secret."""
+    return secrets.token_hex(32)
+
+
+class Device(models.Model):
+    """
+    Represents a device allowed to post vitals on behalf of its owner.
+
+    Attributes:
+        name (CharField): Label of the device.
+        owner (ForeignKey): User the device records for; readings are
+            attributed to the owner (``recorded_by``) and the device.
+        secret (CharField): Shared HMAC signing secret. Returned only when the
+            device is created or its secret rotated.
+        is_active (BooleanField): Whether signed requests are accepted.
+        created_at (DateTimeField): Timestamp when the device was registered.
+        updated_at (DateTimeField): Timestamp when the device was last updated.
+    """
+
+    name = models.CharField(
+        max_length=100,
+        help_text="Label of the device."
+    )
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="devices",
+        help_text="User the device records vitals for."
+    )
+    secret = models.CharField(
+        max_length=64,
+        default=generate_secret,
+        help_text="Shared HMAC-SHA256 signing secret."
+    )
+    is_active = models.BooleanField(
+        default=True,
+        help_text="Designates whether signed requests from this device are accepted."
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="Timestamp when the device was registered."
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Timestamp when the device was last updated."
+    )
+
+    class Meta:
+        """
+        Meta options for the Device model.
+
+        Attributes:
+            ordering (list): Oldest first.
+            verbose_name (str): Human-readable singular name for the model.
+            verbose_name_plural (str): Human-readable plural name for the model.
+        """
+        ordering = ["id"]
+        verbose_name = "Device"
+        verbose_name_plural = "Devices"
+
+    def __str__(self):
+        """
+        Returns the string representation of the Device.
+
+        Returns:
+            str: Name of the device.
+        """
+        return self.name
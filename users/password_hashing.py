@@ -0,0 +1,221 @@
+"""
+password_hashing.py
+~~~~~~~~~~~~~~~~~~~
+Bounded thread pool for password hashing.
+
+Password hashers are deliberately slow (hundreds of milliseconds of CPU).
+Login and registration run them through ``password_pool`` instead of on the
+request thread directly: at most ``PASSWORD_HASH_WORKERS`` hashes run at a
+time, at most ``PASSWORD_HASH_QUEUE`` more wait, and anything beyond that is
+refused at once with ``PasswordPoolBusy`` (HTTP 503) rather than queueing
+behind the burst. A login burst therefore occupies a fixed share of CPU and
+the remaining worker threads keep serving vitals traffic. Django's PBKDF2 /
+scrypt hashers release the GIL while hashing, so pool threads run in
+parallel with request threads.
+
+Only the hash runs in the pool; user lookups and writes stay on the request
+thread (and its database connection).
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.contrib.auth import _clean_credentials, get_backends
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.signals import user_login_failed
+from django.core.exceptions import PermissionDenied
+
+from users.models import User
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when the hashing pool and its queue are full, or a hash times out."""
+
+
+class PasswordHashPool:
+    """
+    Thread pool with a bounded queue and latency / queue metrics.
+
+    Attributes:
+        max_workers (int | None): Concurrent hashes; defaults to ``PASSWORD_HASH_WORKERS``.
+        max_queue (int | None): Waiting hashes; defaults to ``PASSWORD_HASH_QUEUE``.
+    """
+
+    def __init__(self, max_workers=None, max_queue=None):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self.reset_metrics()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._executor is None:
+                workers = self.max_workers or settings.PASSWORD_HASH_WORKERS
+                queue = settings.PASSWORD_HASH_QUEUE if self.max_queue is None else self.max_queue
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+                self._slots = threading.BoundedSemaphore(workers + queue)
+                self._capacity = (workers, queue)
+            return self._executor
+
+    def run(self, func, *args, **kwargs):
+        """
+        Run ``func(*args, **kwargs)`` in the pool and wait for its result.
+
+        Raises:
+            PasswordPoolBusy: If every worker and queue slot is taken, or the
+                result is not ready within ``PASSWORD_HASH_TIMEOUT`` seconds.
+        """
+        executor = self._ensure_started()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordPoolBusy("Too many concurrent password operations; retry shortly.")
+        submitted = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                self._pending -= 1
+                self._running += 1
+                self._wait_seconds += started - submitted
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._run_seconds += time.perf_counter() - started
+                self._slots.release()
+
+        try:
+            future = executor.submit(task)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+            raise
+        try:
+            return future.result(timeout=settings.PASSWORD_HASH_TIMEOUT)
+        except FutureTimeoutError:
+            with self._lock:
+                self._rejected += 1
+            if future.cancel():
+                # Never started, so ``task`` will not give its slot back.
+                with self._lock:
+                    self._pending -= 1
+                self._slots.release()
+            raise PasswordPoolBusy("Password operation timed out; retry shortly.") from None
+
+    def snapshot(self):
+        """
+        Current pool state.
+
+        Returns:
+            dict: ``workers``, ``queue_limit``, ``running``, ``queued``,
+            ``completed``, ``rejected``, ``avg_wait_ms`` and ``avg_run_ms``.
+        """
+        self._ensure_started()
+        with self._lock:
+            done = self._completed
+            return {
+                "workers": self._capacity[0],
+                "queue_limit": self._capacity[1],
+                "running": self._running,
+                "queued": self._pending,
+                "completed": done,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_seconds / done * 1000, 2) if done else None,
+                "avg_run_ms": round(self._run_seconds / done * 1000, 2) if done else None,
+            }
+
+    def reset_metrics(self):
+        with self._lock:
+            self._pending = self._running = self._completed = self._rejected = 0
+            self._wait_seconds = self._run_seconds = 0.0
+
+
+password_pool = PasswordHashPool()
+
+
+def hash_password(raw_password):
+    """Hash ``raw_password`` in the pool (``make_password``)."""
+    return password_pool.run(make_password, raw_password)
+
+
+def authenticate_credentials(request, username, password):
+    """
+    Pool-offloaded equivalent of ``authenticate(request, username=..., password=...)``.
+
+    Backends from ``AUTHENTICATION_BACKENDS`` are tried in order. For
+    ``ModelBackend`` (and subclasses that keep its ``authenticate``) the user
+    is loaded on the calling thread and only the hash comparison runs in the
+    pool; other backends run as they are. As in ``authenticate()``, the
+    matching backend is recorded on ``user.backend``, a ``PermissionDenied``
+    stops the search and a failure sends ``user_login_failed``.
+
+    Returns:
+        User | None: The authenticated user, else None.
+
+    Raises:
+        PasswordPoolBusy: If the pool is saturated or a hash times out.
+    """
+    for backend_path, backend in zip(settings.AUTHENTICATION_BACKENDS, get_backends()):
+        try:
+            if type(backend).authenticate is ModelBackend.authenticate:
+                user = _model_authenticate(backend, username, password)
+            else:
+                user = backend.authenticate(request, username=username, password=password)
+        except PermissionDenied:
+            break
+        if user is not None:
+            user.backend = backend_path
+            return user
+    user_login_failed.send(
+        sender=__name__, credentials=_clean_credentials({"username": username, "password": password}), request=request
+    )
+    return None
+
+
+def _model_authenticate(backend, username, password):
+    """
+    ``ModelBackend.authenticate`` with the hashes run in the pool.
+
+    Unknown usernames still pay one hash, so response time does not reveal
+    which usernames exist. When the stored hash is outdated (hasher or
+    iteration settings changed) the password is rehashed and saved on the
+    calling thread, as ``User.check_password`` does. The save is an
+    ``update()``: the password is unchanged, so it must not revoke tokens
+    (``users/signals.py``).
+    """
+    try:
+        user = User._default_manager.get_by_natural_key(username)
+    except User.DoesNotExist:
+        password_pool.run(make_password, password)
+        return None
+    outdated = []
+    if not password_pool.run(check_password, password, user.password, outdated.append):
+        return None
+    if not backend.user_can_authenticate(user):
+        return None
+    if outdated:
+        user.password = hash_password(password)
+        User._default_manager.filter(pk=user.pk).update(password=user.password)
+    return user
+
+
+def collect_password_pool():
+    """Metrics collector (``core.metrics``) for ``password_pool``."""
+    stats = password_pool.snapshot()
+    yield "password_hash_pool_tasks", "gauge", "Password hashes running or queued.", ("state",), {
+        ("running",): stats["running"],
+        ("queued",): stats["queued"],
+    }
+    yield "password_hash_pool_completed_total", "counter", "Password hashes completed.", (), {(): stats["completed"]}
+    yield "password_hash_pool_rejected_total", "counter", "Password hashes refused (pool full).", (), {(): stats["rejected"]}
@@ -1,2 +1,4 @@
 from .user_serializer import UserRegistrationSerializer, UserSerializer
-from .location_serializer import LocationSerializer
\ No newline at end of file
+from .location_serializer import LocationSerializer
+from .location_snapshot_field import LocationSnapshotField
+from .device_serializer import DeviceSerializer
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""
+device_serializer.py
+~~~~~~~~~~~~~~~~~~~~
+Serializer for Device model. The signing secret is never part of the
+representation; views return it only when it is created or rotated.
+"""
+
+from rest_framework import serializers
+from users.models import Device
+
+
+class DeviceSerializer(serializers.ModelSerializer):
+    """
+    Serializer for Device model.
+
+    Fields
+    ------
+    id : int
+        Primary key, sent by the device as ``X-Device-Id``.
+    name : str
+        Label of the device.
+    owner : FK
+        User the device records for (the requesting user on creation).
+    is_active : bool
+        Whether signed requests are accepted.
+    created_at : datetime
+        Timestamp when the device was registered.
+    updated_at : datetime
+        Timestamp when the device was last updated.
+    """
+
+    class Meta:
+        model = Device
+        fields = ["id", "name", "owner", "is_active", "created_at", "updated_at"]
+        read_only_fields = ["id", "owner", "created_at", "updated_at"]
+
+    def validate_name(self, value):
+        """Ensure the device name is not empty."""
+        if not value.strip():
+            raise serializers.ValidationError("Device name cannot be empty.")
+        return value
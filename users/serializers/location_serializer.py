@@ -5,10 +5,12 @@ Serializer for Location model, handling validation and transformation.
 """
 
 from rest_framework import serializers
+from core.instrumentation import TimedSerializerMixin
+from core.sparse_fields import SparseFieldsSerializerMixin
 from users.models import Location
 
 
-class LocationSerializer(serializers.ModelSerializer):
+class LocationSerializer(TimedSerializerMixin, SparseFieldsSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Location model.
 
@@ -36,6 +38,7 @@ class LocationSerializer(serializers.ModelSerializer):
     Notes
     -----
     - `id`, `created_at`, and `updated_at` are read-only.
+    - Renders only ``context["fields"]`` when a sparse fieldset is requested.
     """
 
     class Meta:
@@ -0,0 +1,36 @@
+"""
+location_snapshot_field.py
+~~~~~~~~~~~~~~~~~~~~~~~~~~
+Location foreign-key field validated against the in-memory location snapshot.
+"""
+
+from rest_framework import serializers
+from users.location_snapshot import location_snapshot
+from users.models import Location
+
+
+class LocationSnapshotField(serializers.PrimaryKeyRelatedField):
+    """
+    ``PrimaryKeyRelatedField`` for ``Location`` that resolves ids from
+    ``location_snapshot`` instead of running ``Location.objects.get`` per
+    request. Output is the location id, as before.
+    """
+
+    def __init__(self, **kwargs):
+        if not kwargs.get("read_only"):
+            kwargs.setdefault("queryset", Location.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        location = location_snapshot.get(pk)
+        if location is None:
+            self.fail("does_not_exist", pk_value=data)
+        return location
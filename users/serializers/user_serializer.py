@@ -8,7 +8,10 @@ Defines serializers for user operations:
 
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
+from core.instrumentation import TimedSerializerMixin
+from core.sparse_fields import SparseFieldsSerializerMixin
 from users.models import User
+from users.password_hashing import PasswordPoolBusy, hash_password
 import logging
 
 logger = logging.getLogger(__name__)
@@ -46,27 +49,37 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         """
-        Create a new user.
+        Create a new user, hashing the password in the bounded hashing pool.
 
         Args:
             validated_data (dict): Data containing user details.
 
         Returns:
             User: The created user object.
+
+        Raises:
+            PasswordPoolBusy: If the hashing pool is saturated.
         """
         try:
             validated_data.pop('password2')
-            user = User.objects.create_user(**validated_data)
-            logger.info(f"User created successfully in serializer: {user.username}")
+            password = hash_password(validated_data.pop('password'))
+            validated_data['username'] = User.normalize_username(validated_data['username'])
+            validated_data['email'] = User.objects.normalize_email(validated_data.get('email'))
+            user = User(**validated_data)
+            user.password = password
+            user.save()
+            logger.info("User created successfully in serializer: %s", user.username)
             return user
+        except PasswordPoolBusy:
+            raise
         except Exception as e:
-            logger.error(f"Error creating user in serializer: {str(e)}")
+            logger.error("Error creating user in serializer: %s", e)
             raise serializers.ValidationError({"detail": "User creation failed", "error": str(e)})
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, SparseFieldsSerializerMixin, serializers.ModelSerializer):
     """
-    Serializer for retrieving user details.
+    Serializer for retrieving user details (``context["fields"]`` only, when given).
     """
     class Meta:
         model = User
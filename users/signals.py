@@ -0,0 +1,65 @@
+"""
+signals.py
+~~~~~~~~~~
+Revoke a user's tokens and device keys when their access changes.
+
+Deactivation, a new password, a username or role change and deletion all set
+a denylist cutoff (``users.authentication.token_denylist``), so tokens
+issued before the change - including ones already cached or carrying stale
+claims - stop authenticating immediately. The same changes, and any device
+change, reload the in-memory device keys (``users.device_keys``).
+
+Changes are detected against the values the instance was loaded with
+(kept by ``user_loaded``), so saving a user costs no extra query; only a
+field that was deferred at load time and assigned since is read back.
+"""
+
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from core.response_cache import response_cache
+from users.authentication import token_denylist
+from users.device_keys import TAG as DEVICE_KEYS_TAG
+from users.models import Device, User
+
+REVOKING_FIELDS = ("is_active", "is_staff", "is_superuser", "password", "username")
+
+
+@receiver(post_init, sender=User, dispatch_uid="auth_user_loaded")
+def user_loaded(sender, instance, **kwargs):
+    # Deferred fields are not in __dict__ and are left out.
+    instance._revoking_state = {field: instance.__dict__[field] for field in REVOKING_FIELDS if field in instance.__dict__}
+
+
+@receiver(pre_save, sender=User, dispatch_uid="auth_user_saving")
+def user_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding:
+        return
+    # Fields neither loaded nor assigned cannot have changed.
+    fields = [
+        field for field in REVOKING_FIELDS
+        if field in instance.__dict__ and (update_fields is None or field in update_fields)
+    ]
+    previous = getattr(instance, "_revoking_state", {})
+    unknown = [field for field in fields if field not in previous]
+    if unknown:
+        previous = {**previous, **(User.objects.filter(pk=instance.pk).values(*unknown).first() or {})}
+    if any(field in previous and previous[field] != getattr(instance, field) for field in fields):
+        token_denylist.revoke_user(instance.pk)
+        response_cache.invalidate(DEVICE_KEYS_TAG)
+
+
+@receiver(post_save, sender=User, dispatch_uid="auth_user_saved")
+def user_saved(sender, instance, **kwargs):
+    user_loaded(sender, instance)
+
+
+@receiver(post_delete, sender=User, dispatch_uid="auth_user_deleted")
+def user_deleted(sender, instance, **kwargs):
+    token_denylist.revoke_user(instance.pk)
+
+
+@receiver(post_save, sender=Device, dispatch_uid="auth_device_saved")
+@receiver(post_delete, sender=Device, dispatch_uid="auth_device_deleted")
+def device_changed(sender, instance, **kwargs):
+    response_cache.invalidate(DEVICE_KEYS_TAG)
@@ -7,10 +7,20 @@ Fixtures for API tests, including clients, users, payloads, and endpoint URLs.
 import pytest
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
+from users.authentication import token_denylist, user_cache
+from users.device_keys import device_keys
 
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def clear_token_state():
+    """Forget cached users, device keys and revocations (rolled-back rows reuse ids)."""
+    user_cache.clear()
+    device_keys.clear()
+    token_denylist.cache.clear()
+
+
 # -----------------------------
 # API Clients
 # -----------------------------
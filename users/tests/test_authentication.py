@@ -0,0 +1,153 @@
+"""
+test_authentication.py
+~~~~~~~~~~~~~~~~~~~~~~
+Tests for cached / claims-only JWT authentication and token revocation.
+"""
+
+import time
+import pytest
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework_simplejwt import tokens as jwt_tokens
+from rest_framework_simplejwt.tokens import RefreshToken
+from patients.models import Patient
+from users.authentication import UserCache, require_shared_caches
+
+PATIENTS_URL = "http://localhost:8000/api/v1/patients"
+HEART_RATES_URL = "http://localhost:8000/api/v1/vitals/heart-rates"
+LOGOUT_URL = "http://localhost:8000/api/v1/users/auth/logout"
+
+
+@pytest.fixture
+def tokens(api_client, test_user, login_payload, user_endpoints):
+    """Access / refresh tokens from a real login."""
+    return api_client.post(user_endpoints["login"], login_payload, format="json").data
+
+
+@pytest.fixture
+def bearer(api_client, tokens):
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+    return api_client
+
+
+@contextmanager
+def clock_at(moment):
+    """Pin the revocation clock and token issue time to ``moment`` (Unix seconds)."""
+    with pytest.MonkeyPatch.context() as m:
+        m.setattr(time, "time", lambda: moment)
+        m.setattr(jwt_tokens, "aware_utcnow", lambda: datetime.fromtimestamp(moment, timezone.utc))
+        yield
+
+
+def user_queries(context):
+    return [q["sql"] for q in context.captured_queries if 'FROM "users_user"' in q["sql"]]
+
+
+@pytest.mark.django_db
+class TestJWTAuthentication:
+
+    # -----------------------------
+    # USER LOOKUP
+    # -----------------------------
+    def test_user_loaded_once_per_token(self, bearer):
+        assert bearer.get(PATIENTS_URL).status_code == status.HTTP_200_OK
+        with CaptureQueriesContext(connection) as ctx:
+            response = bearer.get(PATIENTS_URL)
+        assert response.status_code == status.HTTP_200_OK
+        assert user_queries(ctx) == []
+
+    def test_ingest_never_loads_the_user(self, bearer, test_user):
+        patient = Patient.objects.create(
+            user=test_user, first_name="Ada", last_name="Ingest", date_of_birth=date(1980, 1, 1), gender="Female"
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            response = bearer.post(HEART_RATES_URL, {"patient": patient.id, "bpm": 72}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["recorded_by"] == test_user.id
+        assert user_queries(ctx) == []
+
+    def test_ingest_without_claims_falls_back_to_lookup(self, api_client, test_user):
+        token = RefreshToken.for_user(test_user).access_token
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        response = api_client.post(HEART_RATES_URL, {"patient": 0, "bpm": 72}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_process_local_revocation_cache_refused(self, settings):
+        settings.REQUIRE_SHARED_CACHES = True
+        with pytest.raises(ImproperlyConfigured, match="JWT_DENYLIST_CACHE_ALIAS"):
+            require_shared_caches()
+
+    def test_shared_caches_accepted(self, settings, tmp_path):
+        settings.REQUIRE_SHARED_CACHES = True
+        shared = {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": str(tmp_path)}
+        settings.CACHES = {**settings.CACHES, "tokens": shared, "responses": shared}
+        require_shared_caches()
+
+    def test_lru_is_bounded(self, test_user):
+        cache = UserCache(max_size=2)
+        for jti in ("a", "b", "c"):
+            cache.set(jti, test_user, expires=4102444800)
+        assert cache.get("a") is None
+        assert cache.get("c") is test_user
+        assert len(cache) == 2
+
+    # -----------------------------
+    # REVOCATION
+    # -----------------------------
+    def test_logout_revokes_access_and_refresh(self, bearer, tokens):
+        response = bearer.post(LOGOUT_URL, {"refresh": tokens["refresh"]}, format="json")
+        assert response.status_code == status.HTTP_205_RESET_CONTENT
+        assert bearer.get(PATIENTS_URL).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_deactivation_revokes_cached_and_claims_tokens(self, bearer, test_user):
+        assert bearer.get(PATIENTS_URL).status_code == status.HTTP_200_OK
+        test_user.is_active = False
+        test_user.save()
+        assert bearer.get(PATIENTS_URL).status_code == status.HTTP_401_UNAUTHORIZED
+        response = bearer.post(HEART_RATES_URL, {"patient": 0, "bpm": 72}, format="json")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_unrelated_profile_change_keeps_tokens(self, bearer, test_user):
+        test_user.first_name = "Renamed"
+        test_user.save()
+        assert bearer.get(PATIENTS_URL).status_code == status.HTTP_200_OK
+
+    def test_password_change_revokes_earlier_tokens(self, bearer, test_user):
+        test_user.set_password("changed-pass-456")
+        test_user.save()
+        assert bearer.get(PATIENTS_URL).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_revocation_covers_tokens_from_the_same_second(self, api_client, test_user, login_payload, user_endpoints):
+        second = int(time.time())
+        with clock_at(second + 0.2):
+            tokens = api_client.post(user_endpoints["login"], login_payload, format="json").data
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        test_user.is_active = False
+        with clock_at(second + 0.5):
+            test_user.save()
+        response = api_client.post(HEART_RATES_URL, {"patient": 0, "bpm": 72}, format="json")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_login_right_after_password_change(self, api_client, test_user, user_endpoints):
+        # iat has whole seconds: the issue-time claim keeps a later login in the revoking second valid.
+        second = int(time.time())
+        test_user.set_password("changed-pass-456")
+        with clock_at(second + 0.5):
+            test_user.save()
+        with clock_at(second + 0.9):
+            response = api_client.post(
+                user_endpoints["login"], {"username": "testuser", "password": "changed-pass-456"}, format="json"
+            )
+        assert response.status_code == status.HTTP_200_OK
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        assert api_client.get(PATIENTS_URL).status_code == status.HTTP_200_OK
+
+    def test_save_does_not_read_the_user_back(self, test_user):
+        test_user.first_name = "Renamed"
+        with CaptureQueriesContext(connection) as ctx:
+            test_user.save()
+        assert [sql for sql in user_queries(ctx) if sql.startswith("SELECT")] == []
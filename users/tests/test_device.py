@@ -0,0 +1,116 @@
+"""
+test_device.py
+~~~~~~~~~~~~~~
+Tests for device registration and HMAC-signed vitals ingestion.
+"""
+
+import json
+import time
+import pytest
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from patients.models import Patient
+from users.authentication import sign_device_request
+from users.device_keys import device_keys
+from users.models import Device, User
+from vitals.models import HeartRate
+
+DEVICES_URL = "http://localhost:8000/api/v1/users/devices"
+INGEST_PATH = "/api/v1/vitals/heart-rates"
+INGEST_URL = f"http://localhost:8000{INGEST_PATH}"
+
+
+@pytest.fixture
+def device(test_user):
+    return Device.objects.create(name="Ward A gateway", owner=test_user)
+
+
+@pytest.fixture
+def patient(test_user):
+    return Patient.objects.create(
+        user=test_user, first_name="Ada", last_name="Device", date_of_birth=date(1980, 1, 1), gender="Female"
+    )
+
+
+def signed_post(client, device, payload, secret=None, timestamp=None, signature=None):
+    body = json.dumps(payload).encode()
+    timestamp = str(int(time.time()) if timestamp is None else timestamp)
+    signature = signature or sign_device_request(secret or device.secret, "POST", INGEST_PATH, timestamp, body)
+    return client.generic(
+        "POST", INGEST_URL, body, content_type="application/json",
+        HTTP_X_DEVICE_ID=str(device.id), HTTP_X_DEVICE_TIMESTAMP=timestamp, HTTP_X_DEVICE_SIGNATURE=signature,
+    )
+
+
+@pytest.mark.django_db
+class TestDevices:
+
+    # -----------------------------
+    # REGISTRATION
+    # -----------------------------
+    def test_secret_is_shown_only_on_create(self, auth_client, test_user):
+        response = auth_client.post(DEVICES_URL, {"name": "Monitor 1"}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["owner"] == test_user.id
+        assert len(response.data["secret"]) == 64
+
+        listed = auth_client.get(DEVICES_URL).data["results"]
+        assert [row["name"] for row in listed] == ["Monitor 1"]
+        assert "secret" not in listed[0]
+
+    def test_devices_are_owner_scoped(self, api_client, device):
+        other = User.objects.create_user(username="other", email="other@example.com", password="x")
+        api_client.force_authenticate(user=other)
+        assert api_client.get(DEVICES_URL).data["count"] == 0
+        assert api_client.post(f"{DEVICES_URL}/{device.id}/rotate").status_code == status.HTTP_404_NOT_FOUND
+
+    # -----------------------------
+    # SIGNED INGESTION
+    # -----------------------------
+    def test_signed_ingest_without_auth_queries(self, api_client, device, patient, test_user):
+        device_keys.get(device.id)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = signed_post(api_client, device, {"patient": patient.id, "bpm": 72})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        reading = HeartRate.objects.get(pk=response.data["id"])
+        assert (reading.recorded_by_id, reading.device_id) == (test_user.id, device.id)
+        auth_tables = ('FROM "users_user"', 'FROM "users_device"')
+        assert not [q for q in ctx.captured_queries if any(table in q["sql"] for table in auth_tables)]
+
+    def test_device_cannot_post_for_other_owners_patients(self, api_client, device):
+        other = User.objects.create_user(username="other", email="other@example.com", password="x")
+        foreign = Patient.objects.create(
+            user=other, first_name="Eve", last_name="Else", date_of_birth=date(1980, 1, 1), gender="Female"
+        )
+        response = signed_post(api_client, device, {"patient": foreign.id, "bpm": 72})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_rejected_signatures(self, api_client, device, patient):
+        payload = {"patient": patient.id, "bpm": 72}
+        assert signed_post(api_client, device, payload, secret="wrong").status_code == status.HTTP_401_UNAUTHORIZED
+        stale = int(time.time()) - 3600
+        assert signed_post(api_client, device, payload, timestamp=stale).status_code == status.HTTP_401_UNAUTHORIZED
+
+        timestamp = int(time.time())
+        assert signed_post(api_client, device, payload, timestamp=timestamp).status_code == status.HTTP_201_CREATED
+        replay = signed_post(api_client, device, payload, timestamp=timestamp)
+        assert replay.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_deactivation_and_rotation_take_effect(self, auth_client, device, patient):
+        api_client = APIClient()
+        payload = {"patient": patient.id, "bpm": 72}
+        old_secret = device.secret
+        new_secret = auth_client.post(f"{DEVICES_URL}/{device.id}/rotate").data["secret"]
+
+        response = signed_post(api_client, device, payload, secret=old_secret)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert signed_post(api_client, device, payload, secret=new_secret).status_code == status.HTTP_201_CREATED
+
+        auth_client.patch(f"{DEVICES_URL}/{device.id}", {"is_active": False}, format="json")
+        response = signed_post(api_client, device, {**payload, "bpm": 73}, secret=new_secret)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,82 @@
+"""
+test_list_users.py
+~~~~~~~~~~~~~~~~~~
+Tests for the admin user list: cursor pages, filters and CSV export.
+"""
+
+import csv
+import io
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from rest_framework import status
+from users.models import User
+
+
+@pytest.fixture
+def users(admin_user):
+    """Admin plus five users, the last two deactivated."""
+    return [admin_user] + [
+        User.objects.create_user(
+            username=f"user{i}", email=f"user{i}@example.com", password="x", is_active=i < 3,
+        )
+        for i in range(5)
+    ]
+
+
+@pytest.mark.django_db
+class TestListUsers:
+
+    def test_cursor_pages_cover_all_users(self, admin_auth_client, user_endpoints, users, django_assert_max_num_queries):
+        url, seen = user_endpoints["list_users"] + "?page_size=2", []
+        while url:
+            with django_assert_max_num_queries(1):
+                response = admin_auth_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.data["results"]) <= 2
+            seen += [row["id"] for row in response.data["results"]]
+            url = response.data["next"]
+
+        assert seen == sorted((user.id for user in users), reverse=True)
+
+    def test_ordering(self, admin_auth_client, user_endpoints, users):
+        response = admin_auth_client.get(user_endpoints["list_users"], {"ordering": "username"})
+        names = [row["username"] for row in response.data["results"]]
+        assert names == sorted(names)
+
+    def test_filters(self, admin_auth_client, user_endpoints, users):
+        response = admin_auth_client.get(user_endpoints["list_users"], {"is_active": "false"})
+        assert {row["username"] for row in response.data["results"]} == {"user3", "user4"}
+
+        response = admin_auth_client.get(user_endpoints["list_users"], {"is_staff": "true"})
+        assert [row["username"] for row in response.data["results"]] == ["admin"]
+
+        tomorrow = (timezone.now() + timedelta(days=1)).isoformat()
+        response = admin_auth_client.get(user_endpoints["list_users"], {"created_after": tomorrow})
+        assert response.data["results"] == []
+
+    def test_invalid_filter(self, admin_auth_client, user_endpoints):
+        response = admin_auth_client.get(user_endpoints["list_users"], {"created_after": "yesterday"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "created_after" in response.data
+
+    def test_invalid_cursor(self, admin_auth_client, user_endpoints, users):
+        response = admin_auth_client.get(user_endpoints["list_users"], {"cursor": "garbage"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data == {"detail": "Invalid cursor"}
+
+    def test_csv_export(self, admin_auth_client, user_endpoints, users):
+        response = admin_auth_client.get(
+            user_endpoints["list_users"], {"export": "csv", "fields": "id,username", "is_active": "true"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response["Content-Type"] == "text/csv"
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        assert rows[0] == ["id", "username"]
+        assert [row[1] for row in rows[1:]] == ["user2", "user1", "user0", "admin"]
+
+    def test_csv_export_admin_only(self, auth_client, user_endpoints):
+        response = auth_client.get(user_endpoints["list_users"], {"export": "csv"})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
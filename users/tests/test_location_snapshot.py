@@ -0,0 +1,82 @@
+"""
+test_location_snapshot.py
+~~~~~~~~~~~~~~~~~~~~~~~~~
+Tests for the in-memory location snapshot and the reads it serves.
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from users.location_snapshot import location_snapshot
+from users.models import Location
+
+PATIENTS_URL = "http://localhost:8000/api/v1/patients"
+
+
+@pytest.fixture(autouse=True)
+def cold_snapshot(settings):
+    """Start from an empty snapshot and bypass the response cache."""
+    settings.RESPONSE_CACHE_ENABLED = False
+    location_snapshot.clear()
+
+
+def location_queries(context):
+    return [q["sql"] for q in context.captured_queries if '"users_location"' in q["sql"]]
+
+
+@pytest.mark.django_db
+class TestLocationSnapshot:
+
+    # -----------------------------
+    # LIST / RETRIEVE
+    # -----------------------------
+    def test_list_served_from_memory_with_strong_etag(self, auth_client, location_endpoints, django_assert_num_queries):
+        Location.objects.create(name="Ward A")
+        first = auth_client.get(location_endpoints["list"])
+        assert first["ETag"].startswith('"')
+
+        with django_assert_num_queries(0):
+            response = auth_client.get(location_endpoints["list"])
+        assert response.data["results"] == first.data["results"]
+
+        response = auth_client.get(location_endpoints["list"], HTTP_IF_NONE_MATCH=first["ETag"])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_change_refreshes_snapshot(self, auth_client, location_endpoints):
+        ward = Location.objects.create(name="Ward A")
+        etag = auth_client.get(location_endpoints["list"])["ETag"]
+
+        ward.name = "Ward B"
+        ward.save()
+
+        response = auth_client.get(location_endpoints["list"], HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"][0]["name"] == "Ward B"
+        assert auth_client.get(location_endpoints["detail"](ward.id)).data["name"] == "Ward B"
+
+    def test_retrieve_validators_and_missing(self, auth_client, location_endpoints):
+        ward = Location.objects.create(name="Ward A")
+        first = auth_client.get(location_endpoints["detail"](ward.id))
+        assert first["Last-Modified"]
+        response = auth_client.get(location_endpoints["detail"](ward.id), HTTP_IF_NONE_MATCH=first["ETag"])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert auth_client.get(location_endpoints["detail"](ward.id + 1)).status_code == status.HTTP_404_NOT_FOUND
+
+    # -----------------------------
+    # PATIENT PLACE VALIDATION
+    # -----------------------------
+    def test_patient_place_validated_from_memory(self, auth_client):
+        ward = Location.objects.create(name="Ward A")
+        location_snapshot.current()
+        payload = {"first_name": "Ada", "last_name": "Place", "date_of_birth": "1980-01-01", "gender": "Female"}
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.post(PATIENTS_URL, {**payload, "place": ward.id}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["place"] == ward.id
+        assert location_queries(ctx) == []
+
+        response = auth_client.post(PATIENTS_URL, {**payload, "first_name": "Bo", "place": ward.id + 1}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "place" in response.data
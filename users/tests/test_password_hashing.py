@@ -0,0 +1,114 @@
+"""
+test_password_hashing.py
+~~~~~~~~~~~~~~~~~~~~~~~~
+Tests for the bounded password hashing pool used by login and register.
+"""
+
+import threading
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.signals import user_login_failed
+from rest_framework import status
+from users import password_hashing
+from users.models import User
+from users.password_hashing import PasswordHashPool, PasswordPoolBusy, password_pool
+
+STATS_URL = "http://localhost:8000/api/v1/users/auth/hash-pool-stats"
+PATIENTS_URL = "http://localhost:8000/api/v1/patients"
+
+
+@pytest.fixture
+def saturated_pool(monkeypatch, request):
+    """A one-worker pool (no queue unless parametrized) whose only worker is blocked."""
+    pool = PasswordHashPool(max_workers=1, max_queue=getattr(request, "param", 0))
+    monkeypatch.setattr(password_hashing, "password_pool", pool)
+    release = threading.Event()
+    holder = threading.Thread(target=pool.run, args=(release.wait,))
+    holder.start()
+    while pool.snapshot()["running"] == 0:
+        release.wait(0.01)
+    yield pool
+    release.set()
+    holder.join()
+
+
+@pytest.mark.django_db
+class TestPasswordHashing:
+
+    # -----------------------------
+    # POOL
+    # -----------------------------
+    def test_hashes_run_on_pool_threads(self):
+        pool = PasswordHashPool(max_workers=1, max_queue=1)
+        assert pool.run(lambda: threading.current_thread().name).startswith("password-hash")
+        assert pool.snapshot()["completed"] == 1
+
+    def test_full_pool_rejects_immediately(self, saturated_pool):
+        with pytest.raises(PasswordPoolBusy):
+            saturated_pool.run(len, "x")
+        assert saturated_pool.snapshot()["rejected"] == 1
+
+    # -----------------------------
+    # LOGIN / REGISTER
+    # -----------------------------
+    def test_login_and_register_use_the_pool(self, api_client, test_user, login_payload, register_payload, user_endpoints):
+        password_pool.reset_metrics()
+        assert api_client.post(user_endpoints["login"], login_payload, format="json").status_code == status.HTTP_200_OK
+        response = api_client.post(user_endpoints["register"], register_payload, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert password_pool.snapshot()["completed"] == 2
+
+    def test_saturated_pool_returns_503(self, api_client, test_user, login_payload, user_endpoints, saturated_pool):
+        response = api_client.post(user_endpoints["login"], login_payload, format="json")
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response["Retry-After"] == "1"
+
+    @pytest.mark.parametrize("saturated_pool", [1], indirect=True)
+    def test_hash_timeout_returns_503(self, api_client, test_user, login_payload, user_endpoints, saturated_pool, settings):
+        settings.PASSWORD_HASH_TIMEOUT = 0.05
+        response = api_client.post(user_endpoints["login"], login_payload, format="json")
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response["Retry-After"] == "1"
+        assert saturated_pool.snapshot()["queued"] == 0
+
+    def test_failed_login_sends_signal(self, api_client, test_user, user_endpoints):
+        failures = []
+        receiver = lambda sender, credentials, **kwargs: failures.append(credentials)  # noqa: E731
+        user_login_failed.connect(receiver)
+        try:
+            response = api_client.post(
+                user_endpoints["login"], {"username": "testuser", "password": "wrong-pass"}, format="json"
+            )
+        finally:
+            user_login_failed.disconnect(receiver)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert [credentials["username"] for credentials in failures] == ["testuser"]
+        assert failures[0]["password"] != "wrong-pass"
+
+    def test_authentication_backends_are_honoured(self, api_client, test_user, login_payload, user_endpoints, settings):
+        test_user.is_active = False
+        test_user.save()
+        response = api_client.post(user_endpoints["login"], login_payload, format="json")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        settings.AUTHENTICATION_BACKENDS = ["django.contrib.auth.backends.AllowAllUsersModelBackend"]
+        response = api_client.post(user_endpoints["login"], login_payload, format="json")
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_outdated_hash_is_upgraded_without_revoking(self, api_client, test_user, login_payload, user_endpoints, settings):
+        settings.PASSWORD_HASHERS = [
+            "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+        ]
+        earlier = api_client.post(user_endpoints["login"], login_payload, format="json").data
+        User.objects.filter(pk=test_user.pk).update(password=make_password("testpass123", hasher="md5"))
+        response = api_client.post(user_endpoints["login"], login_payload, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert User.objects.get(pk=test_user.pk).password.startswith("pbkdf2_sha256$")
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {earlier['access']}")
+        assert api_client.get(PATIENTS_URL).status_code == status.HTTP_200_OK
+
+    def test_stats_are_admin_only(self, api_client, test_user, admin_user):
+        api_client.force_authenticate(user=test_user)
+        assert api_client.get(STATS_URL).status_code == status.HTTP_403_FORBIDDEN
+        api_client.force_authenticate(user=admin_user)
+        assert api_client.get(STATS_URL).data["workers"] >= 1
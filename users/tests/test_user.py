@@ -54,7 +54,7 @@ class TestUserEndpoints:
     def test_list_users_admin_success(self, admin_auth_client, user_endpoints):
         response = admin_auth_client.get(user_endpoints["list_users"])
         assert response.status_code == status.HTTP_200_OK
-        assert isinstance(response.data, list)
+        assert isinstance(response.data["results"], list)
 
     def test_list_users_non_admin_forbidden(self, auth_client, user_endpoints):
         response = auth_client.get(user_endpoints["list_users"])
@@ -2,13 +2,14 @@
 users/urls.py
 ~~~~~~~~~~~~~
 Defines URL patterns for user management endpoints including
-registration, login, and listing users. Integrates with
+registration, login, logout, listing users and device
+credentials. Integrates with
 Django REST Framework ViewSets and custom actions.
 """
 
 
 from django.urls import path
-from .views import UserViewSet, LocationViewSet
+from .views import DeviceViewSet, UserViewSet, LocationViewSet
 
 
 urlpatterns = [
@@ -22,6 +23,16 @@ urlpatterns = [
         UserViewSet.as_view({"post": "login"}),
         name="user-login",
     ),
+    path(
+        "auth/logout",
+        UserViewSet.as_view({"post": "logout"}),
+        name="user-logout",
+    ),
+    path(
+        "auth/hash-pool-stats",
+        UserViewSet.as_view({"get": "hash_pool_stats"}),
+        name="user-hash-pool-stats",
+    ),
     path(
         "auth/list-users",
         UserViewSet.as_view({"get": "list_users"}),
@@ -52,5 +63,25 @@ urlpatterns = [
             'patch': 'partial_update',
             'delete': 'destroy'
         }), name='location-detail'),
-]
 
+    # Device endpoints
+    path(
+        'devices',
+        DeviceViewSet.as_view({
+            'get': 'list',
+            'post': 'create'
+        }), name='device-list'),
+
+    path(
+        'devices/<int:pk>',
+        DeviceViewSet.as_view({
+            'get': 'retrieve',
+            'patch': 'partial_update',
+            'delete': 'destroy'
+        }), name='device-detail'),
+
+    path(
+        'devices/<int:pk>/rotate',
+        DeviceViewSet.as_view({'post': 'rotate'}),
+        name='device-rotate'),
+]
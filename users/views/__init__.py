@@ -1,2 +1,3 @@
 from .user import UserViewSet
-from .location import LocationViewSet
\ No newline at end of file
+from .location import LocationViewSet
+from .device import DeviceViewSet
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+device.py
+~~~~~~~~~
+This module defines APIs for registering ingestion devices and managing
+their signing secrets.
+"""
+
+import logging
+from django.db import DatabaseError
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from core.ownership import OwnerScopedMixin
+from users.models import Device
+from users.models.device import generate_secret
+from users.serializers import DeviceSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceViewSet(OwnerScopedMixin, viewsets.ModelViewSet):
+    """
+    API endpoint for managing the requesting user's devices.
+
+    Public Methods
+    --------------
+    create(request, *args, **kwargs)
+        Register a device and return its signing secret (shown once).
+
+    rotate(request, pk)
+        Replace a device's secret; the old one stops working immediately.
+
+    Attributes
+    ----------
+    queryset : QuerySet
+        All devices; ``get_queryset`` scopes them to the requesting user
+        (admins see all) via ``OwnerScopedMixin``.
+    owner_field : str
+        Lookup to the owning user.
+    serializer_class : Serializer
+        Serializer used for validation and transformation.
+    permission_classes : list
+        Permissions required (authenticated users only).
+
+    Raises
+    ------
+    DatabaseError
+        If database operations fail.
+    ValidationError
+        If input data is invalid.
+
+    Notes
+    -----
+    - Devices sign ``POST /api/v1/vitals/heart-rates`` with their secret
+      (see ``users.authentication.sign_device_request``).
+    """
+
+    queryset = Device.objects.all()
+    owner_field = "owner"
+    serializer_class = DeviceSerializer
+    permission_classes = [IsAuthenticated]
+
+    def create(self, request, *args, **kwargs):
+        """
+        Register a new device for the requesting user.
+
+        Steps
+        -----
+        1. Validate request data with serializer.
+        2. Save the device with a generated secret.
+        3. Return the device together with its secret.
+
+        Returns
+        -------
+        Response
+            The device plus ``secret``; the secret is not shown again.
+        """
+        try:
+            serializer = self.get_serializer(data=request.data)
+            if serializer.is_valid():
+                device = serializer.save(owner=request.user)
+                logger.info("Device registered successfully: %s", device.id)
+                return Response({**serializer.data, "secret": device.secret}, status=status.HTTP_201_CREATED)
+
+            logger.warning("Validation failed: %s", serializer.errors)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except DatabaseError as db_err:
+            logger.error("Database error while registering device: %s", db_err)
+            return Response(
+                {"detail": "Database error while registering device."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        except Exception as ex:
+            logger.error("Unexpected error in create: %s", ex)
+            return Response(
+                {"detail": "An unexpected error occurred."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=True, methods=["post"])
+    def rotate(self, request, pk=None):
+        """
+        Issue a new secret for the device.
+
+        Returns
+        -------
+        Response
+            The device plus its new ``secret``, or 404.
+        """
+        try:
+            device = self.get_queryset().filter(pk=pk).first()
+            if device is None:
+                return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+            device.secret = generate_secret()
+            device.save(update_fields=["secret", "updated_at"])
+            logger.info("Device secret rotated: %s", device.id)
+            return Response(
+                {**self.get_serializer(device).data, "secret": device.secret}, status=status.HTTP_200_OK
+            )
+        except DatabaseError as db_err:
+            logger.error("Database error while rotating device secret: %s", db_err)
+            return Response(
+                {"detail": "Database error while rotating device secret."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        except Exception as ex:
+            logger.error("Unexpected error in rotate: %s", ex)
+            return Response(
+                {"detail": "An unexpected error occurred."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
@@ -8,22 +8,34 @@ import logging
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from core.conditional import make_etag, not_modified, set_validators
+from core.pagination import ApproximateCountPagination
+from core.profiling import ProfilingMixin
+from core.response_cache import cache_response
+from core.sparse_fields import parse_fields, project_rows
 from django.db import DatabaseError
+from users.location_snapshot import location_snapshot
 from users.models import Location
 from users.serializers.location_serializer import LocationSerializer
 
 logger = logging.getLogger(__name__)
 
 
-class LocationViewSet(viewsets.ModelViewSet):
+class LocationViewSet(ProfilingMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing Location objects.
 
     Public Methods
     --------------
     list(request, *args, **kwargs)
-        Retrieve a paginated list of locations.
+        Retrieve a paginated list of locations from the in-memory snapshot;
+        ``?fields=`` trims each row to the named fields.
+
+    retrieve(request, *args, **kwargs)
+        Retrieve one location from the in-memory snapshot.
+
+    get_cache_tags()
+        Response-cache tags for list / retrieve reads.
 
     create(request, *args, **kwargs)
         Create a new location entry.
@@ -36,8 +48,8 @@ class LocationViewSet(viewsets.ModelViewSet):
         Serializer used for validation and transformation.
     permission_classes : list
         Permissions required for accessing this API.
-    pagination_class : PageNumberPagination
-        Built-in pagination strategy.
+    pagination_class : ApproximateCountPagination
+        Page-number pagination with cached / estimated counts for large lists.
 
     Raises
     ------
@@ -54,9 +66,53 @@ class LocationViewSet(viewsets.ModelViewSet):
     queryset = Location.objects.all()
     serializer_class = LocationSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = PageNumberPagination
+    pagination_class = ApproximateCountPagination
     # http_method_names = ["get", "post"]
 
+    def get_cache_tags(self):
+        """Tags invalidating cached reads: ``location:<pk>`` or ``locations``."""
+        if self.action == "retrieve":
+            return [f"location:{self.kwargs['pk']}"]
+        return ["locations"]
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve one location from ``location_snapshot``.
+
+        Returns
+        -------
+        Response
+            The location with ``ETag`` / ``Last-Modified``, 304 when the
+            client's copy is current, or 404.
+        """
+        try:
+            snapshot = location_snapshot.current()
+            location = snapshot.by_id.get(int(kwargs["pk"]))
+            if location is None:
+                return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+            etag = make_etag("location", location.pk, location.updated_at.isoformat())
+            cached = not_modified(request, etag, location.updated_at)
+            if cached is not None:
+                return cached
+            return set_validators(
+                Response(snapshot.data_by_id[location.pk], status=status.HTTP_200_OK), etag, location.updated_at
+            )
+        except DatabaseError as db_err:
+            logger.error("Database error while fetching location: %s", db_err)
+            return Response(
+                {"detail": "Database error while fetching locations."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        except Exception as ex:
+            logger.error("Unexpected error in retrieve: %s", ex)
+            return Response(
+                {"detail": "An unexpected error occurred."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @cache_response
     def list(self, request, *args, **kwargs):
         """
         Retrieve a paginated list of locations.
@@ -64,35 +120,40 @@ class LocationViewSet(viewsets.ModelViewSet):
         Steps
         -----
         1. Log the request for fetching locations.
-        2. Query all Location objects.
-        3. Paginate the queryset.
-        4. Serialize paginated data.
-        5. Return serialized response.
+        2. Take the current location snapshot (reloaded only after a change).
+        3. Return 304 if its strong ETag matches ``If-None-Match``.
+        4. Paginate the pre-serialized rows.
+        5. Trim the page to ``?fields=`` when given.
+        6. Return the page with the ETag.
 
         Returns
         -------
         Response
-            Paginated list of locations.
+            Paginated list of locations in id order.
         """
         try:
             logger.info("Fetching list of locations...")
-            queryset = self.get_queryset()
-            page = self.paginate_queryset(queryset)
+            snapshot = location_snapshot.current()
+            etag = make_etag(snapshot.etag, request.get_full_path())
+            cached = not_modified(request, etag)
+            if cached is not None:
+                return cached
+
+            fields = parse_fields(request)
+            page = self.paginate_queryset(snapshot.data)
             if page is not None:
-                serializer = self.get_serializer(page, many=True)
                 logger.info("Locations fetched successfully with pagination.")
-                return self.get_paginated_response(serializer.data)
+                return set_validators(self.get_paginated_response(project_rows(page, fields)), etag)
 
-            serializer = self.get_serializer(queryset, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return set_validators(Response(project_rows(snapshot.data, fields), status=status.HTTP_200_OK), etag)
         except DatabaseError as db_err:
-            logger.error(f"Database error while fetching locations: {db_err}")
+            logger.error("Database error while fetching locations: %s", db_err)
             return Response(
                 {"detail": "Database error while fetching locations."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
         except Exception as ex:
-            logger.error(f"Unexpected error in list: {ex}")
+            logger.error("Unexpected error in list: %s", ex)
             return Response(
                 {"detail": "An unexpected error occurred."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -124,19 +185,19 @@ class LocationViewSet(viewsets.ModelViewSet):
             serializer = self.get_serializer(data=request.data)
             if serializer.is_valid():
                 location = serializer.save()
-                logger.info(f"Location created successfully: {location.id}")
+                logger.info("Location created successfully: %s", location.id)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-            logger.warning(f"Validation failed: {serializer.errors}")
+            logger.warning("Validation failed: %s", serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except DatabaseError as db_err:
-            logger.error(f"Database error while creating location: {db_err}")
+            logger.error("Database error while creating location: %s", db_err)
             return Response(
                 {"detail": "Database error while creating location."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
         except Exception as ex:
-            logger.error(f"Unexpected error in create: {ex}")
+            logger.error("Unexpected error in create: %s", ex)
             return Response(
                 {"detail": "An unexpected error occurred."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
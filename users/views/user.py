@@ -4,25 +4,51 @@ user.py
 Provides user-related APIs:
 - Register new users
 - Login with JWT authentication
-- List all users (admin only)
+- List all users (admin only), cursor-paginated or streamed as CSV
 """
 
+import csv
 import logging
-from django.contrib.auth import authenticate
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework_simplejwt.tokens import RefreshToken
+from core.pagination import OrderingCursorPagination
+from core.profiling import ProfilingMixin
+from core.sparse_fields import parse_fields, projected_columns
+from users.authentication import issue_tokens, token_denylist
+from users.filters import UserFilter
 from users.models import User
+from users.password_hashing import PasswordPoolBusy, authenticate_credentials, password_pool
 from users.serializers import UserRegistrationSerializer, UserSerializer
 
 logger = logging.getLogger(__name__)
 
-class UserViewSet(viewsets.ViewSet):
+
+class Echo:
+    """File-like object handing each written CSV row straight back."""
+
+    def write(self, value):
+        return value
+
+
+class UserViewSet(ProfilingMixin, viewsets.ViewSet):
     """
     A ViewSet for managing user registration, login, and user retrieval.
+
+    Attributes:
+        cursor_ordering_choices (tuple): ``?ordering=`` values accepted by
+            ``list_users`` (unique, indexed keys; the first is the default).
+        export_chunk_size (int): Rows fetched per round trip when streaming.
     """
+
+    cursor_ordering_choices = ("-id", "id", "username", "-username")
+    export_chunk_size = 2000
     
     def get_permissions(self):
         """
@@ -31,7 +57,7 @@ class UserViewSet(viewsets.ViewSet):
         Steps:
         1. Check the current action (register/login/list_users).
         2. Return AllowAny for public actions.
-        3. Return IsAdminUser for list_users.
+        3. Return IsAdminUser for list_users and hash_pool_stats.
         4. Default to IsAuthenticated for all other actions.
 
         Returns:
@@ -39,7 +65,7 @@ class UserViewSet(viewsets.ViewSet):
         """
         if self.action in ["register", "login"]:
             return [AllowAny()]
-        elif self.action == "list_users":
+        elif self.action in ["list_users", "hash_pool_stats"]:
             return [IsAdminUser()]
         return [IsAuthenticated()]
     
@@ -56,18 +82,19 @@ class UserViewSet(viewsets.ViewSet):
 
         Raises:
             serializers.ValidationError: If request data is invalid.
+            PasswordPoolBusy: If the password hashing pool is saturated (503).
             Exception: If unexpected error occurs during user creation.
 
         Steps:
             1. Validate request body with UserRegistrationSerializer.
-            2. Save user if valid.
+            2. Save user if valid (password hashed in the bounded pool).
             3. Return serialized user data with success message.
         """
         try:
             serializer = UserRegistrationSerializer(data=request.data)
             if serializer.is_valid(raise_exception=True):
                 user = serializer.save()
-                logger.info(f"User registered successfully: {user.username}")
+                logger.info("User registered successfully: %s", user.username)
                 return Response(
                     {
                         # "user": UserSerializer(user, context={'request': request}).data,
@@ -75,8 +102,10 @@ class UserViewSet(viewsets.ViewSet):
                     },
                     status=status.HTTP_201_CREATED
                 )
+        except PasswordPoolBusy as e:
+            return self.pool_busy_response(e)
         except Exception as e:
-            logger.error(f"Error during user registration: {str(e)}")
+            logger.error("Error during user registration: %s", e)
             return Response(
                 {"detail": "Failed to register user.", "error": str(e)},
                 status=status.HTTP_400_BAD_REQUEST
@@ -95,11 +124,13 @@ class UserViewSet(viewsets.ViewSet):
 
         Raises:
             AuthenticationFailed: If credentials are invalid.
+            PasswordPoolBusy: If the password hashing pool is saturated (503).
             Exception: If unexpected error occurs.
 
         Steps:
             1. Extract username and password from request body.
-            2. Authenticate user using Django's authenticate().
+            2. Authenticate the user, checking the password in the bounded
+               hashing pool (``users.password_hashing``).
             3. Generate JWT tokens if authentication succeeds.
             4. Return tokens and user data.
         """
@@ -114,11 +145,11 @@ class UserViewSet(viewsets.ViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            user = authenticate(username=username, password=password)
+            user = authenticate_credentials(request, username, password)
 
             if user:
-                refresh = RefreshToken.for_user(user)
-                logger.info(f"User logged in successfully: {user.username}")
+                refresh = issue_tokens(user)
+                logger.info("User logged in successfully: %s", user.username)
                 return Response(
                     {
                         "access": str(refresh.access_token),
@@ -128,43 +159,176 @@ class UserViewSet(viewsets.ViewSet):
                     status=status.HTTP_200_OK
                 )
             else:
-                logger.warning(f"Invalid login attempt for username: {username}")
+                logger.warning("Invalid login attempt for username: %s", username)
                 return Response(
                     {"detail": "Invalid credentials."},
                     status=status.HTTP_401_UNAUTHORIZED
                 )
 
+        except PasswordPoolBusy as e:
+            return self.pool_busy_response(e)
         except Exception as e:
-            logger.error(f"Error during login: {str(e)}")
+            logger.error("Error during login: %s", e)
             return Response(
                 {"detail": "Login failed due to server error.", "error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def pool_busy_response(self, error):
+        """
+        503 for a saturated password hashing pool.
+
+        Args:
+            error (PasswordPoolBusy): The rejection.
+
+        Returns:
+            Response: 503 with ``Retry-After``.
+        """
+        logger.warning("Password hashing pool saturated: %s", error)
+        return Response(
+            {"detail": str(error)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": "1"},
+        )
+
+    @action(detail=False, methods=['get'])
+    def hash_pool_stats(self, request):
+        """
+        Password hashing pool state and queue metrics (admin only).
+
+        Args:
+            request (Request): Incoming HTTP request.
+
+        Returns:
+            Response: ``PasswordHashPool.snapshot()``.
+        """
+        return Response(password_pool.snapshot(), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'])
+    def logout(self, request):
+        """
+        Revoke the access token of this request and, if given, its refresh token.
+
+        Args:
+            request (Request): Authenticated request; optional body ``{"refresh": "<token>"}``.
+
+        Returns:
+            Response: 205 once the tokens are on the denylist.
+
+        Raises:
+            TokenError: If the refresh token is invalid (400).
+        """
+        try:
+            refresh = request.data.get("refresh") if hasattr(request.data, "get") else None
+            if refresh:
+                token = RefreshToken(refresh)
+                if str(token.get(jwt_settings.USER_ID_CLAIM)) != str(request.user.pk):
+                    return Response(
+                        {"detail": "Refresh token belongs to another user."},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                token_denylist.revoke(token)
+            if request.auth is not None:
+                token_denylist.revoke(request.auth)
+            logger.info("User logged out: %s", request.user.username)
+            return Response({"message": "Logged out."}, status=status.HTTP_205_RESET_CONTENT)
+        except TokenError as e:
+            return Response({"detail": "Invalid refresh token.", "error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error("Error during logout: %s", e)
+            return Response(
+                {"detail": "Logout failed due to server error.", "error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
     @action(detail=False, methods=['get'])
     def list_users(self, request):
         """
-        List all registered users (admin only).
+        List registered users (admin only).
 
         Args:
             request (Request): Incoming HTTP request.
 
+        Query Parameters:
+            is_active, is_staff (bool): Account filters.
+            created_after, created_before (datetime): ``created_at`` range.
+            ordering (str): One of ``cursor_ordering_choices`` (default ``-id``).
+            cursor (str) / page_size (int): Cursor pagination controls.
+            fields (str): Optional comma-separated sparse fieldset, e.g.
+                ``?fields=id,username``; only those columns are selected.
+            export (str): ``csv`` streams every matching user instead of a page.
+
         Returns:
-            Response: JSON response containing all users.
+            Response: ``{"next", "previous", "results"}`` page, 400 for invalid
+            filters, or a streamed CSV export.
 
         Raises:
             PermissionDenied: If user is not an admin.
+            NotFound: If ``?cursor=`` is invalid.
             Exception: If query fails.
+
+        Steps:
+            1. Filter users with ``UserFilter``.
+            2. Narrow columns to ``?fields=`` when given.
+            3. Stream a CSV export, or return one cursor page (a single
+               keyset query; no COUNT, no OFFSET).
         """
         try:
-            users = User.objects.all()
-            serializer = UserSerializer(users, many=True)
+            filterset = UserFilter(request.query_params, queryset=User.objects.all(), request=request)
+            if not filterset.is_valid():
+                return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+            users = filterset.qs
+            fields = parse_fields(request)
+            columns = projected_columns(UserSerializer, fields) if fields else None
+            if columns is not None:
+                users = users.only(*columns)
+
+            if request.query_params.get("export") == "csv":
+                return self.export_users(request, users, fields)
+
+            paginator = OrderingCursorPagination()
+            page = paginator.paginate_queryset(users, request, view=self)
+            serializer = UserSerializer(page, many=True, context={"fields": fields})
             logger.info("Admin retrieved user list successfully.")
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return paginator.get_paginated_response(serializer.data)
 
+        except APIException:
+            # Client errors such as an invalid ``?cursor=`` keep their own status.
+            raise
         except Exception as e:
-            logger.error(f"Error retrieving users: {str(e)}")
+            logger.error("Error retrieving users: %s", e)
             return Response(
                 {"detail": "Failed to retrieve users.", "error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+    def export_users(self, request, users, fields):
+        """
+        Stream ``users`` as CSV in constant memory.
+
+        Args:
+            request (Request): Incoming HTTP request (for ``?ordering=``).
+            users (QuerySet): Filtered users.
+            fields (tuple | None): Requested columns; all serializer fields by default.
+
+        Returns:
+            StreamingHttpResponse: ``text/csv`` read from a server-side
+            iterator ``export_chunk_size`` rows at a time.
+        """
+        serializer_fields = UserSerializer.Meta.fields
+        header = [name for name in fields or () if name in serializer_fields] or list(serializer_fields)
+        ordering = request.query_params.get("ordering")
+        if ordering not in self.cursor_ordering_choices:
+            ordering = self.cursor_ordering_choices[0]
+        rows = users.order_by(ordering).values_list(*header).iterator(chunk_size=self.export_chunk_size)
+        writer = csv.writer(Echo())
+
+        def stream():
+            yield writer.writerow(header)
+            for row in rows:
+                yield writer.writerow(row)
+
+        logger.info("Admin started a user export.")
+        response = StreamingHttpResponse(stream(), content_type="text/csv")
+        response["Content-Disposition"] = 'attachment; filename="users.csv"'
+        return response
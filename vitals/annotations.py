@@ -0,0 +1,58 @@
+"""
+annotations.py
+~~~~~~~~~~~~~~
+Queryset annotations that summarize each patient's heart rates.
+
+Every value is a correlated subquery on ``vitals_heartrate`` filtered by
+``patient_id`` and, where relevant, a ``recorded_at`` lower bound, so each
+one is a short range scan of the ``(patient, -recorded_at)`` index. Added to
+a patient queryset they cost nothing extra in round trips: a page of
+patients and their summaries comes back in the same single query.
+"""
+
+from datetime import timedelta
+
+from django.db.models import Avg, Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from vitals.models import HeartRate
+
+
+def _readings(since=None):
+    readings = HeartRate.objects.filter(patient_id=OuterRef("pk")).order_by()
+    return readings if since is None else readings.filter(recorded_at__gte=since)
+
+
+def _aggregate(expression, since):
+    return Subquery(_readings(since).values("patient_id").annotate(value=expression).values("value")[:1])
+
+
+def with_vitals_summary(queryset, now=None):
+    """
+    Annotate patients with a heart-rate summary.
+
+    Annotations (prefixed ``vitals_``):
+        last_bpm (int | None): Most recent reading.
+        last_recorded_at (datetime | None): When it was taken.
+        readings_today (int): Readings since local midnight.
+        avg_bpm_24h (float | None): Mean bpm over the last 24 hours.
+
+    Args:
+        queryset (QuerySet): Patient queryset.
+        now (datetime | None): Reference time. Defaults to ``timezone.now()``.
+
+    Returns:
+        QuerySet: ``queryset`` with the four annotations.
+    """
+    now = now or timezone.now()
+    midnight = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    latest = _readings().order_by("-recorded_at")
+    return queryset.annotate(
+        vitals_last_bpm=Subquery(latest.values("bpm")[:1]),
+        vitals_last_recorded_at=Subquery(latest.values("recorded_at")[:1]),
+        vitals_readings_today=Coalesce(
+            _aggregate(Count("id"), midnight), Value(0), output_field=IntegerField()
+        ),
+        vitals_avg_bpm_24h=_aggregate(Avg("bpm"), now - timedelta(hours=24)),
+    )
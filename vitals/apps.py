@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class VitalsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vitals'
+
+    def ready(self):
+        from vitals.partitions import ensure_partitions_after_migrate
+
+        post_migrate.connect(ensure_partitions_after_migrate, sender=self)
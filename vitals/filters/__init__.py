@@ -0,0 +1,2 @@
+from .heartrate_filter import HeartRateFilter
+from .patient_name_search import PatientNameSearchFilter
\ No newline at end of file
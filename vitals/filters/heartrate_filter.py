@@ -0,0 +1,33 @@
+"""
+heartrate_filter.py
+~~~~~~~~~~~~~~~~~~~
+FilterSet for HeartRate queries, including time bounds on ``recorded_at``.
+
+Bounding a query by ``recorded_after`` / ``recorded_before`` lets PostgreSQL
+prune monthly partitions instead of scanning the whole table.
+"""
+
+import django_filters
+from vitals.models import HeartRate
+
+
+class HeartRateFilter(django_filters.FilterSet):
+    """
+    Filters for HeartRate list queries.
+
+    Fields
+    ------
+    patient : int
+        Restrict to a single patient.
+    recorded_after : datetime
+        Inclusive lower bound on ``recorded_at``.
+    recorded_before : datetime
+        Exclusive upper bound on ``recorded_at``.
+    """
+
+    recorded_after = django_filters.IsoDateTimeFilter(field_name="recorded_at", lookup_expr="gte")
+    recorded_before = django_filters.IsoDateTimeFilter(field_name="recorded_at", lookup_expr="lt")
+
+    class Meta:
+        model = HeartRate
+        fields = ["patient", "recorded_after", "recorded_before"]
@@ -0,0 +1,53 @@
+"""
+patient_name_search.py
+~~~~~~~~~~~~~~~~~~~~~~
+Search filter for HeartRate that matches patient names without a join.
+
+``SearchFilter`` with ``patient__first_name`` / ``patient__last_name`` joins
+``Patient`` into every heart-rate query. This backend resolves the matching
+patient ids first and filters readings with ``patient_id IN (...)``, which is
+served by the ``(patient, -recorded_at)`` index. Cost follows the number of
+matching patients rather than the number of readings.
+
+Matching keeps ``SearchFilter`` semantics: names only, case-insensitive
+substrings, no email and no fuzzy fallback (unlike the patient list's
+``search_patients``). On PostgreSQL the ``icontains`` lookups use the
+``pg_trgm`` indexes of ``patients.search``.
+"""
+
+import operator
+from functools import reduce
+
+from django.db.models import Q
+from rest_framework import filters
+from rest_framework.filters import search_smart_split
+from patients.models import Patient
+from patients.search import limited_ids
+
+NAME_FIELDS = ("first_name", "last_name")
+
+
+class PatientNameSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` filter for HeartRate querysets by patient first / last name.
+
+    Each whitespace-separated term must match the first or last name, as with
+    ``SearchFilter``. Views may override ``get_search_patient_queryset`` to
+    restrict which patients are searched.
+    """
+
+    def get_patient_queryset(self, request, view):
+        """Patients whose names are searched."""
+        getter = getattr(view, "get_search_patient_queryset", None)
+        return getter() if getter else Patient.objects.all()
+
+    def filter_queryset(self, request, queryset, view):
+        terms = list(search_smart_split(self.get_search_terms(request)))
+        if not terms:
+            return queryset
+        patients = self.get_patient_queryset(request, view)
+        for term in terms:
+            patients = patients.filter(
+                reduce(operator.or_, (Q(**{f"{field}__icontains": term}) for field in NAME_FIELDS))
+            )
+        return queryset.filter(patient_id__in=limited_ids(patients))
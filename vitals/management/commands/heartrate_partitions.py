@@ -0,0 +1,68 @@
+"""
+heartrate_partitions.py
+~~~~~~~~~~~~~~~~~~~~~~~
+Management command for maintaining monthly HeartRate partitions.
+
+Usage
+-----
+    python manage.py heartrate_partitions ensure [--months-ahead N]
+    python manage.py heartrate_partitions prune [--retain-months N] [--drop] [--dry-run]
+
+``prune`` detaches (and with ``--drop`` drops) partitions older than the
+retention window, which is instantaneous compared to deleting rows.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from vitals.partitions import (
+    detach_partition,
+    ensure_partitions,
+    expired_partitions,
+    is_partitioned,
+)
+
+
+class Command(BaseCommand):
+    help = "Create upcoming HeartRate partitions or detach/drop expired ones (PostgreSQL)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["ensure", "prune"])
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--months-ahead", type=int, default=None,
+            help="Months of future partitions to create (ensure).",
+        )
+        parser.add_argument(
+            "--retain-months", type=int, default=None,
+            help="Months to keep, including the current one (prune).",
+        )
+        parser.add_argument("--drop", action="store_true", help="Drop partitions instead of only detaching.")
+        parser.add_argument("--dry-run", action="store_true", help="List what would be pruned.")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        retain = options["retain_months"]
+        if retain is None:
+            retain = settings.HEARTRATE_RETENTION_MONTHS
+        if options["action"] == "prune" and retain < 1:
+            raise CommandError("--retain-months must be at least 1.")
+        if not is_partitioned(using):
+            self.stdout.write("HeartRate table is not partitioned on this database; nothing to do.")
+            return
+
+        if options["action"] == "ensure":
+            created = ensure_partitions(options["months_ahead"], using=using)
+            self.stdout.write(f"Created {len(created)} partition(s): {', '.join(created) or '-'}")
+            return
+
+        expired = expired_partitions(retain, using=using)
+        for name in expired:
+            if options["dry_run"]:
+                self.stdout.write(f"Would {'drop' if options['drop'] else 'detach'} {name}")
+                continue
+            detach_partition(name, drop=options["drop"], using=using)
+            self.stdout.write(f"{'Dropped' if options['drop'] else 'Detached'} {name}")
+        if not expired:
+            self.stdout.write("No expired partitions.")
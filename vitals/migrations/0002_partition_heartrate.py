@@ -0,0 +1,132 @@
+"""
+Convert ``vitals_heartrate`` into a table range-partitioned by month on
+``recorded_at`` (PostgreSQL only; other backends are left untouched).
+
+PostgreSQL requires the partition key in the primary key, so the table's
+primary key becomes ``(id, recorded_at)``. ``id`` keeps its own sequence and
+stays unique in practice, which is all the ORM relies on.
+"""
+
+from django.db import migrations, models
+from django.utils import timezone
+
+from vitals.partitions import (
+    DEFAULT_PARTITION,
+    PARENT_TABLE,
+    add_months,
+    create_partitions,
+    month_start,
+)
+
+STAGING_TABLE = f"{PARENT_TABLE}_staging"
+SEQUENCE = f"{PARENT_TABLE}_id_seq"
+STAGING_SEQUENCE = f"{PARENT_TABLE}_staging_id_seq"
+MONTHS_AHEAD = 3
+
+
+def _constraint_and_index_sql(cursor, table):
+    """Capture FK/CHECK constraints and secondary indexes of ``table`` for recreation."""
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('f', 'c') AND conparentid = 0
+        """,
+        [table],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        """
+        SELECT pg_get_indexdef(indexrelid) FROM pg_index
+        WHERE indrelid = %s::regclass AND NOT indisprimary
+        """,
+        [table],
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    return constraints, indexes
+
+
+def _restore(cursor, qn, table, source, constraints, indexes):
+    """Re-add captured constraints and indexes to ``table``."""
+    for name, definition in constraints:
+        cursor.execute(f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}")
+    for definition in indexes:
+        definition = definition.replace(" ON ONLY ", " ON ")
+        cursor.execute(definition.replace(f".{source} ", f".{table} ").replace(f" {source} ", f" {table} "))
+
+
+def partition_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {qn(PARENT_TABLE)} RENAME TO {qn(STAGING_TABLE)}")
+        constraints, indexes = _constraint_and_index_sql(cursor, STAGING_TABLE)
+
+        cursor.execute(
+            f"CREATE TABLE {qn(PARENT_TABLE)} (LIKE {qn(STAGING_TABLE)} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE (recorded_at)"
+        )
+        cursor.execute(f"CREATE SEQUENCE {qn(STAGING_SEQUENCE)}")
+        cursor.execute(
+            f"ALTER TABLE {qn(PARENT_TABLE)} ALTER COLUMN id "
+            f"SET DEFAULT nextval('{STAGING_SEQUENCE}')"
+        )
+        # Monthly partitions cover every existing row before the default
+        # partition exists, so the default starts empty and later months can
+        # be created without moving rows out of it.
+        now = timezone.now()
+        cursor.execute(f"SELECT MIN(recorded_at), MAX(recorded_at) FROM {qn(STAGING_TABLE)}")
+        oldest, newest = cursor.fetchone()
+        ahead = add_months(month_start(now), MONTHS_AHEAD)
+        create_partitions(cursor, qn, min(oldest or now, now), max(newest or ahead, ahead))
+        cursor.execute(f"CREATE TABLE {qn(DEFAULT_PARTITION)} PARTITION OF {qn(PARENT_TABLE)} DEFAULT")
+
+        cursor.execute(f"INSERT INTO {qn(PARENT_TABLE)} SELECT * FROM {qn(STAGING_TABLE)}")
+        cursor.execute(
+            f"SELECT setval('{STAGING_SEQUENCE}', COALESCE(MAX(id), 0) + 1, false) "
+            f"FROM {qn(PARENT_TABLE)}"
+        )
+        cursor.execute(f"DROP TABLE {qn(STAGING_TABLE)}")
+
+        cursor.execute(f"ALTER SEQUENCE {qn(STAGING_SEQUENCE)} RENAME TO {qn(SEQUENCE)}")
+        cursor.execute(f"ALTER SEQUENCE {qn(SEQUENCE)} OWNED BY {qn(PARENT_TABLE)}.id")
+        cursor.execute(f"ALTER TABLE {qn(PARENT_TABLE)} ADD PRIMARY KEY (id, recorded_at)")
+        _restore(cursor, qn, PARENT_TABLE, STAGING_TABLE, constraints, indexes)
+
+
+def unpartition_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {qn(PARENT_TABLE)} RENAME TO {qn(STAGING_TABLE)}")
+        constraints, indexes = _constraint_and_index_sql(cursor, STAGING_TABLE)
+
+        cursor.execute(f"CREATE TABLE {qn(PARENT_TABLE)} (LIKE {qn(STAGING_TABLE)} INCLUDING DEFAULTS)")
+        cursor.execute(f"INSERT INTO {qn(PARENT_TABLE)} SELECT * FROM {qn(STAGING_TABLE)}")
+        cursor.execute(f"ALTER SEQUENCE {qn(SEQUENCE)} OWNED BY NONE")
+        cursor.execute(f"DROP TABLE {qn(STAGING_TABLE)} CASCADE")
+
+        cursor.execute(f"ALTER SEQUENCE {qn(SEQUENCE)} OWNED BY {qn(PARENT_TABLE)}.id")
+        cursor.execute(f"ALTER TABLE {qn(PARENT_TABLE)} ADD PRIMARY KEY (id)")
+        _restore(cursor, qn, PARENT_TABLE, STAGING_TABLE, constraints, indexes)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vitals", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_table, unpartition_table),
+        migrations.AddIndex(
+            model_name="heartrate",
+            index=models.Index(
+                fields=["patient", "-recorded_at"],
+                name="vitals_hr_patient_recent_idx",
+            ),
+        ),
+    ]
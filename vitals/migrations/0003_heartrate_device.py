@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_device"),
+        ("vitals", "0002_partition_heartrate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="heartrate",
+            name="device",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Device that posted the heart rate. Null for manual entries.",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="heart_rates",
+                to="users.device",
+            ),
+        ),
+    ]
@@ -10,7 +10,7 @@ Created By: Kaustubh
 
 from django.db import models
 from patients.models import Patient
-from users.models import User
+from users.models import Device, User
 
 class HeartRate(models.Model):
     """
@@ -19,6 +19,7 @@ class HeartRate(models.Model):
     Attributes:
         patient: The patient whose heart rate is recorded.
         recorded_by: User who recorded the measurement. Can be null.
+        device: Device that posted the measurement, if any.
         bpm: Beats per minute recorded for the patient.
         recorded_at: Timestamp when the heart rate was recorded.
         created_at: Timestamp when the record was created.
@@ -38,6 +39,14 @@ class HeartRate(models.Model):
         related_name='recorded_heart_rates',
         help_text="User who recorded the heart rate. Can be null."
     )
+    device: Device = models.ForeignKey(
+        Device,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='heart_rates',
+        help_text="Device that posted the heart rate. Null for manual entries."
+    )
     bpm: int = models.PositiveIntegerField(
         help_text="Beats per minute recorded for the patient."
     )
@@ -60,8 +69,14 @@ class HeartRate(models.Model):
 
         Attributes:
             ordering: Default ordering of records (newest first based on recorded_at).
+            indexes: Composite (patient, -recorded_at) index serving per-patient,
+                     time-bounded reads. On PostgreSQL the table is also range
+                     partitioned by month on recorded_at (see vitals/partitions.py).
         """
         ordering = ['-recorded_at']
+        indexes = [
+            models.Index(fields=['patient', '-recorded_at'], name='vitals_hr_patient_recent_idx'),
+        ]
         verbose_name = "Heart Rate"
         verbose_name_plural = "Heart Rates"
 
@@ -0,0 +1,283 @@
+"""
+partitions.py
+~~~~~~~~~~~~~
+Monthly range partitioning of the HeartRate table on PostgreSQL.
+
+The ``vitals_heartrate`` table is partitioned by ``recorded_at`` into one
+partition per calendar month (``vitals_heartrate_pYYYY_MM``) plus a default
+partition that catches anything outside the attached ranges. Helpers in this
+module create upcoming partitions ahead of time (moving any rows the default
+partition already holds for that month) and detach or drop expired ones, so
+retention is a metadata operation instead of a large DELETE.
+
+Every helper is a no-op on databases other than PostgreSQL, or when the table
+has not been converted by ``vitals/migrations/0002_partition_heartrate.py``.
+"""
+
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connections, DatabaseError, DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "vitals_heartrate"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+PARTITION_PREFIX = f"{PARENT_TABLE}_p"
+
+
+def month_start(value):
+    """
+    Return the first instant (UTC) of the month containing ``value``.
+
+    Args:
+        value (datetime): Aware or naive datetime. Naive values are treated as UTC.
+
+    Returns:
+        datetime: Aware UTC datetime at midnight on the first of the month.
+    """
+    if timezone.is_naive(value):
+        value = value.replace(tzinfo=dt_timezone.utc)
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(value, months):
+    """
+    Shift a month start by a whole number of months.
+
+    Args:
+        value (datetime): Datetime at the start of a month.
+        months (int): Number of months to add (may be negative).
+
+    Returns:
+        datetime: Start of the shifted month.
+    """
+    index = value.year * 12 + (value.month - 1) + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(start):
+    """
+    Return the partition table name for the month starting at ``start``.
+
+    Example:
+        ``vitals_heartrate_p2025_09``
+    """
+    return f"{PARTITION_PREFIX}{start.year:04d}_{start.month:02d}"
+
+
+def partition_start(name):
+    """
+    Parse a partition table name back into its month start.
+
+    Returns:
+        datetime | None: Start of the month, or None if ``name`` is not a
+        monthly partition (for example the default partition).
+    """
+    if not name.startswith(PARTITION_PREFIX):
+        return None
+    try:
+        year, month = name[len(PARTITION_PREFIX):].split("_")
+        return datetime(int(year), int(month), 1, tzinfo=dt_timezone.utc)
+    except ValueError:
+        return None
+
+
+def is_partitioned(using=DEFAULT_DB_ALIAS):
+    """
+    Check whether the HeartRate table is a partitioned table.
+
+    Returns:
+        bool: True only on PostgreSQL once the table has been converted.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = %s AND pg_table_is_visible(c.oid)
+            """,
+            [PARENT_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def existing_partitions(using=DEFAULT_DB_ALIAS):
+    """
+    List partitions currently attached to the HeartRate table.
+
+    Returns:
+        list[str]: Partition table names, sorted.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)
+            ORDER BY child.relname
+            """,
+            [PARENT_TABLE],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _default_has_rows(cursor, quote_name, start, end):
+    """Whether the default partition (if any) holds rows in ``[start, end)``."""
+    cursor.execute("SELECT to_regclass(%s)", [DEFAULT_PARTITION])
+    if cursor.fetchone()[0] is None:
+        return False
+    cursor.execute(
+        f"SELECT 1 FROM {quote_name(DEFAULT_PARTITION)} WHERE recorded_at >= %s AND recorded_at < %s LIMIT 1",
+        [start, end],
+    )
+    return cursor.fetchone() is not None
+
+
+def _create_partition(cursor, quote_name, start):
+    """
+    Create and attach the monthly partition starting at ``start``.
+
+    PostgreSQL refuses ``CREATE TABLE ... PARTITION OF`` for a range the
+    default partition already holds rows in. In that case the month is built
+    as a standalone table, the rows are moved into it from the default
+    partition and the table is then attached. Run it inside a transaction.
+    """
+    end = add_months(start, 1)
+    name = quote_name(partition_name(start))
+    parent = quote_name(PARENT_TABLE)
+    bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    if not _default_has_rows(cursor, quote_name, start, end):
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {parent} {bounds}")
+        return
+    default = quote_name(DEFAULT_PARTITION)
+    in_range = "recorded_at >= %s AND recorded_at < %s"
+    cursor.execute(f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS)")
+    cursor.execute(f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_range}", [start, end])
+    cursor.execute(f"DELETE FROM {default} WHERE {in_range}", [start, end])
+    logger.info("Moved %s heart rate(s) from %s into %s", cursor.rowcount, DEFAULT_PARTITION, partition_name(start))
+    cursor.execute(f"ALTER TABLE {parent} ATTACH PARTITION {name} {bounds}")
+
+
+def create_partitions(cursor, quote_name, first, last):
+    """
+    Create monthly partitions covering ``first`` through ``last`` inclusive.
+
+    Intended for migrations, which already hold a cursor inside the
+    migration transaction.
+
+    Returns:
+        list[str]: Names of the partitions that were requested.
+    """
+    names = []
+    start = month_start(first)
+    stop = month_start(last)
+    while start <= stop:
+        _create_partition(cursor, quote_name, start)
+        names.append(partition_name(start))
+        start = add_months(start, 1)
+    return names
+
+
+def ensure_partitions(months_ahead=None, now=None, using=DEFAULT_DB_ALIAS):
+    """
+    Make sure partitions exist from the current month to ``months_ahead`` months out.
+
+    Args:
+        months_ahead (int | None): Months to pre-create. Defaults to
+            ``settings.HEARTRATE_PARTITION_MONTHS_AHEAD``.
+        now (datetime | None): Reference time, mainly for tests.
+        using (str): Database alias.
+
+    Returns:
+        list[str]: Names of partitions that were newly created.
+    """
+    if not is_partitioned(using):
+        return []
+    if months_ahead is None:
+        months_ahead = settings.HEARTRATE_PARTITION_MONTHS_AHEAD
+    current = month_start(now or timezone.now())
+    connection = connections[using]
+    existing = set(existing_partitions(using))
+    created = []
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            start = add_months(current, offset)
+            name = partition_name(start)
+            if name in existing:
+                continue
+            _create_partition(cursor, connection.ops.quote_name, start)
+            created.append(name)
+    if created:
+        logger.info("Created heart rate partitions: %s", ", ".join(created))
+    return created
+
+
+def expired_partitions(retain_months, now=None, using=DEFAULT_DB_ALIAS):
+    """
+    List monthly partitions that lie entirely outside the retention window.
+
+    Args:
+        retain_months (int): Number of months to keep, counting the current month.
+        now (datetime | None): Reference time, mainly for tests.
+        using (str): Database alias.
+
+    Returns:
+        list[str]: Partition names whose whole month is older than the window.
+    """
+    if not is_partitioned(using):
+        return []
+    cutoff = add_months(month_start(now or timezone.now()), -(retain_months - 1))
+    return [
+        name for name in existing_partitions(using)
+        if (start := partition_start(name)) is not None and start < cutoff
+    ]
+
+
+def detach_partition(name, drop=False, using=DEFAULT_DB_ALIAS):
+    """
+    Detach a monthly partition from the HeartRate table, optionally dropping it.
+
+    Detaching keeps the rows in a standalone table for archiving; dropping
+    removes them. Either way the parent table never runs a DELETE.
+
+    Args:
+        name (str): Partition table name.
+        drop (bool): Drop the table after detaching.
+        using (str): Database alias.
+
+    Raises:
+        ValueError: If ``name`` is not a monthly HeartRate partition.
+    """
+    if partition_start(name) is None:
+        raise ValueError(f"{name} is not a monthly heart rate partition.")
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(
+            f"ALTER TABLE {quote_name(PARENT_TABLE)} DETACH PARTITION {quote_name(name)}"
+        )
+        if drop:
+            cursor.execute(f"DROP TABLE {quote_name(name)}")
+    logger.info("%s heart rate partition %s", "Dropped" if drop else "Detached", name)
+
+
+def ensure_partitions_after_migrate(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    ``post_migrate`` receiver that tops up future partitions after every migrate.
+
+    Failures are logged rather than raised so they never abort ``migrate``;
+    ``manage.py heartrate_partitions ensure`` retries.
+    """
+    try:
+        ensure_partitions(using=using)
+    except DatabaseError:
+        logger.exception("Could not create heart rate partitions after migrate")
@@ -5,10 +5,13 @@ Serializer for HeartRate model, handling validation and transformations.
 """
 
 from rest_framework import serializers
+from core.ownership import scope_to_owner
+from core.instrumentation import TimedSerializerMixin
+from core.sparse_fields import SparseFieldsSerializerMixin
 from vitals.models import HeartRate
 
 
-class HeartRateSerializer(serializers.ModelSerializer):
+class HeartRateSerializer(TimedSerializerMixin, SparseFieldsSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for HeartRate model.
 
@@ -24,6 +27,8 @@ class HeartRateSerializer(serializers.ModelSerializer):
         User who recorded this entry.
     recorded_by_name : str
         Username of the recorder.
+    device : FK
+        Device that posted this entry (null for manual entries).
     bpm : int
         Heartbeats per minute.
     recorded_at : datetime
@@ -32,6 +37,11 @@ class HeartRateSerializer(serializers.ModelSerializer):
         Timestamp when entry was created.
     updated_at : datetime
         Timestamp when entry was updated.
+
+    Notes
+    -----
+    - Renders only ``context["fields"]`` when a sparse fieldset is requested
+      (``SparseFieldsSerializerMixin``).
     """
 
     patient_name = serializers.CharField(source="patient.__str__", read_only=True)
@@ -41,9 +51,18 @@ class HeartRateSerializer(serializers.ModelSerializer):
         model = HeartRate
         fields = [
             "id", "patient", "patient_name", "recorded_by", "recorded_by_name",
-            "bpm", "recorded_at", "created_at", "updated_at",
+            "device", "bpm", "recorded_at", "created_at", "updated_at",
         ]
-        read_only_fields = ["id", "recorded_at", "created_at", "updated_at", "recorded_by"]
+        read_only_fields = ["id", "recorded_at", "created_at", "updated_at", "recorded_by", "device"]
+
+    def get_fields(self):
+        """Only offer the requesting user's own patients (all for admins)."""
+        fields = super().get_fields()
+        request = self.context.get("request")
+        patient = fields.get("patient")
+        if request is not None and patient is not None and not patient.read_only:
+            patient.queryset = scope_to_owner(patient.queryset, request.user)
+        return fields
 
     def validate_bpm(self, value):
         """Ensure bpm value is realistic (between 30 and 250)."""
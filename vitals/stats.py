@@ -0,0 +1,57 @@
+"""
+stats.py
+~~~~~~~~
+Aggregate heart-rate statistics computed in the database.
+"""
+
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import Avg, Count, DateTimeField, Max, Min, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Least
+
+from vitals.models import HeartRate
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def window_stats(patient_id, since, recent=None):
+    """
+    Summarize one patient's readings since ``since`` in a single query.
+
+    The same aggregate validates a cached representation of the window and
+    of the ``recent`` latest readings (see the timeline ETag). It covers only
+    the readings such a response can show: those recorded since the earlier
+    of ``since`` and the ``recent``-th latest reading. Its cost therefore
+    follows the window and ``recent``, not the patient's whole history. The
+    bound comes from an uncorrelated subquery served by the
+    ``(patient, -recorded_at)`` index.
+
+    Args:
+        patient_id (int): Patient whose readings are summarized.
+        since (datetime): Inclusive start of the window.
+        recent (int | None): Latest readings to cover beyond the window.
+
+    Returns:
+        dict: ``count``, ``min_bpm``, ``max_bpm`` and ``avg_bpm`` for the window,
+        plus ``total``, ``first_recorded`` and ``last_modified`` over the
+        covered readings.
+    """
+    readings = HeartRate.objects.filter(patient_id=patient_id)
+    start = Value(since, output_field=DateTimeField())
+    if recent:
+        nth_latest = readings.order_by("-recorded_at").values("recorded_at")[recent - 1:recent]
+        # Fewer than ``recent`` readings: all of them are shown.
+        start = Least(start, Coalesce(Subquery(nth_latest), Value(EPOCH, output_field=DateTimeField())))
+    in_window = Q(recorded_at__gte=since)
+    stats = readings.filter(recorded_at__gte=start).aggregate(
+        count=Count("id", filter=in_window),
+        min_bpm=Min("bpm", filter=in_window),
+        max_bpm=Max("bpm", filter=in_window),
+        avg_bpm=Avg("bpm", filter=in_window),
+        total=Count("id"),
+        first_recorded=Min("recorded_at"),
+        last_modified=Max("updated_at"),
+    )
+    if stats["avg_bpm"] is not None:
+        stats["avg_bpm"] = round(float(stats["avg_bpm"]), 1)
+    return stats
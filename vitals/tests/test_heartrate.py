@@ -5,6 +5,8 @@ Tests for HeartRateViewSet with Patient and User integration.
 """
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from vitals.models import HeartRate
 
@@ -109,6 +111,26 @@ class TestHeartRateEndpoints:
         assert response.status_code == status.HTTP_200_OK
         assert any(hr["patient_name"] == "John Doe" for hr in response.data["results"])
 
+    def test_search_heart_rate_resolves_patients_without_join(self, auth_client, heart_rate_endpoints, heart_rate_create):
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(f"{heart_rate_endpoints['list']}?search=Doe")
+        assert response.status_code == status.HTTP_200_OK
+        assert [hr["id"] for hr in response.data["results"]] == [heart_rate_create.id]
+        heart_rate_queries = [q["sql"] for q in ctx.captured_queries if 'FROM "vitals_heartrate"' in q["sql"]]
+        assert heart_rate_queries
+        assert not any("JOIN" in sql for sql in heart_rate_queries)
+
+    def test_search_heart_rate_no_matching_patient(self, auth_client, heart_rate_endpoints, heart_rate_create):
+        response = auth_client.get(f"{heart_rate_endpoints['list']}?search=Nobody")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"] == []
+
+    @pytest.mark.parametrize("term", ["johndoe@example", "Jonh"])
+    def test_search_heart_rate_matches_names_strictly(self, auth_client, heart_rate_endpoints, heart_rate_create, term):
+        response = auth_client.get(heart_rate_endpoints["list"], {"search": term})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"] == []
+
     def test_order_heart_rate_by_bpm(self, auth_client, heart_rate_endpoints, heart_rate_create):
         for bpm in [70, 65, 85]:
             HeartRate.objects.create(
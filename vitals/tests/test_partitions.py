@@ -0,0 +1,140 @@
+"""
+test_partitions.py
+~~~~~~~~~~~~~~~~~~
+Tests for HeartRate partition helpers, the maintenance command and
+time-bounded list queries.
+"""
+
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, DatabaseError
+from django.utils import timezone
+from rest_framework import status
+
+from vitals import partitions
+from vitals.models import HeartRate
+
+
+def quote(name):
+    return f'"{name}"'
+
+
+class RecordingCursor:
+    """Cursor stand-in recording SQL and answering the default-partition checks."""
+
+    rowcount = 3
+
+    def __init__(self, default_exists, default_rows):
+        self.answers = [("vitals_heartrate_default" if default_exists else None,), (1,) if default_rows else None]
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+    def fetchone(self):
+        return self.answers.pop(0)
+
+
+class TestPartitionHelpers:
+
+    def test_month_start_and_add_months(self):
+        start = partitions.month_start(datetime(2025, 12, 17, 8, 30, tzinfo=dt_timezone.utc))
+        assert start == datetime(2025, 12, 1, tzinfo=dt_timezone.utc)
+        assert partitions.add_months(start, 1) == datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+        assert partitions.add_months(start, -12) == datetime(2024, 12, 1, tzinfo=dt_timezone.utc)
+
+    def test_partition_name_round_trip(self):
+        start = datetime(2025, 9, 1, tzinfo=dt_timezone.utc)
+        name = partitions.partition_name(start)
+        assert name == "vitals_heartrate_p2025_09"
+        assert partitions.partition_start(name) == start
+        assert partitions.partition_start(partitions.DEFAULT_PARTITION) is None
+
+    def test_detach_rejects_non_monthly_partition(self):
+        with pytest.raises(ValueError):
+            partitions.detach_partition(partitions.DEFAULT_PARTITION)
+
+    def test_create_partition_attaches_directly_when_default_is_empty(self):
+        cursor = RecordingCursor(default_exists=True, default_rows=False)
+        partitions._create_partition(cursor, quote, datetime(2025, 9, 1, tzinfo=dt_timezone.utc))
+        assert cursor.statements[-1].startswith('CREATE TABLE IF NOT EXISTS "vitals_heartrate_p2025_09" PARTITION OF')
+
+    def test_create_partition_moves_rows_out_of_default(self):
+        cursor = RecordingCursor(default_exists=True, default_rows=True)
+        partitions._create_partition(cursor, quote, datetime(2025, 9, 1, tzinfo=dt_timezone.utc))
+        prefixes = [
+            'CREATE TABLE "vitals_heartrate_p2025_09" (LIKE',
+            'INSERT INTO "vitals_heartrate_p2025_09" SELECT * FROM "vitals_heartrate_default"',
+            'DELETE FROM "vitals_heartrate_default"',
+            'ALTER TABLE "vitals_heartrate" ATTACH PARTITION "vitals_heartrate_p2025_09"',
+        ]
+        moves = cursor.statements[2:]
+        assert len(moves) == len(prefixes)
+        assert all(sql.startswith(prefix) for sql, prefix in zip(moves, prefixes))
+
+    def test_post_migrate_failure_does_not_abort_migrate(self, monkeypatch, caplog):
+        def fail(**kwargs):
+            raise DatabaseError("updated partition constraint for default partition would be violated")
+
+        monkeypatch.setattr(partitions, "ensure_partitions", fail)
+        partitions.ensure_partitions_after_migrate(sender=None)
+        assert "Could not create heart rate partitions" in caplog.text
+
+
+@pytest.mark.django_db
+class TestPartitionCommand:
+
+    def test_noop_when_not_partitioned(self):
+        out = StringIO()
+        call_command("heartrate_partitions", "prune", stdout=out)
+        assert "not partitioned" in out.getvalue()
+        assert partitions.ensure_partitions() == []
+
+    def test_zero_retention_rejected(self):
+        with pytest.raises(CommandError, match="at least 1"):
+            call_command("heartrate_partitions", "prune", "--retain-months", "0", stdout=StringIO())
+
+
+def partition_of(reading):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT tableoid::regclass::text FROM vitals_heartrate WHERE id = %s", [reading.id])
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="HeartRate is only partitioned on PostgreSQL")
+class TestPartitionDDL:
+
+    def test_months_move_out_of_default_and_expire(self, heart_rate_create):
+        assert partitions.is_partitioned()
+        moment = partitions.add_months(partitions.month_start(timezone.now()), -24)
+        HeartRate.objects.filter(id=heart_rate_create.id).update(recorded_at=moment)
+        assert partition_of(heart_rate_create) == partitions.DEFAULT_PARTITION
+
+        name = partitions.partition_name(moment)
+        assert partitions.ensure_partitions(months_ahead=0, now=moment) == [name]
+        assert partition_of(heart_rate_create) == name
+        assert partitions.ensure_partitions(months_ahead=0, now=moment) == []
+
+        call_command("heartrate_partitions", "prune", "--retain-months", "12", "--drop", stdout=StringIO())
+        assert name not in partitions.existing_partitions()
+        assert not HeartRate.objects.filter(id=heart_rate_create.id).exists()
+
+
+@pytest.mark.django_db
+class TestTimeBoundedList:
+
+    def test_list_filters_by_recorded_range(self, auth_client, heart_rate_endpoints, heart_rate_create):
+        old = HeartRate.objects.create(patient=heart_rate_create.patient, bpm=60)
+        HeartRate.objects.filter(pk=old.pk).update(recorded_at=datetime(2024, 1, 15, tzinfo=dt_timezone.utc))
+
+        response = auth_client.get(
+            heart_rate_endpoints["list"],
+            {"recorded_after": "2024-01-01T00:00:00Z", "recorded_before": "2024-02-01T00:00:00Z"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [hr["id"] for hr in response.data["results"]] == [old.id]
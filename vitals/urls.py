@@ -18,6 +18,11 @@ urlpatterns = [
             'post': 'create'
         }), name='heart-rate-list'),
 
+    path(
+        'heart-rates/batch',
+        HeartRateViewSet.as_view({'get': 'batch', 'post': 'batch'}),
+        name='heart-rate-batch'),
+
     path(
         'heart-rates/<int:pk>',
         HeartRateViewSet.as_view({
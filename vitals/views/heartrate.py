@@ -7,10 +7,23 @@ Includes pagination, search, and ordering functionality.
 
 import logging
 from django.db import DatabaseError
+from django.db.models import Max
 from rest_framework import viewsets, status, filters
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from core.batch import BatchRetrieveMixin
+from core.conditional import ConditionalReadMixin, not_modified, set_validators
+from core.metrics import INGESTED_ROWS
+from core.ownership import OwnerScopedMixin, scope_to_owner
+from core.pagination import ApproximateCountPagination
+from core.profiling import ProfilingMixin
+from core.response_cache import cache_response, owner_tag
+from core.sparse_fields import SparseFieldsMixin
+from django_filters.rest_framework import DjangoFilterBackend
+from patients.models import Patient
+from users.authentication import IngestAuthenticationMixin
+from users.models import Device
+from vitals.filters import HeartRateFilter, PatientNameSearchFilter
 from vitals.models import HeartRate
 from vitals.serializers import HeartRateSerializer
 
@@ -18,32 +31,61 @@ from vitals.serializers import HeartRateSerializer
 logger = logging.getLogger(__name__)
 
 
-class HeartRateViewSet(viewsets.ModelViewSet):
+class HeartRateViewSet(
+    ProfilingMixin, IngestAuthenticationMixin, BatchRetrieveMixin, SparseFieldsMixin, ConditionalReadMixin,
+    OwnerScopedMixin, viewsets.ModelViewSet,
+):
     """
     API to record and retrieve heart rate data for patients.
 
     Public Methods
     --------------
     list(request, *args, **kwargs)
-        Retrieve paginated heart rate data with search and ordering.
+        Retrieve paginated heart rate data with search and ordering;
+        ``?fields=`` selects and renders only the named fields
+        (``SparseFieldsMixin``).
+
+    retrieve(request, *args, **kwargs)
+        Retrieve one reading; 304 when ``If-None-Match`` / ``If-Modified-Since``
+        still match (``ConditionalReadMixin``).
+
+    batch(request)
+        Retrieve many readings by id (``?ids=`` or POST body) in one query,
+        in request order, with missing ids reported (``BatchRetrieveMixin``).
+
+    get_cache_tags()
+        Response-cache tags for list / retrieve reads.
 
     create(request, *args, **kwargs)
-        Record a new heart rate entry for a patient.
+        Record a new heart rate entry for a patient. Accepts HMAC-signed
+        device requests or user tokens, authenticated without loading the
+        user (``IngestAuthenticationMixin``).
+
+    get_search_patient_queryset()
+        Patients searched by ``?search=`` (the requesting user's own).
 
     Attributes
     ----------
     queryset : QuerySet
-        All heart rate records.
+        All heart rate records; ``get_queryset`` scopes them to the requesting
+        user's patients (admins see all) via ``OwnerScopedMixin``.
+    owner_subquery : tuple
+        Scope through ``patient_id IN (SELECT id FROM patient WHERE user_id = ...)``,
+        served by the Patient ``(user, ...)`` and HeartRate ``(patient, -recorded_at)``
+        indexes without joining Patient.
     serializer_class : Serializer
         Serializer used for validation and transformation.
     permission_classes : list
         Permissions required (authenticated users only).
-    pagination_class : PageNumberPagination
-        Built-in pagination strategy.
+    pagination_class : ApproximateCountPagination
+        Page-number pagination with cached / estimated counts for large lists.
     filter_backends : list
-        Filters enabled for search and ordering.
+        Filters enabled for field filters, search and ordering.
+    filterset_class : FilterSet
+        Patient and ``recorded_at`` time-bound filters (enables partition pruning).
     search_fields : list
-        Searchable patient fields.
+        Searchable patient fields. Matched by ``PatientNameSearchFilter``, which
+        resolves patient ids first instead of joining Patient.
     ordering_fields : list
         Fields that can be ordered.
 
@@ -56,13 +98,67 @@ class HeartRateViewSet(viewsets.ModelViewSet):
     """
 
     queryset = HeartRate.objects.all()
+    owner_subquery = ("patient", Patient, "user")
     serializer_class = HeartRateSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = PageNumberPagination
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = ApproximateCountPagination
+    filter_backends = [DjangoFilterBackend, PatientNameSearchFilter, filters.OrderingFilter]
+    filterset_class = HeartRateFilter
     search_fields = ["patient__first_name", "patient__last_name"]
     ordering_fields = ["recorded_at", "bpm"]
 
+    def get_search_patient_queryset(self):
+        """
+        Patients whose names ``?search=`` matches.
+
+        Returns
+        -------
+        QuerySet
+            The requesting user's patients, or all patients for admins.
+        """
+        return scope_to_owner(Patient.objects.all(), self.request.user)
+
+    def get_queryset(self):
+        """Owner-scoped readings; detail and batch reads also load patient and recorder."""
+        queryset = super().get_queryset()
+        if self.action in ("retrieve", "batch"):
+            queryset = queryset.select_related("patient", "recorded_by")
+        return queryset
+
+    def get_list_validator_parts(self, queryset):
+        """Readings embed ``patient_name``, so renaming a patient changes the list."""
+        patients = self.get_search_patient_queryset().aggregate(last_modified=Max("updated_at"))
+        return (patients["last_modified"],)
+
+    def get_object_last_modified(self, instance):
+        """The later of the reading's and its patient's ``updated_at``."""
+        return max(instance.updated_at, instance.patient.updated_at)
+
+    def get_cache_tags(self):
+        """
+        Tags invalidating cached reads (see ``core.response_cache``).
+
+        Readings embed the patient name, so patient tags are included too.
+
+        Returns
+        -------
+        list
+            Per-reading tags for a detail read, per-patient tags for
+            ``?patient=`` lists, otherwise the requesting user's tags.
+        """
+        user = self.request.user
+        if self.action == "retrieve":
+            return [f"heart_rate:{self.kwargs['pk']}", owner_tag("patients", user)]
+        patient = self.request.query_params.get("patient", "")
+        if patient.isdigit():
+            return [f"heart_rates:patient:{patient}", f"patient:{patient}"]
+        return [owner_tag("heart_rates", user), owner_tag("patients", user)]
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @cache_response
     def list(self, request, *args, **kwargs):
         """
         Retrieve paginated heart rate records.
@@ -71,29 +167,36 @@ class HeartRateViewSet(viewsets.ModelViewSet):
         -----
         1. Log request for fetching heart rate data.
         2. Query HeartRate objects.
-        3. Apply pagination, search, and ordering.
-        4. Serialize paginated results.
-        5. Return serialized data.
+        3. Return 304 if the list's ETag (row count, latest ``updated_at`` of
+           readings and patients, request path) matches ``If-None-Match``.
+        4. Apply pagination, search, and ordering.
+        5. Serialize paginated results.
+        6. Return serialized data with the ETag.
         """
         try:
             logger.info("Fetching heart rate records...")
             queryset = self.filter_queryset(self.get_queryset())
+            etag = self.get_list_etag(queryset)
+            cached = not_modified(request, etag)
+            if cached is not None:
+                return cached
+
             page = self.paginate_queryset(queryset)
             if page is not None:
                 serializer = self.get_serializer(page, many=True)
                 logger.info("Heart rate records fetched successfully.")
-                return self.get_paginated_response(serializer.data)
+                return set_validators(self.get_paginated_response(serializer.data), etag)
 
             serializer = self.get_serializer(queryset, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return set_validators(Response(serializer.data, status=status.HTTP_200_OK), etag)
         except DatabaseError as db_err:
-            logger.error(f"Database error while fetching heart rates: {db_err}")
+            logger.error("Database error while fetching heart rates: %s", db_err)
             return Response(
                 {"detail": "Database error while fetching heart rate data."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
         except Exception as ex:
-            logger.error(f"Unexpected error in list: {ex}")
+            logger.error("Unexpected error in list: %s", ex)
             return Response(
                 {"detail": "An unexpected error occurred."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -107,7 +210,8 @@ class HeartRateViewSet(viewsets.ModelViewSet):
         -----
         1. Log request for creating a new heart rate record.
         2. Validate input data with serializer.
-        3. Save entry with recorded_by set as request.user.
+        3. Save entry with recorded_by set as request.user (the owner for
+           device requests) and the posting device, if any.
         4. Return created entry in response.
 
         Arguments
@@ -121,23 +225,25 @@ class HeartRateViewSet(viewsets.ModelViewSet):
             JSON response with created entry or validation errors.
         """
         try:
-            logger.info("Creating a new heart rate record...")
+            logger.debug("Creating a new heart rate record...")
             serializer = self.get_serializer(data=request.data)
             if serializer.is_valid():
-                heart_rate = serializer.save(recorded_by=request.user)
-                logger.info(f"Heart rate record created successfully: {heart_rate.id}")
+                device = request.auth if isinstance(request.auth, Device) else None
+                heart_rate = serializer.save(recorded_by=request.user, device=device)
+                INGESTED_ROWS.inc("heart_rate")
+                logger.info("Heart rate record created successfully: %s", heart_rate.id)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-            logger.warning(f"Validation failed: {serializer.errors}")
+            logger.warning("Validation failed: %s", serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except DatabaseError as db_err:
-            logger.error(f"Database error while creating heart rate record: {db_err}")
+            logger.error("Database error while creating heart rate record: %s", db_err)
             return Response(
                 {"detail": "Database error while saving heart rate data."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
         except Exception as ex:
-            logger.error(f"Unexpected error in create: {ex}")
+            logger.error("Unexpected error in create: %s", ex)
             return Response(
                 {"detail": "An unexpected error occurred."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,